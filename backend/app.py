@@ -3,20 +3,44 @@ Flask 애플리케이션 메인 파일
 데이터베이스 초기화 및 서버 실행을 담당합니다.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
-from models import db, User, Subject, QuizResult, Week, Material, LearningPDF, ChatHistory, ConceptContent, Quiz, Question, UserResponse, QuizReport
+from sqlalchemy.orm import defer, undefer
+from models import db, User, Subject, QuizResult, Week, Material, LearningPDF, ChatHistory, ConceptContent, Quiz, Question, UserResponse, QuizReport, ConceptMastery, QuestionBankEntry
 from werkzeug.utils import secure_filename
 from werkzeug.security import generate_password_hash, check_password_hash
-from PyPDF2 import PdfReader
 import os
 import json
 import time
+import logging
+import threading
 from datetime import datetime
 from dotenv import load_dotenv
-import google.generativeai as genai
 import random
-from rag_utils import extract_text_from_pdf
+from llm_provider import get_llm_provider
+from jobs import submit_job
+from rag_utils import iter_pdf_pages
+from text_cleaning import clean_pages
+from grading import grade_answers
+from study_planner import build_study_plan, build_message_prompt, plan_inputs, refresh_study_plan, korea_today, exam_day, is_message_enabled as is_study_plan_message_enabled
+from compressed_text import load_dictionaries
+from artifacts import week_text_fingerprint, subject_week_text_fingerprints, is_current
+from mastery import apply_graded_responses, quiz_graded_responses, weakest_concepts, format_weak_concepts
+from question_bank import BankSelection, select_bank_questions, copy_question, index_questions, promote_copies, is_enabled as question_bank_enabled
+from quiz_generation import plan_shards, generate_sharded, generate_questions, QuizGenerationError, QUESTION_WEEKS_KEY, is_enabled as quiz_sharding_enabled
+from concept_summaries import material_summaries, partial_fingerprint, reduce_input as material_reduce_input, is_enabled as concept_hierarchical_enabled
+from idempotency import idempotent
+from rate_limits import init_rate_limits, rate_limited, check as check_rate_limit, charge_llm_tokens
+from coalescing import init_coalescing, acquire as acquire_generation, release as release_generation, ClaimTimeout
+from db_lifecycle import release_session
+from migrations import run_migrations, is_enabled as migrations_enabled
+from material_text import schedule_material_text, get_material_text, material_abspath, MaterialTextPending, TEXT_PENDING
+from json_serialization import init_json_provider
+from response_compression import init_response_compression, negotiate_encoding, precompress_json, precompressed_response
+from logging_setup import configure_logging, init_request_ids
+from instrumentation import init_instrumentation, registry as metrics_registry, metrics_access_allowed
+
+logger = logging.getLogger(__name__)
 
 # 현대적이고 차분한 색상 팔레트 (HEX 코드)
 PASTEL_COLORS = [
@@ -39,24 +63,31 @@ def create_app():
     basedir = os.path.abspath(os.path.dirname(__file__))
     env_path = os.path.join(basedir, '.env')
     load_dotenv(env_path)
+    configure_logging()
     
     """Flask 애플리케이션 팩토리 함수"""
     # 환경 변수 로드 확인 (디버깅)
     api_key = os.getenv('GEMINI_API_KEY')
-    if api_key:
+    if os.getenv('LLM_PROVIDER', 'gemini').lower() == 'fake':
+        logger.info("LLM_PROVIDER=fake: 로컬 Fake LLM 프로바이더를 사용합니다 (Gemini API 호출 없음).")
+    elif api_key:
         masked_key = api_key[:7] + "..." + api_key[-4:] if len(api_key) > 11 else "***"
-        print(f"✅ GEMINI_API_KEY 로드 완료: {masked_key}")
+        logger.info("GEMINI_API_KEY 로드 완료: %s", masked_key)
     else:
-        print("⚠️  GEMINI_API_KEY가 로드되지 않았습니다. .env 파일을 확인해주세요.")
+        logger.warning("GEMINI_API_KEY가 로드되지 않았습니다. .env 파일을 확인해주세요.")
     
     app = Flask(__name__)
     
+    # API 응답 JSON 직렬화 (orjson)
+    init_json_provider(app)
+    
     # CORS 설정 (프론트엔드와의 통신을 위해 - 모든 도메인 허용)
     CORS(app, resources={
         r"/*": {
             "origins": "*",
             "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"],
+            "allow_headers": ["Content-Type", "Authorization", "Idempotency-Key"],
+            "expose_headers": ["Idempotent-Replayed", "Retry-After"],
         }
     })
     
@@ -68,7 +99,8 @@ def create_app():
     # instance 폴더가 없으면 생성
     os.makedirs(os.path.dirname(db_path), exist_ok=True)
     
-    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    # DATABASE_URL이 설정되어 있으면 우선 사용 (벤치마크/테스트용 별도 DB)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', f'sqlite:///{db_path}')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
     # 파일 업로드 설정
@@ -88,218 +120,32 @@ def create_app():
     # SQLAlchemy 초기화
     db.init_app(app)
     
-    # 데이터베이스 테이블 생성 (스키마 업데이트)
+    # 요청 ID 발급 (로그와 X-Request-ID 응답 헤더에 사용)
+    init_request_ids(app)
+    
+    # 요청 계측 (Server-Timing 헤더, 요청별 계측 로그, /metrics 집계)
+    init_instrumentation(app)
+    
+    # 응답 압축 (Accept-Encoding 협상, brotli/gzip)
+    init_response_compression(app)
+    
+    # 같은 결과를 만드는 동시 생성 요청 병합 (요청이 끝나면 점유 해제)
+    init_coalescing(app)
+    
+    # LLM 엔드포인트 요청 제한 (요청이 사용한 LLM 토큰을 사용자 일일 사용량에 기록, init_instrumentation 뒤에 등록)
+    init_rate_limits(app)
+    
+    # 데이터베이스 스키마 마이그레이션 (DB_MIGRATE_ON_START=1일 때만, 배포 시에는 python migrations.py)
     with app.app_context():
-        # 개발 환경: 기존 데이터베이스 스키마 문제 해결을 위해 재생성 옵션
-        # 환경 변수 RESET_DB=1로 설정하면 데이터베이스를 재생성합니다
-        if os.getenv('RESET_DB') == '1':
-            print("⚠️  데이터베이스를 재생성합니다...")
-            db.drop_all()
-            db.create_all()
-            print("✅ 데이터베이스가 재생성되었습니다.")
-        else:
-            # 기존 테이블에 새 컬럼 추가 (마이그레이션)
-            from sqlalchemy import inspect, text
-            
-            inspector = inspect(db.engine)
-            existing_tables = inspector.get_table_names()
-            
-            if 'users' in existing_tables:
-                # users 테이블에 새 컬럼 추가
-                existing_columns = [col['name'] for col in inspector.get_columns('users')]
-                
-                # 새 컬럼들 추가
-                new_columns = {
-                    'login_id': ('VARCHAR(80)', None),
-                    'password': ('VARCHAR(255)', None),
-                    'school': ('VARCHAR(100)', '""'),
-                    'major': ('VARCHAR(100)', '""'),
-                    'grade': ('INTEGER', '1'),
-                    'social_type': ('VARCHAR(20)', None),
-                    'social_id': ('VARCHAR(100)', None),
-                    'onboarding_completed': ('BOOLEAN', '0'),
-                    'theme': ('VARCHAR(20)', "'light'"),
-                    'email_notifications': ('BOOLEAN', '1'),
-                    'push_notifications': ('BOOLEAN', '1'),
-                }
-                
-                # email 컬럼이 NOT NULL로 되어 있다면 nullable로 변경
-                if 'email' in existing_columns:
-                    try:
-                        # SQLite는 ALTER TABLE로 NOT NULL 제약을 직접 변경할 수 없으므로
-                        # 새 테이블을 만들고 데이터를 복사하는 방식이 필요하지만,
-                        # 여기서는 간단히 기본값을 설정하는 방식으로 처리
-                        db.session.execute(text("UPDATE users SET email = NULL WHERE email = ''"))
-                        db.session.commit()
-                        print("email 컬럼을 nullable로 처리했습니다.")
-                    except Exception as e:
-                        db.session.rollback()
-                        print(f"email 컬럼 처리 중 오류: {e}")
-                
-                for col_name, (col_type, default_val) in new_columns.items():
-                    if col_name not in existing_columns:
-                        try:
-                            if default_val is not None:
-                                db.session.execute(text(f'ALTER TABLE users ADD COLUMN {col_name} {col_type} DEFAULT {default_val}'))
-                            else:
-                                db.session.execute(text(f'ALTER TABLE users ADD COLUMN {col_name} {col_type}'))
-                            db.session.commit()
-                            print(f"users 테이블에 {col_name} 컬럼을 추가했습니다.")
-                        except Exception as e:
-                            db.session.rollback()
-                            print(f"{col_name} 컬럼 추가 중 오류: {e}")
-                
-                # 기존 필수 필드들을 nullable로 변경 (기존 데이터 호환성)
-                if 'exam_style' in existing_columns:
-                    try:
-                        # 기존 필수 필드들을 nullable로 변경
-                        db.session.execute(text("UPDATE users SET exam_style = NULL WHERE exam_style = ''"))
-                        db.session.execute(text("UPDATE users SET learning_depth = NULL WHERE learning_depth = ''"))
-                        db.session.execute(text("UPDATE users SET material_preference = NULL WHERE material_preference = ''"))
-                        db.session.execute(text("UPDATE users SET practice_style = NULL WHERE practice_style = ''"))
-                        db.session.execute(text("UPDATE users SET ai_persona = NULL WHERE ai_persona = ''"))
-                        db.session.commit()
-                    except Exception as e:
-                        db.session.rollback()
-                        print(f"기존 필드 업데이트 중 오류: {e}")
-            
-            if 'subjects' in existing_tables:
-                # subjects 테이블에 새 컬럼 추가
-                existing_columns = [col['name'] for col in inspector.get_columns('subjects')]
-                
-                # subject_type 컬럼 추가
-                if 'subject_type' not in existing_columns:
-                    try:
-                        db.session.execute(text('ALTER TABLE subjects ADD COLUMN subject_type VARCHAR(50) DEFAULT "교양"'))
-                        db.session.execute(text("UPDATE subjects SET subject_type = '교양' WHERE subject_type IS NULL OR subject_type = ''"))
-                        db.session.commit()
-                        print("subjects 테이블에 subject_type 컬럼을 추가했습니다.")
-                    except Exception as e:
-                        db.session.rollback()
-                        print(f"subject_type 컬럼 추가 중 오류: {e}")
-                
-                # syllabus_analysis 컬럼 추가 (JSON 타입)
-                if 'syllabus_analysis' not in existing_columns:
-                    try:
-                        db.session.execute(text('ALTER TABLE subjects ADD COLUMN syllabus_analysis TEXT'))
-                        db.session.commit()
-                        print("subjects 테이블에 syllabus_analysis 컬럼을 추가했습니다.")
-                    except Exception as e:
-                        db.session.rollback()
-                        print(f"syllabus_analysis 컬럼 추가 중 오류: {e}")
-                
-                # color 컬럼 추가
-                if 'color' not in existing_columns:
-                    try:
-                        db.session.execute(text('ALTER TABLE subjects ADD COLUMN color VARCHAR(7)'))
-                        db.session.commit()
-                        print("subjects 테이블에 color 컬럼을 추가했습니다.")
-                    except Exception as e:
-                        db.session.rollback()
-                        print(f"color 컬럼 추가 중 오류: {e}")
-                
-                # order 컬럼 추가 (SQLite 예약어이므로 따옴표로 감싸야 함)
-                if 'order' not in existing_columns:
-                    try:
-                        # SQLite에서 order는 예약어이므로 따옴표로 감싸야 함
-                        db.session.execute(text('ALTER TABLE subjects ADD COLUMN "order" INTEGER'))
-                        db.session.commit()
-                        # 기존 과목들의 order를 id 기반으로 설정
-                        db.session.execute(text('UPDATE subjects SET "order" = id WHERE "order" IS NULL'))
-                        db.session.commit()
-                        print("subjects 테이블에 order 컬럼을 추가했습니다.")
-                    except Exception as e:
-                        db.session.rollback()
-                        print(f"order 컬럼 추가 중 오류: {e}")
-                        import traceback
-                        traceback.print_exc()
-                
-                # D-Day 관련 컬럼 추가
-                # exam_date 컬럼 추가
-                if 'exam_date' not in existing_columns:
-                    try:
-                        db.session.execute(text('ALTER TABLE subjects ADD COLUMN exam_date DATETIME'))
-                        db.session.commit()
-                        print("subjects 테이블에 exam_date 컬럼을 추가했습니다.")
-                    except Exception as e:
-                        db.session.rollback()
-                        print(f"exam_date 컬럼 추가 중 오류: {e}")
-                
-                # is_notification_on 컬럼 추가
-                if 'is_notification_on' not in existing_columns:
-                    try:
-                        db.session.execute(text('ALTER TABLE subjects ADD COLUMN is_notification_on BOOLEAN DEFAULT 1'))
-                        db.session.commit()
-                        # 기존 과목들의 알림을 기본값(True)으로 설정
-                        db.session.execute(text('UPDATE subjects SET is_notification_on = 1 WHERE is_notification_on IS NULL'))
-                        db.session.commit()
-                        print("subjects 테이블에 is_notification_on 컬럼을 추가했습니다.")
-                    except Exception as e:
-                        db.session.rollback()
-                        print(f"is_notification_on 컬럼 추가 중 오류: {e}")
-                
-                # study_plan 컬럼 추가
-                if 'study_plan' not in existing_columns:
-                    try:
-                        db.session.execute(text('ALTER TABLE subjects ADD COLUMN study_plan TEXT'))
-                        db.session.commit()
-                        print("subjects 테이블에 study_plan 컬럼을 추가했습니다.")
-                    except Exception as e:
-                        db.session.rollback()
-                        print(f"study_plan 컬럼 추가 중 오류: {e}")
-                
-                # exam_type 컬럼 추가
-                if 'exam_type' not in existing_columns:
-                    try:
-                        db.session.execute(text('ALTER TABLE subjects ADD COLUMN exam_type VARCHAR(20)'))
-                        db.session.commit()
-                        print("subjects 테이블에 exam_type 컬럼을 추가했습니다.")
-                    except Exception as e:
-                        db.session.rollback()
-                        print(f"exam_type 컬럼 추가 중 오류: {e}")
-                
-                # exam_week_start 컬럼 추가
-                if 'exam_week_start' not in existing_columns:
-                    try:
-                        db.session.execute(text('ALTER TABLE subjects ADD COLUMN exam_week_start INTEGER'))
-                        db.session.commit()
-                        print("subjects 테이블에 exam_week_start 컬럼을 추가했습니다.")
-                    except Exception as e:
-                        db.session.rollback()
-                        print(f"exam_week_start 컬럼 추가 중 오류: {e}")
-                
-                # exam_week_end 컬럼 추가
-                if 'exam_week_end' not in existing_columns:
-                    try:
-                        db.session.execute(text('ALTER TABLE subjects ADD COLUMN exam_week_end INTEGER'))
-                        db.session.commit()
-                        print("subjects 테이블에 exam_week_end 컬럼을 추가했습니다.")
-                    except Exception as e:
-                        db.session.rollback()
-                        print(f"exam_week_end 컬럼 추가 중 오류: {e}")
-            
-            # 모든 테이블 생성/업데이트
-            db.create_all()  # 새 테이블이 있으면 생성
-            
-            # 개발 환경에서 email NOT NULL 문제 해결을 위한 임시 조치
-            # 프로덕션에서는 마이그레이션 스크립트를 사용해야 함
-            try:
-                # email 컬럼이 존재하는지 확인하고, NOT NULL 제약이 있으면 경고
-                if 'users' in existing_tables:
-                    email_col = next((col for col in inspector.get_columns('users') if col['name'] == 'email'), None)
-                    if email_col and not email_col.get('nullable', True):
-                        print("\n" + "="*60)
-                        print("⚠️  경고: email 컬럼이 NOT NULL로 설정되어 있습니다.")
-                        print("해결 방법:")
-                        print("1. 백엔드 서버를 중지하고 backend/instance/app.db 파일을 삭제한 후 서버를 재시작하세요.")
-                        print("2. 또는 reset_db.py 스크립트를 실행하세요: python backend/reset_db.py")
-                        print("3. 또는 환경 변수 RESET_DB=1을 설정하고 서버를 재시작하세요.")
-                        print("   (Windows PowerShell: $env:RESET_DB='1'; python app.py)")
-                        print("="*60 + "\n")
-            except Exception as e:
-                print(f"스키마 확인 중 오류: {e}")
-            
-            print("데이터베이스 테이블이 준비되었습니다.")
+        if migrations_enabled():
+            run_migrations()
+        
+        # 압축 텍스트 공유 사전 로드 (사전 학습은 마이그레이션에서)
+        try:
+            load_dictionaries()
+        except Exception as e:
+            db.session.rollback()
+            logger.warning("압축 텍스트 사전 로드 중 오류 (테이블이 없으면 python migrations.py 실행): %s", e)
     
     # 기본 라우트 (헬스 체크)
     @app.route('/')
@@ -308,7 +154,14 @@ def create_app():
             'status': 'ok',
             'message': 'Adaptive AI Tutor Backend API'
         }
-    
+
+    # 성능 지표 (Prometheus 텍스트 형식, 프로세스 단위 집계, METRICS_TOKEN 또는 같은 호스트에서만)
+    @app.route('/metrics')
+    def metrics():
+        if not metrics_access_allowed():
+            return jsonify({'error': 'Unauthorized'}), 403
+        return Response(metrics_registry.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
     # 회원가입 API
     @app.route('/register', methods=['POST'])
     def register():
@@ -553,6 +406,11 @@ def create_app():
             
             db.session.commit()
             
+            # 학습 스타일이 바뀌었을 수 있으므로 학습 계획 갱신
+            schedule_study_plan_refresh(Subject.query.filter(
+                Subject.user_id == user.id, Subject.study_plan.isnot(None)
+            ).all())
+            
             return jsonify({
                 'message': '온보딩이 완료되었습니다.',
                 'user': user.to_dict()
@@ -706,15 +564,15 @@ def create_app():
             if not user:
                 return jsonify({'error': 'User not found'}), 404
             
-            print(f"⚠️  사용자 ID {user_id} 계정 삭제 시작...")
-            print(f"   - 삭제될 과목 수: {len(user.subjects)}")
+            logger.info("사용자 ID %s 계정 삭제 시작...", user_id)
+            logger.debug("삭제될 과목 수: %s", len(user.subjects))
             # quiz_results는 raw SQL로 개수 확인 (모델과 DB 스키마 불일치 방지)
             try:
                 result = db.session.execute(db.text("SELECT COUNT(*) FROM quiz_results WHERE user_id = :user_id"), {"user_id": user_id})
                 quiz_results_count = result.scalar() or 0
-                print(f"   - 삭제될 퀴즈 결과 수: {quiz_results_count}")
+                logger.debug("삭제될 퀴즈 결과 수: %s", quiz_results_count)
             except Exception as e:
-                print(f"   - 퀴즈 결과 개수 확인 실패 (무시하고 계속): {str(e)}")
+                logger.warning("퀴즈 결과 개수 확인 실패 (무시하고 계속): %s", e)
                 quiz_results_count = 0
             
             # Subject 관련 데이터를 먼저 삭제
@@ -780,14 +638,17 @@ def create_app():
                     db.session.execute(db.text("DELETE FROM quiz_results WHERE subject_id = :subject_id"), {"subject_id": subject_id})
                     db.session.flush()
                 except Exception as e:
-                    print(f"      - QuizResult 삭제 중 오류 (무시하고 계속): {str(e)}")
+                    logger.warning("QuizResult 삭제 중 오류 (무시하고 계속): %s", e)
+                
+                # ConceptMastery 삭제 (subject_id로 연결, raw SQL로 과목을 삭제하므로 cascade가 적용되지 않음)
+                ConceptMastery.query.filter_by(subject_id=subject_id).delete(synchronize_session=False)
                 
                 # 6. Subject 삭제 - raw SQL 사용 (cascade로 인한 QuizResult 모델 참조 방지)
                 try:
                     db.session.execute(db.text("DELETE FROM subjects WHERE id = :subject_id"), {"subject_id": subject_id})
                     db.session.flush()
                 except Exception as e:
-                    print(f"      - Subject 삭제 중 오류: {str(e)}")
+                    logger.warning("Subject 삭제 중 오류: %s", e)
                     raise
             
             # Quiz 관련 데이터 삭제 (user_id로 직접 연결된 것들 - 혹시 모를 경우 대비)
@@ -811,9 +672,9 @@ def create_app():
             try:
                 db.session.execute(db.text("DELETE FROM quiz_results WHERE user_id = :user_id"), {"user_id": user_id})
                 db.session.flush()
-                print(f"   - QuizResult 삭제 완료")
+                logger.debug("QuizResult 삭제 완료")
             except Exception as e:
-                print(f"   - QuizResult 삭제 중 오류 (무시하고 계속): {str(e)}")
+                logger.warning("QuizResult 삭제 중 오류 (무시하고 계속): %s", e)
             
             # 사용자 삭제 - raw SQL 사용 (cascade로 인한 QuizResult 모델 참조 방지)
             try:
@@ -821,10 +682,10 @@ def create_app():
                 db.session.commit()
             except Exception as e:
                 db.session.rollback()
-                print(f"   - User 삭제 중 오류: {str(e)}")
+                logger.warning("User 삭제 중 오류: %s", e)
                 raise
             
-            print(f"✅ 사용자 ID {user_id} 계정이 완전히 삭제되었습니다.")
+            logger.info("사용자 ID %s 계정이 완전히 삭제되었습니다.", user_id)
             
             return jsonify({
                 'message': '계정이 성공적으로 삭제되었습니다.'
@@ -832,9 +693,7 @@ def create_app():
             
         except Exception as e:
             db.session.rollback()
-            print(f"❌ 계정 삭제 중 오류: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("계정 삭제 중 오류: %s", e)
             return jsonify({'error': str(e)}), 500
     
     # 사용자 설정 저장 API (알림, 테마)
@@ -914,59 +773,60 @@ def create_app():
             # syllabus_analysis가 없고 syllabus_text가 있으면 AI 분석 실행
             # 단, 이미 분석 실패한 경우(에러 정보가 저장된 경우) 재시도하지 않음
             if not subject.syllabus_analysis and subject.syllabus_text:
-                print(f"\n{'='*60}")
-                print(f"📊 과목 ID {subject_id}: AI 분석 시작 (lazy loading)")
-                print(f"📄 강의계획서 텍스트 길이: {len(subject.syllabus_text)} 문자")
-                print(f"{'='*60}\n")
+                syllabus_text = subject.syllabus_text
+                logger.info("과목 ID %s: AI 분석 시작 (lazy loading)", subject_id)
+                logger.debug("강의계획서 텍스트 길이: %s 문자", len(syllabus_text))
+                # 분석하는 동안 DB 커넥션을 잡지 않도록 세션 반환 (결과는 과목을 다시 읽어 저장)
+                release_session()
+                analysis_json = None
                 try:
-                    analysis_result = analyze_syllabus_with_llm(subject.syllabus_text)
+                    analysis_result = analyze_syllabus_with_llm(syllabus_text)
                     if analysis_result:
                         # JSON 문자열로 저장
-                        subject.syllabus_analysis = json.dumps(analysis_result, ensure_ascii=False)
-                        db.session.commit()
-                        print(f"\n{'='*60}")
-                        print(f"✅ 과목 ID {subject_id}: AI 분석 완료 및 저장")
-                        print(f"📊 분석 결과: {len(analysis_result.get('weekly_schedule', []))}개 주차 추출")
-                        print(f"{'='*60}\n")
+                        analysis_json = json.dumps(analysis_result, ensure_ascii=False)
+                        logger.debug("분석 결과: %s개 주차 추출", len(analysis_result.get('weekly_schedule', [])))
                     else:
-                        print(f"⚠️  과목 ID {subject_id}: AI 분석 결과가 None입니다.")
+                        logger.warning("과목 ID %s: AI 분석 결과가 None입니다.", subject_id)
                         # 분석 실패 시 에러 정보 저장하여 재시도 방지
                         error_info = {
                             "error": "analysis_failed",
                             "message": "Gemini API 분석이 실패했습니다. API 키를 확인하거나 잠시 후 다시 시도해주세요."
                         }
-                        subject.syllabus_analysis = json.dumps(error_info, ensure_ascii=False)
-                        db.session.commit()
+                        analysis_json = json.dumps(error_info, ensure_ascii=False)
                 except Exception as e:
                     error_msg = str(e)
-                    print(f"\n{'='*60}")
-                    print(f"❌ 과목 ID {subject_id}: AI 분석 실패")
-                    print(f"오류 내용: {error_msg}")
-                    print(f"{'='*60}\n")
+                    logger.error("과목 ID %s: AI 분석 실패: %s", subject_id, error_msg)
                     
                     # 할당량 초과나 인증 오류는 에러 정보를 저장하여 재시도 방지
                     if '429' in error_msg or 'quota' in error_msg.lower() or 'rate limit' in error_msg.lower():
-                        print(f"⚠️  할당량 초과로 인해 분석 실패 정보 저장 (재시도 방지)")
+                        logger.warning("할당량 초과로 인해 분석 실패 정보 저장 (재시도 방지)")
                         error_info = {
                             "error": "quota_exceeded",
                             "message": "Gemini API 할당량이 초과되었습니다. 무료 티어는 모델별로 할당량이 다를 수 있습니다."
                         }
-                        subject.syllabus_analysis = json.dumps(error_info, ensure_ascii=False)
-                        db.session.commit()
+                        analysis_json = json.dumps(error_info, ensure_ascii=False)
                     elif 'authentication' in error_msg.lower() or '401' in error_msg or '403' in error_msg or 'invalid' in error_msg.lower():
-                        print(f"⚠️  인증 오류로 인해 분석 실패 정보 저장 (재시도 방지)")
+                        logger.warning("인증 오류로 인해 분석 실패 정보 저장 (재시도 방지)")
                         error_info = {
                             "error": "auth_error",
                             "message": "Gemini API 인증 오류가 발생했습니다. API 키를 확인해주세요."
                         }
-                        subject.syllabus_analysis = json.dumps(error_info, ensure_ascii=False)
-                        db.session.commit()
+                        analysis_json = json.dumps(error_info, ensure_ascii=False)
+                
+                # 짧은 쓰기 트랜잭션: 분석하는 동안 과목이 삭제되었거나 다른 요청이 먼저 저장했으면 그 상태를 사용
+                subject = Subject.query.get(subject_id)
+                if not subject:
+                    return jsonify({'error': 'Subject not found'}), 404
+                if analysis_json is not None and not subject.syllabus_analysis:
+                    subject.syllabus_analysis = analysis_json
+                    db.session.commit()
+                    logger.info("과목 ID %s: AI 분석 결과 저장", subject_id)
             elif subject.syllabus_analysis:
                 # 이미 분석 결과가 있는 경우, 에러 정보인지 확인
                 try:
                     existing_analysis = json.loads(subject.syllabus_analysis)
                     if isinstance(existing_analysis, dict) and existing_analysis.get('error'):
-                        print(f"⏭️  과목 ID {subject_id}: 이전에 분석 실패 ({existing_analysis.get('error')}) - 재시도하지 않음")
+                        logger.warning("과목 ID %s: 이전에 분석 실패 (%s) - 재시도하지 않음", subject_id, existing_analysis.get('error'))
                 except:
                     pass
             
@@ -993,15 +853,15 @@ def create_app():
                                         description=week_data.get('description', '')
                                     )
                                     db.session.add(new_week)
-                                    print(f"✅ Week 모델 생성: 과목 ID {subject_id}, 주차 {week_no}")
+                                    logger.debug("Week 모델 생성: 과목 ID %s, 주차 %s", subject_id, week_no)
                         
                         db.session.commit()
                 except Exception as e:
-                    print(f"⚠️  Week 모델 생성 중 오류 (무시): {e}")
+                    logger.warning("Week 모델 생성 중 오류 (무시): %s", e)
                     db.session.rollback()
             
             subject_dict = subject.to_dict(include_weeks=True)
-            print(f"📤 과목 ID {subject_id} 반환 데이터 - exam_date: {subject_dict.get('exam_date')}, exam_type: {subject_dict.get('exam_type')}, exam_week_start: {subject_dict.get('exam_week_start')}, exam_week_end: {subject_dict.get('exam_week_end')}")
+            logger.debug("과목 ID %s 반환 데이터 - exam_date: %s, exam_type: %s, exam_week_start: %s, exam_week_end: %s", subject_id, subject_dict.get('exam_date'), subject_dict.get('exam_type'), subject_dict.get('exam_week_start'), subject_dict.get('exam_week_end'))
             return jsonify({
                 'subject': subject_dict
             }), 200
@@ -1066,6 +926,9 @@ def create_app():
             subject.syllabus_analysis = json.dumps(analysis, ensure_ascii=False)
             db.session.commit()
             
+            # 주차 주제가 바뀌었으므로 학습 계획 갱신
+            schedule_study_plan_refresh([subject])
+            
             return jsonify({
                 'message': '주차 주제가 업데이트되었습니다.',
                 'subject': subject.to_dict(include_weeks=True)
@@ -1080,8 +943,15 @@ def create_app():
         return '.' in filename and \
                filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
     
+    # 강의계획서에서 추출하여 저장하는 최대 문자 수 (대용량 PDF를 끝까지 추출하지 않도록 제한)
+    SYLLABUS_TEXT_MAX_CHARS = 50000
+    # 개념 학습/퀴즈 프롬프트에 포함하는 강의 자료 최대 문자 수 (토큰 사용량 제한)
+    CONCEPT_MATERIAL_MAX_CHARS = 12000
+    QUIZ_MATERIAL_MAX_CHARS = 30000
+    
     # 과목 추가 API
     @app.route('/subjects', methods=['POST'])
+    @rate_limited('syllabus_analysis')
     def create_subject():
         """과목 추가 (multipart/form-data로 과목명과 PDF 파일 받음)"""
         try:
@@ -1125,28 +995,28 @@ def create_app():
             # 상대 경로 저장 (DB에 저장할 때)
             relative_path = os.path.join('uploads', 'syllabus', filename)
             
-            # PDF에서 텍스트 추출 (PyPDF2 사용)
+            # PDF에서 텍스트 추출 (PDF_EXTRACTOR로 선택된 백엔드 사용)
             # File API 대신 텍스트만 추출하여 API에 전달
             syllabus_text = ''
             try:
-                print(f"📄 PDF 파일에서 텍스트 추출 시작: {filename}")
-                pdf_reader = PdfReader(file_path)
+                logger.debug("PDF 파일에서 텍스트 추출 시작: %s", filename)
+                page_numbers = []
                 text_parts = []
-                for page_num, page in enumerate(pdf_reader.pages, 1):
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_parts.append(page_text)
-                        print(f"   페이지 {page_num} 텍스트 추출 완료: {len(page_text)} 문자")
+                for page_num, page_text in iter_pdf_pages(file_path, max_chars=SYLLABUS_TEXT_MAX_CHARS):
+                    page_numbers.append(page_num)
+                    text_parts.append(page_text)
+                    logger.debug("페이지 %s 텍스트 추출 완료: %s 문자", page_num, len(page_text))
                 
-                syllabus_text = '\n\n'.join(text_parts)
-                print(f"✅ PDF 텍스트 추출 완료: 총 {len(syllabus_text)} 문자, {len(text_parts)} 페이지")
+                # 반복 머리말/꼬리말, 공백 등을 정리한 텍스트를 저장 (분석 프롬프트에 그대로 사용)
+                cleaned_parts, cleaning_stats = clean_pages(text_parts, page_numbers)
+                syllabus_text = '\n\n'.join(part for part in cleaned_parts if part)
+                logger.debug("PDF 텍스트 추출 완료: 총 %s 문자, %s 페이지 (정리 전 %s 토큰 → %s 토큰)",
+                             len(syllabus_text), len(text_parts), cleaning_stats['raw_tokens'], cleaning_stats['clean_tokens'])
                 
                 if len(syllabus_text.strip()) == 0:
-                    print("⚠️  추출된 텍스트가 비어있습니다. PDF가 텍스트 기반이 아닐 수 있습니다.")
+                    logger.warning("추출된 텍스트가 비어있습니다. PDF가 텍스트 기반이 아닐 수 있습니다.")
             except Exception as e:
-                print(f"❌ PDF 텍스트 추출 중 오류 발생: {str(e)}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("PDF 텍스트 추출 중 오류 발생: %s", e)
                 # 텍스트 추출 실패해도 과목은 생성 (파일은 저장됨)
                 syllabus_text = ''
             
@@ -1175,22 +1045,18 @@ def create_app():
             
             # 실시간 LLM 분석 실행 (과목 생성 시점에 즉시 분석)
             if syllabus_text and len(syllabus_text.strip()) > 0:
-                print(f"\n{'='*60}")
-                print(f"📊 과목 생성 직후 AI 분석 시작 (실시간)")
-                print(f"📄 강의계획서 텍스트 길이: {len(syllabus_text)} 문자")
-                print(f"{'='*60}\n")
+                logger.info("과목 생성 직후 AI 분석 시작 (실시간)")
+                logger.debug("강의계획서 텍스트 길이: %s 문자", len(syllabus_text))
                 try:
                     analysis_result = analyze_syllabus_with_llm(syllabus_text)
                     if analysis_result:
                         # JSON 문자열로 저장
                         new_subject.syllabus_analysis = json.dumps(analysis_result, ensure_ascii=False)
                         db.session.commit()
-                        print(f"\n{'='*60}")
-                        print(f"✅ 과목 ID {new_subject.id}: AI 분석 완료 및 저장 (실시간)")
-                        print(f"📊 분석 결과: {len(analysis_result.get('weekly_schedule', []))}개 주차 추출")
-                        print(f"{'='*60}\n")
+                        logger.info("과목 ID %s: AI 분석 완료 및 저장 (실시간)", new_subject.id)
+                        logger.debug("분석 결과: %s개 주차 추출", len(analysis_result.get('weekly_schedule', [])))
                     else:
-                        print(f"⚠️  과목 ID {new_subject.id}: AI 분석 결과가 None입니다.")
+                        logger.warning("과목 ID %s: AI 분석 결과가 None입니다.", new_subject.id)
                         error_info = {
                             "error": "analysis_failed",
                             "message": "Gemini API 분석이 실패했습니다. API 키를 확인하거나 잠시 후 다시 시도해주세요."
@@ -1199,10 +1065,7 @@ def create_app():
                         db.session.commit()
                 except Exception as e:
                     error_msg = str(e)
-                    print(f"\n{'='*60}")
-                    print(f"❌ 과목 ID {new_subject.id}: AI 분석 실패")
-                    print(f"오류 내용: {error_msg}")
-                    print(f"{'='*60}\n")
+                    logger.error("과목 ID %s: AI 분석 실패: %s", new_subject.id, error_msg)
                     
                     # 에러 정보 저장
                     if '429' in error_msg or 'quota' in error_msg.lower() or 'rate limit' in error_msg.lower():
@@ -1223,7 +1086,7 @@ def create_app():
                     new_subject.syllabus_analysis = json.dumps(error_info, ensure_ascii=False)
                     db.session.commit()
             else:
-                print("⚠️  강의계획서 텍스트가 없어 AI 분석을 건너뜁니다.")
+                logger.warning("강의계획서 텍스트가 없어 AI 분석을 건너뜁니다.")
             
             return jsonify({
                 'message': 'Subject created successfully',
@@ -1310,42 +1173,28 @@ def create_app():
         test_gemini.py에서 성공한 모델 선택 로직을 사용하여 무료 계정에 적합한 모델을 자동 선택합니다.
         JSON Mode를 사용하여 정확한 JSON 형식으로 응답을 받습니다.
         """
-        # API 키 확인
-        api_key = os.getenv('GEMINI_API_KEY')
-        if not api_key:
+        # LLM 프로바이더 확인 (Gemini 사용 시 API 키 필요)
+        provider = get_llm_provider()
+        if provider is None:
             error_msg = "GEMINI_API_KEY가 설정되지 않았습니다."
-            print(f"❌ {error_msg}")
-            print("   backend/.env 파일에 GEMINI_API_KEY=... 형식으로 추가해주세요.")
-            print("   API 키는 https://aistudio.google.com/app/apikey 에서 발급받을 수 있습니다.")
+            logger.error("%s backend/.env 파일에 GEMINI_API_KEY=... 형식으로 추가해주세요. "
+                         "(발급: https://aistudio.google.com/app/apikey)", error_msg)
             raise ValueError(error_msg)
         
-        # API 키 마스킹 (보안)
-        masked_key = api_key[:7] + "..." + api_key[-4:] if len(api_key) > 11 else "***"
-        print(f"🔑 Gemini API 키 확인: 설정됨 ({masked_key})")
+        logger.debug("LLM 프로바이더 확인: %s", provider.name)
         
         # 텍스트 검증
         if not syllabus_text or len(syllabus_text.strip()) == 0:
             error_msg = "강의계획서 텍스트가 비어있습니다."
-            print(f"❌ {error_msg}")
+            logger.error("%s", error_msg)
             raise ValueError(error_msg)
         
-        print(f"📄 강의계획서 텍스트 길이: {len(syllabus_text)} 문자")
+        logger.debug("강의계획서 텍스트 길이: %s 문자", len(syllabus_text))
         
         try:
-            # Gemini API 클라이언트 설정
-            genai.configure(api_key=api_key)
-            
             # 사용 가능한 모델 목록 조회하여 무료 계정에 적합한 모델 선택
-            print("📋 사용 가능한 모델 목록 조회 중...")
-            models = genai.list_models()
-            available_models = []
-            for model_obj in models:
-                model_obj_name = model_obj.name
-                if model_obj_name.startswith('models/'):
-                    model_obj_name = model_obj_name.replace('models/', '')
-                # generateContent를 지원하는 모델만 추가
-                if 'generateContent' in model_obj.supported_generation_methods:
-                    available_models.append(model_obj_name)
+            logger.debug("사용 가능한 모델 목록 조회 중...")
+            available_models = provider.list_models()
             
             # 무료 계정에 적합한 모델 우선순위: 여러 모델 시도
             # 1순위: gemini-2.5-flash (사용자가 확인한 할당량 있는 모델)
@@ -1387,45 +1236,12 @@ def create_app():
                 else:
                     raise Exception("사용 가능한 모델을 찾을 수 없습니다.")
             
-            # 여러 모델을 순차적으로 시도
-            model = None
-            selected_model_name = None
-            for model_name in model_candidates:
-                try:
-                    print(f"📡 모델 생성 중... (모델: {model_name})")
-                    # Gemini 모델 생성
-                    test_model = genai.GenerativeModel(
-                        model_name,
-                        generation_config=genai.types.GenerationConfig(
-                            temperature=0.3
-                        )
-                    )
-                    # 모델 생성만 확인 (테스트 호출 없이)
-                    model = test_model
-                    selected_model_name = model_name
-                    print(f"✅ 모델 선택 완료: {selected_model_name}")
-                    break
-                except Exception as model_error:
-                    error_msg = str(model_error)
-                    # 404 에러면 다음 모델 시도
-                    if '404' in error_msg or 'not found' in error_msg.lower():
-                        print(f"⚠️  {model_name}: 모델을 찾을 수 없음 - 다음 모델 시도...")
-                        continue
-                    # 429 할당량 초과 에러면 다음 모델 시도
-                    elif '429' in error_msg or 'quota' in error_msg.lower() or 'exceeded' in error_msg.lower():
-                        print(f"⚠️  {model_name}: 할당량 초과 - 다음 모델 시도...")
-                        continue
-                    # 다른 에러면 재발생
-                    else:
-                        print(f"⚠️  {model_name}: {error_msg}")
-                        if model_name == model_candidates[-1]:  # 마지막 모델이면 에러 발생
-                            raise
-            
-            if not model:
-                raise Exception("사용 가능한 모델을 찾을 수 없습니다.")
+            # 모델 객체 생성은 네트워크 호출이 없으므로 최우선 후보를 바로 선택
+            selected_model_name = model_candidates[0]
+            logger.debug("모델 선택 완료: %s", selected_model_name)
             
             # 프롬프트 구성 (JSON 구조)
-            # PyPDF2로 추출된 텍스트를 프롬프트에 직접 포함
+            # PDF에서 추출된 텍스트를 프롬프트에 직접 포함
             prompt = f"""당신은 대학 강의계획서를 분석하는 전문가입니다. 주어진 텍스트에서 정확한 정보를 추출하여 JSON 형식으로 응답합니다.
 
 다음은 대학 강의계획서의 텍스트입니다. 이 텍스트를 분석하여 다음 JSON 형식으로 추출해주세요:
@@ -1458,7 +1274,7 @@ def create_app():
   ]
 }}
 
-강의계획서 텍스트 (PyPDF2로 추출된 텍스트):
+강의계획서 텍스트 (PDF에서 추출된 텍스트):
 {syllabus_text[:8000]}
 
 중요 사항:
@@ -1471,17 +1287,17 @@ def create_app():
 7. week_no는 1부터 시작하는 연속된 숫자여야 합니다.
 8. 강의계획서 텍스트를 꼼꼼히 읽고, 과목구분(전공기초/전공핵심 등), 이수구분(100단위/200단위 등)을 정확히 찾아서 추출해주세요."""
             
-            print(f"🤖 Gemini API 실시간 호출 시작...")
-            print(f"   모델: {selected_model_name}")
-            print(f"   프롬프트 길이: {len(prompt)} 문자")
-            import time
-            start_time = time.time()
+            logger.debug("Gemini API 실시간 호출 시작 (모델: %s, 프롬프트 길이: %s 문자)", selected_model_name, len(prompt))
             
-            # 실시간 API 호출 (JSON Mode 사용)
-            response = model.generate_content(prompt)
+            # 실시간 API 호출
+            response = provider.generate(
+                selected_model_name,
+                prompt,
+                purpose='syllabus_analysis',
+                generation_config={'temperature': 0.3}
+            )
             
-            elapsed_time = time.time() - start_time
-            print(f"✅ Gemini API 응답 수신 완료 (소요 시간: {elapsed_time:.2f}초)")
+            logger.debug("Gemini API 응답 수신 완료 (소요 시간: %.2f초)", response.latency)
             
             # 응답 파싱
             response_text = response.text.strip()
@@ -1530,63 +1346,48 @@ def create_app():
                     del grading_policy[key]
             
             # 디버깅: 추출된 정보 확인
-            print(f"📊 LLM 분석 결과:")
-            print(f"   - 학점: {result['basic_info'].get('credits', 'N/A')}")
-            print(f"   - 과목구분: {result['basic_info'].get('course_type', 'N/A')}")
-            print(f"   - 이수구분: {result['basic_info'].get('course_level', 'N/A')}")
-            print(f"   - 주차 수: {len(result.get('weekly_schedule', []))}")
-            print(f"📊 전체 LLM 분석 결과: {json.dumps(result, ensure_ascii=False, indent=2)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("LLM 분석 결과 - 학점: %s, 과목구분: %s, 이수구분: %s, 주차 수: %s",
+                             result['basic_info'].get('credits', 'N/A'),
+                             result['basic_info'].get('course_type', 'N/A'),
+                             result['basic_info'].get('course_level', 'N/A'),
+                             len(result.get('weekly_schedule', [])))
+                logger.debug("전체 LLM 분석 결과: %s", json.dumps(result, ensure_ascii=False, indent=2))
             
             return result
             
         except json.JSONDecodeError as e:
             error_msg = str(e)
-            print(f"❌ JSON 파싱 오류: {error_msg}")
-            response_content = response.choices[0].message.content if 'response' in locals() and hasattr(response, 'choices') else 'N/A'
-            print(f"응답 내용: {response_content}")
+            logger.error("JSON 파싱 오류: %s", error_msg)
+            response_content = response.text if 'response' in locals() else 'N/A'
+            logger.debug("응답 내용: %s", response_content)
             raise ValueError(f"JSON 파싱 실패: {error_msg}")
             
         except Exception as e:
             error_msg = str(e)
             error_type = type(e).__name__
-            print(f"❌ LLM 분석 중 오류: {error_type} - {error_msg}")
+            logger.error("LLM 분석 중 오류: %s - %s", error_type, error_msg)
             
             # 할당량 초과 오류 처리 (Gemini)
             if '429' in error_msg or 'quota' in error_msg.lower() or 'rate limit' in error_msg.lower() or 'resourceexhausted' in error_msg.lower():
-                print("\n" + "="*60)
-                print("⚠️  Gemini API 할당량 문제가 발생했습니다.")
-                print("해결 방법:")
-                print("1. Google AI Studio (https://aistudio.google.com/)에 로그인")
-                print("2. API 키 할당량 확인")
-                print("3. 무료 티어는 모델별로 할당량이 다를 수 있습니다")
-                print("4. 잠시 후 다시 시도하거나 다른 모델 사용")
-                print("="*60 + "\n")
+                logger.warning("Gemini API 할당량 문제가 발생했습니다. Google AI Studio(https://aistudio.google.com/)에서 "
+                               "API 키 할당량을 확인하고 잠시 후 다시 시도하거나 다른 모델을 사용하세요.")
                 raise ValueError("Gemini API 할당량이 초과되었습니다.")
             
             # 인증 오류 처리
             if 'authentication' in error_msg.lower() or 'invalid' in error_msg.lower() or '401' in error_msg or '403' in error_msg or 'permissiondenied' in error_msg.lower():
-                print("\n" + "="*60)
-                print("⚠️  Gemini API 키 인증 오류가 발생했습니다.")
-                print("해결 방법:")
-                print("1. backend/.env 파일의 GEMINI_API_KEY가 올바른지 확인")
-                print("2. Google AI Studio에서 새 API 키 발급")
-                print("3. 서버 재시작")
-                print("="*60 + "\n")
+                logger.warning("Gemini API 키 인증 오류가 발생했습니다. backend/.env 파일의 GEMINI_API_KEY를 확인하거나 "
+                               "Google AI Studio에서 새 API 키를 발급한 뒤 서버를 재시작하세요.")
                 raise ValueError("Gemini API 인증 오류가 발생했습니다.")
             
             # 404 에러 처리 (모델을 찾을 수 없음)
             if '404' in error_msg or 'not found' in error_msg.lower() or 'notfound' in error_msg.lower():
-                print("\n" + "="*60)
-                print("⚠️  Gemini 모델을 찾을 수 없습니다.")
-                print("해결 방법:")
-                print("1. 모델 이름이 변경되었을 수 있습니다")
-                print("2. genai.list_models()로 사용 가능한 모델 확인")
-                print("3. 다른 모델로 자동 시도 중...")
-                print("="*60 + "\n")
+                logger.warning("Gemini 모델을 찾을 수 없습니다. 모델 이름이 변경되었을 수 있으니 "
+                               "LLM 프로바이더의 list_models()로 사용 가능한 모델을 확인하세요.")
                 raise ValueError("Gemini 모델을 찾을 수 없습니다.")
             
             # 기타 오류
-            print(f"❌ 예상치 못한 오류: {error_type}")
+            logger.error("예상치 못한 오류: %s", error_type)
             raise
 
     
@@ -1669,7 +1470,7 @@ def create_app():
     
     @app.route('/weeks/<int:week_id>/materials', methods=['POST'])
     def upload_week_material(week_id):
-        """주차별 자료 업로드 (PDF인 경우 학습용 PDF로도 저장)"""
+        """주차별 자료 업로드 (PDF인 경우 텍스트 추출은 백그라운드에서 진행)"""
         try:
             if 'file' not in request.files:
                 return jsonify({'error': 'No file provided'}), 400
@@ -1725,41 +1526,21 @@ def create_app():
                 file_name=file.filename,
                 file_path=relative_path,
                 file_type=file_ext,
-                file_size=file_size
+                file_size=file_size,
+                text_status=TEXT_PENDING if file_ext == 'pdf' else None
             )
             db.session.add(material)
+            db.session.commit()
             
-            # PDF인 경우 학습용 PDF로도 저장 (새로운 방식에서는 벡터 인덱스 없이 저장)
-            learning_pdf = None
+            # PDF인 경우 텍스트 추출을 백그라운드 작업으로 실행 (추출 결과는 MaterialText에 저장되고,
+            # 텍스트가 있으면 학습용 PDF로도 등록됨)
             if file_ext == 'pdf':
-                try:
-                    # 텍스트 추출
-                    extracted_text = extract_text_from_pdf(file_path)
-                    if extracted_text:
-                        # LearningPDF에 저장 (벡터 인덱스는 생성하지 않음)
-                        learning_pdf = LearningPDF(
-                            subject_id=subject.id,
-                            file_name=file.filename,
-                            file_path=relative_path,
-                            file_size=file_size,
-                            vector_index_path=None  # 새로운 방식에서는 벡터 인덱스 불필요
-                        )
-                        db.session.add(learning_pdf)
-                except Exception as e:
-                    print(f"⚠️  학습용 PDF 처리 중 오류 (자료는 정상 저장됨): {e}")
-                    # 학습용 PDF 처리 실패해도 자료 업로드는 성공으로 처리
-            
-            db.session.commit()
+                schedule_material_text(app, material.id)
             
-            result = {
+            return jsonify({
                 'message': 'Material uploaded successfully',
-                'material': material.to_dict(),
-                'learning_pdf_id': learning_pdf.id if learning_pdf else None
-            }
-            if learning_pdf:
-                result['learning_pdf'] = learning_pdf.to_dict()
-            
-            return jsonify(result), 201
+                'material': material.to_dict()
+            }), 201
             
         except Exception as e:
             db.session.rollback()
@@ -1794,9 +1575,9 @@ def create_app():
                 if os.path.exists(file_path):
                     try:
                         os.remove(file_path)
-                        print(f"✅ 파일 삭제 완료: {file_path}")
+                        logger.debug("파일 삭제 완료: %s", file_path)
                     except Exception as e:
-                        print(f"⚠️  파일 삭제 실패: {e}")
+                        logger.warning("파일 삭제 실패: %s", e)
             
             # LearningPDF도 함께 삭제 (PDF인 경우)
             if material.file_type == 'pdf' and subject_id and material.file_path:
@@ -1821,21 +1602,14 @@ def create_app():
                             chunks_path = learning_pdf.vector_db_path.replace('.index', '_chunks.pkl')
                             if os.path.exists(chunks_path):
                                 os.remove(chunks_path)
-                            print(f"✅ 벡터 인덱스 파일 삭제 완료")
+                            logger.debug("벡터 인덱스 파일 삭제 완료")
                         except Exception as e:
-                            print(f"⚠️  벡터 인덱스 파일 삭제 실패: {e}")
+                            logger.warning("벡터 인덱스 파일 삭제 실패: %s", e)
                     db.session.delete(learning_pdf)
-                    print(f"✅ LearningPDF 삭제 완료")
+                    logger.debug("LearningPDF 삭제 완료")
             
-            # PDF 삭제 시 해당 주차의 개념 학습 콘텐츠도 삭제
-            if material.file_type == 'pdf' and week:
-                week_id = week.id
-                # 해당 주차의 모든 ConceptContent 삭제
-                concept_contents = ConceptContent.query.filter_by(week_id=week_id).all()
-                for content in concept_contents:
-                    db.session.delete(content)
-                if concept_contents:
-                    print(f"✅ ConceptContent 삭제 완료 ({len(concept_contents)}개)")
+            # 해당 주차의 개념 학습 콘텐츠/문제 은행 문제는 주차 텍스트 fingerprint가 달라지므로
+            # 다음에 읽을 때 다시 생성/제외됨 (artifacts 모듈 참고)
             
             # Material 삭제
             db.session.delete(material)
@@ -1851,12 +1625,17 @@ def create_app():
             
         except Exception as e:
             db.session.rollback()
-            import traceback
-            traceback.print_exc()
+            logger.exception("자료 삭제 중 오류: %s", e)
             return jsonify({'error': str(e)}), 500
     
     # ==================== Concept Learning ====================
     
+    def store_precompressed_concept(concept_content):
+        """개념 학습 콘텐츠 캐시 응답 본문을 인코딩별로 미리 압축하여 저장 (commit은 호출하는 쪽에서)"""
+        bodies = precompress_json({'content': concept_content.content})
+        concept_content.gzip_body = bodies.get('gzip')
+        concept_content.br_body = bodies.get('br')
+    
     @app.route('/api/concept/generate', methods=['POST'])
     def generate_concept_content():
         """Concept Learning 콘텐츠 생성 (Summary 또는 Deep Dive)"""
@@ -1882,86 +1661,146 @@ def create_app():
             is_first_week = (week_number == 1)
             
             # 캐시 확인 (force_regenerate가 False인 경우)
+            # 캐시된 콘텐츠를 만든 뒤 주차 자료가 바뀌었으면(fingerprint 불일치) 다시 생성
+            source_fingerprint = week_text_fingerprint(week_id)
             if not force_regenerate:
-                cached_content = ConceptContent.query.filter_by(
-                    week_id=week_id,
-                    mode=mode
-                ).first()
-                
-                if cached_content:
+                # 압축 응답을 받는 클라이언트에는 미리 압축한 본문만 읽어서 그대로 보냄
+                # (콘텐츠 압축 해제, JSON 직렬화, 응답 압축 생략)
+                encoding = negotiate_encoding()
+                query = ConceptContent.query.filter_by(week_id=week_id, mode=mode)
+                if encoding:
+                    query = query.options(defer(ConceptContent.content), undefer(getattr(ConceptContent, f'{encoding}_body')))
+                cached_content = query.first()
+                
+                if cached_content and not is_current(cached_content.source_fingerprint, source_fingerprint):
+                    logger.info("주차 %s 자료가 바뀌어 개념 학습 콘텐츠(%s)를 다시 생성합니다.", week_id, mode)
+                elif cached_content and encoding:
+                    body = getattr(cached_content, f'{encoding}_body')
+                    if body is None:
+                        # 미리 압축한 본문이 없는 기존 콘텐츠는 처음 읽을 때 채움
+                        store_precompressed_concept(cached_content)
+                        db.session.commit()
+                        body = getattr(cached_content, f'{encoding}_body')
+                    return precompressed_response(body, encoding)
+                elif cached_content:
                     return jsonify({
                         'content': cached_content.content
                     }), 200
             
+            # 같은 주차/모드/자료의 콘텐츠를 다른 요청(다른 탭, 재시도, 다른 워커)이 생성 중이면
+            # PDF 텍스트 추출과 LLM 호출을 반복하지 않고 그 요청이 저장한 결과를 반환
+            claim_key = f'concept:{week_id}:{mode}:{source_fingerprint}'
+            wait_started = datetime.utcnow()
+            try:
+                while not acquire_generation(claim_key):
+                    generated = ConceptContent.query.filter_by(
+                        week_id=week_id, mode=mode, source_fingerprint=source_fingerprint)
+                    if force_regenerate:
+                        # 재생성 요청은 기다리기 시작한 뒤 저장된 결과만 사용
+                        generated = generated.filter(ConceptContent.updated_at >= wait_started)
+                    generated = generated.first()
+                    if generated:
+                        return jsonify({
+                            'content': generated.content
+                        }), 200
+            except ClaimTimeout:
+                return jsonify({
+                    'error': '같은 콘텐츠를 생성하고 있습니다. 잠시 후 다시 시도해주세요.',
+                    'error_code': 'GENERATION_IN_PROGRESS'
+                }), 409
+
+            if not force_regenerate:
+                # 캐시를 확인한 뒤 점유를 얻기 전에 다른 요청이 생성을 끝내고 점유를 해제했으면 그 결과를 사용
+                generated = ConceptContent.query.filter_by(
+                    week_id=week_id, mode=mode, source_fingerprint=source_fingerprint).first()
+                if generated:
+                    release_generation(claim_key)
+                    return jsonify({
+                        'content': generated.content
+                    }), 200
+
+            # 캐시 응답과 다른 요청의 결과를 기다린 요청은 제한하지 않고, 실제로 생성하는 요청만 제한
+            limited = check_rate_limit('concept_generate', week.subject.user_id if week.subject else None)
+            if limited is not None:
+                return limited
+            
             # 주차별 PDF 자료 찾기
             pdf_materials = Material.query.filter_by(week_id=week_id, file_type='pdf').all()
             if not pdf_materials:
                 return jsonify({'error': 'No PDF materials found for this week'}), 404
             
-            # 모든 PDF 파일의 텍스트 추출 및 합치기
-            app_basedir = os.path.abspath(os.path.dirname(__file__))
-            all_pdf_texts = []
-            pdf_extraction_errors = []
-            
-            for pdf_material in pdf_materials:
-                try:
-                    # 파일 경로 구성
-                    if pdf_material.file_path.startswith('uploads/'):
-                        pdf_path = os.path.join(app_basedir, pdf_material.file_path)
-                    else:
-                        pdf_path = os.path.join(app_basedir, 'uploads', 'materials', os.path.basename(pdf_material.file_path))
-                    
-                    if not os.path.exists(pdf_path):
-                        pdf_extraction_errors.append(f"PDF 파일을 찾을 수 없습니다: {pdf_path}")
-                        continue
+            # 자료가 여러 개면 자료별 요약 노트(캐시)를 통합하여 생성 (concept_summaries)
+            hierarchical = concept_hierarchical_enabled(len(pdf_materials))
+            stored_fingerprint = source_fingerprint
+            if not hierarchical:
+                # 업로드 시 저장된 PDF 텍스트 합치기
+                # 프롬프트 길이 최적화 (너무 긴 텍스트는 할당량 소모가 큼)
+                # CONCEPT_MATERIAL_MAX_CHARS를 채우면 나머지 페이지/자료는 읽지 않음
+                all_pdf_texts = []
+                pdf_extraction_errors = []
+                remaining_chars = CONCEPT_MATERIAL_MAX_CHARS
+                text_truncated = False
+            
+                for pdf_material in pdf_materials:
+                    if remaining_chars < 50:
+                        text_truncated = True
+                        break
+                    try:
+                        if pdf_material.text_status is None and not os.path.exists(material_abspath(pdf_material.file_path)):
+                            pdf_extraction_errors.append(f"PDF 파일을 찾을 수 없습니다: {pdf_material.file_name}")
+                            continue
                     
-                    pdf_text = extract_text_from_pdf(pdf_path)
-                    if pdf_text and len(pdf_text.strip()) >= 50:
-                        # PDF 파일명이 유효한 경우에만 구분자 추가
-                        if pdf_material.file_name and pdf_material.file_name.strip():
-                            all_pdf_texts.append(f"\n\n## 📄 {pdf_material.file_name}\n\n{pdf_text}\n\n")
+                        pdf_text = get_material_text(pdf_material, max_chars=remaining_chars)
+                        if pdf_text and len(pdf_text.strip()) >= 50:
+                            if len(pdf_text) >= remaining_chars:
+                                text_truncated = True
+                            # PDF 파일명이 유효한 경우에만 구분자 추가
+                            if pdf_material.file_name and pdf_material.file_name.strip():
+                                all_pdf_texts.append(f"\n\n## 📄 {pdf_material.file_name}\n\n{pdf_text}\n\n")
+                            else:
+                                all_pdf_texts.append(f"\n\n{pdf_text}\n\n")
+                            remaining_chars -= len(all_pdf_texts[-1]) + 1
                         else:
-                            all_pdf_texts.append(f"\n\n{pdf_text}\n\n")
-                    else:
-                        pdf_extraction_errors.append(f"PDF에서 텍스트를 추출할 수 없거나 내용이 너무 짧습니다: {pdf_material.file_name or '알 수 없음'}")
-                except Exception as pdf_error:
-                    pdf_extraction_errors.append(f"PDF 처리 중 오류 발생 ({pdf_material.file_name or '알 수 없음'}): {str(pdf_error)}")
-            
-            if not all_pdf_texts:
-                error_msg = 'PDF에서 텍스트를 추출할 수 없습니다.'
-                if pdf_extraction_errors:
-                    error_msg += f' 상세: {"; ".join(pdf_extraction_errors[:3])}'
-                return jsonify({'error': error_msg}), 400
-            
-            # 모든 PDF 텍스트 합치기
-            lecture_text = '\n'.join(all_pdf_texts)
-            
-            # 프롬프트 길이 최적화 (너무 긴 텍스트는 할당량 소모가 큼)
-            # 12000자로 제한하여 토큰 사용량 감소
-            max_text_length = 12000
-            if len(lecture_text) > max_text_length:
-                print(f"⚠️ PDF 텍스트가 너무 깁니다 ({len(lecture_text)} 문자). {max_text_length}자로 제한합니다.")
-                lecture_text = lecture_text[:max_text_length] + "\n\n[이하 생략...]"
-            
-            # Gemini API 설정
-            api_key = os.getenv('GEMINI_API_KEY')
-            if not api_key:
-                print("❌ GEMINI_API_KEY가 설정되지 않았습니다!")
+                            pdf_extraction_errors.append(f"PDF에서 텍스트를 추출할 수 없거나 내용이 너무 짧습니다: {pdf_material.file_name or '알 수 없음'}")
+                    except MaterialTextPending as pending:
+                        return jsonify({
+                            'error': f'{pending} 잠시 후 다시 시도해주세요.',
+                            'error_code': 'MATERIAL_PROCESSING'
+                        }), 409
+                    except Exception as pdf_error:
+                        pdf_extraction_errors.append(f"PDF 처리 중 오류 발생 ({pdf_material.file_name or '알 수 없음'}): {str(pdf_error)}")
+            
+                if not all_pdf_texts:
+                    error_msg = 'PDF에서 텍스트를 추출할 수 없습니다.'
+                    if pdf_extraction_errors:
+                        error_msg += f' 상세: {"; ".join(pdf_extraction_errors[:3])}'
+                    return jsonify({'error': error_msg}), 400
+            
+                # 모든 PDF 텍스트 합치기
+                lecture_text = '\n'.join(all_pdf_texts)
+                if text_truncated:
+                    logger.info("PDF 텍스트가 너무 깁니다. %s자까지만 사용합니다.", CONCEPT_MATERIAL_MAX_CHARS)
+                    lecture_text = lecture_text.rstrip() + "\n\n[이하 생략...]"
+            
+            # 모델 목록 조회와 LLM 호출(재시도 대기 포함) 동안 DB 커넥션을 잡지 않도록 세션 반환
+            # (이후에는 위에서 읽은 값만 사용하고, 저장은 마지막에 짧은 쓰기 트랜잭션으로)
+            release_session()
+            
+            # LLM 프로바이더 설정
+            provider = get_llm_provider()
+            if provider is None:
+                logger.error("GEMINI_API_KEY가 설정되지 않았습니다!")
                 return jsonify({'error': 'GEMINI_API_KEY가 설정되지 않았습니다. .env 파일을 확인해주세요.'}), 500
             
-            print(f"✅ Gemini API 키 확인됨 (길이: {len(api_key)})")
-            genai.configure(api_key=api_key)
+            logger.debug("LLM 프로바이더 확인됨 (%s)", provider.name)
             
             # 모델 선택: 강의 계획서 업로드와 동일한 로직 사용
             # 사용 가능한 모델 목록 가져오기
             try:
-                print("📋 사용 가능한 모델 목록 확인 중...")
-                available_models = []
-                for m in genai.list_models():
-                    if 'generateContent' in m.supported_generation_methods:
-                        model_name = m.name.replace('models/', '')  # 'models/gemini-pro' -> 'gemini-pro'
-                        available_models.append(model_name)
-                        print(f"  ✅ {model_name}")
+                logger.debug("사용 가능한 모델 목록 확인 중...")
+                available_models = provider.list_models()
+                for model_name in available_models:
+                    logger.debug("사용 가능한 모델: %s", model_name)
                 
                 if not available_models:
                     raise Exception("사용 가능한 모델을 찾을 수 없습니다.")
@@ -1986,45 +1825,46 @@ def create_app():
                     if '2.5' in model_name.lower() and model_name not in model_candidates:
                         model_candidates.append(model_name)
                 
-                print(f"📡 모델 후보: {model_candidates}")
+                logger.debug("모델 후보: %s", model_candidates)
                 
             except Exception as list_error:
-                print(f"⚠️ 모델 목록 조회 실패: {str(list_error)}")
+                logger.warning("모델 목록 조회 실패: %s", list_error)
                 # 기본 모델 목록 사용
                 model_candidates = ['gemini-pro', 'gemini-1.5-pro', 'gemini-1.5-flash']
             
-            # 여러 모델을 순차적으로 시도
-            model = None
-            selected_model_name = None
-            for model_name in model_candidates:
-                try:
-                    print(f"📡 모델 생성 시도 중... (모델: {model_name})")
-                    test_model = genai.GenerativeModel(model_name)
-                    model = test_model
-                    selected_model_name = model_name
-                    print(f"✅ 모델 선택 완료: {selected_model_name}")
-                    break
-                except Exception as model_error:
-                    error_msg = str(model_error)
-                    # 404 에러면 다음 모델 시도
-                    if '404' in error_msg or 'not found' in error_msg.lower():
-                        print(f"⚠️  {model_name}: 모델을 찾을 수 없음 - 다음 모델 시도...")
-                        continue
-                    # 429 할당량 초과 에러면 다음 모델 시도
-                    elif '429' in error_msg or 'quota' in error_msg.lower() or 'exceeded' in error_msg.lower():
-                        print(f"⚠️  {model_name}: 할당량 초과 - 다음 모델 시도...")
-                        continue
-                    # 다른 에러면 재발생
-                    else:
-                        print(f"⚠️  {model_name}: {error_msg}")
-                        if model_name == model_candidates[-1]:  # 마지막 모델이면 에러 발생
-                            raise
-            
-            if not model:
+            if not model_candidates:
                 return jsonify({
                     'error': '사용 가능한 Gemini 모델을 찾을 수 없습니다. API 키와 모델 이름을 확인해주세요.'
                 }), 500
             
+            # 모델 객체 생성은 네트워크 호출이 없으므로 최우선 후보를 바로 선택
+            selected_model_name = model_candidates[0]
+            logger.debug("모델 선택 완료: %s", selected_model_name)
+            
+            if hierarchical:
+                # map: 요약이 없거나 자료가 바뀐 경우만 자료별로 동시에 요약, reduce: 요약 노트를 강의 자료로 사용
+                # (세션을 반환했으므로 자료 목록을 다시 읽음 - material_summaries가 요약 생성 전에 다시 반환)
+                pdf_materials = Material.query.filter_by(week_id=week_id, file_type='pdf').all()
+                try:
+                    partials, pdf_extraction_errors, failed_summaries = material_summaries(
+                        week_number, pdf_materials, provider, model_candidates, CONCEPT_MATERIAL_MAX_CHARS)
+                except MaterialTextPending as pending:
+                    return jsonify({
+                        'error': f'{pending} 잠시 후 다시 시도해주세요.',
+                        'error_code': 'MATERIAL_PROCESSING'
+                    }), 409
+                if not partials:
+                    error_msg = 'PDF에서 텍스트를 추출할 수 없습니다.'
+                    if pdf_extraction_errors:
+                        error_msg += f' 상세: {"; ".join(pdf_extraction_errors[:3])}'
+                    return jsonify({'error': error_msg}), 400
+                if pdf_extraction_errors:
+                    logger.warning("일부 자료를 요약하지 못했습니다: %s", "; ".join(pdf_extraction_errors))
+                if failed_summaries:
+                    # 요약에 실패한 자료가 빠진 콘텐츠는 캐시 히트가 되지 않도록 저장 (다음 요청에서 실패한 자료만 다시 요약)
+                    stored_fingerprint = partial_fingerprint(source_fingerprint)
+                lecture_text = material_reduce_input(partials)
+            
             # 모드별 프롬프트 구성
             # f-string에서 백슬래시를 직접 사용할 수 없으므로 일반 문자열 연결 사용
             # 주차별 특별 지시사항
@@ -2188,23 +2028,15 @@ def create_app():
 출력은 Markdown 형식으로만 작성하고, 다른 설명은 포함하지 마세요. 모든 내용은 반드시 한국어로 작성하세요."""
             
             # AI 응답 생성 (재시도 로직 포함)
-            print(f"📤 Gemini API 호출 중... (프롬프트 길이: {len(prompt)} 문자)")
-            
-            # GenerationConfig로 토큰 사용량 최적화
-            # API 버전에 따라 GenerationConfig 형식이 다를 수 있으므로 try-except로 처리
-            generation_config = None
-            try:
-                generation_config = genai.types.GenerationConfig(
-                    temperature=0.7,
-                    top_p=0.95,
-                    top_k=40,
-                    max_output_tokens=16384,  # 충분한 길이의 콘텐츠 생성을 위해 대폭 증가
-                )
-                print("✅ GenerationConfig 설정 완료")
-            except Exception as config_error:
-                print(f"⚠️ GenerationConfig 설정 실패 (기본 설정 사용): {str(config_error)}")
-                # GenerationConfig가 지원되지 않는 경우 None으로 두고 기본 설정 사용
-                generation_config = None
+            logger.debug("Gemini API 호출 중... (프롬프트 길이: %s 문자)", len(prompt))
+            
+            # GenerationConfig로 토큰 사용량 최적화 (프로바이더가 자체 형식으로 변환)
+            generation_config = {
+                'temperature': 0.7,
+                'top_p': 0.95,
+                'top_k': 40,
+                'max_output_tokens': 16384,  # 충분한 길이의 콘텐츠 생성을 위해 대폭 증가
+            }
             
             max_retries = 3
             retry_delay = 2  # 초기 지연 시간 (초)
@@ -2214,36 +2046,34 @@ def create_app():
                     # 요청 간 지연 시간 추가 (할당량 제한 방지)
                     if attempt > 0:
                         wait_time = retry_delay * (2 ** (attempt - 1))  # Exponential backoff
-                        print(f"⏳ {wait_time}초 대기 후 재시도 중... (시도 {attempt + 1}/{max_retries})")
+                        logger.info("%s초 대기 후 재시도 중... (시도 %s/%s)", wait_time, attempt + 1, max_retries)
                         time.sleep(wait_time)
                     else:
                         # 첫 요청 전에도 짧은 지연 (할당량 분산)
                         time.sleep(0.5)
                     
-                    # GenerationConfig가 None이면 기본 설정 사용
-                    if generation_config:
-                        response = model.generate_content(
-                            prompt,
-                            generation_config=generation_config
-                        )
-                    else:
-                        response = model.generate_content(prompt)
-                    print(f"✅ Gemini API 응답 수신됨")
+                    response = provider.generate(
+                        selected_model_name,
+                        prompt,
+                        purpose='concept',
+                        generation_config=generation_config
+                    )
+                    logger.debug("Gemini API 응답 수신됨")
                     
                     if not response:
-                        print("❌ Gemini API 응답이 None입니다")
+                        logger.error("Gemini API 응답이 None입니다")
                         if attempt < max_retries - 1:
                             continue  # 재시도
                         return jsonify({'error': 'Gemini API 응답이 비어있습니다. API 키와 모델을 확인해주세요.'}), 500
                     
                     if not hasattr(response, 'text'):
-                        print(f"❌ 응답 객체에 'text' 속성이 없습니다. 응답 타입: {type(response)}")
+                        logger.error("응답 객체에 'text' 속성이 없습니다. 응답 타입: %s", type(response))
                         if attempt < max_retries - 1:
                             continue  # 재시도
                         return jsonify({'error': 'Gemini API 응답 형식이 예상과 다릅니다. API 버전을 확인해주세요.'}), 500
                     
                     if not response.text:
-                        print("❌ Gemini API 응답 텍스트가 비어있습니다")
+                        logger.error("Gemini API 응답 텍스트가 비어있습니다")
                         if attempt < max_retries - 1:
                             continue  # 재시도
                         return jsonify({'error': 'Gemini API 응답이 비어있습니다. API 키와 모델을 확인해주세요.'}), 500
@@ -2253,30 +2083,25 @@ def create_app():
                     
                     # 응답이 완전한지 확인
                     if not response_text or len(response_text) < 50:
-                        print(f"⚠️ 응답이 너무 짧습니다 (길이: {len(response_text)} 문자)")
+                        logger.warning("응답이 너무 짧습니다 (길이: %s 문자)", len(response_text))
                         if attempt < max_retries - 1:
                             continue  # 재시도
                         return jsonify({'error': '생성된 콘텐츠가 너무 짧습니다. 다시 시도해주세요.'}), 500
                     
-                    print(f"✅ 응답 텍스트 추출 완료 (길이: {len(response_text)} 문자)")
+                    logger.debug("응답 텍스트 추출 완료 (길이: %s 문자)", len(response_text))
                     
                     # 응답이 완전히 끝났는지 확인 (마지막 문장이 완료 표시로 끝나는지)
                     last_char = response_text[-1] if response_text else ''
                     if last_char not in ['.', '!', '?', ':', ';', '\n'] and not response_text.endswith('```'):
-                        print("⚠️ 응답이 불완전할 수 있습니다. 하지만 계속 진행합니다.")
+                        logger.warning("응답이 불완전할 수 있습니다. 하지만 계속 진행합니다.")
                     
                     break  # 성공하면 루프 종료
                     
                 except Exception as api_error:
-                    import traceback
-                    error_trace = traceback.format_exc()
                     error_str = str(api_error)
                     
-                    print("=" * 80)
-                    print(f"❌ Gemini API 호출 실패! (시도 {attempt + 1}/{max_retries})")
-                    print(f"오류 타입: {type(api_error).__name__}")
-                    print(f"오류 메시지: {error_str}")
-                    print("-" * 80)
+                    logger.warning("Gemini API 호출 실패 (시도 %s/%s): %s: %s",
+                                   attempt + 1, max_retries, type(api_error).__name__, error_str)
                     
                     # 할당량 초과 에러 처리
                     is_quota_error = ('429' in error_str or 
@@ -2286,12 +2111,11 @@ def create_app():
                     
                     if is_quota_error:
                         if attempt < max_retries - 1:
-                            print(f"할당량 초과 감지. 재시도 대기 중...")
+                            logger.warning("할당량 초과 감지. 재시도 대기 중...")
                             continue  # 재시도
                         else:
                             # 모든 재시도 실패
                             user_message = 'Gemini API 할당량을 초과했습니다. 잠시 후 다시 시도해주세요. (일반적으로 몇 분 후에 재시도 가능합니다)'
-                            print("=" * 80)
                             return jsonify({
                                 'error': user_message,
                                 'error_code': 'QUOTA_EXCEEDED',
@@ -2300,13 +2124,11 @@ def create_app():
                     
                     # 기타 API 에러 - 재시도 가능한 경우
                     if attempt < max_retries - 1:
-                        print(f"일시적 오류로 보입니다. 재시도 중...")
+                        logger.warning("일시적 오류로 보입니다. 재시도 중...")
                         continue
                     else:
                         # 모든 재시도 실패
-                        print("상세 스택 트레이스:")
-                        print(error_trace)
-                        print("=" * 80)
+                        logger.exception("Gemini API 호출 최종 실패: %s", error_str)
                         return jsonify({
                             'error': f'Gemini API 호출 실패: {error_str}',
                             'error_code': 'API_ERROR'
@@ -2327,9 +2149,9 @@ def create_app():
             if not response_text or len(response_text.strip()) < 50:
                 return jsonify({'error': '생성된 콘텐츠가 너무 짧습니다. 다시 시도해주세요.'}), 500
             
-            print(f"✅ 최종 콘텐츠 준비 완료 (길이: {len(response_text)} 문자)")
+            logger.debug("최종 콘텐츠 준비 완료 (길이: %s 문자)", len(response_text))
             
-            # 데이터베이스에 저장 (기존 캐시 업데이트 또는 새로 생성)
+            # 데이터베이스에 저장 (짧은 쓰기 트랜잭션 - 기존 캐시 업데이트 또는 새로 생성)
             existing_content = ConceptContent.query.filter_by(
                 week_id=week_id,
                 mode=mode
@@ -2337,16 +2159,21 @@ def create_app():
             
             if existing_content:
                 existing_content.content = response_text
+                existing_content.source_fingerprint = stored_fingerprint
                 existing_content.updated_at = datetime.utcnow()
             else:
-                new_content = ConceptContent(
+                existing_content = ConceptContent(
                     week_id=week_id,
                     mode=mode,
-                    content=response_text
+                    content=response_text,
+                    source_fingerprint=stored_fingerprint
                 )
-                db.session.add(new_content)
+                db.session.add(existing_content)
+            store_precompressed_concept(existing_content)
             
             db.session.commit()
+            # 기다리는 요청이 바로 저장된 결과를 읽도록 점유 해제 (실패로 끝나면 요청 종료 시 해제)
+            release_generation(claim_key)
             
             return jsonify({
                 'content': response_text
@@ -2359,15 +2186,8 @@ def create_app():
             error_type = type(e).__name__
             error_message = str(e)
             
-            print("=" * 80)
-            print(f"❌ Concept Learning 생성 중 오류 발생!")
-            print(f"오류 타입: {error_type}")
-            print(f"오류 메시지: {error_message}")
-            print(f"Week ID: {week_id}, Mode: {mode}, Force Regenerate: {force_regenerate}")
-            print("-" * 80)
-            print("상세 스택 트레이스:")
-            print(error_trace)
-            print("=" * 80)
+            logger.exception("Concept Learning 생성 중 오류 발생 (Week ID: %s, Mode: %s, Force Regenerate: %s): %s: %s",
+                             week_id, mode, force_regenerate, error_type, error_message)
             
             # 사용자에게 보여줄 에러 메시지
             user_error_message = f'콘텐츠 생성 중 오류가 발생했습니다: {error_message}'
@@ -2417,7 +2237,51 @@ def create_app():
     
     # ==================== New Quiz System (From Scratch) ====================
     
+    def save_generated_quiz(subject_id, user_id, week_numbers, difficulty, question_types, language,
+                            num_questions, past_exam_context, quiz_number, bank_questions, questions_data, generated_weeks,
+                            week_fingerprints=None):
+        """퀴즈와 문제 저장 (문제 은행 문제를 먼저 복사하고, LLM이 새로 생성한 문제는 문제 은행에 색인)"""
+        quiz = Quiz(
+            subject_id=subject_id,
+            user_id=user_id,
+            week_numbers=json.dumps(week_numbers),
+            difficulty=difficulty,
+            question_types=json.dumps(question_types),
+            language=language,
+            num_questions=num_questions,
+            past_exam_context=past_exam_context,
+            quiz_number=quiz_number
+        )
+        db.session.add(quiz)
+        db.session.flush()  # quiz.id를 얻기 위해
+        
+        questions = [copy_question(original, quiz.id, idx) for idx, original in enumerate(bank_questions, 1)]
+        
+        # 새로 생성한 문제 저장 (분할 생성한 문제는 그 문제를 만든 주차로 문제 은행에 색인)
+        generated = []
+        for idx, q_data in enumerate(questions_data, len(questions) + 1):
+            question_weeks = q_data.pop(QUESTION_WEEKS_KEY, None) or generated_weeks
+            question = Question(
+                quiz_id=quiz.id,
+                question_type=q_data.get('question_type', 'multiple_choice'),
+                question_text=q_data.get('question_text', ''),
+                options=json.dumps(q_data.get('options')) if q_data.get('options') else None,
+                correct_answer=q_data.get('correct_answer', ''),
+                explanation=q_data.get('explanation', ''),
+                key_concept=q_data.get('key_concept', ''),
+                order=idx
+            )
+            generated.append(question)
+            index_questions(quiz, [question], question_weeks, week_fingerprints)
+        
+        questions.extend(generated)
+        db.session.add_all(questions)
+        db.session.commit()
+        return quiz, questions
+    
     @app.route('/api/quiz/generate', methods=['POST'])
+    @idempotent('quiz_generate')
+    @rate_limited('quiz_generate')
     def generate_quiz():
         """퀴즈 생성 API - 적응형 학습 로직 포함"""
         try:
@@ -2428,8 +2292,7 @@ def create_app():
             required_tables = ['quizzes', 'questions', 'user_responses', 'quiz_reports']
             missing_tables = [t for t in required_tables if t not in existing_tables]
             if missing_tables:
-                print(f"⚠️ 필요한 테이블이 없습니다: {missing_tables}")
-                print("백엔드 서버를 재시작하여 테이블을 생성하세요.")
+                logger.warning("필요한 테이블이 없습니다: %s. 백엔드 서버를 재시작하여 테이블을 생성하세요.", missing_tables)
                 return jsonify({
                     'error': f'데이터베이스 테이블이 생성되지 않았습니다. 다음 테이블이 없습니다: {", ".join(missing_tables)}. 백엔드 서버를 재시작해주세요.'
                 }), 500
@@ -2455,14 +2318,47 @@ def create_app():
             if not subject:
                 return jsonify({'error': 'Subject not found'}), 404
             
+            # 퀴즈 번호 계산 (해당 과목의 퀴즈 개수 + 1)
+            try:
+                quiz_count = Quiz.query.filter_by(subject_id=subject_id, user_id=user_id).count()
+                quiz_number = quiz_count + 1
+            except Exception as e:
+                logger.error("퀴즈 개수 조회 오류: %s", e)
+                # 테이블이 없을 수 있으므로 기본값 사용
+                quiz_number = 1
+            
             # 사용자 확인
             user = User.query.get(user_id)
             if not user:
                 return jsonify({'error': 'User not found'}), 404
             
+            # 문제 은행에서 조건(주차/난이도/유형/언어)이 맞는 기존 문제를 먼저 사용
+            # 과거 시험 스타일을 지정한 경우에는 해당 스타일로 새로 생성
+            # 주차 자료가 바뀐 뒤에는 이전 자료로 만든 문제를 사용하지 않도록 주차 텍스트 fingerprint 비교
+            week_fingerprints = subject_week_text_fingerprints(subject_id, week_numbers)
+            bank = BankSelection(uncovered_weeks=list(week_numbers))
+            if question_bank_enabled() and not past_exam_context:
+                bank = select_bank_questions(subject_id, user_id, week_numbers, difficulty,
+                                             question_types, language, num_questions, week_fingerprints)
+            generate_count = num_questions - len(bank.questions)
+            
+            if generate_count <= 0:
+                # 문제 은행만으로 충분하면 LLM 호출 없이 바로 퀴즈 구성
+                logger.info("문제 은행으로 퀴즈 구성 - Subject: %s, Weeks: %s, 문제 %s개",
+                            subject_id, week_numbers, len(bank.questions))
+                quiz, questions = save_generated_quiz(
+                    subject_id, user_id, list(week_numbers), difficulty, question_types, language,
+                    num_questions, past_exam_context, quiz_number, bank.questions, [], []
+                )
+                return jsonify({
+                    'message': 'Quiz generated successfully',
+                    'quiz': quiz.to_dict(),
+                    'questions': [q.to_dict() for q in questions],
+                    'bank_question_count': len(bank.questions)
+                }), 200
+            
             # 선택된 주차의 PDF 파일들 수집
-            pdf_texts = []
-            selected_weeks = []
+            week_materials = []
             for week_no in week_numbers:
                 week = Week.query.filter_by(subject_id=subject_id, week_number=week_no).first()
                 if not week:
@@ -2472,59 +2368,63 @@ def create_app():
                 pdf_materials = Material.query.filter_by(week_id=week.id, file_type='pdf').all()
                 if not pdf_materials:
                     continue  # PDF가 없는 주차는 건너뛰기
-                
+                week_materials.append((week_no, pdf_materials))
+            
+            # 문제 은행에 문제가 없는 주차가 있으면 그 주차 자료로 부족한 문제를 생성
+            if bank.questions and bank.uncovered_weeks:
+                week_materials = [(week_no, materials) for week_no, materials in week_materials
+                                  if week_no in bank.uncovered_weeks] or week_materials
+            
+            # 모든 주차가 문제 범위에 포함되도록 자료별로 같은 분량의 예산을 나눠서 앞부분부터 사용
+            material_count = sum(len(materials) for _, materials in week_materials)
+            per_material_chars = QUIZ_MATERIAL_MAX_CHARS // material_count if material_count else 0
+            
+            pdf_texts = []
+            week_texts = []  # [(주차 번호, 자료 텍스트 목록)] - 분할 생성에 사용
+            selected_weeks = []
+            for week_no, pdf_materials in week_materials:
                 selected_weeks.append(week_no)
+                texts = []
+                week_texts.append((week_no, texts))
                 for material in pdf_materials:
                     try:
-                        text = extract_text_from_pdf(material.file_path)
+                        text = get_material_text(material, max_chars=per_material_chars)
                         if text:
-                            pdf_texts.append(f"=== Week {week_no} - {material.file_name} ===\n{text}")
+                            texts.append(f"=== Week {week_no} - {material.file_name} ===\n{text}")
+                            pdf_texts.append(texts[-1])
+                    except MaterialTextPending as pending:
+                        return jsonify({
+                            'error': f'{pending} 잠시 후 다시 시도해주세요.',
+                            'error_code': 'MATERIAL_PROCESSING'
+                        }), 409
                     except Exception as e:
-                        print(f"⚠️ PDF 추출 실패 ({material.file_name}): {e}")
+                        logger.warning("PDF 추출 실패 (%s): %s", material.file_name, e)
             
             if not pdf_texts:
                 return jsonify({'error': 'No PDF materials found in selected weeks'}), 400
+            week_texts = [(week_no, texts) for week_no, texts in week_texts if texts]
             
-            combined_text = '\n\n'.join(pdf_texts)
-            
-            # 이전 퀴즈 리포트에서 취약점 분석 (적응형 학습)
+            # 핵심 개념 숙련도에서 정답률이 낮은 개념 조회 (적응형 학습)
             previous_weakness = ""
             try:
-                latest_report = db.session.query(QuizReport).join(Quiz).filter(
-                    Quiz.subject_id == subject_id,
-                    Quiz.user_id == user_id
-                ).order_by(QuizReport.created_at.desc()).first()
-                
-                if latest_report:
-                    # 이전 리포트에서 취약점 추출 (간단한 방법: AI 리포트에서 추출)
-                    # 실제로는 더 정교한 분석이 필요할 수 있음
-                    previous_weakness = latest_report.ai_report
+                previous_weakness = format_weak_concepts(weakest_concepts(user_id, subject_id))
             except Exception as e:
-                print(f"⚠️ 이전 리포트 조회 중 오류 (무시하고 계속 진행): {e}")
+                logger.warning("취약 개념 조회 중 오류 (무시하고 계속 진행): %s", e)
             
-            # 퀴즈 번호 계산 (해당 과목의 퀴즈 개수 + 1)
-            try:
-                quiz_count = Quiz.query.filter_by(subject_id=subject_id, user_id=user_id).count()
-                quiz_number = quiz_count + 1
-            except Exception as e:
-                print(f"❌ 퀴즈 개수 조회 오류: {e}")
-                # 테이블이 없을 수 있으므로 기본값 사용
-                quiz_number = 1
+            # 문제 은행 문제는 ID만 기억하고, 모델 목록 조회와 LLM 호출 동안 DB 커넥션을 잡지 않도록 세션 반환
+            # (생성 후 문제 은행 문제를 다시 읽어 짧은 쓰기 트랜잭션으로 저장)
+            bank_question_ids = [q.id for q in bank.questions]
+            bank_concepts = sorted({q.key_concept for q in bank.questions if q.key_concept})
+            release_session()
             
-            # Gemini API를 사용하여 퀴즈 생성
-            api_key = os.getenv('GEMINI_API_KEY')
-            if not api_key:
+            # LLM 프로바이더를 사용하여 퀴즈 생성
+            provider = get_llm_provider()
+            if provider is None:
                 return jsonify({'error': 'GEMINI_API_KEY not configured'}), 500
             
-            genai.configure(api_key=api_key)
-            
             # 실제 사용 가능한 모델 목록 조회 (다른 기능과 동일한 방식)
             try:
-                available_models = []
-                for m in genai.list_models():
-                    if 'generateContent' in m.supported_generation_methods:
-                        model_name = m.name.replace('models/', '')  # 'models/gemini-pro' -> 'gemini-pro'
-                        available_models.append(model_name)
+                available_models = provider.list_models()
                 
                 if not available_models:
                     raise Exception("사용 가능한 모델을 찾을 수 없습니다.")
@@ -2555,30 +2455,17 @@ def create_app():
                     if model_name not in model_candidates and 'gemma' not in model_name.lower() and '2.5' not in model_name.lower():
                         model_candidates.append(model_name)
                 
-                print(f"📡 퀴즈 생성 모델 후보: {model_candidates}")
+                logger.debug("퀴즈 생성 모델 후보: %s", model_candidates)
                 
             except Exception as list_error:
-                print(f"⚠️ 모델 목록 조회 실패: {str(list_error)}")
+                logger.debug("모델 목록 조회 실패: %s", list_error)
                 # 기본 모델 목록 사용 (2.5-flash 우선)
                 model_candidates = ['gemini-2.5-flash', 'gemini-1.5-pro', 'gemini-1.5-flash', 'gemini-pro']
             
             # 적응형 프롬프트 구성
             adaptive_instruction = ""
             if previous_weakness:
-                adaptive_instruction = f"\n\n**적응형 학습 지시사항:**\n사용자의 이전 취약점 리포트를 참고하여, 다음 약점 영역을 특히 집중적으로 다루는 문제를 생성해주세요:\n{previous_weakness}\n\n이 약점들을 개선할 수 있도록 관련 문제를 포함해주세요."
-            
-            # 주차 범위 문자열 생성 (연속/비연속 판단)
-            week_scope_str = ""
-            if len(selected_weeks) == 1:
-                week_scope_str = f"Week {selected_weeks[0]}"
-            else:
-                sorted_weeks = sorted(selected_weeks)
-                # 연속 여부 확인
-                is_continuous = all(sorted_weeks[i] + 1 == sorted_weeks[i+1] for i in range(len(sorted_weeks)-1))
-                if is_continuous:
-                    week_scope_str = f"Weeks {sorted_weeks[0]}-{sorted_weeks[-1]}"
-                else:
-                    week_scope_str = "Week " + ", ".join(map(str, sorted_weeks))
+                adaptive_instruction = f"\n\n**적응형 학습 지시사항:**\n사용자가 이전 퀴즈에서 자주 틀린 핵심 개념입니다. 이 개념들을 특히 집중적으로 다루는 문제를 생성해주세요:\n{previous_weakness}\n\n이 약점들을 개선할 수 있도록 관련 문제를 포함해주세요."
             
             # 문제 유형 설명
             type_descriptions = {
@@ -2586,7 +2473,6 @@ def create_app():
                 'short_answer': '단답형 (Short Answer)',
                 'subjective': '주관식 (Subjective/Essay)'
             }
-            question_type_str = ', '.join([type_descriptions.get(t, t) for t in question_types])
             
             # 언어 설정
             lang_instruction = "한국어로" if language == 'korean' else "영어로"
@@ -2596,7 +2482,26 @@ def create_app():
             if past_exam_context:
                 past_exam_section = f"5. 참고 스타일/예시:\n{past_exam_context}"
             
-            prompt = f"""당신은 교육용 퀴즈 생성 전문가입니다. 다음 강의 자료를 기반으로 {lang_instruction} 퀴즈를 생성해주세요.
+            def build_quiz_prompt(texts, weeks, types, count, avoid_concepts):
+                """자료 텍스트/주차/문제 유형/문제 수로 퀴즈 생성 프롬프트 구성 (분할 생성 시 묶음마다 호출)"""
+                # 주차 범위 문자열 생성 (연속/비연속 판단)
+                sorted_weeks = sorted(weeks)
+                if len(sorted_weeks) == 1:
+                    week_scope_str = f"Week {sorted_weeks[0]}"
+                elif all(sorted_weeks[i] + 1 == sorted_weeks[i+1] for i in range(len(sorted_weeks)-1)):
+                    week_scope_str = f"Weeks {sorted_weeks[0]}-{sorted_weeks[-1]}"
+                else:
+                    week_scope_str = "Week " + ", ".join(map(str, sorted_weeks))
+                
+                question_type_str = ', '.join([type_descriptions.get(t, t) for t in types])
+                
+                bank_instruction = ""
+                concepts = sorted(set(bank_concepts) | set(avoid_concepts))
+                if concepts:
+                    bank_instruction = "\n\n**중복 방지:**\n다음 핵심 개념은 이미 다른 문제로 출제되었으므로, 가능하면 다른 개념을 다루는 문제를 생성해주세요:\n" + "\n".join(f"- {concept}" for concept in concepts)
+                
+                combined_text = '\n\n'.join(texts)
+                return f"""당신은 교육용 퀴즈 생성 전문가입니다. 다음 강의 자료를 기반으로 {lang_instruction} 퀴즈를 생성해주세요.
 
 **강의 자료:**
 {combined_text}
@@ -2604,9 +2509,9 @@ def create_app():
 **퀴즈 생성 요구사항:**
 1. 난이도: {difficulty} ({'쉬움' if difficulty == 'easy' else '보통' if difficulty == 'medium' else '어려움'})
 2. 문제 유형: {question_type_str}
-3. 문제 개수: {num_questions}개
+3. 문제 개수: {count}개
 4. 범위: {week_scope_str}
-{past_exam_section}{adaptive_instruction}
+{past_exam_section}{adaptive_instruction}{bank_instruction}
 
 **출력 형식 (JSON):**
 {{
@@ -2623,132 +2528,55 @@ def create_app():
 }}
 
 **중요 지시사항:**
-- 반드시 정확히 {num_questions}개의 문제를 생성해야 합니다. 더 많거나 적게 생성하면 안 됩니다.
+- 반드시 정확히 {count}개의 문제를 생성해야 합니다. 더 많거나 적게 생성하면 안 됩니다.
 - 객관식 문제는 4개의 선택지를 제공하세요.
 - 각 문제는 강의 자료의 내용을 정확히 반영해야 합니다.
 - 정답과 오답 선택지 모두 그럴듯해야 합니다 (객관식의 경우).
 - explanation은 왜 정답인지, 왜 오답인지 명확히 설명해야 합니다.
 - key_concept는 이 문제가 평가하는 핵심 지식이나 개념을 명시하세요.
 - JSON 형식만 출력하고, 다른 설명은 포함하지 마세요.
-- "questions" 배열에는 정확히 {num_questions}개의 객체가 있어야 합니다."""
+- "questions" 배열에는 정확히 {count}개의 객체가 있어야 합니다."""
             
-            # 여러 모델을 순차적으로 시도 (모델 생성 + API 호출을 하나의 루프에서 처리)
-            response = None
-            response_text = ""
-            selected_model_name = None
+            logger.info("퀴즈 생성 요청 - Subject: %s, Weeks: %s, Difficulty: %s, 생성 %s개 (문제 은행 %s개)",
+                        subject_id, selected_weeks, difficulty, generate_count, len(bank.questions))
             
-            print(f"📤 퀴즈 생성 요청 - Subject: {subject_id}, Weeks: {selected_weeks}, Difficulty: {difficulty}")
-            
-            for model_name in model_candidates:
-                try:
-                    print(f"📡 퀴즈 생성 모델 시도 중... (모델: {model_name})")
-                    test_model = genai.GenerativeModel(model_name)
-                    selected_model_name = model_name
-                    
-                    # 모델 생성 성공 시 즉시 API 호출 시도
-                    response = test_model.generate_content(prompt)
-                    
-                    if response and response.text:
-                        response_text = response.text.strip()
-                        print(f"✅ 퀴즈 생성 완료 (모델: {selected_model_name})")
-                        break  # 성공하면 루프 종료
-                    else:
-                        print(f"⚠️  {model_name}: 응답이 없음 - 다음 모델 시도...")
-                        continue
-                        
-                except Exception as error:
-                    error_msg = str(error)
-                    # 404 에러면 다음 모델 시도
-                    if '404' in error_msg or 'not found' in error_msg.lower():
-                        print(f"⚠️  {model_name}: 모델을 찾을 수 없음 - 다음 모델 시도...")
-                        continue
-                    # 429 할당량 초과 에러면 다음 모델 시도
-                    elif '429' in error_msg or 'quota' in error_msg.lower() or 'exceeded' in error_msg.lower():
-                        print(f"⚠️  {model_name}: 할당량 초과 - 다음 모델 시도...")
-                        continue
-                    # 다른 에러면 재발생
-                    else:
-                        print(f"⚠️  {model_name}: {error_msg}")
-                        if model_name == model_candidates[-1]:  # 마지막 모델이면 에러 발생
-                            raise
+            # 여러 주차/유형이면 묶음별 작은 호출로 나눠 동시에 생성 (각 호출에는 자기 주차 자료만 포함)
+            shards = plan_shards(week_texts, question_types, generate_count) if quiz_sharding_enabled() else []
+            try:
+                if len(shards) > 1:
+                    logger.info("퀴즈 분할 생성 - 묶음 %s개: %s", len(shards),
+                                [(shard.weeks, shard.question_types, shard.count) for shard in shards])
+                    questions_data, _ = generate_sharded(shards, provider, model_candidates, build_quiz_prompt, generate_count)
+                else:
+                    prompt = build_quiz_prompt(pdf_texts, selected_weeks, question_types, generate_count, [])
+                    questions_data, _ = generate_questions(provider, model_candidates, prompt, generate_count)
+            except QuizGenerationError as generation_error:
+                error_body = {'error': str(generation_error)}
+                if generation_error.model:
+                    error_body['model'] = generation_error.model
+                return jsonify(error_body), 500
+            
+            # 퀴즈 저장 (문제 은행 문제 + 새로 생성한 문제, 생성하는 동안 삭제된 문제 은행 문제는 제외)
+            bank_questions = {q.id: q for q in Question.query.filter(Question.id.in_(bank_question_ids)).all()} if bank_question_ids else {}
+            bank_questions = [bank_questions[question_id] for question_id in bank_question_ids if question_id in bank_questions]
+            quiz_weeks = [week_no for week_no in week_numbers if week_no in bank.weeks or week_no in selected_weeks]
+            quiz, questions = save_generated_quiz(
+                subject_id, user_id, quiz_weeks, difficulty, question_types, language,
+                num_questions, past_exam_context, quiz_number, bank_questions, questions_data, selected_weeks,
+                week_fingerprints
+            )
             
-            if response is None or not response_text:
-                return jsonify({'error': '사용 가능한 Gemini 모델을 찾을 수 없거나 할당량이 초과되었습니다. 잠시 후 다시 시도해주세요.'}), 500
-            
-            # JSON 파싱
-            # JSON 코드 블록 제거 (```json ... ```)
-            if response_text.startswith('```'):
-                lines = response_text.split('\n')
-                response_text = '\n'.join(lines[1:-1]) if lines[-1].startswith('```') else '\n'.join(lines[1:])
-            
-            try:
-                quiz_data = json.loads(response_text)
-            except json.JSONDecodeError as json_err:
-                print(f"❌ JSON 파싱 오류: {json_err}")
-                print(f"응답 텍스트: {response_text[:500]}...")  # 처음 500자만 출력
-                return jsonify({'error': f'Failed to parse quiz data: {str(json_err)}'}), 500
-            questions_data = quiz_data.get('questions', [])
-            
-            # 문제 수 검증 및 조정
-            if len(questions_data) != num_questions:
-                print(f"⚠️ 요청한 문제 수({num_questions})와 생성된 문제 수({len(questions_data)})가 다릅니다.")
-                
-                # 문제가 부족한 경우: 에러 반환 (재시도 유도)
-                if len(questions_data) < num_questions:
-                    error_msg = f'생성된 문제 수({len(questions_data)}개)가 요청한 문제 수({num_questions}개)보다 적습니다. 모델이 정확한 수의 문제를 생성하지 못했습니다.'
-                    print(f"❌ {error_msg}")
-                    return jsonify({'error': error_msg, 'model': selected_model_name}), 500
-                
-                # 문제가 더 많은 경우: 처음 N개만 사용
-                if len(questions_data) > num_questions:
-                    print(f"📝 생성된 문제가 더 많음. 처음 {num_questions}개만 사용합니다.")
-                    questions_data = questions_data[:num_questions]
-            
-            # 퀴즈 저장
-            quiz = Quiz(
-                subject_id=subject_id,
-                user_id=user_id,
-                week_numbers=json.dumps(selected_weeks),
-                difficulty=difficulty,
-                question_types=json.dumps(question_types),
-                language=language,
-                num_questions=num_questions,
-                past_exam_context=past_exam_context,
-                quiz_number=quiz_number
-            )
-            db.session.add(quiz)
-            db.session.flush()  # quiz.id를 얻기 위해
-            
-            # 문제들 저장
-            questions = []
-            for idx, q_data in enumerate(questions_data, 1):
-                question = Question(
-                    quiz_id=quiz.id,
-                    question_type=q_data.get('question_type', 'multiple_choice'),
-                    question_text=q_data.get('question_text', ''),
-                    options=json.dumps(q_data.get('options')) if q_data.get('options') else None,
-                    correct_answer=q_data.get('correct_answer', ''),
-                    explanation=q_data.get('explanation', ''),
-                    key_concept=q_data.get('key_concept', ''),
-                    order=idx
-                )
-                db.session.add(question)
-                questions.append(question)
-            
-            db.session.commit()
-            
-            return jsonify({
-                'message': 'Quiz generated successfully',
-                'quiz': quiz.to_dict(),
-                'questions': [q.to_dict() for q in questions]
-            }), 200
+            return jsonify({
+                'message': 'Quiz generated successfully',
+                'quiz': quiz.to_dict(),
+                'questions': [q.to_dict() for q in questions],
+                'bank_question_count': len(bank_questions)
+            }), 200
             
         except Exception as e:
             db.session.rollback()
             error_message = str(e)
-            print(f"❌ 퀴즈 생성 오류: {error_message}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("퀴즈 생성 오류: %s", error_message)
             
             # 데이터베이스 테이블 관련 에러인지 확인
             if 'no such table' in error_message.lower() or 'does not exist' in error_message.lower():
@@ -2784,164 +2612,146 @@ def create_app():
             }), 200
             
         except Exception as e:
-            print(f"❌ 퀴즈 조회 오류: {e}")
+            logger.error("퀴즈 조회 오류: %s", e)
             return jsonify({'error': str(e)}), 500
     
-    @app.route('/api/quiz/<int:quiz_id>/submit', methods=['POST'])
-    def submit_quiz(quiz_id):
-        """퀴즈 제출 및 채점"""
+    # 퀴즈 리포트가 이 시간 이상 pending이면 작업이 유실된 것으로 간주 (서버 재시작 등)
+    REPORT_JOB_TIMEOUT_SECONDS = int(os.getenv('REPORT_JOB_TIMEOUT_SECONDS', '600'))
+    
+    def quiz_owner_id(quiz_id):
+        """퀴즈 소유자 ID (요청 제한/LLM 토큰 사용량 기록용, 퀴즈가 없으면 None)"""
+        owner = db.session.query(Quiz.user_id).filter(Quiz.id == quiz_id).first()
+        return owner[0] if owner else None
+    
+    def generate_quiz_report(report_id, quiz_id, attempt_created_at, report_prompt):
+        """백그라운드 작업: AI 리포트를 생성하여 QuizReport에 저장 (status: pending → ready/failed)
+
+        재응시하면 리포트 행이 지워지고 새로 만들어지며, SQLite는 지워진 최대 rowid를 다시 쓰므로 같은 report_id가
+        다른 시도(또는 다른 퀴즈)의 리포트일 수 있습니다. 행의 quiz_id와 created_at(시도마다, 재생성 시에도 새로 기록)이
+        작업을 만든 시도와 같을 때만 저장합니다.
+        """
+        report_response = None
         try:
-            data = request.get_json()
-            user_id = data.get('user_id')
-            answers = data.get('answers', [])  # [{question_id: 1, answer: "..."}, ...]
-            
-            if not user_id:
-                return jsonify({'error': 'user_id is required'}), 400
-            
-            quiz = Quiz.query.get(quiz_id)
-            if not quiz:
-                return jsonify({'error': 'Quiz not found'}), 404
-            
-            if quiz.user_id != user_id:
-                return jsonify({'error': 'Unauthorized'}), 403
-            
-            # 이미 제출된 경우 기존 리포트와 답안 삭제 (재시도 허용)
-            # 이전 리포트는 비교 분석에 사용하기 위해 삭제 전에 저장
-            existing_report = QuizReport.query.filter_by(quiz_id=quiz_id).first()
-            previous_report_for_comparison = None
-            previous_score_for_comparison = None
-            
-            if existing_report:
-                # 이전 리포트 저장 (비교 분석용)
-                previous_report_for_comparison = existing_report.ai_report
-                previous_score_for_comparison = existing_report.score
-                # 기존 답안 삭제 (cascade가 설정되어 있지 않을 수 있으므로 명시적으로 삭제)
-                try:
-                    UserResponse.query.filter_by(quiz_id=quiz_id).delete(synchronize_session=False)
-                    db.session.delete(existing_report)
-                    # 여기서는 commit하지 않고 나중에 한 번에 commit
-                    print(f"🔄 퀴즈 {quiz_id} 재시도: 기존 리포트 및 답안 삭제 예정 (이전 점수: {previous_score_for_comparison})")
-                except Exception as delete_error:
-                    db.session.rollback()
-                    print(f"⚠️ 기존 리포트 삭제 중 오류: {delete_error}")
-                    # 삭제 실패해도 계속 진행 (이미 삭제되었을 수도 있음)
-            
-            # 문제 조회
-            questions = Question.query.filter_by(quiz_id=quiz_id).order_by(Question.order).all()
-            question_dict = {q.id: q for q in questions}
-            
-            # 답안 저장 및 채점
-            score = 0
-            total = len(questions)
-            results = []
-            user_responses_list = []
-            
-            for answer_data in answers:
-                question_id = answer_data.get('question_id')
-                user_answer = answer_data.get('answer', '').strip()
-                
-                if question_id not in question_dict:
-                    continue
-                
-                question = question_dict[question_id]
-                correct_answer = question.correct_answer.strip()
-                
-                # 정답 판정 (대소문자 무시, 공백 무시)
-                is_correct = user_answer.upper().replace(' ', '') == correct_answer.upper().replace(' ', '')
-                
-                if is_correct:
-                    score += 1
-                
-                # UserResponse 저장
-                user_response = UserResponse(
-                    quiz_id=quiz_id,
-                    question_id=question_id,
-                    user_answer=user_answer,
-                    is_correct=is_correct
-                )
-                db.session.add(user_response)
-                user_responses_list.append(user_response)
-                
-                results.append({
-                    'question_id': question_id,
-                    'is_correct': is_correct,
-                    'user_answer': user_answer,
-                    'correct_answer': correct_answer,
-                    'explanation': question.explanation,
-                    'key_concept': question.key_concept
-                })
-            
-            # AI 리포트 생성
-            api_key = os.getenv('GEMINI_API_KEY')
-            if not api_key:
-                return jsonify({'error': 'GEMINI_API_KEY not configured'}), 500
-            
-            genai.configure(api_key=api_key)
+            provider = get_llm_provider()
+            if provider is None:
+                raise ValueError('GEMINI_API_KEY not configured')
             
             # 실제 사용 가능한 모델 목록 조회 (다른 기능과 동일한 방식)
             try:
-                available_models = []
-                for m in genai.list_models():
-                    if 'generateContent' in m.supported_generation_methods:
-                        model_name = m.name.replace('models/', '')  # 'models/gemini-pro' -> 'gemini-pro'
-                        available_models.append(model_name)
-                
+                available_models = provider.list_models()
+
                 if not available_models:
                     raise Exception("사용 가능한 모델을 찾을 수 없습니다.")
-                
+
                 # 모델 우선순위 설정 (gemini-2.5-flash를 최우선으로 설정)
                 model_candidates = []
-                
+
                 # 1순위: gemini-2.5-flash (결제 계정이므로 최우선)
                 for model_name in available_models:
                     if '2.5' in model_name.lower() and 'flash' in model_name.lower() and 'gemma' not in model_name.lower():
                         model_candidates.append(model_name)
                         break  # 첫 번째 2.5-flash만 추가
-                
+
                 # 2순위: gemini-1.5-pro (고품질 대안)
                 if 'gemini-1.5-pro' in available_models:
                     model_candidates.append('gemini-1.5-pro')
-                
+
                 # 3순위: gemini-1.5-flash
                 if 'gemini-1.5-flash' in available_models:
                     model_candidates.append('gemini-1.5-flash')
-                
+
                 # 4순위: gemini-pro
                 if 'gemini-pro' in available_models:
                     model_candidates.append('gemini-pro')
-                
+
                 # 나머지 모델 추가 (gemma 제외, 2.5 버전은 이미 추가됨)
                 for model_name in available_models:
                     if model_name not in model_candidates and 'gemma' not in model_name.lower() and '2.5' not in model_name.lower():
                         model_candidates.append(model_name)
-                
-                print(f"📡 리포트 생성 모델 후보: {model_candidates}")
-                
+
+                logger.debug("리포트 생성 모델 후보: %s", model_candidates)
+
             except Exception as list_error:
-                print(f"⚠️ 모델 목록 조회 실패: {str(list_error)}")
+                logger.debug("모델 목록 조회 실패: %s", list_error)
                 # 기본 모델 목록 사용 (2.5-flash 우선)
                 model_candidates = ['gemini-2.5-flash', 'gemini-1.5-pro', 'gemini-1.5-flash', 'gemini-pro']
-            
-            # 리포트 프롬프트
-            wrong_answers = [r for r in results if not r['is_correct']]
-            correct_answers = [r for r in results if r['is_correct']]
-            
-            # 비교 분석 섹션 구성 (재시도인 경우 이전 리포트 사용)
-            comparison_section = ""
-            if previous_report_for_comparison and previous_score_for_comparison is not None:
-                score_diff = score - previous_score_for_comparison
-                percentage_diff = round((score/total*100) - (previous_score_for_comparison/total*100), 1) if total > 0 else 0
-                comparison_section = f"""
+
+            # 여러 모델을 순차적으로 시도 (모델 생성 + API 호출을 하나의 루프에서 처리)
+            report_response = None
+            ai_report = "리포트 생성 실패"
+            selected_model_name = None
+
+            for model_name in model_candidates:
+                try:
+                    logger.debug("리포트 생성 모델 시도 중... (모델: %s)", model_name)
+                    selected_model_name = model_name
+                    report_response = provider.generate(model_name, report_prompt, purpose='quiz_report')
+
+                    if report_response and report_response.text:
+                        ai_report = report_response.text
+                        logger.info("리포트 생성 완료 (모델: %s)", selected_model_name)
+                        break  # 성공하면 루프 종료
+                    else:
+                        logger.warning("%s: 응답이 없음 - 다음 모델 시도...", model_name)
+                        continue
+
+                except Exception as error:
+                    error_msg = str(error)
+                    # 404 에러면 다음 모델 시도
+                    if '404' in error_msg or 'not found' in error_msg.lower():
+                        logger.warning("%s: 모델을 찾을 수 없음 - 다음 모델 시도...", model_name)
+                        continue
+                    # 429 할당량 초과 에러면 다음 모델 시도
+                    elif '429' in error_msg or 'quota' in error_msg.lower() or 'exceeded' in error_msg.lower():
+                        logger.warning("%s: 할당량 초과 - 다음 모델 시도...", model_name)
+                        continue
+                    # 다른 에러면 재발생
+                    else:
+                        logger.warning("%s: %s", model_name, error_msg)
+                        if model_name == model_candidates[-1]:  # 마지막 모델이면 에러 발생
+                            raise
+
+            if report_response is None or ai_report == "리포트 생성 실패":
+                raise ValueError('사용 가능한 Gemini 모델을 찾을 수 없거나 할당량이 초과되었습니다. 잠시 후 다시 시도해주세요.')
+            status, error_message = 'ready', None
+        except Exception as e:
+            logger.exception("퀴즈 리포트 생성 실패 (리포트 ID: %s): %s", report_id, e)
+            ai_report, status, error_message = '', 'failed', str(e)
+        
+        if report_response is not None:
+            # 백그라운드 작업의 LLM 사용량은 요청에서 기록되지 않으므로 직접 기록 (결과를 버리는 경우에도 호출한 퀴즈 소유자에게)
+            charge_llm_tokens(quiz_owner_id(quiz_id), report_response.prompt_tokens + report_response.output_tokens)
+        quiz_report = QuizReport.query.get(report_id)
+        if quiz_report is None or quiz_report.quiz_id != quiz_id or quiz_report.created_at != attempt_created_at:
+            # 리포트 생성 중 재응시/재생성으로 리포트가 삭제되거나 새 시도로 바뀐 경우
+            logger.info("퀴즈 리포트 %s가 삭제되었거나 새 시도로 바뀌어 생성 결과를 버립니다.", report_id)
+            return
+        quiz_report.ai_report = ai_report
+        quiz_report.status = status
+        quiz_report.error_message = error_message
+        db.session.commit()
+    
+    def build_quiz_report_prompt(score, total, results, previous_report=None, previous_score=None):
+        """채점 결과로 AI 리포트 프롬프트 생성 (재시도인 경우 이전 리포트와 비교)"""
+        wrong_answers = [r for r in results if not r['is_correct']]
+        correct_answers = [r for r in results if r['is_correct']]
+        
+        # 비교 분석 섹션 구성 (재시도인 경우 이전 리포트 사용)
+        comparison_section = ""
+        if previous_report and previous_score is not None:
+            score_diff = score - previous_score
+            percentage_diff = round((score/total*100) - (previous_score/total*100), 1) if total > 0 else 0
+            comparison_section = f"""
 
 **이전 시도와의 비교:**
-- 이전 점수: {previous_score_for_comparison}/{total} (정답률: {round(previous_score_for_comparison/total*100, 1)}%)
+- 이전 점수: {previous_score}/{total} (정답률: {round(previous_score/total*100, 1)}%)
 - 현재 점수: {score}/{total} (정답률: {round(score/total*100, 1)}%)
 - 점수 변화: {score_diff:+d}점 (정답률 변화: {percentage_diff:+.1f}%)
-- 이전 리포트 요약: {previous_report_for_comparison[:300]}...
+- 이전 리포트 요약: {previous_report[:300]}...
 
 **중요:** 이전 시도 대비 성과 변화와 발전 정도를 구체적으로 분석하고, 개선된 부분과 여전히 부족한 부분을 명확히 구분하여 작성해주세요."""
-            
-            report_prompt = f"""당신은 학습 분석 전문가입니다. 다음 퀴즈 결과를 분석하여 사용자의 성과 리포트를 작성해주세요.
+        
+        report_prompt = f"""당신은 학습 분석 전문가입니다. 다음 퀴즈 결과를 분석하여 사용자의 성과 리포트를 작성해주세요.
 
 **성적: {score}/{total} (정답률: {round(score/total*100, 1)}%)**
 
@@ -3011,58 +2821,121 @@ def create_app():
 - 이전 시도가 있는 경우 발전 정도를 구체적으로 분석
 - 한국어로 친절하고 격려하는 톤으로 작성
 - 평가는 구체적이고 명확하게 작성 (애매한 표현 지양)"""
+        
+        return report_prompt
+    
+    @app.route('/api/quiz/<int:quiz_id>/submit', methods=['POST'])
+    @idempotent('quiz_submit:{quiz_id}')
+    @rate_limited('quiz_submit', user=lambda quiz_id: quiz_owner_id(quiz_id))
+    def submit_quiz(quiz_id):
+        """퀴즈 제출 및 채점"""
+        try:
+            data = request.get_json()
+            user_id = data.get('user_id')
+            answers = data.get('answers', [])  # [{question_id: 1, answer: "..."}, ...]
             
-            # 여러 모델을 순차적으로 시도 (모델 생성 + API 호출을 하나의 루프에서 처리)
-            report_response = None
-            ai_report = "리포트 생성 실패"
-            selected_model_name = None
+            if not user_id:
+                return jsonify({'error': 'user_id is required'}), 400
             
-            for model_name in model_candidates:
+            quiz = Quiz.query.get(quiz_id)
+            if not quiz:
+                return jsonify({'error': 'Quiz not found'}), 404
+            
+            if quiz.user_id != user_id:
+                return jsonify({'error': 'Unauthorized'}), 403
+            
+            # 이미 제출된 경우 기존 리포트와 답안 삭제 (재시도 허용)
+            # 이전 리포트는 비교 분석에 사용하기 위해 삭제 전에 저장
+            existing_report = QuizReport.query.filter_by(quiz_id=quiz_id).first()
+            previous_report_for_comparison = None
+            previous_score_for_comparison = None
+            
+            if existing_report:
+                # 이전 리포트 저장 (비교 분석용)
+                previous_report_for_comparison = existing_report.ai_report
+                previous_score_for_comparison = existing_report.score
+                # 기존 답안 삭제 (cascade가 설정되어 있지 않을 수 있으므로 명시적으로 삭제)
                 try:
-                    print(f"📡 리포트 생성 모델 시도 중... (모델: {model_name})")
-                    test_model = genai.GenerativeModel(model_name)
-                    selected_model_name = model_name
-                    
-                    # 모델 생성 성공 시 즉시 API 호출 시도
-                    report_response = test_model.generate_content(report_prompt)
-                    
-                    if report_response and report_response.text:
-                        ai_report = report_response.text
-                        print(f"✅ 리포트 생성 완료 (모델: {selected_model_name})")
-                        break  # 성공하면 루프 종료
-                    else:
-                        print(f"⚠️  {model_name}: 응답이 없음 - 다음 모델 시도...")
-                        continue
-                        
-                except Exception as error:
-                    error_msg = str(error)
-                    # 404 에러면 다음 모델 시도
-                    if '404' in error_msg or 'not found' in error_msg.lower():
-                        print(f"⚠️  {model_name}: 모델을 찾을 수 없음 - 다음 모델 시도...")
-                        continue
-                    # 429 할당량 초과 에러면 다음 모델 시도
-                    elif '429' in error_msg or 'quota' in error_msg.lower() or 'exceeded' in error_msg.lower():
-                        print(f"⚠️  {model_name}: 할당량 초과 - 다음 모델 시도...")
-                        continue
-                    # 다른 에러면 재발생
-                    else:
-                        print(f"⚠️  {model_name}: {error_msg}")
-                        if model_name == model_candidates[-1]:  # 마지막 모델이면 에러 발생
-                            raise
+                    # 이전 제출에서 핵심 개념 숙련도에 반영한 결과를 먼저 되돌림
+                    apply_graded_responses(quiz.user_id, quiz.subject_id, quiz_graded_responses(quiz_id), revert=True)
+                    UserResponse.query.filter_by(quiz_id=quiz_id).delete(synchronize_session=False)
+                    db.session.delete(existing_report)
+                    # 여기서는 commit하지 않고 나중에 한 번에 commit
+                    logger.info("퀴즈 %s 재시도: 기존 리포트 및 답안 삭제 예정 (이전 점수: %s)", quiz_id, previous_score_for_comparison)
+                except Exception as delete_error:
+                    db.session.rollback()
+                    logger.warning("기존 리포트 삭제 중 오류: %s", delete_error)
+                    # 삭제 실패해도 계속 진행 (이미 삭제되었을 수도 있음)
             
-            if report_response is None or ai_report == "리포트 생성 실패":
-                return jsonify({'error': '사용 가능한 Gemini 모델을 찾을 수 없거나 할당량이 초과되었습니다. 잠시 후 다시 시도해주세요.'}), 500
+            # 문제 조회
+            questions = Question.query.filter_by(quiz_id=quiz_id).order_by(Question.order).all()
+            question_dict = {q.id: q for q in questions}
+            
+            # 답안 저장 및 채점 (제출된 답안 전체를 한 번에 로컬 채점)
+            score = 0
+            total = len(questions)
+            results = []
+            user_responses_list = []
+            
+            submitted = []
+            for answer_data in answers:
+                question_id = answer_data.get('question_id')
+                if question_id not in question_dict:
+                    continue
+                submitted.append((question_dict[question_id], (answer_data.get('answer') or '').strip()))
             
-            # QuizReport 저장
+            grades = grade_answers([(question.question_type, user_answer, question.correct_answer)
+                                    for question, user_answer in submitted])
+            
+            for (question, user_answer), grade in zip(submitted, grades):
+                correct_answer = question.correct_answer.strip()
+                is_correct = grade.is_correct
+                
+                if is_correct:
+                    score += 1
+                
+                # UserResponse 저장
+                user_response = UserResponse(
+                    quiz_id=quiz_id,
+                    question_id=question.id,
+                    user_answer=user_answer,
+                    is_correct=is_correct
+                )
+                db.session.add(user_response)
+                user_responses_list.append(user_response)
+                
+                results.append({
+                    'question_id': question.id,
+                    'is_correct': is_correct,
+                    'user_answer': user_answer,
+                    'correct_answer': correct_answer,
+                    'explanation': question.explanation,
+                    'key_concept': question.key_concept
+                })
+            
+            # 핵심 개념 숙련도 갱신 (점수/답안과 함께 commit)
+            apply_graded_responses(quiz.user_id, quiz.subject_id,
+                                   [(result['key_concept'], result['is_correct']) for result in results])
+            
+            report_prompt = build_quiz_report_prompt(score, total, results,
+                                                     previous_report_for_comparison, previous_score_for_comparison)
+            
+            # 점수와 답안은 바로 저장하고, AI 리포트는 백그라운드 작업으로 생성
             quiz_report = QuizReport(
                 quiz_id=quiz_id,
                 score=score,
                 total=total,
-                ai_report=ai_report
+                ai_report='',
+                status='pending'
             )
             db.session.add(quiz_report)
             db.session.commit()
             
+            submit_job(app, f'quiz_report:{quiz_report.id}', generate_quiz_report,
+                       quiz_report.id, quiz_id, quiz_report.created_at, report_prompt)
+            # 주차별 정답률이 바뀌었으므로 학습 계획 갱신
+            schedule_study_plan_refresh([quiz.subject])
+            
             return jsonify({
                 'message': 'Quiz submitted successfully',
                 'score': score,
@@ -3073,11 +2946,94 @@ def create_app():
             
         except Exception as e:
             db.session.rollback()
-            print(f"❌ 퀴즈 제출 오류: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("퀴즈 제출 오류: %s", e)
             return jsonify({'error': str(e)}), 500
-    
+
+    @app.route('/api/quiz/<int:quiz_id>/report', methods=['GET'])
+    def get_quiz_report(quiz_id):
+        """퀴즈 리포트 조회 (제출 후 status가 'ready' 또는 'failed'가 될 때까지 클라이언트가 폴링)"""
+        try:
+            user_id = request.args.get('user_id', type=int)
+            if not user_id:
+                return jsonify({'error': 'user_id parameter is required'}), 400
+
+            owner_id = quiz_owner_id(quiz_id)
+            if owner_id is None:
+                return jsonify({'error': 'Quiz not found'}), 404
+            if owner_id != user_id:
+                return jsonify({'error': 'Unauthorized'}), 403
+
+            quiz_report = QuizReport.query.filter_by(quiz_id=quiz_id).first()
+            if not quiz_report:
+                return jsonify({'error': 'Report not found'}), 404
+
+            # 서버 재시작 등으로 작업이 유실되어 pending에 머무른 리포트는 실패로 처리 (재생성 가능)
+            if (quiz_report.status == 'pending' and quiz_report.created_at and
+                    (datetime.utcnow() - quiz_report.created_at).total_seconds() > REPORT_JOB_TIMEOUT_SECONDS):
+                quiz_report.status = 'failed'
+                quiz_report.error_message = '리포트 생성이 중단되었습니다. 다시 시도해주세요.'
+                db.session.commit()
+
+            return jsonify({'report': quiz_report.to_dict()}), 200
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error("퀴즈 리포트 조회 오류: %s", e)
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/quiz/<int:quiz_id>/report/retry', methods=['POST'])
+    @rate_limited('quiz_report_retry', user=lambda quiz_id: quiz_owner_id(quiz_id))
+    def retry_quiz_report(quiz_id):
+        """생성에 실패한 퀴즈 리포트를 다시 생성 (저장된 답안으로 프롬프트를 재구성)"""
+        try:
+            data = request.get_json() or {}
+            user_id = data.get('user_id')
+            if not user_id:
+                return jsonify({'error': 'user_id is required'}), 400
+
+            quiz = Quiz.query.get(quiz_id)
+            if not quiz:
+                return jsonify({'error': 'Quiz not found'}), 404
+            if quiz.user_id != user_id:
+                return jsonify({'error': 'Unauthorized'}), 403
+
+            quiz_report = QuizReport.query.filter_by(quiz_id=quiz_id).first()
+            if not quiz_report:
+                return jsonify({'error': 'Report not found'}), 404
+            if quiz_report.status != 'failed':
+                return jsonify({'report': quiz_report.to_dict()}), 200
+
+            questions = {q.id: q for q in Question.query.filter_by(quiz_id=quiz_id).all()}
+            results = []
+            for response in UserResponse.query.filter_by(quiz_id=quiz_id).all():
+                question = questions.get(response.question_id)
+                if not question:
+                    continue
+                results.append({
+                    'question_id': question.id,
+                    'is_correct': response.is_correct,
+                    'user_answer': response.user_answer,
+                    'correct_answer': question.correct_answer,
+                    'explanation': question.explanation,
+                    'key_concept': question.key_concept
+                })
+
+            report_prompt = build_quiz_report_prompt(quiz_report.score, quiz_report.total, results)
+            quiz_report.status = 'pending'
+            quiz_report.error_message = None
+            quiz_report.created_at = datetime.utcnow()
+            db.session.commit()
+
+            submit_job(app, f'quiz_report:{quiz_report.id}', generate_quiz_report,
+                       quiz_report.id, quiz_id, quiz_report.created_at, report_prompt)
+
+            return jsonify({'report': quiz_report.to_dict()}), 202
+
+        except Exception as e:
+            db.session.rollback()
+            logger.exception("퀴즈 리포트 재생성 오류: %s", e)
+            return jsonify({'error': str(e)}), 500
+
     @app.route('/api/subjects/<int:subject_id>/quizzes', methods=['GET'])
     def get_quiz_history(subject_id):
         """과목별 퀴즈 히스토리 조회"""
@@ -3110,7 +3066,7 @@ def create_app():
             }), 200
             
         except Exception as e:
-            print(f"❌ 퀴즈 히스토리 조회 오류: {e}")
+            logger.error("퀴즈 히스토리 조회 오류: %s", e)
             return jsonify({'error': str(e)}), 500
     
     @app.route('/api/quiz/<int:quiz_id>', methods=['DELETE'])
@@ -3128,20 +3084,32 @@ def create_app():
             if quiz.user_id != user_id:
                 return jsonify({'error': 'Unauthorized'}), 403
             
+            # 제출한 답안이 핵심 개념 숙련도에 반영되어 있으면 먼저 되돌림 (삭제한 퀴즈가 취약 개념 목록에 남지 않도록)
+            apply_graded_responses(quiz.user_id, quiz.subject_id, quiz_graded_responses(quiz_id), revert=True)
+            
             # 관련 데이터 삭제 (cascade로 자동 삭제되지만 명시적으로)
             UserResponse.query.filter_by(quiz_id=quiz_id).delete()
+            # 다른 퀴즈가 복사해 간 원본 문제는 복사본에 넘기고, 남은 원본의 문제 은행 색인만 삭제
+            promote_copies(quiz_id)
+            QuestionBankEntry.query.filter(QuestionBankEntry.question_id.in_(
+                db.session.query(Question.id).filter_by(quiz_id=quiz_id)
+            )).delete(synchronize_session=False)
             Question.query.filter_by(quiz_id=quiz_id).delete()
             QuizReport.query.filter_by(quiz_id=quiz_id).delete()
+            subject = quiz.subject
             db.session.delete(quiz)
             db.session.commit()
             
+            # 주차별 정답률이 바뀌었으므로 학습 계획 갱신
+            schedule_study_plan_refresh([subject])
+            
             return jsonify({
                 'message': 'Quiz deleted successfully'
             }), 200
             
         except Exception as e:
             db.session.rollback()
-            print(f"❌ 퀴즈 삭제 오류: {e}")
+            logger.error("퀴즈 삭제 오류: %s", e)
             return jsonify({'error': str(e)}), 500
     
     # ==================== D-Day Exam Planner API ====================
@@ -3183,13 +3151,15 @@ def create_app():
             old_exam_date_only = old_exam_date.date() if old_exam_date else None
             new_exam_date_only = exam_date.date() if exam_date else None
             
-            # 시험 정보가 변경되면 기존 학습 계획 삭제
-            if (old_exam_date_only != new_exam_date_only or 
-                subject.exam_type != exam_type or 
-                subject.exam_week_start != exam_week_start or 
-                subject.exam_week_end != exam_week_end):
-                subject.study_plan = None  # 학습 계획 초기화
-                print(f"📝 시험 정보 변경 감지 - 학습 계획 초기화")
+            # 시험 정보가 변경되면 기존 학습 계획을 다시 계산 (시험일이 지났으면 삭제)
+            exam_info_changed = (old_exam_date_only != new_exam_date_only or
+                                 subject.exam_type != exam_type or
+                                 subject.exam_week_start != exam_week_start or
+                                 subject.exam_week_end != exam_week_end)
+            if exam_info_changed and new_exam_date_only <= korea_today():
+                subject.study_plan = None
+                subject.study_plan_fingerprint = None
+                logger.info("시험 정보 변경 감지 - 지난 시험일이므로 학습 계획 삭제")
             
             subject.exam_date = exam_date
             subject.exam_type = exam_type
@@ -3199,7 +3169,10 @@ def create_app():
             
             db.session.commit()
             
-            print(f"✅ 시험 날짜 업데이트 완료: {exam_date}, 유형: {exam_type}, 범위: {exam_week_start}~{exam_week_end}주차")
+            logger.info("시험 날짜 업데이트 완료: %s, 유형: %s, 범위: %s~%s주차", exam_date, exam_type, exam_week_start, exam_week_end)
+            
+            if exam_info_changed:
+                schedule_study_plan_refresh([subject])
             
             return jsonify({
                 'message': 'Exam date set successfully',
@@ -3208,7 +3181,7 @@ def create_app():
             
         except Exception as e:
             db.session.rollback()
-            print(f"❌ 시험 날짜 설정 오류: {e}")
+            logger.error("시험 날짜 설정 오류: %s", e)
             return jsonify({'error': str(e)}), 500
     
     @app.route('/api/subjects/<int:subject_id>/exam-date', methods=['DELETE'])
@@ -3221,6 +3194,7 @@ def create_app():
             
             subject.exam_date = None
             subject.study_plan = None  # 학습 계획도 함께 삭제
+            subject.study_plan_fingerprint = None
             subject.updated_at = datetime.utcnow()
             
             db.session.commit()
@@ -3232,7 +3206,7 @@ def create_app():
             
         except Exception as e:
             db.session.rollback()
-            print(f"❌ 시험 날짜 삭제 오류: {e}")
+            logger.error("시험 날짜 삭제 오류: %s", e)
             return jsonify({'error': str(e)}), 500
     
     @app.route('/api/subjects/<int:subject_id>/notification', methods=['PUT'])
@@ -3258,12 +3232,59 @@ def create_app():
             
         except Exception as e:
             db.session.rollback()
-            print(f"❌ 알림 설정 오류: {e}")
+            logger.error("알림 설정 오류: %s", e)
             return jsonify({'error': str(e)}), 500
     
+    def schedule_study_plan_refresh(subjects):
+        """학습 계획 입력이 바뀌었을 수 있는 과목의 계획을 백그라운드에서 갱신 (계획이 있는 과목만)"""
+        for subject in subjects:
+            if subject is not None and subject.study_plan:
+                submit_job(app, f'study_plan_refresh:{subject.id}', refresh_study_plan, subject.id)
+    
+    def generate_study_plan_message(subject_id, generated_at, prompt):
+        """백그라운드 작업: 학습 계획 응원 메시지를 생성하여 study_plan["message"]에 저장"""
+        provider = get_llm_provider()
+        if provider is None:
+            logger.warning("GEMINI_API_KEY가 없어 학습 계획 응원 메시지를 생성하지 않습니다.")
+            return
+        
+        # 모델 후보를 차례로 시도 (404/할당량 초과/빈 응답이면 다음 모델)
+        model_candidates = ['gemini-2.5-flash', 'gemini-1.5-pro', 'gemini-1.5-flash', 'gemini-pro']
+        response, message = None, ''
+        for model_name in model_candidates:
+            try:
+                response = provider.generate(model_name, prompt, purpose='study_plan_message')
+            except Exception as error:
+                error_msg = str(error)
+                if ('404' in error_msg or 'not found' in error_msg.lower() or
+                        '429' in error_msg or 'quota' in error_msg.lower() or 'exceeded' in error_msg.lower()):
+                    logger.warning("%s: 학습 계획 응원 메시지 생성 실패 - 다음 모델 시도... (%s)", model_name, error_msg)
+                    continue
+                raise
+            message = (response.text or '').strip() if response else ''
+            if message:
+                break
+            logger.warning("%s: 응답이 없음 - 다음 모델 시도...", model_name)
+        if not message:
+            logger.warning("학습 계획 응원 메시지를 생성하지 못했습니다 (과목 ID: %s)", subject_id)
+            return
+        
+        subject = Subject.query.get(subject_id)
+        if subject is not None:
+            # 백그라운드 작업의 LLM 사용량은 요청에서 기록되지 않으므로 직접 기록
+            charge_llm_tokens(subject.user_id, response.prompt_tokens + response.output_tokens)
+        plan_data = json.loads(subject.study_plan) if subject and subject.study_plan else None
+        # 메시지를 생성하는 동안 계획이 다시 만들어졌거나 삭제된 경우 저장하지 않음
+        if not plan_data or plan_data.get('generated_at') != generated_at:
+            return
+        plan_data['message'] = message[:500]
+        subject.study_plan = json.dumps(plan_data, ensure_ascii=False)
+        db.session.commit()
+    
     @app.route('/api/subjects/<int:subject_id>/study-plan', methods=['POST'])
+    @rate_limited('study_plan', user=lambda subject_id: request.args.get('user_id', type=int))
     def generate_study_plan(subject_id):
-        """AI 학습 계획 생성"""
+        """학습 계획 생성 (일별 계획은 로컬에서 계산, LLM은 응원 메시지에만 사용)"""
         try:
             user_id = request.args.get('user_id', type=int)
             if not user_id:
@@ -3281,190 +3302,70 @@ def create_app():
                 return jsonify({'error': 'User not found'}), 404
             
             # 오늘 날짜와 시험 날짜 계산 (한국 시간 기준, UTC+9)
-            from datetime import timezone, timedelta
-            korea_tz = timezone(timedelta(hours=9))
-            today = datetime.now(korea_tz).date()
-            exam_date = subject.exam_date.date() if isinstance(subject.exam_date, datetime) else subject.exam_date
+            today = korea_today()
+            exam_date = exam_day(subject)
             
             if exam_date <= today:
                 return jsonify({'error': 'Exam date must be in the future'}), 400
             
             days_until_exam = (exam_date - today).days
             
-            # 강의계획서 요약 수집 (시험 범위에 맞춰 필터링)
-            syllabus_summary = ""
-            exam_range_info = ""
-            if subject.syllabus_analysis:
-                try:
-                    analysis = json.loads(subject.syllabus_analysis) if isinstance(subject.syllabus_analysis, str) else subject.syllabus_analysis
-                    if isinstance(analysis, dict) and 'weekly_schedule' in analysis:
-                        weekly_schedule = analysis.get('weekly_schedule', [])
-                        
-                        # 시험 범위 필터링
-                        if subject.exam_week_start and subject.exam_week_end:
-                            filtered_weeks = [
-                                week for week in weekly_schedule
-                                if subject.exam_week_start <= week.get('week_no', 0) <= subject.exam_week_end
-                            ]
-                            exam_range_info = f"시험 범위: {subject.exam_week_start}주차 ~ {subject.exam_week_end}주차"
-                            syllabus_summary = "\n".join([f"Week {week.get('week_no', i+1)}: {week.get('topic', '')}" for i, week in enumerate(filtered_weeks)])
-                        else:
-                            weekly_topics = [week.get('topic', '') for week in weekly_schedule]
-                            syllabus_summary = "\n".join([f"Week {i+1}: {topic}" for i, topic in enumerate(weekly_topics)])
-                except:
-                    pass
+            # 시험 범위 주차와 주차별 퀴즈 정답률로 일별 계획을 로컬에서 계산
+            weeks, accuracy, learning_style, inputs_fingerprint = plan_inputs(subject, user)
+            plan_data = build_study_plan(today, exam_date, weeks, accuracy, learning_style)
+            plan_data['generated_at'] = datetime.utcnow().isoformat()
             
-            if not syllabus_summary and subject.syllabus_text:
-                # syllabus_text에서 첫 2000자만 사용
-                syllabus_summary = subject.syllabus_text[:2000]
-            
-            # 시험 유형 정보
-            exam_type_info = ""
-            if subject.exam_type:
-                exam_type_info = "중간고사" if subject.exam_type == 'midterm' else "기말고사"
-            
-            # 사용자 학습 스타일 수집
-            learning_style = {
-                'exam_style': user.exam_style or '미리미리',
-                'learning_depth': user.learning_depth or '원리파악',
-                'material_preference': user.material_preference or '텍스트',
-                'practice_style': user.practice_style or '이론중심',
-                'ai_persona': user.ai_persona or '격려형'
-            }
+            # 학습 계획 저장 (입력 fingerprint는 이후 입력이 바뀌었는지 확인하는 데 사용)
+            subject.study_plan = json.dumps(plan_data, ensure_ascii=False)
+            subject.study_plan_fingerprint = inputs_fingerprint
+            subject.updated_at = datetime.utcnow()
+            db.session.commit()
             
-            # 학습 스타일 설명 생성
-            style_description = f"""
-- 시험 준비 방식: {learning_style['exam_style']}
-- 이해 깊이: {learning_style['learning_depth']}
-- 자료 선호: {learning_style['material_preference']}
-- 실전 선호: {learning_style['practice_style']}
-- AI 성격: {learning_style['ai_persona']}
-"""
+            logger.info("학습 계획 생성 완료 - Subject: %s, %s일, 범위 %s개 주차", subject_id, days_until_exam, len(weeks))
             
-            # Gemini 프롬프트 생성
-            prompt = f"""당신은 학습 계획 전문가입니다. 다음 정보를 바탕으로 {days_until_exam}일간의 일일 학습 계획을 생성해주세요.
-
-**과목 정보:**
-- 과목명: {subject.name}
-- 시험 유형: {exam_type_info if exam_type_info else "시험"}
-- 시험 날짜: {exam_date.isoformat()}
-- 오늘 날짜: {today.isoformat()}
-- 남은 일수: {days_until_exam}일
-{exam_range_info if exam_range_info else ""}
-
-**강의계획서 요약 (시험 범위):**
-{syllabus_summary if syllabus_summary else "강의계획서 정보가 없습니다."}
-
-**사용자 학습 스타일:**
-{style_description}
-
-**요구사항:**
-1. 오늘({today.isoformat()})부터 시험일({exam_date.isoformat()})까지 매일의 학습 계획을 생성하세요.
-2. 각 날짜별로 구체적이고 실행 가능한 학습 계획을 작성하세요:
-   - **학습 범위**: 어느 주차, 어느 단원, 어느 개념부터 어디까지 학습할지 명시
-   - **학습 방법**: 이론 정리, 예제 풀이, 개념 이해, 복습 등 구체적인 방법 제시
-   - **퀴즈 활용**: 퀴즈를 언제, 어떻게 활용할지 (예: "Week 1-2 개념 퀴즈 생성 후 풀이", "이전에 틀린 문제 재풀이", "중요 개념 확인 퀴즈")
-   - **학습 자료**: 어떤 자료를 사용할지 (교재, 강의노트, PDF 등)
-3. 사용자의 학습 스타일에 맞춰 계획을 조정하세요:
-   - {learning_style['material_preference']} 선호: 해당 자료 유형을 활용한 학습 제안
-   - {learning_style['learning_depth']}: 이해 깊이에 맞는 학습 방법 제안
-   - {learning_style['practice_style']}: 실전 선호에 맞는 문제/이론 비율 조정
-4. 시험일이 가까워질수록 복습과 문제 풀이 비중을 높이세요.
-5. 주말에는 더 많은 시간을 할당하고, 주중에는 집중적인 학습을 제안하세요.
-6. 각 날짜의 학습 계획은 2-3줄로 구체적으로 작성하세요.
-
-**출력 형식:**
-반드시 다음 JSON 형식으로 출력하세요 (다른 텍스트 없이 JSON만):
-{{
-  "plan": {{
-    "YYYY-MM-DD": "구체적인 학습 계획 (학습 범위, 방법, 퀴즈 활용 포함)",
-    "YYYY-MM-DD": "구체적인 학습 계획",
-    ...
-  }}
-}}
-
-예시:
-{{
-  "plan": {{
-    "2024-12-15": "Week 1-2 범위 복습: 선형대수 기초 개념(벡터, 행렬)부터 중간 개념(행렬식, 역행렬)까지 이론 정리. Week 1-2 개념 확인 퀴즈 생성 후 풀이하며 약점 파악.",
-    "2024-12-16": "Week 3-4 범위 학습: 확률론 기본 개념(확률의 정의, 조건부 확률)부터 베이즈 정리까지 교재로 학습. 각 개념별 예제 문제 5개씩 풀이 후 이해도 확인.",
-    "2024-12-17": "Week 1-4 종합 복습: 지난 3일간 학습한 내용 전체 복습. 종합 퀴즈 생성하여 실전 감각 익히기. 틀린 문제는 오답노트 정리.",
-    ...
-  }}
-}}
-
-중요: 
-- 각 날짜의 계획은 학습 범위(어디부터 어디까지), 학습 방법, 퀴즈 활용 방법을 모두 포함해야 합니다.
-- 반드시 JSON 형식만 출력하고, 다른 설명이나 텍스트는 포함하지 마세요."""
-
-            # Gemini API 호출
-            try:
-                api_key = os.getenv('GEMINI_API_KEY')
-                if not api_key:
-                    return jsonify({'error': 'GEMINI_API_KEY not configured'}), 500
-                
-                genai.configure(api_key=api_key)
-                
-                # 모델 선택 (gemini-2.5-flash 우선)
-                model_candidates = ['gemini-2.5-flash', 'gemini-1.5-pro', 'gemini-1.5-flash', 'gemini-pro']
-                model = None
-                
-                for model_name in model_candidates:
-                    try:
-                        model = genai.GenerativeModel(model_name)
-                        break
-                    except:
-                        continue
-                
-                if not model:
-                    return jsonify({'error': 'No available Gemini model'}), 500
-                
-                response = model.generate_content(prompt)
-                
-                if not response or not response.text:
-                    return jsonify({'error': 'Failed to generate study plan'}), 500
-                
-                # JSON 파싱
-                response_text = response.text.strip()
-                # JSON 코드 블록 제거 (```json ... ```)
-                if response_text.startswith('```'):
-                    response_text = response_text.split('```')[1]
-                    if response_text.startswith('json'):
-                        response_text = response_text[4:]
-                    response_text = response_text.strip()
-                
-                plan_data = json.loads(response_text)
-                
-                # 학습 계획 저장
-                subject.study_plan = json.dumps(plan_data, ensure_ascii=False)
-                subject.updated_at = datetime.utcnow()
-                db.session.commit()
-                
-                return jsonify({
-                    'message': 'Study plan generated successfully',
-                    'study_plan': plan_data
-                }), 200
-                
-            except json.JSONDecodeError as e:
-                print(f"❌ JSON 파싱 오류: {e}")
-                print(f"응답 텍스트: {response.text if 'response' in locals() else 'N/A'}")
-                return jsonify({'error': 'Failed to parse AI response as JSON'}), 500
-            except Exception as e:
-                print(f"❌ 학습 계획 생성 오류: {e}")
-                return jsonify({'error': str(e)}), 500
+            # 응원 메시지만 LLM으로 생성 (백그라운드, 실패해도 계획은 그대로 사용)
+            if is_study_plan_message_enabled():
+                exam_label = "중간고사" if subject.exam_type == 'midterm' else "기말고사" if subject.exam_type else "시험"
+                message_prompt = build_message_prompt(subject.name, exam_label, days_until_exam, weeks, accuracy,
+                                                      user.ai_persona or '격려형')
+                submit_job(app, f'study_plan_message:{subject_id}', generate_study_plan_message,
+                           subject_id, plan_data['generated_at'], message_prompt)
+            
+            return jsonify({
+                'message': 'Study plan generated successfully',
+                'study_plan': plan_data
+            }), 200
             
         except Exception as e:
             db.session.rollback()
-            print(f"❌ 학습 계획 생성 오류: {e}")
+            logger.error("학습 계획 생성 오류: %s", e)
             return jsonify({'error': str(e)}), 500
     
     return app
 
-app = create_app()
+_app_lock = threading.Lock()
+
+
+def __getattr__(name):
+    """모듈 속성 app을 처음 접근할 때 생성 (from app import app)
+
+    import만으로 앱을 만들지 않으므로 create_app만 쓰는 스크립트(check_tables.py, reset_db.py)가 앱을 두 번 만들지 않습니다.
+    """
+    if name == 'app':
+        with _app_lock:
+            if 'app' not in globals():
+                globals()['app'] = create_app()
+        return globals()['app']
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 if __name__ == '__main__':
+    # 개발 서버는 시작할 때 마이그레이션 실행 (DB_MIGRATE_ON_START=0으로 끌 수 있음)
+    os.environ.setdefault('DB_MIGRATE_ON_START', '1')
+    app = create_app()
     
-    # 개발 서버 실행
-    print("Flask 서버를 시작합니다...")
-    print("서버 주소: http://127.0.0.1:5000")
+    # 개발 서버 실행 (프로덕션은 python migrations.py 후 gunicorn -c gunicorn.conf.py wsgi:app)
+    logger.info("Flask 개발 서버를 시작합니다...")
+    logger.info("서버 주소: http://127.0.0.1:5000")
     app.run(debug=True, host='0.0.0.0', port=5000)
 
@@ -0,0 +1,92 @@
+"""
+파생 데이터 의존성 모듈
+LLM/계산으로 만든 파생 데이터가 어떤 입력으로 만들어졌는지 fingerprint로 기록하고,
+입력이 바뀐 데이터만 stale로 판단하여 다시 만듭니다 (일괄 삭제하지 않음).
+
+의존성 그래프:
+    강의계획서 → 분석 결과(syllabus_analysis) → 주차 주제 → 학습 계획 (Subject.study_plan_fingerprint)
+    주차 수업자료(PDF) → 주차 텍스트 → 개념 학습 콘텐츠 (ConceptContent.source_fingerprint)
+                                     → 문제 은행 색인 (QuestionBankEntry.source_fingerprint)
+    수업자료(PDF) 하나 → 자료별 요약 (MaterialSummary.source_fingerprint) → 개념 학습 콘텐츠 (계층 요약)
+
+- 주차 텍스트 fingerprint는 주차의 PDF 자료 ID 목록으로 계산합니다 (업로드된 자료의 내용은 바뀌지 않음).
+- 자료별 요약 fingerprint는 자료 ID, 텍스트 정리 규칙 버전, 요약 규칙 버전으로 계산합니다. 주차에 자료가 추가/삭제되면
+  주차 콘텐츠는 다시 만들지만, 나머지 자료의 요약은 그대로 재사용합니다.
+- 개념 학습 콘텐츠와 문제 은행은 읽을 때 fingerprint를 비교하여 다르면 다시 생성/제외합니다 (lazy).
+  fingerprint가 없는 기존 데이터는 현재 입력으로 만들어진 것으로 간주합니다.
+- 학습 계획은 입력(시험 정보, 주차 주제, 퀴즈 정답률, 학습 스타일)이 바뀌는 요청 뒤에
+  백그라운드에서 fingerprint를 비교하여 다시 계산합니다 (study_planner.refresh_study_plan).
+"""
+
+import json
+import hashlib
+
+from models import db, Week, Material, ConceptContent, QuestionBankEntry
+
+
+def fingerprint(*parts):
+    """입력 값들의 fingerprint (JSON 직렬화 후 SHA-1 앞 16자리)"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def week_text_fingerprints(week_ids):
+    """주차별 텍스트 fingerprint {week_id: fingerprint} (PDF 자료가 없는 주차도 포함)"""
+    week_ids = list(week_ids)
+    materials = {week_id: [] for week_id in week_ids}
+    if week_ids:
+        rows = db.session.query(Material.week_id, Material.id).filter(
+            Material.week_id.in_(week_ids), Material.file_type == 'pdf'
+        ).all()
+        for week_id, material_id in rows:
+            materials[week_id].append(material_id)
+    return {week_id: fingerprint('week_text', sorted(ids)) for week_id, ids in materials.items()}
+
+
+def week_text_fingerprint(week_id):
+    return week_text_fingerprints([week_id])[week_id]
+
+
+def subject_week_text_fingerprints(subject_id, week_numbers):
+    """과목의 주차 번호별 텍스트 fingerprint {week_number: fingerprint} (주차가 없으면 자료 없음으로 계산)"""
+    weeks = dict(db.session.query(Week.week_number, Week.id).filter(
+        Week.subject_id == subject_id, Week.week_number.in_(list(week_numbers))
+    ).all())
+    by_week_id = week_text_fingerprints(weeks.values())
+    empty = fingerprint('week_text', [])
+    return {week_no: by_week_id[weeks[week_no]] if week_no in weeks else empty for week_no in week_numbers}
+
+
+def material_summary_fingerprint(material_id, cleaning_version, summary_version):
+    """자료별 요약 fingerprint (자료 텍스트 정리 규칙이나 요약 규칙이 바뀌면 달라짐)"""
+    return fingerprint('material_summary', material_id, cleaning_version, summary_version)
+
+
+def is_current(stored, current):
+    """저장된 fingerprint가 현재 입력과 같은지 확인 (fingerprint가 없는 기존 데이터는 현재 것으로 간주)"""
+    return stored is None or stored == current
+
+
+def stamp_missing_fingerprints():
+    """fingerprint가 없는 기존 개념 학습 콘텐츠/문제 은행 색인에 현재 주차 텍스트 fingerprint를 기록
+
+    fingerprint 컬럼을 추가하거나 문제 은행을 처음 색인한 뒤 한 번 실행합니다.
+    """
+    week_ids = [week_id for (week_id,) in db.session.query(ConceptContent.week_id).filter(
+        ConceptContent.source_fingerprint.is_(None)).distinct().all()]
+    for week_id, value in week_text_fingerprints(week_ids).items():
+        ConceptContent.query.filter(
+            ConceptContent.week_id == week_id, ConceptContent.source_fingerprint.is_(None)
+        ).update({ConceptContent.source_fingerprint: value}, synchronize_session=False)
+
+    subject_weeks = {}
+    for subject_id, week_no in db.session.query(QuestionBankEntry.subject_id, QuestionBankEntry.week_number).filter(
+            QuestionBankEntry.source_fingerprint.is_(None)).distinct().all():
+        subject_weeks.setdefault(subject_id, []).append(week_no)
+    for subject_id, week_numbers in subject_weeks.items():
+        for week_no, value in subject_week_text_fingerprints(subject_id, week_numbers).items():
+            QuestionBankEntry.query.filter(
+                QuestionBankEntry.subject_id == subject_id, QuestionBankEntry.week_number == week_no,
+                QuestionBankEntry.source_fingerprint.is_(None)
+            ).update({QuestionBankEntry.source_fingerprint: value}, synchronize_session=False)
+    db.session.commit()
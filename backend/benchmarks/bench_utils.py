@@ -0,0 +1,91 @@
+"""
+벤치마크 공용 유틸리티
+백분위수 계산, 실행 환경 메타데이터 수집, 결과 저장/비교 기능을 제공합니다.
+"""
+
+import os
+import sys
+import json
+import platform
+import subprocess
+from datetime import datetime
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def use_backend_path():
+    """backend 폴더를 import 경로와 작업 디렉터리로 설정 (상대 경로 업로드 파일 접근용)"""
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    os.chdir(BACKEND_DIR)
+
+
+def percentile(values, pct):
+    """선형 보간 백분위수 (values가 비어 있으면 0)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * pct / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(values):
+    """지연 시간 목록(초)을 ms 단위 통계로 요약"""
+    return {
+        'count': len(values),
+        'mean_ms': round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        'p50_ms': round(percentile(values, 50) * 1000, 3),
+        'p95_ms': round(percentile(values, 95) * 1000, 3),
+        'p99_ms': round(percentile(values, 99) * 1000, 3),
+        'max_ms': round(max(values) * 1000, 3) if values else 0.0,
+    }
+
+
+def run_metadata(params):
+    """커밋 간 비교를 위한 실행 메타데이터"""
+    def git(*args):
+        try:
+            return subprocess.check_output(['git', *args], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL).decode().strip()
+        except Exception:
+            return None
+
+    return {
+        'git_commit': git('rev-parse', '--short', 'HEAD'),
+        'git_dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+        'timestamp': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': params,
+    }
+
+
+def save_results(path, results):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {path}")
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def print_comparison(baseline, current, metrics, key='endpoints'):
+    """두 결과 파일의 엔드포인트별 지표 비교 출력 (음수 변화율 = 개선)"""
+    print(f"\n=== 비교: {baseline['meta'].get('git_commit')} → {current['meta'].get('git_commit')} ===")
+    header = f"{'endpoint':<22}" + ''.join(f"{m:>22}" for m in metrics)
+    print(header)
+    for name, cur in current[key].items():
+        base = baseline[key].get(name)
+        if not base:
+            continue
+        row = f"{name:<22}"
+        for metric in metrics:
+            b, c = base.get(metric, 0), cur.get(metric, 0)
+            change = f"{(c - b) / b * 100:+.1f}%" if b else 'n/a'
+            row += f"{b:>9.2f}→{c:>7.2f} {change:>5}"
+        print(row)
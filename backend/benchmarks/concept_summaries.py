@@ -0,0 +1,186 @@
+"""
+개념 학습 계층 요약 벤치마크
+
+DB 사본에서 한 주차에 PDF 자료 여러 개(--materials)를 두고, 자료 하나를 추가한 뒤 개념 학습 콘텐츠(/api/concept/generate)를
+다시 생성하는 비용을 계층 요약 끔(CONCEPT_HIERARCHICAL=0, 주차 자료 전체로 한 번에 생성)과 켬(자료별 요약 캐시 + 통합)으로 비교합니다.
+    - full: 계층 요약 끔. 자료가 바뀔 때마다 주차 자료 전체를 프롬프트에 넣어 다시 생성
+    - hierarchical: 자료별 요약을 미리 만들어 둔 상태에서 자료 추가 → 새 자료 요약 1회 + 통합 1회
+LLM 호출 수, 프롬프트 입력 문자 수(입력 토큰 비용), 응답 시간과 함께 자료 텍스트 중 LLM에 전달된 비율(coverage)을 기록합니다.
+full은 주차 자료 전체가 CONCEPT_MATERIAL_MAX_CHARS 하나를 나눠 쓰므로 자료가 많으면 뒤쪽 자료가 잘리고,
+hierarchical은 자료마다 같은 예산으로 요약합니다.
+시드 DB의 다른 주차 자료를 복사해 대상 주차의 자료로 사용하며, 원본 DB는 바꾸지 않습니다.
+
+사용법 (backend 폴더에서, benchmarks/load_test.py가 만든 시드 DB 사용):
+    python benchmarks/concept_summaries.py --db /tmp/ai_tutor_bench_xxx.db
+    python benchmarks/concept_summaries.py --db /tmp/ai_tutor_bench_xxx.db --materials 6 --output concept_summaries.json
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_utils import use_backend_path, summarize, run_metadata, save_results
+
+# app.generate_concept_content의 자료 텍스트 예산과 같은 값
+CONCEPT_MATERIAL_MAX_CHARS = 12000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='개념 학습 계층 요약 벤치마크')
+    parser.add_argument('--db', required=True, help='시드 DB 경로 (사본에서 측정)')
+    parser.add_argument('--materials', type=int, default=4, help='자료 추가 전 주차의 PDF 자료 수')
+    parser.add_argument('--repeat', type=int, default=3, help='구성별 반복 측정 횟수')
+    parser.add_argument('--llm-latency-ms', type=float, default=500, help='Fake LLM 호출당 고정 지연')
+    parser.add_argument('--token-latency-ms', type=float, default=2, help='Fake LLM 출력 토큰당 지연')
+    parser.add_argument('--output', help='결과 JSON 저장 경로')
+    return parser.parse_args()
+
+
+class CallCounter:
+    """LLM 호출 수와 프롬프트 문자 수 집계 (provider.generate 감싸기)"""
+
+    def __init__(self, provider_class):
+        self.calls = 0
+        self.prompt_chars = 0
+        self._lock = threading.Lock()
+        original = provider_class.generate
+
+        def generate(provider, model_name, prompt, *args, **kwargs):
+            with self._lock:
+                self.calls += 1
+                self.prompt_chars += len(prompt)
+            return original(provider, model_name, prompt, *args, **kwargs)
+
+        provider_class.generate = generate
+
+    def reset(self):
+        self.calls = 0
+        self.prompt_chars = 0
+
+
+def copy_material(source_id, week_id):
+    """다른 주차 자료를 대상 주차의 새 자료로 복사 (추출 텍스트 포함)"""
+    from models import db, Material, MaterialText
+
+    # 요청 처리 중 세션이 반환되므로(db_lifecycle) 자료 객체 대신 ID를 받아 다시 조회
+    source = Material.query.get(source_id)
+    material = Material(week_id=week_id, file_name=f'copy_{source.id}_{source.file_name}', file_path=source.file_path,
+                        file_type='pdf', file_size=source.file_size, text_status=source.text_status,
+                        page_count=source.page_count)
+    db.session.add(material)
+    db.session.flush()
+    text = MaterialText.query.get(source.id)
+    if text is not None:
+        db.session.add(MaterialText(material_id=material.id, pages=text.pages, char_count=text.char_count,
+                                    clean_pages=text.clean_pages, clean_char_count=text.clean_char_count,
+                                    clean_version=text.clean_version))
+    db.session.commit()
+    return material
+
+
+def coverage(week_id, budget, per_material):
+    """주차 자료 텍스트 중 프롬프트(full) 또는 자료별 요약(hierarchical)에 들어간 문자 비율과 자료 텍스트 전체 문자 수"""
+    from models import Material
+    from material_text import get_material_text
+
+    lengths = [len(get_material_text(m) or '') for m in Material.query.filter_by(week_id=week_id, file_type='pdf')]
+    covered = sum(min(n, budget) for n in lengths) if per_material else min(sum(lengths), budget)
+    return covered / max(sum(lengths), 1), sum(lengths)
+
+
+def main():
+    args = parse_args()
+    source = os.path.abspath(args.db)
+    use_backend_path()
+    if not os.path.exists(source):
+        raise SystemExit(f'DB 파일을 찾을 수 없습니다: {source}')
+    workdir = tempfile.mkdtemp(prefix='ai_tutor_concept_summaries_')
+    db_path = os.path.join(workdir, 'bench.db')
+    shutil.copyfile(source, db_path)
+    os.environ.update({
+        'DATABASE_URL': f'sqlite:///{db_path}',
+        'LLM_PROVIDER': 'fake',
+        'FAKE_LLM_LATENCY_MS': str(args.llm_latency_ms),
+        'FAKE_LLM_TOKEN_LATENCY_MS': str(args.token_latency_ms),
+        'RATE_LIMIT_ENABLED': '0',
+    })
+    os.environ.setdefault('REQUEST_METRICS_LOG', '0')
+
+    from app import app
+    from llm_provider import FakeLLMProvider
+    from models import db, Material, MaterialText
+
+    counter = CallCounter(FakeLLMProvider)
+    client = app.test_client()
+    with app.app_context():
+        sources = [material_id for (material_id,) in db.session.query(Material.id).join(
+            MaterialText, MaterialText.material_id == Material.id).filter(
+            Material.file_type == 'pdf').order_by(Material.id).all()]
+        if len(sources) < args.materials + args.repeat * 2:
+            raise SystemExit(f'추출 텍스트가 있는 PDF 자료가 {args.materials + args.repeat * 2}개 이상 필요합니다')
+        sources = iter(sources)
+
+        def new_week(number):
+            from models import Week
+            base = Week.query.first()
+            week = Week(subject_id=base.subject_id, week_number=1000 + number, title=f'벤치마크 {number}')
+            db.session.add(week)
+            db.session.commit()
+            for _ in range(args.materials):
+                copy_material(next(sources), week.id)
+            return week.id
+
+        results = {}
+        for name, hierarchical in (('full', '0'), ('hierarchical', '1')):
+            os.environ['CONCEPT_HIERARCHICAL'] = hierarchical
+            timings, calls, prompt_chars, covered, source_chars = [], [], [], [], []
+            for i in range(args.repeat):
+                week_id = new_week(len(results) * args.repeat + i)
+                # 자료 추가 전 콘텐츠(계층 요약이면 자료별 요약 포함)를 미리 생성
+                response = client.post('/api/concept/generate', json={'week_id': week_id, 'mode': 'summary'})
+                if response.status_code != 200:
+                    raise SystemExit(f'{name} 개념 학습 생성 실패: {response.status_code} {response.get_json()}')
+                copy_material(next(sources), week_id)
+                counter.reset()
+                start = time.perf_counter()
+                response = client.post('/api/concept/generate', json={'week_id': week_id, 'mode': 'summary'})
+                elapsed = time.perf_counter() - start
+                if response.status_code != 200:
+                    raise SystemExit(f'{name} 개념 학습 재생성 실패: {response.status_code} {response.get_json()}')
+                timings.append(elapsed)
+                calls.append(counter.calls)
+                prompt_chars.append(counter.prompt_chars)
+                ratio, total = coverage(week_id, CONCEPT_MATERIAL_MAX_CHARS, hierarchical == '1')
+                covered.append(ratio)
+                source_chars.append(total)
+            results[name] = dict(summarize(timings), llm_calls=max(calls), prompt_chars=max(prompt_chars),
+                                 coverage=round(min(covered), 3), source_chars=max(source_chars))
+
+    print(f"자료 {args.materials}개 주차에 자료 1개 추가 후 재생성, 반복 {args.repeat}회")
+    print(f"{'mode':<14}{'p50 ms':>10}{'LLM calls':>11}{'prompt chars':>14}{'coverage':>10}")
+    for name, stats in results.items():
+        print(f"{name:<14}{stats['p50_ms']:>10.1f}{stats['llm_calls']:>11}{stats['prompt_chars']:>14}"
+              f"{stats['coverage']:>10.0%}")
+    ratio = results['hierarchical']['prompt_chars'] / max(results['full']['prompt_chars'], 1)
+    print(f"hierarchical/full 프롬프트 입력 비율: {ratio:.2f} "
+          f"(자료 전체를 한 번에 넣으면 {results['hierarchical']['source_chars']}자)")
+
+    if args.output:
+        save_results(args.output, {
+            'meta': run_metadata({
+                'db': source, 'materials': args.materials, 'repeat': args.repeat,
+                'llm_latency_ms': args.llm_latency_ms, 'token_latency_ms': args.token_latency_ms,
+            }),
+            'modes': results,
+            'prompt_chars_ratio': round(ratio, 2),
+        })
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
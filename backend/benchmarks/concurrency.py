@@ -0,0 +1,283 @@
+"""
+서버 동시성 벤치마크
+
+시드 DB 사본으로 실제 HTTP 서버를 띄우고, 여러 클라이언트 스레드가 LLM 호출 요청(개념 학습 재생성, 퀴즈 생성)과
+빠른 조회 요청(get_subjects)을 섞어 보내 서버 구성별 처리량과 지연 시간을 비교합니다.
+    - sync: 워커 1개, 요청을 한 번에 하나씩 처리 (gunicorn sync 워커, 기존 실행 방식)
+    - gthread: gunicorn.conf.py 설정 (스레드 워커, --workers/--threads로 크기 지정)
+LLM은 Fake 프로바이더(--llm-latency-ms 지연)를 사용하고, 퀴즈 생성이 매번 LLM을 호출하도록 문제 은행과 요청 제한(rate_limits)은 끕니다.
+gunicorn이 설치되어 있지 않으면 werkzeug 개발 서버(단일 스레드 / 요청당 스레드)로 대신 측정합니다.
+측정이 끝나면 서버의 /metrics에서 LLM 호출 수와 DB 커넥션을 잡은 채 시작한 LLM 호출 수를 읽어 함께 기록합니다
+(/metrics는 워커 프로세스 단위이므로 gunicorn 워커가 여러 개면 응답한 워커 하나의 값입니다).
+원본 DB는 바꾸지 않습니다 (서버 구성마다 새 사본 사용).
+
+사용법 (backend 폴더에서, benchmarks/load_test.py가 만든 시드 DB 사용):
+    python benchmarks/concurrency.py --db /tmp/ai_tutor_bench_xxx.db
+    python benchmarks/concurrency.py --db /tmp/ai_tutor_bench_xxx.db --llm-latency-ms 2000 --clients 32 --output concurrency.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import socket
+import sqlite3
+import argparse
+import tempfile
+import threading
+import subprocess
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_utils import BACKEND_DIR, use_backend_path, summarize, run_metadata, save_results
+
+# 엔드포인트별 트래픽 비율 (LLM 호출 요청과 빠른 조회 요청을 섞어 조회 요청이 LLM 대기에 막히는지 확인)
+TRAFFIC_MIX = {
+    'get_subjects': 50,
+    'concept_generate': 30,
+    'quiz_generate': 20,
+}
+
+SERVERS = ('sync', 'gthread')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='서버 동시성 벤치마크')
+    parser.add_argument('--db', required=True, help='시드 DB 경로 (benchmarks/load_test.py로 생성, 사본에서 측정)')
+    parser.add_argument('--requests', type=int, default=200, help='서버 구성별 총 요청 수')
+    parser.add_argument('--clients', type=int, default=32, help='동시 요청 클라이언트 스레드 수')
+    parser.add_argument('--llm-latency-ms', type=float, default=1000, help='Fake LLM 응답 지연 시간')
+    parser.add_argument('--workers', type=int, default=2, help='gthread 구성의 워커 프로세스 수')
+    parser.add_argument('--threads', type=int, default=32, help='gthread 구성의 워커당 스레드 수')
+    parser.add_argument('--servers', default=','.join(SERVERS), help='측정할 서버 구성 (쉼표 구분)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='결과 JSON 저장 경로')
+    # 내부용: gunicorn이 없을 때 werkzeug 서버 프로세스로 실행
+    parser.add_argument('--serve-werkzeug', type=int, metavar='PORT', help=argparse.SUPPRESS)
+    parser.add_argument('--threaded', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.output:
+        args.output = os.path.abspath(args.output)
+    return args
+
+
+def serve_werkzeug(port, threaded):
+    """werkzeug 서버로 wsgi:app 실행 (gunicorn 대체용)"""
+    use_backend_path()
+    from werkzeug.serving import make_server
+    from wsgi import app
+
+    make_server('127.0.0.1', port, app, threaded=threaded).serve_forever()
+
+
+def has_gunicorn():
+    try:
+        import gunicorn  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def server_command(name, port, args, use_gunicorn):
+    """서버 구성별 (실행 명령, 추가 환경 변수)"""
+    if not use_gunicorn:
+        command = [sys.executable, os.path.abspath(__file__), '--db', args.db, '--serve-werkzeug', str(port)]
+        return command + (['--threaded'] if name == 'gthread' else []), {}
+    command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}', 'wsgi:app']
+    if name == 'sync':
+        return command, {'GUNICORN_WORKER_CLASS': 'sync', 'GUNICORN_WORKERS': '1', 'GUNICORN_THREADS': '1'}
+    return command, {'GUNICORN_WORKER_CLASS': 'gthread', 'GUNICORN_WORKERS': str(args.workers),
+                     'GUNICORN_THREADS': str(args.threads)}
+
+
+def start_server(name, port, db_path, args, use_gunicorn):
+    command, extra_env = server_command(name, port, args, use_gunicorn)
+    env = dict(os.environ)
+    env.update(extra_env)
+    env.update({
+        'DATABASE_URL': f'sqlite:///{db_path}',
+        'LLM_PROVIDER': 'fake',
+        'FAKE_LLM_LATENCY_MS': str(args.llm_latency_ms),
+        'FAKE_LLM_SEED': str(args.seed),
+        'QUESTION_BANK_ENABLED': '0',
+        'RATE_LIMIT_ENABLED': '0',
+        'REQUEST_METRICS_LOG': '0',
+        'LOG_LEVEL': 'WARNING',
+    })
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f'{name} 서버가 시작되지 못했습니다 (종료 코드 {process.returncode})')
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=1):
+                return process
+        except (urllib.error.URLError, ConnectionError, socket.timeout):
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit(f'{name} 서버가 120초 안에 응답하지 않았습니다')
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def load_targets(db_path):
+    """요청에 사용할 (과목 ID, 사용자 ID)와 과목별 자료가 있는 주차 목록"""
+    connection = sqlite3.connect(db_path)
+    subjects = connection.execute('SELECT id, user_id FROM subjects').fetchall()
+    weeks = connection.execute(
+        'SELECT DISTINCT weeks.id, weeks.subject_id, weeks.week_number FROM weeks '
+        'JOIN materials ON materials.week_id = weeks.id').fetchall()
+    connection.close()
+    weeks_by_subject = {}
+    for week_id, subject_id, week_number in weeks:
+        weeks_by_subject.setdefault(subject_id, []).append((week_id, week_number))
+    return [s for s in subjects if s[0] in weeks_by_subject], weeks_by_subject
+
+
+def build_request(rng, targets, endpoint):
+    subjects, weeks_by_subject = targets
+    subject_id, user_id = rng.choice(subjects)
+    weeks = weeks_by_subject[subject_id]
+    if endpoint == 'get_subjects':
+        return 'GET', f'/subjects?user_id={user_id}', None
+    if endpoint == 'concept_generate':
+        week_id, _ = rng.choice(weeks)
+        return 'POST', '/api/concept/generate', {'week_id': week_id, 'mode': 'summary', 'force_regenerate': True}
+    if endpoint == 'quiz_generate':
+        selected = sorted({n for _, n in rng.sample(weeks, k=min(2, len(weeks)))})
+        return 'POST', '/api/quiz/generate', {
+            'subject_id': subject_id, 'user_id': user_id, 'week_numbers': selected,
+            'difficulty': 'medium', 'question_types': ['multiple_choice', 'short_answer'], 'num_questions': 5,
+        }
+    raise ValueError(endpoint)
+
+
+def send(base_url, method, path, payload):
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    request = urllib.request.Request(base_url + path, data=data, method=method,
+                                     headers={'Content-Type': 'application/json'} if data else {})
+    try:
+        with urllib.request.urlopen(request, timeout=300) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def scrape_counter(base_url, metric):
+    """서버 /metrics에서 metric의 엔드포인트별 값을 합산 (서버에 METRICS_TOKEN을 설정했으면 같은 토큰으로 요청)"""
+    request = urllib.request.Request(base_url + '/metrics')
+    if os.getenv('METRICS_TOKEN'):
+        request.add_header('Authorization', f"Bearer {os.environ['METRICS_TOKEN']}")
+    with urllib.request.urlopen(request, timeout=30) as response:
+        text = response.read().decode('utf-8')
+    return int(sum(float(line.rsplit(' ', 1)[1]) for line in text.splitlines()
+                   if line.startswith(metric + '{')))
+
+
+def replay(base_url, targets, args):
+    endpoints = list(TRAFFIC_MIX.keys())
+    plan_rng = random.Random(args.seed)
+    plan = [plan_rng.choices(endpoints, list(TRAFFIC_MIX.values()))[0] for _ in range(args.requests)]
+    samples = {name: {'latency': [], 'errors': 0} for name in endpoints}
+    lock = threading.Lock()
+
+    def worker(index):
+        rng = random.Random(args.seed * 1000 + index)
+        for i in range(index, len(plan), args.clients):
+            method, path, payload = build_request(rng, targets, plan[i])
+            start = time.perf_counter()
+            status = send(base_url, method, path, payload)
+            elapsed = time.perf_counter() - start
+            with lock:
+                samples[plan[i]]['latency'].append(elapsed)
+                if status >= 400:
+                    samples[plan[i]]['errors'] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as executor:
+        list(executor.map(worker, range(args.clients)))
+    wall_time = time.perf_counter() - start
+
+    endpoints_result = {}
+    for name, data in samples.items():
+        if data['latency']:
+            endpoints_result[name] = dict(summarize(data['latency']), errors=data['errors'])
+    return {'wall_time_s': round(wall_time, 3), 'throughput_rps': round(args.requests / wall_time, 3),
+            'endpoints': endpoints_result,
+            'llm_calls': scrape_counter(base_url, 'llm_calls_total'),
+            'llm_calls_holding_db': scrape_counter(base_url, 'llm_calls_holding_db_connection_total')}
+
+
+def main():
+    args = parse_args()
+    if args.serve_werkzeug:
+        serve_werkzeug(args.serve_werkzeug, args.threaded)
+        return
+
+    args.db = os.path.abspath(args.db)
+    if not os.path.exists(args.db):
+        raise SystemExit(f'DB 파일을 찾을 수 없습니다: {args.db}')
+    use_backend_path()
+    use_gunicorn = has_gunicorn()
+    if not use_gunicorn:
+        print('gunicorn이 설치되어 있지 않아 werkzeug 서버(sync: 단일 스레드, gthread: 요청당 스레드)로 측정합니다.')
+    targets = load_targets(args.db)
+    workdir = tempfile.mkdtemp(prefix='ai_tutor_concurrency_')
+
+    results = {}
+    try:
+        for name in args.servers.split(','):
+            db_path = os.path.join(workdir, f'{name}.db')
+            shutil.copyfile(args.db, db_path)
+            port = free_port()
+            process = start_server(name, port, db_path, args, use_gunicorn)
+            try:
+                print(f'{name}: {args.requests}개 요청, 클라이언트 {args.clients}개 ...')
+                results[name] = replay(f'http://127.0.0.1:{port}', targets, args)
+            finally:
+                stop_server(process)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\n{'server':<10}{'endpoint':<18}{'count':>7}{'err':>6}{'p50(ms)':>10}{'p95(ms)':>10}{'rps':>9}")
+    for name, result in results.items():
+        for endpoint, stats in result['endpoints'].items():
+            print(f"{name:<10}{endpoint:<18}{stats['count']:>7}{stats['errors']:>6}"
+                  f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{result['throughput_rps']:>9.2f}")
+    for name, result in results.items():
+        print(f"{name}: LLM 호출 {result['llm_calls']}회 중 DB 커넥션을 잡은 채 시작한 호출 {result['llm_calls_holding_db']}회")
+    if 'sync' in results and 'gthread' in results:
+        gain = results['gthread']['throughput_rps'] / results['sync']['throughput_rps']
+        print(f"\n처리량: sync {results['sync']['throughput_rps']:.2f} req/s → gthread "
+              f"{results['gthread']['throughput_rps']:.2f} req/s ({gain:.1f}x)")
+
+    if args.output:
+        save_results(args.output, {
+            'meta': run_metadata({
+                'db': args.db, 'requests': args.requests, 'clients': args.clients,
+                'llm_latency_ms': args.llm_latency_ms, 'workers': args.workers, 'threads': args.threads,
+                'server': 'gunicorn' if use_gunicorn else 'werkzeug', 'traffic_mix': TRAFFIC_MIX,
+            }),
+            'servers': results,
+        })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+API 응답 JSON 직렬화 벤치마크
+
+DB 사본에서 목록 엔드포인트와 같은 응답 객체(get_subjects, get_quiz_history, get_quiz)를 만들어
+직렬화 시간만 비교합니다 (조회 시간 제외, 모델 인스턴스는 미리 로드).
+    - legacy: getattr + isoformat()으로 만든 딕셔너리를 표준 json 프로바이더(Flask 기본값)로 직렬화 (기존 방식)
+    - current: 모델별 직렬화 함수(to_dict) + 앱에 설정된 JSON 프로바이더 (orjson)
+원본 DB는 바꾸지 않습니다.
+
+사용법 (backend 폴더에서):
+    python benchmarks/json_serialization.py --db /tmp/ai_tutor_bench_xxx.db
+    python benchmarks/json_serialization.py --db instance/app.db --repeat 200 --output json_bench.json
+"""
+
+import os
+import sys
+import time
+import json
+import shutil
+import argparse
+import tempfile
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_utils import use_backend_path, summarize, run_metadata, save_results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='API 응답 JSON 직렬화 벤치마크')
+    parser.add_argument('--db', default='instance/app.db', help='측정할 SQLite DB 경로 (사본에서 측정)')
+    parser.add_argument('--repeat', type=int, default=100, help='응답별 반복 측정 횟수')
+    parser.add_argument('--output', help='결과 JSON 저장 경로')
+    return parser.parse_args()
+
+
+def legacy_dict(obj, json_fields=()):
+    """기존 to_dict 방식 (속성 디스크립터로 읽고 datetime은 isoformat 문자열로 변환)"""
+    result = {}
+    for column in obj.__table__.columns:
+        value = getattr(obj, column.key)
+        if column.key in json_fields:
+            value = json.loads(value) if value else None
+        elif isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        result[column.key] = value
+    return result
+
+
+def build_payloads(db, models):
+    """엔드포인트별 (legacy 응답 생성 함수, current 응답 생성 함수)"""
+    Subject, Quiz, Question, UserResponse, QuizReport = models
+    user_id = db.session.query(Subject.user_id).order_by(Subject.id).limit(1).scalar()
+    subjects = Subject.query.filter_by(user_id=user_id).all()
+    subject_id = subjects[0].id
+    quizzes = Quiz.query.filter_by(subject_id=subject_id, user_id=user_id).order_by(Quiz.created_at.desc()).all()
+    reports = {report.quiz_id: report for report in QuizReport.query.filter(QuizReport.quiz_id.in_([q.id for q in quizzes])).all()}
+    quiz = quizzes[0]
+    questions = Question.query.filter_by(quiz_id=quiz.id).order_by(Question.order).all()
+    responses = UserResponse.query.filter_by(quiz_id=quiz.id).all()
+    report = reports.get(quiz.id)
+
+    def history(to_dict):
+        items = []
+        for item in quizzes:
+            entry = to_dict(item)
+            entry['report'] = to_dict(reports[item.id]) if item.id in reports else None
+            items.append(entry)
+        return {'quizzes': items}
+
+    subject_json = ('study_plan', 'syllabus_analysis')
+    quiz_json = ('week_numbers', 'question_types', 'options')
+    return {
+        'get_subjects': (
+            lambda: {'subjects': [legacy_dict(s, subject_json) for s in subjects]},
+            lambda: {'subjects': [s.to_dict() for s in subjects]},
+        ),
+        'get_quiz_history': (
+            lambda: history(lambda o: legacy_dict(o, quiz_json)),
+            lambda: history(lambda o: o.to_dict()),
+        ),
+        'get_quiz': (
+            lambda: {'quiz': legacy_dict(quiz, quiz_json), 'questions': [legacy_dict(q, quiz_json) for q in questions],
+                     'user_responses': {r.question_id: legacy_dict(r) for r in responses},
+                     'report': legacy_dict(report) if report else None},
+            lambda: {'quiz': quiz.to_dict(), 'questions': [q.to_dict() for q in questions],
+                     'user_responses': {r.question_id: r.to_dict() for r in responses},
+                     'report': report.to_dict() if report else None},
+        ),
+    }
+
+
+def measure(app, provider, make_payload, repeat):
+    timings, size = [], 0
+    with app.test_request_context():
+        for _ in range(repeat):
+            start = time.perf_counter()
+            body = provider.response(make_payload()).get_data()
+            timings.append(time.perf_counter() - start)
+            size = len(body)
+    return summarize(timings), size
+
+
+def main():
+    args = parse_args()
+    source = os.path.abspath(args.db)
+    use_backend_path()
+    if not os.path.exists(source):
+        raise SystemExit(f'DB 파일을 찾을 수 없습니다: {source}')
+    workdir = tempfile.mkdtemp(prefix='ai_tutor_json_')
+    db_path = os.path.join(workdir, 'bench.db')
+    shutil.copyfile(source, db_path)
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ['LLM_PROVIDER'] = 'fake'
+    os.environ.setdefault('REQUEST_METRICS_LOG', '0')
+
+    from flask.json.provider import DefaultJSONProvider
+    from app import app
+    from models import db, Subject, Quiz, Question, UserResponse, QuizReport
+
+    legacy_provider = DefaultJSONProvider(app)
+    results = {}
+    with app.app_context():
+        payloads = build_payloads(db, (Subject, Quiz, Question, UserResponse, QuizReport))
+        print(f"{'endpoint':<20}{'legacy p50 ms':>15}{'current p50 ms':>16}{'speedup':>9}{'legacy KB':>11}{'current KB':>12}")
+        for name, (legacy, current) in payloads.items():
+            legacy_stats, legacy_size = measure(app, legacy_provider, legacy, args.repeat)
+            current_stats, current_size = measure(app, app.json, current, args.repeat)
+            speedup = legacy_stats['p50_ms'] / current_stats['p50_ms'] if current_stats['p50_ms'] else None
+            results[name] = {'legacy': legacy_stats, 'current': current_stats, 'legacy_bytes': legacy_size,
+                             'current_bytes': current_size, 'speedup_p50': round(speedup, 2) if speedup else None}
+            print(f"{name:<20}{legacy_stats['p50_ms']:>15.3f}{current_stats['p50_ms']:>16.3f}{speedup or 0:>8.1f}x"
+                  f"{legacy_size / 1024:>11.1f}{current_size / 1024:>12.1f}")
+
+    if args.output:
+        save_results(args.output, {
+            'meta': run_metadata({'db': source, 'repeat': args.repeat, 'provider': type(app.json).__name__}),
+            'endpoints': results,
+        })
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,403 @@
+"""
+Flask API 부하 테스트 / 벤치마크 스크립트
+
+현실적인 규모의 데이터(수천 명의 사용자, 16주차 과목, uploads/materials의 PDF, 사용자당 수백 개의 퀴즈)를
+별도 SQLite DB에 시드한 뒤, Fake LLM 프로바이더를 사용하여 엔드포인트 트래픽 믹스를 재생합니다.
+엔드포인트별 p50/p95/p99 지연 시간, 처리량, 요청당 SQL 쿼리 수를 JSON으로 저장하여 커밋 간 비교할 수 있습니다.
+
+사용법 (backend 폴더에서):
+    python benchmarks/load_test.py --profile small
+    python benchmarks/load_test.py --profile full --requests 5000 --output after.json --compare before.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_utils import use_backend_path, summarize, run_metadata, save_results, load_results, print_comparison
+
+PROFILES = {
+    # 빠른 확인용
+    'small': {'users': 200, 'subjects_per_user': 2, 'quizzes_per_subject': 20, 'questions_per_quiz': 5, 'material_weeks': 4},
+    # 현실적인 규모 (사용자 2000명, 사용자당 퀴즈 200개)
+    'full': {'users': 2000, 'subjects_per_user': 2, 'quizzes_per_subject': 100, 'questions_per_quiz': 5, 'material_weeks': 6},
+}
+
+# 엔드포인트별 트래픽 비율
+TRAFFIC_MIX = {
+    'get_subjects': 30,
+    'get_subject': 25,
+    'concept_generate': 20,
+    'quiz_history': 15,
+    'quiz_generate': 5,
+    'quiz_submit': 5,
+}
+
+WEEKS_PER_SUBJECT = 16
+INSERT_CHUNK = 5000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='AI Tutor Flask API 부하 테스트')
+    parser.add_argument('--profile', choices=PROFILES.keys(), default='small')
+    parser.add_argument('--users', type=int)
+    parser.add_argument('--subjects-per-user', type=int)
+    parser.add_argument('--quizzes-per-subject', type=int)
+    parser.add_argument('--questions-per-quiz', type=int)
+    parser.add_argument('--material-weeks', type=int, help='자료(PDF)와 개념 학습 캐시를 가진 주차 수')
+    parser.add_argument('--requests', type=int, default=1000, help='재생할 총 요청 수')
+    parser.add_argument('--concurrency', type=int, default=1, help='동시 요청 스레드 수')
+    parser.add_argument('--llm-latency-ms', type=float, default=0, help='Fake LLM 응답 지연 시간')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db', help='시드 DB 경로 (기본값: 임시 폴더에 파라미터별로 캐시)')
+    parser.add_argument('--reseed', action='store_true', help='캐시된 시드 DB를 무시하고 다시 생성')
+    parser.add_argument('--output', default='load_test_results.json')
+    parser.add_argument('--compare', help='비교할 이전 결과 JSON 파일')
+    args = parser.parse_args()
+
+    scale = dict(PROFILES[args.profile])
+    for key in scale:
+        value = getattr(args, key)
+        if value is not None:
+            scale[key] = value
+    args.scale = scale
+    # use_backend_path()가 작업 디렉터리를 바꾸기 전에 절대 경로로 변환
+    args.output = os.path.abspath(args.output)
+    args.compare = os.path.abspath(args.compare) if args.compare else None
+    return args
+
+
+def prepare_environment(args):
+    """app import 전에 DB 경로와 Fake LLM 설정"""
+    if args.db:
+        db_path = os.path.abspath(args.db)
+    else:
+        digest = hashlib.sha1(json.dumps(args.scale, sort_keys=True).encode()).hexdigest()[:10]
+        db_path = os.path.join(tempfile.gettempdir(), f'ai_tutor_bench_{digest}.db')
+
+    if args.reseed and os.path.exists(db_path):
+        os.remove(db_path)
+    needs_seed = not os.path.exists(db_path)
+
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ['LLM_PROVIDER'] = 'fake'
+    os.environ['FAKE_LLM_LATENCY_MS'] = str(args.llm_latency_ms)
+    os.environ['FAKE_LLM_SEED'] = str(args.seed)
+    os.environ['RATE_LIMIT_ENABLED'] = '0'  # 같은 사용자로 LLM 요청을 반복하므로 요청 제한은 끔
+    os.environ['DB_MIGRATE_ON_START'] = '1'  # 새 시드 DB의 테이블 생성 (캐시된 DB는 이전 스키마에서 마이그레이션)
+    os.environ.setdefault('REQUEST_METRICS_LOG', '0')  # 요청별 계측 로그는 결과 출력을 가리므로 끔
+    return db_path, needs_seed
+
+
+def chunked_insert(db, table, rows):
+    for i in range(0, len(rows), INSERT_CHUNK):
+        db.session.execute(table.insert(), rows[i:i + INSERT_CHUNK])
+
+
+def seed_database(app, scale, seed):
+    """대량 데이터 시드 (Core insert로 ID를 직접 지정하여 빠르게 삽입)"""
+    from werkzeug.security import generate_password_hash
+    from models import (db, User, Subject, Week, Material, MaterialText, ConceptContent, Quiz, Question,
+                        QuestionBankEntry, UserResponse, QuizReport)
+    from rag_utils import extract_text_from_pdf, extract_pages_from_pdf
+    from llm_provider import FakeLLMProvider
+    from text_cleaning import clean_pages, CLEANING_VERSION
+
+    rng = random.Random(seed)
+    fake = FakeLLMProvider()
+    now = datetime.utcnow()
+
+    syllabus_dir = os.path.join('uploads', 'syllabus')
+    material_dir = os.path.join('uploads', 'materials')
+    syllabus_files = sorted(f for f in os.listdir(syllabus_dir) if f.endswith('.pdf'))
+    material_files = sorted(f for f in os.listdir(material_dir) if f.endswith('.pdf'))
+    if not syllabus_files or not material_files:
+        raise SystemExit('uploads/syllabus와 uploads/materials에 PDF가 필요합니다.')
+
+    syllabus_text = extract_text_from_pdf(os.path.join(syllabus_dir, syllabus_files[0]))
+    analysis = fake.generate('fake', syllabus_text, purpose='syllabus_analysis').text
+    weekly_schedule = json.loads(analysis)['weekly_schedule']
+    concept_markdown = fake.generate('fake', 'seed', purpose='concept').text
+    report_markdown = fake.generate('fake', '성적: 3/5', purpose='quiz_report').text
+    password_hash = generate_password_hash('Bench1234!')
+    material_sizes = {f: os.path.getsize(os.path.join(material_dir, f)) for f in material_files}
+    # 업로드 시 추출되어 저장된 상태를 재현 (파일별로 한 번만 추출)
+    material_pages = {f: extract_pages_from_pdf(os.path.join(material_dir, f)) for f in material_files}
+    material_pages_json = {f: json.dumps(pages, ensure_ascii=False) for f, pages in material_pages.items()}
+    material_clean = {f: clean_pages(pages) for f, pages in material_pages.items()}
+    material_clean_json = {f: json.dumps(cleaned, ensure_ascii=False) for f, (cleaned, _) in material_clean.items()}
+
+    start = time.time()
+    with app.app_context():
+        subject_id = week_id = material_id = content_id = quiz_id = question_id = response_id = report_id = 0
+        batch_users = max(1, 20000 // max(1, scale['subjects_per_user'] * scale['quizzes_per_subject']))
+
+        for batch_start in range(0, scale['users'], batch_users):
+            rows = {t: [] for t in ('users', 'subjects', 'weeks', 'materials', 'material_texts', 'contents', 'quizzes', 'questions', 'bank', 'responses', 'reports')}
+            for user_id in range(batch_start + 1, min(batch_start + batch_users, scale['users']) + 1):
+                rows['users'].append({
+                    'id': user_id, 'username': f'bench{user_id}', 'login_id': f'bench{user_id}', 'password': password_hash,
+                    'school': '벤치대학교', 'major': '컴퓨터공학과', 'grade': rng.randint(1, 4),
+                    'exam_style': rng.choice(['미리미리', '벼락치기']), 'learning_depth': '원리파악',
+                    'material_preference': '텍스트', 'practice_style': '문제중심', 'ai_persona': '격려형',
+                    'onboarding_completed': True,
+                })
+                for s in range(scale['subjects_per_user']):
+                    subject_id += 1
+                    rows['subjects'].append({
+                        'id': subject_id, 'user_id': user_id, 'name': f'머신러닝 {s + 1}', 'subject_type': '전공',
+                        'syllabus_context': '', 'syllabus_file_path': os.path.join(syllabus_dir, syllabus_files[0]),
+                        'syllabus_text': syllabus_text, 'syllabus_analysis': analysis, 'color': '#A8D5E2', 'order': s + 1,
+                        'is_notification_on': True,
+                    })
+                    week_ids = {}
+                    for week in weekly_schedule[:WEEKS_PER_SUBJECT]:
+                        week_id += 1
+                        week_ids[week['week_no']] = week_id
+                        rows['weeks'].append({
+                            'id': week_id, 'subject_id': subject_id, 'week_number': week['week_no'],
+                            'title': week['topic'], 'description': week['description'],
+                        })
+                    for week_no in range(1, scale['material_weeks'] + 1):
+                        file_name = material_files[(week_no - 1) % len(material_files)]
+                        material_id += 1
+                        rows['materials'].append({
+                            'id': material_id, 'week_id': week_ids[week_no], 'file_name': file_name,
+                            'file_path': f'uploads/materials/{file_name}', 'file_type': 'pdf', 'file_size': material_sizes[file_name],
+                            'text_status': 'ready', 'page_count': len(material_pages[file_name]),
+                        })
+                        rows['material_texts'].append({
+                            'material_id': material_id, 'pages': material_pages_json[file_name],
+                            'char_count': sum(len(page) for page in material_pages[file_name]),
+                            'clean_pages': material_clean_json[file_name],
+                            'clean_char_count': material_clean[file_name][1]['clean_chars'],
+                            'clean_version': CLEANING_VERSION,
+                        })
+                        content_id += 1
+                        rows['contents'].append({'id': content_id, 'week_id': week_ids[week_no], 'mode': 'summary', 'content': concept_markdown})
+                    for q in range(scale['quizzes_per_subject']):
+                        quiz_id += 1
+                        weeks = sorted(rng.sample(range(1, scale['material_weeks'] + 1), k=min(2, scale['material_weeks'])))
+                        created = now - timedelta(minutes=scale['quizzes_per_subject'] - q)
+                        difficulty = rng.choice(['easy', 'medium', 'hard'])
+                        rows['quizzes'].append({
+                            'id': quiz_id, 'subject_id': subject_id, 'user_id': user_id, 'week_numbers': json.dumps(weeks),
+                            'difficulty': difficulty, 'question_types': json.dumps(['multiple_choice']),
+                            'language': 'korean', 'num_questions': scale['questions_per_quiz'], 'past_exam_context': '',
+                            'quiz_number': q + 1, 'created_at': created,
+                        })
+                        score = 0
+                        for order in range(1, scale['questions_per_quiz'] + 1):
+                            question_id += 1
+                            options = [f'개념 {order} 보기 {j}' for j in range(1, 5)]
+                            is_correct = rng.random() < 0.7
+                            score += is_correct
+                            key_concept = f'개념 {rng.randint(1, 12)}'
+                            rows['questions'].append({
+                                'id': question_id, 'quiz_id': quiz_id, 'question_type': 'multiple_choice',
+                                'question_text': f'[{quiz_id}-{order}] 개념 {order}에 대한 설명으로 옳은 것은?',
+                                'options': json.dumps(options, ensure_ascii=False), 'correct_answer': options[0],
+                                'explanation': f'개념 {order}의 정의에 따라 보기 1이 정답입니다.',
+                                'key_concept': key_concept, 'order': order,
+                            })
+                            for week_no in weeks:
+                                rows['bank'].append({
+                                    'question_id': question_id, 'subject_id': subject_id, 'week_number': week_no,
+                                    'difficulty': difficulty, 'question_type': 'multiple_choice', 'language': 'korean',
+                                    'key_concept': key_concept,
+                                })
+                            response_id += 1
+                            rows['responses'].append({
+                                'id': response_id, 'quiz_id': quiz_id, 'question_id': question_id,
+                                'user_answer': options[0] if is_correct else options[1], 'is_correct': is_correct,
+                            })
+                        report_id += 1
+                        rows['reports'].append({
+                            'id': report_id, 'quiz_id': quiz_id, 'score': score, 'total': scale['questions_per_quiz'],
+                            'ai_report': report_markdown, 'created_at': created,
+                        })
+
+            for table, key in ((User.__table__, 'users'), (Subject.__table__, 'subjects'), (Week.__table__, 'weeks'),
+                               (Material.__table__, 'materials'), (MaterialText.__table__, 'material_texts'),
+                               (ConceptContent.__table__, 'contents'),
+                               (Quiz.__table__, 'quizzes'), (Question.__table__, 'questions'), (QuestionBankEntry.__table__, 'bank'),
+                               (UserResponse.__table__, 'responses'), (QuizReport.__table__, 'reports')):
+                chunked_insert(db, table, rows[key])
+            db.session.commit()
+            print(f"  시드 진행: 사용자 {min(batch_start + batch_users, scale['users'])}/{scale['users']}")
+
+    with app.app_context():
+        # 퀴즈 제출 시 누적되는 핵심 개념 숙련도를 시드한 답안으로 한 번에 생성
+        from mastery import backfill_concept_mastery
+        backfill_concept_mastery()
+
+    print(f"시드 완료: 과목 {subject_id}개, 주차 {week_id}개, 퀴즈 {quiz_id}개, 문제 {question_id}개 ({time.time() - start:.1f}초)")
+
+
+def load_targets(app):
+    """트래픽 재생에 사용할 ID 목록 로드"""
+    from models import db, Subject, Week, Material, Quiz
+
+    with app.app_context():
+        subjects = db.session.query(Subject.id, Subject.user_id).all()
+        material_weeks = db.session.query(Week.id, Week.subject_id, Week.week_number).join(
+            Material, Material.week_id == Week.id).distinct().all()
+        quizzes = db.session.query(Quiz.id, Quiz.subject_id).all()
+
+    targets = {'subjects': subjects, 'weeks_by_subject': {}, 'quizzes_by_subject': {}}
+    for week_id, subject_id, week_number in material_weeks:
+        targets['weeks_by_subject'].setdefault(subject_id, []).append((week_id, week_number))
+    for quiz_id, subject_id in quizzes:
+        targets['quizzes_by_subject'].setdefault(subject_id, []).append(quiz_id)
+    return targets
+
+
+class QueryCounter:
+    """SQLAlchemy 엔진 이벤트로 스레드별 SQL 실행 횟수 집계"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self._local = threading.local()
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self._local.count = getattr(self._local, 'count', 0) + 1
+
+    def reset(self):
+        self._local.count = 0
+
+    @property
+    def count(self):
+        return getattr(self._local, 'count', 0)
+
+
+def build_request(app, rng, targets, endpoint):
+    """엔드포인트 이름으로 (method, url, json) 요청 구성 (측정 구간 밖에서 실행)"""
+    from models import Question
+
+    subject_id, user_id = rng.choice(targets['subjects'])
+    weeks = targets['weeks_by_subject'].get(subject_id, [])
+
+    if endpoint == 'get_subjects':
+        return 'GET', f'/subjects?user_id={user_id}', None
+    if endpoint == 'get_subject':
+        return 'GET', f'/subjects/{subject_id}', None
+    if endpoint == 'quiz_history':
+        return 'GET', f'/api/subjects/{subject_id}/quizzes?user_id={user_id}', None
+    if endpoint == 'concept_generate':
+        week_id, _ = rng.choice(weeks)
+        return 'POST', '/api/concept/generate', {'week_id': week_id, 'mode': 'summary'}
+    if endpoint == 'quiz_generate':
+        selected = sorted({n for _, n in rng.sample(weeks, k=min(2, len(weeks)))})
+        return 'POST', '/api/quiz/generate', {
+            'subject_id': subject_id, 'user_id': user_id, 'week_numbers': selected,
+            'difficulty': 'medium', 'question_types': ['multiple_choice', 'short_answer'], 'num_questions': 5,
+        }
+    if endpoint == 'quiz_submit':
+        quiz_id = rng.choice(targets['quizzes_by_subject'][subject_id])
+        with app.app_context():
+            questions = Question.query.with_entities(Question.id, Question.correct_answer).filter_by(quiz_id=quiz_id).all()
+        answers = [{'question_id': qid, 'answer': answer if rng.random() < 0.7 else '오답'} for qid, answer in questions]
+        return 'POST', f'/api/quiz/{quiz_id}/submit', {'user_id': user_id, 'answers': answers}
+    raise ValueError(endpoint)
+
+
+def replay_traffic(app, targets, args):
+    from models import db
+
+    with app.app_context():
+        counter = QueryCounter(db.engine)
+
+    endpoints = list(TRAFFIC_MIX.keys())
+    weights = list(TRAFFIC_MIX.values())
+    plan_rng = random.Random(args.seed)
+    plan = [plan_rng.choices(endpoints, weights)[0] for _ in range(args.requests)]
+
+    samples = {name: {'latency': [], 'queries': [], 'errors': 0} for name in endpoints}
+    lock = threading.Lock()
+
+    def worker(worker_index):
+        rng = random.Random(args.seed * 1000 + worker_index)
+        client = app.test_client()
+        for i in range(worker_index, len(plan), args.concurrency):
+            endpoint = plan[i]
+            method, url, payload = build_request(app, rng, targets, endpoint)
+            counter.reset()
+            start = time.perf_counter()
+            response = client.open(url, method=method, json=payload)
+            elapsed = time.perf_counter() - start
+            queries = counter.count
+            with lock:
+                samples[endpoint]['latency'].append(elapsed)
+                samples[endpoint]['queries'].append(queries)
+                if response.status_code >= 400:
+                    samples[endpoint]['errors'] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(worker, range(args.concurrency)))
+    wall_time = time.perf_counter() - start
+
+    results = {}
+    for name, data in samples.items():
+        if not data['latency']:
+            continue
+        stats = summarize(data['latency'])
+        stats['errors'] = data['errors']
+        stats['throughput_rps'] = round(len(data['latency']) / wall_time, 3)
+        stats['queries_mean'] = round(sum(data['queries']) / len(data['queries']), 2)
+        stats['queries_max'] = max(data['queries'])
+        results[name] = stats
+    return results, wall_time
+
+
+def print_report(results, wall_time, total_requests):
+    print(f"\n=== 결과 ({total_requests}개 요청, {wall_time:.2f}초, {total_requests / wall_time:.1f} req/s) ===")
+    print(f"{'endpoint':<18}{'count':>7}{'err':>6}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'rps':>9}{'queries':>9}")
+    for name, s in sorted(results.items()):
+        print(f"{name:<18}{s['count']:>7}{s['errors']:>6}{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}"
+              f"{s['throughput_rps']:>9.2f}{s['queries_mean']:>9.1f}")
+
+
+def main():
+    args = parse_args()
+    db_path, needs_seed = prepare_environment(args)
+    use_backend_path()
+
+    from app import app
+
+    if needs_seed:
+        print(f"시드 DB 생성 중: {db_path}")
+        seed_database(app, args.scale, args.seed)
+    else:
+        print(f"캐시된 시드 DB 사용: {db_path} (--reseed로 재생성)")
+
+    targets = load_targets(app)
+    results, wall_time = replay_traffic(app, targets, args)
+    print_report(results, wall_time, args.requests)
+
+    output = {
+        'meta': run_metadata({
+            'scale': args.scale, 'requests': args.requests, 'concurrency': args.concurrency,
+            'llm_latency_ms': args.llm_latency_ms, 'seed': args.seed, 'traffic_mix': TRAFFIC_MIX,
+        }),
+        'wall_time_s': round(wall_time, 3),
+        'endpoints': results,
+    }
+    save_results(args.output, output)
+
+    if args.compare:
+        print_comparison(load_results(args.compare), output, ['p50_ms', 'p95_ms', 'queries_mean'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+"""
+PDF 추출 백엔드 벤치마크
+
+backend/uploads 아래의 PDF(강의계획서, 수업자료)를 각 추출 백엔드(pdf_extractors.EXTRACTORS)로 추출하여
+처리 속도(페이지/초), 최대 메모리 사용량(tracemalloc), 추출 품질을 비교합니다.
+
+추출 품질은 기준 백엔드(기본값: 기존 구현인 pypdf2)의 결과와 비교합니다.
+    - content_similarity: 공백을 제외한 페이지별 문자 시퀀스 유사도(difflib) 평균 (내용 누락/오인식 확인)
+    - word_similarity: 페이지별 단어 시퀀스 유사도 평균 (단어 경계가 다르게 추출되면 낮아짐, 참고용)
+    - char_ratio: 기준 대비 추출 문자 수 비율
+    - empty_pages: 텍스트가 추출되지 않은 페이지 수
+    - garbled_ratio: 대체 문자(U+FFFD)/제어 문자 비율
+내용 유사도가 --min-similarity 이상이고 빈 페이지/깨진 문자가 기준보다 많지 않은 백엔드를 "허용"으로 보고,
+그중 가장 빠른 백엔드를 기본값 후보로 출력합니다.
+
+사용법 (backend 폴더에서):
+    python benchmarks/pdf_extractors.py
+    python benchmarks/pdf_extractors.py --repeat 10 --output pdf_bench.json
+    python benchmarks/pdf_extractors.py --pdf path/to/file.pdf --backends pypdf pypdf2
+"""
+
+import os
+import sys
+import glob
+import time
+import difflib
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_utils import use_backend_path, summarize, run_metadata, save_results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='PDF 추출 백엔드 벤치마크')
+    parser.add_argument('--pdf', action='append', help='측정할 PDF 경로 (여러 번 지정 가능, 기본값: uploads/**/*.pdf)')
+    parser.add_argument('--backends', nargs='+', help='비교할 백엔드 (기본값: 전체)')
+    parser.add_argument('--reference', default='pypdf2', help='품질 비교 기준 백엔드')
+    parser.add_argument('--repeat', type=int, default=5, help='파일별 반복 측정 횟수')
+    parser.add_argument('--min-similarity', type=float, default=0.98, help='허용 백엔드의 최소 내용 유사도')
+    parser.add_argument('--output', help='결과 JSON 저장 경로')
+    return parser.parse_args()
+
+
+def garbled_chars(text):
+    return sum(1 for ch in text if ch == '�' or (ord(ch) < 32 and ch not in '\n\r\t'))
+
+
+def page_similarity(pages, reference_pages, tokenize):
+    """페이지별 시퀀스 유사도 평균 (페이지 수가 다르면 부족한 페이지는 0점)"""
+    count = max(len(pages), len(reference_pages))
+    if count == 0:
+        return 1.0
+    total = 0.0
+    for page, reference in zip(pages, reference_pages):
+        tokens, reference_tokens = tokenize(page), tokenize(reference)
+        if not tokens and not reference_tokens:
+            total += 1.0
+        else:
+            total += difflib.SequenceMatcher(None, tokens, reference_tokens, autojunk=False).ratio()
+    return total / count
+
+
+def content_similarity(pages, reference_pages):
+    return page_similarity(pages, reference_pages, lambda text: ''.join(text.split()))
+
+
+def word_similarity(pages, reference_pages):
+    return page_similarity(pages, reference_pages, str.split)
+
+
+def measure(extractor, path, repeat):
+    """추출 시간(반복 측정)과 최대 메모리(별도 1회 측정) 반환"""
+    durations = []
+    pages = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pages = extractor.extract_pages(path)
+        durations.append(time.perf_counter() - start)
+
+    # tracemalloc은 실행 속도를 떨어뜨리므로 시간 측정과 분리
+    tracemalloc.start()
+    try:
+        extractor.extract_pages(path)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return pages, durations, peak
+
+
+def main():
+    args = parse_args()
+    use_backend_path()
+    from pdf_extractors import EXTRACTORS, DEFAULT_PDF_EXTRACTOR, get_pdf_extractor
+
+    paths = args.pdf or sorted(glob.glob(os.path.join('uploads', '**', '*.pdf'), recursive=True))
+    if not paths:
+        print("측정할 PDF가 없습니다 (--pdf로 지정하세요)")
+        return 1
+
+    names = args.backends or list(EXTRACTORS)
+    if args.reference not in names:
+        names.append(args.reference)
+
+    extractors = {}
+    for name in names:
+        try:
+            extractors[name] = get_pdf_extractor(name)
+        except ImportError as e:
+            print(f"[건너뜀] {name}: {e}")
+    if args.reference not in extractors:
+        print(f"기준 백엔드 {args.reference}를 사용할 수 없습니다")
+        return 1
+
+    # 첫 호출의 import/초기화 비용이 측정에 섞이지 않도록 예열
+    for extractor in extractors.values():
+        extractor.extract_pages(paths[0])
+
+    raw = {name: {} for name in extractors}
+    for path in paths:
+        for name, extractor in extractors.items():
+            raw[name][path] = measure(extractor, path, args.repeat)
+
+    backends = {}
+    for name in extractors:
+        total_pages = total_time = 0
+        peak_memory = 0
+        durations = []
+        similarities = []
+        word_similarities = []
+        chars = reference_chars = empty_pages = garbled = 0
+        files = {}
+        for path in paths:
+            pages, file_durations, peak = raw[name][path]
+            reference_pages = raw[args.reference][path][0]
+            page_time = sum(file_durations) / len(file_durations)
+            similarity = content_similarity(pages, reference_pages)
+            words = word_similarity(pages, reference_pages)
+            file_chars = sum(len(page) for page in pages)
+
+            total_pages += len(pages)
+            total_time += page_time
+            peak_memory = max(peak_memory, peak)
+            durations.extend(file_durations)
+            similarities.append(similarity)
+            word_similarities.append(words)
+            chars += file_chars
+            reference_chars += sum(len(page) for page in reference_pages)
+            empty_pages += sum(1 for page in pages if not page.strip())
+            garbled += sum(garbled_chars(page) for page in pages)
+            files[os.path.basename(path)] = {
+                'pages': len(pages),
+                'chars': file_chars,
+                'mean_ms': round(page_time * 1000, 3),
+                'peak_memory_kb': round(peak / 1024, 1),
+                'content_similarity': round(similarity, 4),
+                'word_similarity': round(words, 4),
+            }
+
+        backends[name] = {
+            'pages_per_sec': round(total_pages / total_time, 2) if total_time else 0.0,
+            'peak_memory_kb': round(peak_memory / 1024, 1),
+            'content_similarity': round(sum(similarities) / len(similarities), 4),
+            'word_similarity': round(sum(word_similarities) / len(word_similarities), 4),
+            'char_ratio': round(chars / reference_chars, 4) if reference_chars else 0.0,
+            'empty_pages': empty_pages,
+            'garbled_ratio': round(garbled / chars, 6) if chars else 0.0,
+            'latency': summarize(durations),
+            'files': files,
+        }
+
+    reference = backends[args.reference]
+    for name, result in backends.items():
+        result['acceptable'] = (result['content_similarity'] >= args.min_similarity and
+                                result['empty_pages'] <= reference['empty_pages'] and
+                                result['garbled_ratio'] <= reference['garbled_ratio'] + 0.001)
+
+    acceptable = [name for name, result in backends.items() if result['acceptable']]
+    recommended = max(acceptable, key=lambda name: backends[name]['pages_per_sec']) if acceptable else None
+
+    print(f"\n=== PDF 추출 벤치마크: {len(paths)}개 파일, 반복 {args.repeat}회, 기준 {args.reference} ===")
+    print(f"{'backend':<10}{'pages/s':>10}{'p50_ms':>10}{'peak_kb':>12}{'content':>10}{'words':>8}{'chars':>8}{'empty':>7}{'ok':>5}")
+    for name, result in backends.items():
+        print(f"{name:<10}{result['pages_per_sec']:>10.1f}{result['latency']['p50_ms']:>10.1f}"
+              f"{result['peak_memory_kb']:>12.1f}{result['content_similarity']:>10.4f}{result['word_similarity']:>8.4f}{result['char_ratio']:>8.3f}"
+              f"{result['empty_pages']:>7}{'yes' if result['acceptable'] else 'no':>5}")
+    print(f"\n현재 기본값: {DEFAULT_PDF_EXTRACTOR}, 권장 기본값: {recommended or '없음'}")
+
+    if args.output:
+        save_results(args.output, {
+            'meta': run_metadata(vars(args)),
+            'files': [os.path.basename(path) for path in paths],
+            'backends': backends,
+            'recommended': recommended,
+        })
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
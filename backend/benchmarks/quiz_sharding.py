@@ -0,0 +1,115 @@
+"""
+퀴즈 분할 생성 벤치마크
+
+DB 사본에서 여러 주차를 선택한 퀴즈 생성(/api/quiz/generate)을 분할 생성 끔(QUIZ_SHARDING=0, 기존 방식: LLM 호출 한 번)과
+켬(주차 묶음별 동시 호출)으로 번갈아 요청하여 응답 시간을 비교합니다.
+Fake LLM 프로바이더는 고정 지연(--llm-latency-ms)에 출력 토큰당 지연(--token-latency-ms)을 더해, 실제 모델처럼
+문제 수가 많을수록 응답이 느려지게 합니다. 매번 LLM을 호출하도록 문제 은행과 요청 제한(rate_limits)은 끕니다.
+원본 DB는 바꾸지 않습니다.
+
+사용법 (backend 폴더에서, benchmarks/load_test.py가 만든 시드 DB 사용):
+    python benchmarks/quiz_sharding.py --db /tmp/ai_tutor_bench_xxx.db
+    python benchmarks/quiz_sharding.py --db /tmp/ai_tutor_bench_xxx.db --num-questions 20 --weeks 4 --output sharding.json
+"""
+
+import os
+import sys
+import time
+import shutil
+import sqlite3
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_utils import use_backend_path, summarize, run_metadata, save_results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='퀴즈 분할 생성 벤치마크')
+    parser.add_argument('--db', required=True, help='시드 DB 경로 (사본에서 측정)')
+    parser.add_argument('--num-questions', type=int, default=20, help='퀴즈 문제 수')
+    parser.add_argument('--weeks', type=int, default=4, help='선택할 주차 수 (자료가 있는 주차)')
+    parser.add_argument('--repeat', type=int, default=5, help='구성별 반복 측정 횟수')
+    parser.add_argument('--llm-latency-ms', type=float, default=500, help='Fake LLM 호출당 고정 지연')
+    parser.add_argument('--token-latency-ms', type=float, default=5, help='Fake LLM 출력 토큰당 지연')
+    parser.add_argument('--output', help='결과 JSON 저장 경로')
+    return parser.parse_args()
+
+
+def find_subject(db_path, weeks):
+    """자료가 있는 주차가 weeks개 이상인 과목과 그 주차 번호"""
+    connection = sqlite3.connect(db_path)
+    rows = connection.execute(
+        'SELECT weeks.subject_id, subjects.user_id, weeks.week_number FROM weeks '
+        'JOIN materials ON materials.week_id = weeks.id JOIN subjects ON subjects.id = weeks.subject_id '
+        'GROUP BY weeks.id ORDER BY weeks.subject_id, weeks.week_number').fetchall()
+    connection.close()
+    by_subject = {}
+    for subject_id, user_id, week_number in rows:
+        by_subject.setdefault((subject_id, user_id), []).append(week_number)
+    for (subject_id, user_id), week_numbers in by_subject.items():
+        if len(week_numbers) >= weeks:
+            return subject_id, user_id, week_numbers[:weeks]
+    raise SystemExit(f'자료가 있는 주차가 {weeks}개 이상인 과목이 없습니다')
+
+
+def main():
+    args = parse_args()
+    source = os.path.abspath(args.db)
+    use_backend_path()
+    if not os.path.exists(source):
+        raise SystemExit(f'DB 파일을 찾을 수 없습니다: {source}')
+    workdir = tempfile.mkdtemp(prefix='ai_tutor_sharding_')
+    db_path = os.path.join(workdir, 'bench.db')
+    shutil.copyfile(source, db_path)
+    os.environ.update({
+        'DATABASE_URL': f'sqlite:///{db_path}',
+        'LLM_PROVIDER': 'fake',
+        'FAKE_LLM_LATENCY_MS': str(args.llm_latency_ms),
+        'FAKE_LLM_TOKEN_LATENCY_MS': str(args.token_latency_ms),
+        'QUESTION_BANK_ENABLED': '0',
+        'RATE_LIMIT_ENABLED': '0',
+    })
+    os.environ.setdefault('REQUEST_METRICS_LOG', '0')
+
+    subject_id, user_id, week_numbers = find_subject(db_path, args.weeks)
+    from app import app
+
+    client = app.test_client()
+    payload = {
+        'subject_id': subject_id, 'user_id': user_id, 'week_numbers': week_numbers, 'difficulty': 'medium',
+        'question_types': ['multiple_choice', 'short_answer'], 'num_questions': args.num_questions,
+    }
+    timings = {'single': [], 'sharded': []}
+    for _ in range(args.repeat):
+        for name, sharding in (('single', '0'), ('sharded', '1')):
+            os.environ['QUIZ_SHARDING'] = sharding
+            start = time.perf_counter()
+            response = client.post('/api/quiz/generate', json=payload)
+            elapsed = time.perf_counter() - start
+            if response.status_code != 200:
+                raise SystemExit(f'{name} 퀴즈 생성 실패: {response.status_code} {response.get_json()}')
+            timings[name].append(elapsed)
+
+    results = {name: summarize(values) for name, values in timings.items()}
+    speedup = results['single']['p50_ms'] / results['sharded']['p50_ms']
+    print(f"퀴즈 {args.num_questions}문제, 주차 {week_numbers}, 반복 {args.repeat}회")
+    print(f"{'mode':<10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, stats in results.items():
+        print(f"{name:<10}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}")
+    print(f"분할 생성: {speedup:.1f}x")
+
+    if args.output:
+        save_results(args.output, {
+            'meta': run_metadata({
+                'db': source, 'num_questions': args.num_questions, 'weeks': week_numbers, 'repeat': args.repeat,
+                'llm_latency_ms': args.llm_latency_ms, 'token_latency_ms': args.token_latency_ms,
+            }),
+            'modes': results,
+            'speedup_p50': round(speedup, 2),
+        })
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+앱 시작 시간 벤치마크
+
+새 파이썬 프로세스에서 앱을 불러와 첫 요청에 응답하기까지의 시간을 구성별로 반복 측정합니다
+(gunicorn 워커 부팅, 오토스케일링 콜드 스타트, check_tables.py 같은 스크립트 실행 비용).
+    - import_ms: app 모듈 import (Flask, SQLAlchemy, 모델 등)
+    - create_ms: 앱 생성 (create_app, 마이그레이션을 켜면 스키마 확인과 create_all 포함)
+    - first_request_ms: 첫 요청(/ 헬스 체크와 /subjects 과목 목록) 응답 시간 (DB 연결, 매퍼 설정 등 첫 사용 비용 포함)
+    - ready_ms: 프로세스 시작부터 첫 요청 응답까지 (인터프리터 시작 포함)
+함께 첫 요청 후 google.generativeai, PDF 라이브러리가 import되었는지 기록합니다.
+
+구성:
+    - app: from app import app (DB_MIGRATE_ON_START=0, Fake LLM)
+    - app_migrate: 앱 생성 시 마이그레이션 실행 (DB_MIGRATE_ON_START=1)
+    - wsgi_preload: wsgi 모듈 import (Gemini 프로바이더, WSGI_PRELOAD_MODULES=1: gunicorn 마스터의 preload)
+    - wsgi_lazy: wsgi 모듈 import (Gemini 프로바이더, WSGI_PRELOAD_MODULES=0: 무거운 모듈은 처음 사용할 때 import)
+Gemini 구성은 API를 호출하지 않으므로 임의의 GEMINI_API_KEY를 사용합니다. 원본 DB는 바꾸지 않습니다.
+
+사용법 (backend 폴더에서, benchmarks/load_test.py가 만든 시드 DB 사용):
+    python benchmarks/startup.py --db /tmp/ai_tutor_bench_xxx.db
+    python benchmarks/startup.py --db /tmp/ai_tutor_bench_xxx.db --repeat 10 --output startup.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_utils import BACKEND_DIR, use_backend_path, summarize, run_metadata, save_results
+
+RESULT_PREFIX = 'STARTUP_RESULT '
+
+# 측정 프로세스에서 실행하는 코드 (이전 코드처럼 import 시 앱을 만들면 create_ms는 0에 가깝고 import_ms에 포함됨)
+PROBE = '''
+import sys, json, time
+start = time.perf_counter()
+module = __import__(sys.argv[1])
+imported = time.perf_counter()
+application = module.app
+created = time.perf_counter()
+client = application.test_client()
+statuses = [client.get('/').status_code, client.get('/subjects', query_string={'user_id': int(sys.argv[2])}).status_code]
+responded = time.perf_counter()
+print(%r + json.dumps({
+    'import_ms': (imported - start) * 1000, 'create_ms': (created - imported) * 1000,
+    'first_request_ms': (responded - created) * 1000, 'statuses': statuses,
+    'genai_loaded': 'google.generativeai' in sys.modules,
+    'pdf_loaded': 'PyPDF2' in sys.modules or 'pypdf' in sys.modules,
+}))
+''' % RESULT_PREFIX
+
+CONFIGS = {
+    'app': ('app', {'DB_MIGRATE_ON_START': '0', 'LLM_PROVIDER': 'fake'}),
+    'app_migrate': ('app', {'DB_MIGRATE_ON_START': '1', 'LLM_PROVIDER': 'fake'}),
+    'wsgi_preload': ('wsgi', {'DB_MIGRATE_ON_START': '0', 'LLM_PROVIDER': 'gemini', 'GEMINI_API_KEY': 'bench-not-a-real-key',
+                              'WSGI_PRELOAD_MODULES': '1'}),
+    'wsgi_lazy': ('wsgi', {'DB_MIGRATE_ON_START': '0', 'LLM_PROVIDER': 'gemini', 'GEMINI_API_KEY': 'bench-not-a-real-key',
+                           'WSGI_PRELOAD_MODULES': '0'}),
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='앱 시작 시간 벤치마크')
+    parser.add_argument('--db', required=True, help='시드 DB 경로 (사본에서 측정)')
+    parser.add_argument('--repeat', type=int, default=5, help='구성별 반복 측정 횟수 (매번 새 프로세스)')
+    parser.add_argument('--configs', nargs='+', choices=sorted(CONFIGS), default=list(CONFIGS), help='측정할 구성')
+    parser.add_argument('--output', help='결과 JSON 저장 경로')
+    return parser.parse_args()
+
+
+def find_user(db_path):
+    """과목이 가장 많은 사용자 ID"""
+    connection = sqlite3.connect(db_path)
+    row = connection.execute(
+        'SELECT user_id FROM subjects GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1').fetchone()
+    connection.close()
+    if row is None:
+        raise SystemExit('과목이 있는 사용자가 없습니다')
+    return row[0]
+
+
+def measure(module_name, extra_env, db_path, user_id):
+    """새 프로세스에서 앱을 불러와 첫 요청까지 측정"""
+    env = dict(os.environ)
+    env.update(extra_env)
+    env.update({'DATABASE_URL': f'sqlite:///{db_path}', 'REQUEST_METRICS_LOG': '0', 'LOG_LEVEL': 'warning'})
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-c', PROBE, module_name, str(user_id)], cwd=BACKEND_DIR, env=env,
+                               capture_output=True, text=True)
+    ready = time.perf_counter() - start
+    lines = [line for line in completed.stdout.splitlines() if line.startswith(RESULT_PREFIX)]
+    if completed.returncode != 0 or not lines:
+        raise SystemExit(f'{module_name} 측정 실패 (exit {completed.returncode}):\n{completed.stderr[-2000:]}')
+    result = json.loads(lines[-1][len(RESULT_PREFIX):])
+    if any(status != 200 for status in result['statuses']):
+        raise SystemExit(f'{module_name} 첫 요청 실패: {result["statuses"]}')
+    result['ready_ms'] = ready * 1000
+    return result
+
+
+def main():
+    args = parse_args()
+    source = os.path.abspath(args.db)
+    use_backend_path()
+    if not os.path.exists(source):
+        raise SystemExit(f'DB 파일을 찾을 수 없습니다: {source}')
+    workdir = tempfile.mkdtemp(prefix='ai_tutor_startup_')
+    db_path = os.path.join(workdir, 'bench.db')
+    shutil.copyfile(source, db_path)
+    user_id = find_user(db_path)
+
+    # 디스크 캐시와 .pyc 생성 비용이 첫 구성에만 들어가지 않도록 한 번 실행해 둠
+    measure(*CONFIGS['app'], db_path, user_id)
+
+    results = {}
+    for name in args.configs:
+        module_name, extra_env = CONFIGS[name]
+        runs = [measure(module_name, extra_env, db_path, user_id) for _ in range(args.repeat)]
+        results[name] = {
+            metric: summarize([run[metric] / 1000 for run in runs])
+            for metric in ('import_ms', 'create_ms', 'first_request_ms', 'ready_ms')
+        }
+        results[name]['genai_loaded'] = runs[-1]['genai_loaded']
+        results[name]['pdf_loaded'] = runs[-1]['pdf_loaded']
+
+    print(f"새 프로세스에서 첫 요청까지, 반복 {args.repeat}회 (p50 ms)")
+    print(f"{'config':<14}{'import':>9}{'create':>9}{'first req':>11}{'ready':>9}{'genai':>7}{'pdf':>5}")
+    for name, stats in results.items():
+        print(f"{name:<14}{stats['import_ms']['p50_ms']:>9.1f}{stats['create_ms']['p50_ms']:>9.1f}"
+              f"{stats['first_request_ms']['p50_ms']:>11.1f}{stats['ready_ms']['p50_ms']:>9.1f}"
+              f"{'yes' if stats['genai_loaded'] else 'no':>7}{'yes' if stats['pdf_loaded'] else 'no':>5}")
+
+    if args.output:
+        save_results(args.output, {
+            'meta': run_metadata({'db': source, 'repeat': args.repeat, 'configs': args.configs}),
+            'configs': results,
+        })
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""
+큰 텍스트 컬럼 압축 벤치마크
+
+DB 사본에서 압축 텍스트 컬럼(compressed_text.CompressedText)의 값을 읽어 다음을 비교합니다.
+    - 컬럼별 저장 크기: 원문(UTF-8) / zlib / zlib + 학습 사전
+      (사전은 표본의 절반으로 학습하고 나머지 절반으로 측정하여 학습 데이터에 맞춘 결과를 피함)
+    - 값 하나의 압축 해제 시간 (p50/p95)
+    - DB 파일 크기와 컬럼 읽기 지연 시간: 압축 저장한 사본 vs 원문으로 다시 저장한 사본 (둘 다 VACUUM)
+원본 DB는 바꾸지 않습니다 (사본을 앱으로 열어 마이그레이션한 뒤 측정).
+
+사용법 (backend 폴더에서):
+    python benchmarks/text_compression.py --db instance/app.db
+    python benchmarks/text_compression.py --db /tmp/ai_tutor_bench_xxx.db --output compression.json
+    (부하 테스트 시드 DB는 benchmarks/load_test.py가 임시 폴더에 만든 ai_tutor_bench_*.db 사용)
+"""
+
+import os
+import sys
+import time
+import zlib
+import random
+import shutil
+import sqlite3
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_utils import use_backend_path, summarize, run_metadata, save_results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='큰 텍스트 컬럼 압축 벤치마크')
+    parser.add_argument('--db', default='instance/app.db', help='측정할 SQLite DB 경로 (사본에서 측정)')
+    parser.add_argument('--sample-rows', type=int, default=2000, help='컬럼별 크기/압축 해제 측정에 사용할 최대 행 수')
+    parser.add_argument('--read-rows', type=int, default=500, help='읽기 지연 시간 측정에 사용할 행 수')
+    parser.add_argument('--repeat', type=int, default=5, help='읽기 지연 시간 반복 측정 횟수')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='결과 JSON 저장 경로')
+    return parser.parse_args()
+
+
+def prepare_copies(source):
+    """원본 DB를 임시 폴더에 복사하고 앱이 사본을 사용하도록 설정"""
+    if not os.path.exists(source):
+        raise SystemExit(f'DB 파일을 찾을 수 없습니다: {source}')
+    workdir = tempfile.mkdtemp(prefix='ai_tutor_compression_')
+    compressed_path = os.path.join(workdir, 'compressed.db')
+    shutil.copyfile(source, compressed_path)
+    os.environ['DATABASE_URL'] = f'sqlite:///{compressed_path}'
+    os.environ['LLM_PROVIDER'] = 'fake'
+    os.environ['DB_MIGRATE_ON_START'] = '1'  # 사본을 현재 스키마(압축 컬럼, 사전 테이블)로 마이그레이션
+    os.environ.setdefault('REQUEST_METRICS_LOG', '0')
+    return workdir, compressed_path
+
+
+def read_values(db, table, column, limit):
+    pk = list(table.primary_key.columns)[0]
+    rows = db.session.execute(db.select(pk, column).where(column.isnot(None)).order_by(pk).limit(limit)).all()
+    return [(row[0], row[1]) for row in rows if row[1]]
+
+
+def codec_sizes(values, dictionary, rng):
+    """값 목록을 codec별로 압축한 크기와 압축 해제 시간 (사전 codec은 학습에 쓰지 않은 절반으로 측정)"""
+    import compressed_text
+
+    raw = [value.encode('utf-8') for value in values]
+    test = [raw[i] for i in range(len(raw)) if i % 2 == 1] or raw
+    result = {'rows': len(raw), 'raw_bytes': sum(len(r) for r in raw)}
+    test_raw_bytes = sum(len(r) for r in test)
+
+    for name, zdict in (('zlib', None), ('zlib_dict', dictionary)):
+        blobs = []
+        for data in test:
+            compressor = zlib.compressobj(compressed_text.LEVEL, zlib.DEFLATED, -15, **({'zdict': zdict} if zdict else {}))
+            blobs.append(compressor.compress(data) + compressor.flush())
+        timings = []
+        for blob in rng.sample(blobs, min(len(blobs), 500)):
+            start = time.perf_counter()
+            decompressor = zlib.decompressobj(-15, **({'zdict': zdict} if zdict else {}))
+            (decompressor.decompress(blob) + decompressor.flush()).decode('utf-8')
+            timings.append(time.perf_counter() - start)
+        compressed_bytes = sum(len(b) + compressed_text.HEADER.size for b in blobs)
+        result[name] = {
+            'ratio': round(test_raw_bytes / compressed_bytes, 2) if compressed_bytes else None,
+            'decompress': summarize(timings),
+        }
+    return result
+
+
+def write_plain_copy(workdir, compressed_path, plain_values):
+    """압축 사본을 복사한 뒤 압축 컬럼을 원문으로 다시 저장 (압축하지 않았을 때의 비교 기준)"""
+    plain_path = os.path.join(workdir, 'plain.db')
+    shutil.copyfile(compressed_path, plain_path)
+    connection = sqlite3.connect(plain_path)
+    for (table_name, column_name, pk_name), rows in plain_values.items():
+        connection.executemany(f'UPDATE {table_name} SET {column_name} = ? WHERE {pk_name} = ?',
+                               [(value, pk) for pk, value in rows])
+    connection.commit()
+    connection.execute('VACUUM')
+    connection.close()
+    return plain_path
+
+
+def read_latency(engine, table, column, ids, repeat):
+    """압축 컬럼을 기본 키로 한 행씩 읽는 지연 시간 (CompressedText 결과 처리 포함)"""
+    from sqlalchemy import select, bindparam
+
+    pk = list(table.primary_key.columns)[0]
+    statement = select(column).where(pk == bindparam('pk'))
+    timings = []
+    with engine.connect() as connection:
+        for _ in range(repeat):
+            for row_id in ids:
+                start = time.perf_counter()
+                connection.execute(statement, {'pk': row_id}).scalar()
+                timings.append(time.perf_counter() - start)
+    return summarize(timings)
+
+
+def main():
+    args = parse_args()
+    source = os.path.abspath(args.db)
+    use_backend_path()
+    workdir, compressed_path = prepare_copies(source)
+    rng = random.Random(args.seed)
+
+    from sqlalchemy import create_engine
+    from app import app
+    from models import db
+    import compressed_text
+
+    source_size = os.path.getsize(source)
+    with app.app_context():
+        # 사본의 모든 값을 현재 사전으로 압축 (사전이 없으면 학습)
+        if compressed_text.current_dictionary_id() == compressed_text.NO_DICTIONARY:
+            compressed_text.train_and_store_dictionary(min_sample_bytes=0)
+        compressed_text.migrate_compressed_columns(recompress=True)
+        compressed_text.vacuum()
+
+        # 사전 codec 비교용 사전은 표본 절반(짝수 번째)으로 학습
+        columns = compressed_text.compressed_columns()
+        samples = {}
+        for table, column in columns:
+            samples[(table.name, column.name)] = read_values(db, table, column, args.sample_rows)
+        train = [value for rows in samples.values() for i, (_, value) in enumerate(rows) if i % 2 == 0]
+        dictionary = compressed_text.train_dictionary(train)
+
+        column_results = {}
+        for table, column in columns:
+            values = [value for _, value in samples[(table.name, column.name)]]
+            if not values:
+                continue
+            column_results[f'{table.name}.{column.name}'] = codec_sizes(values, dictionary, rng)
+
+        plain_values, read_targets = {}, []
+        for table, column in columns:
+            rows = read_values(db, table, column, None)
+            plain_values[(table.name, column.name, list(table.primary_key.columns)[0].name)] = rows
+            ids = [pk for pk, _ in rows]
+            read_targets.append((table, column, rng.sample(ids, min(args.read_rows, len(ids)))))
+        compressed_engine = db.engine
+
+    plain_path = write_plain_copy(workdir, compressed_path, plain_values)
+    plain_engine = create_engine(f'sqlite:///{plain_path}')
+
+    with app.app_context():
+        for table, column, ids in read_targets:
+            if not ids:
+                continue
+            entry = column_results.setdefault(f'{table.name}.{column.name}', {})
+            entry['read_plain'] = read_latency(plain_engine, table, column, ids, args.repeat)
+            entry['read_compressed'] = read_latency(compressed_engine, table, column, ids, args.repeat)
+
+    files = {
+        'source_bytes': source_size,
+        'plain_bytes': os.path.getsize(plain_path),
+        'compressed_bytes': os.path.getsize(compressed_path),
+    }
+
+    print(f"\nDB 파일: 원문 {files['plain_bytes'] / 1e6:.2f}MB → 압축 {files['compressed_bytes'] / 1e6:.2f}MB "
+          f"({files['compressed_bytes'] / files['plain_bytes']:.1%}), 원본 {source_size / 1e6:.2f}MB")
+    print(f"{'column':<32}{'rows':>7}{'raw MB':>9}{'zlib':>7}{'+dict':>7}{'unzip p50 ms':>14}{'read plain p50':>16}{'read zip p50':>14}")
+    for name, entry in column_results.items():
+        if 'rows' not in entry:
+            continue
+        print(f"{name:<32}{entry['rows']:>7}{entry['raw_bytes'] / 1e6:>9.2f}"
+              f"{entry['zlib']['ratio'] or 0:>7.2f}{entry['zlib_dict']['ratio'] or 0:>7.2f}"
+              f"{entry['zlib_dict']['decompress']['p50_ms']:>14.3f}"
+              f"{entry.get('read_plain', {}).get('p50_ms', 0):>16.3f}{entry.get('read_compressed', {}).get('p50_ms', 0):>14.3f}")
+
+    output = {
+        'meta': run_metadata({
+            'db': source, 'sample_rows': args.sample_rows, 'read_rows': args.read_rows, 'repeat': args.repeat,
+            'min_bytes': compressed_text.MIN_BYTES, 'level': compressed_text.LEVEL, 'dictionary_bytes': len(dictionary),
+        }),
+        'files': files,
+        'columns': column_results,
+    }
+    if args.output:
+        save_results(args.output, output)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -20,8 +20,8 @@ with app.app_context():
         print(f"  - {table}: {status}")
     
     if any(t not in existing_tables for t in required_tables):
-        print("\n⚠️ 일부 테이블이 없습니다. 백엔드 서버를 재시작하세요.")
-        print("서버 시작 시 자동으로 테이블이 생성됩니다.")
+        print("\n⚠️ 일부 테이블이 없습니다. python migrations.py를 실행하세요.")
+        print("개발 서버(python app.py)는 시작 시 자동으로 테이블을 생성합니다.")
     else:
         print("\n✅ 모든 필요한 테이블이 존재합니다.")
 
@@ -0,0 +1,123 @@
+"""
+생성 요청 병합 모듈 (request coalescing)
+같은 결과를 만드는 LLM 생성 요청(예: 같은 주차/모드/자료의 개념 학습 콘텐츠)이 동시에 여러 개 오면
+한 요청(리더)만 생성하고, 나머지 요청(팔로워)은 리더가 끝날 때까지 기다렸다가 리더가 저장한 결과를 읽습니다.
+
+- 리더는 GenerationClaim 행을 INSERT하여 작업 키를 점유합니다 (Primary Key 제약으로 워커 프로세스가 여러 개여도 한 요청만 점유).
+- 팔로워는 점유 행이 사라질 때까지 기다립니다. 같은 프로세스의 리더는 이벤트로 바로 깨우고,
+  다른 워커의 리더는 DB를 주기적으로 다시 읽습니다 (기다리는 동안에는 트랜잭션을 끝내 풀 커넥션을 잡지 않음).
+- 점유는 리더가 release하거나 요청이 끝날 때(teardown) 해제됩니다. 리더가 실패하면 팔로워는 결과가 없으므로
+  다시 점유를 시도하여 직접 생성합니다 (사용하는 쪽의 반복문 참고).
+- 프로세스가 종료되어 남은 점유는 GENERATION_CLAIM_STALE_SECONDS가 지나면 다음 요청이 넘겨받습니다.
+
+사용 예:
+    while not acquire(key):
+        result = 저장된 결과 조회
+        if result: return result
+    ... 생성 후 저장 ...
+    release(key)
+
+환경 변수:
+    GENERATION_CLAIM_WAIT_SECONDS: 팔로워의 최대 대기 시간 (기본값 LLM_REQUEST_TIMEOUT_SECONDS × 2 + 30)
+    GENERATION_CLAIM_STALE_SECONDS: 점유를 버려진 것으로 보는 시간 (기본값 GENERATION_CLAIM_WAIT_SECONDS × 2)
+"""
+
+import os
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from flask import g
+from sqlalchemy.exc import IntegrityError
+
+from models import db, GenerationClaim
+
+logger = logging.getLogger(__name__)
+
+# 다른 워커가 점유한 작업의 해제 여부를 다시 읽는 간격 (초)
+POLL_INTERVAL_SECONDS = 0.25
+
+_LLM_TIMEOUT = float(os.getenv('LLM_REQUEST_TIMEOUT_SECONDS', '120'))
+WAIT_SECONDS = float(os.getenv('GENERATION_CLAIM_WAIT_SECONDS', str(_LLM_TIMEOUT * 2 + 30)))
+STALE_AFTER = timedelta(seconds=float(os.getenv('GENERATION_CLAIM_STALE_SECONDS', str(WAIT_SECONDS * 2))))
+
+# 이 프로세스가 점유한 작업 {key: Event} - 같은 프로세스의 팔로워를 바로 깨움
+_claims = {}
+_claims_lock = threading.Lock()
+
+
+class ClaimTimeout(Exception):
+    """리더의 작업이 대기 시간 안에 끝나지 않음"""
+
+
+def init_coalescing(app):
+    """요청이 끝날 때 그 요청이 점유한 작업을 해제하는 teardown 훅 등록 (예외로 끝난 요청 포함)"""
+
+    @app.teardown_request
+    def release_request_claims(exc):
+        for key in list(g.get('generation_claims', ())):
+            release(key)
+
+
+def acquire(key):
+    """작업 키 점유 시도
+
+    Returns:
+        True: 점유함 (리더, 생성 후 release 호출)
+        False: 다른 요청이 점유하고 있어 해제될 때까지 기다림 (팔로워, 저장된 결과를 조회)
+
+    Raises:
+        ClaimTimeout: 대기 시간 안에 해제되지 않음
+    """
+    GenerationClaim.query.filter(
+        GenerationClaim.key == key, GenerationClaim.created_at < datetime.utcnow() - STALE_AFTER
+    ).delete(synchronize_session=False)
+    db.session.add(GenerationClaim(key=key, created_at=datetime.utcnow()))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+    else:
+        with _claims_lock:
+            _claims[key] = threading.Event()
+        g.setdefault('generation_claims', set()).add(key)
+        return True
+
+    logger.info("다른 요청이 같은 작업을 처리 중 - 완료 대기 (%s)", key)
+    with _claims_lock:
+        event = _claims.get(key)
+    deadline = time.monotonic() + WAIT_SECONDS
+    while time.monotonic() < deadline:
+        if event is not None:
+            event.wait(POLL_INTERVAL_SECONDS)
+        else:
+            time.sleep(POLL_INTERVAL_SECONDS)
+        # 대기 중에는 쓰기가 없으므로 트랜잭션을 끝내고 리더가 commit한 최신 상태를 읽음
+        db.session.rollback()
+        released = db.session.get(GenerationClaim, key) is None
+        # 기다리는 동안 풀 커넥션을 잡지 않도록 읽기 트랜잭션 종료 (close와 달리 요청이 읽은 객체는 세션에 남음)
+        db.session.rollback()
+        if released:
+            return False
+    raise ClaimTimeout(key)
+
+
+def release(key):
+    """점유한 작업 키 해제 (팔로워를 깨움)"""
+    claims = g.get('generation_claims')
+    if claims is None or key not in claims:
+        return
+    claims.discard(key)
+    try:
+        db.session.rollback()
+        GenerationClaim.query.filter_by(key=key).delete(synchronize_session=False)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        logger.exception("작업 점유 해제 실패 (%s)", key)
+    finally:
+        with _claims_lock:
+            event = _claims.pop(key, None)
+        if event is not None:
+            event.set()
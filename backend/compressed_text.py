@@ -0,0 +1,276 @@
+"""
+압축 텍스트 컬럼 모듈
+강의계획서 텍스트/분석 결과, 학습 계획, 개념 학습 콘텐츠, 퀴즈 리포트, 추출 텍스트처럼 큰 텍스트 컬럼을
+zlib(raw deflate)로 압축하여 저장하고, 읽을 때 다시 문자열로 풀어 줍니다 (모델 코드에서는 일반 문자열처럼 사용).
+
+저장 형식:
+    - 압축 값: BLOB = 매직 b'zt' + 사전 ID(2바이트) + raw deflate 스트림
+    - 작은 값(TEXT_COMPRESSION_MIN_BYTES 미만)과 기존 데이터: 그대로 TEXT
+    읽을 때 SQLite가 돌려주는 타입(bytes/str)으로 구분하므로 압축 전 데이터와 섞여 있어도 됩니다.
+
+공유 사전:
+    같은 서비스의 텍스트는 JSON 키, 마크다운 제목, 자주 쓰는 한국어 어구가 반복되므로
+    저장된 텍스트로 학습한 사전(text_dictionaries 테이블)을 zlib preset dictionary(zdict)로 사용하면
+    짧은 값도 잘 압축됩니다. 사전은 한 번 저장하면 바꾸지 않고(압축 값이 사전 ID를 참조),
+    새로 학습하면 새 ID로 추가합니다. 사전 ID 0은 사전 없이 압축한 값입니다.
+    (zstandard 학습 사전 대신 표준 라이브러리 zlib의 preset dictionary를 사용하며, zlib 창 크기 때문에 최대 32KB)
+
+환경 변수:
+    TEXT_COMPRESSION: 0이면 새로 저장하는 값을 압축하지 않음 (기존 압축 값은 계속 읽음, 기본값 1)
+    TEXT_COMPRESSION_MIN_BYTES: 이보다 작은 값은 압축하지 않음 (기본값 256)
+    TEXT_COMPRESSION_LEVEL: zlib 압축 레벨 (기본값 6)
+    TEXT_DICTIONARY_SIZE: 학습할 사전 크기 (기본값 32768, 최대 32768)
+    TEXT_DICTIONARY_MIN_SAMPLE_BYTES: 사전을 학습하기 위한 최소 표본 크기 (기본값 262144)
+"""
+
+import os
+import re
+import time
+import zlib
+import struct
+import logging
+import threading
+from collections import Counter
+
+from sqlalchemy import Text, LargeBinary, select, update, bindparam, func, cast, and_, or_, text
+from sqlalchemy.types import TypeDecorator
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'zt'
+HEADER = struct.Struct('>2sH')  # 매직, 사전 ID
+NO_DICTIONARY = 0
+MAX_DICTIONARY_SIZE = 32 * 1024  # zlib 창 크기 (이보다 앞부분은 참조되지 않음)
+
+ENABLED = os.getenv('TEXT_COMPRESSION', '1') != '0'
+MIN_BYTES = int(os.getenv('TEXT_COMPRESSION_MIN_BYTES', '256'))
+LEVEL = int(os.getenv('TEXT_COMPRESSION_LEVEL', '6'))
+DICTIONARY_SIZE = min(int(os.getenv('TEXT_DICTIONARY_SIZE', str(MAX_DICTIONARY_SIZE))), MAX_DICTIONARY_SIZE)
+MIN_SAMPLE_BYTES = int(os.getenv('TEXT_DICTIONARY_MIN_SAMPLE_BYTES', '262144'))
+
+# 사전 학습용 토큰 (뒤따르는 공백 포함, 이어 붙이면 원문 조각이 됨)
+_TOKEN = re.compile(r'\S+\s*')
+MAX_NGRAM = 3
+SAMPLE_ROWS_PER_COLUMN = 200
+SAMPLE_MAX_CHARS = 16 * 1024  # 표본 하나에서 학습에 사용할 앞부분 길이 (긴 추출 텍스트의 메모리 사용 제한)
+
+_dictionaries = {}  # {사전 ID: 사전 바이트}
+_current_id = NO_DICTIONARY
+_lock = threading.Lock()
+
+
+def register_dictionary(dictionary_id, data, current=True):
+    """사전을 등록 (current=True이면 새로 압축하는 값에 사용)"""
+    global _current_id
+    _dictionaries[dictionary_id] = bytes(data)
+    if current and dictionary_id > _current_id:
+        _current_id = dictionary_id
+
+
+def current_dictionary_id():
+    return _current_id
+
+
+def load_dictionaries():
+    """저장된 사전을 모두 불러와 가장 최근 사전을 현재 사전으로 사용 (앱 시작 시 실행)"""
+    from models import db, TextDictionary
+    for dictionary_id, data in db.session.query(TextDictionary.id, TextDictionary.data).all():
+        register_dictionary(dictionary_id, data)
+    return _current_id
+
+
+def _dictionary(dictionary_id):
+    """사전 바이트 반환 (다른 프로세스가 새로 학습한 사전이면 DB에서 불러옴)"""
+    data = _dictionaries.get(dictionary_id)
+    if data is None:
+        from models import db, TextDictionary
+        with _lock, db.engine.connect() as connection:
+            row = connection.execute(
+                select(TextDictionary.data).where(TextDictionary.id == dictionary_id)).first()
+        if row is None:
+            raise ValueError(f"압축 텍스트 사전을 찾을 수 없습니다 (사전 ID: {dictionary_id})")
+        register_dictionary(dictionary_id, row[0], current=False)
+        data = _dictionaries[dictionary_id]
+    return data
+
+
+def compress(value, dictionary_id=None):
+    """문자열을 압축 값(bytes)으로 변환"""
+    if dictionary_id is None:
+        dictionary_id = _current_id
+    raw = value.encode('utf-8')
+    if dictionary_id == NO_DICTIONARY:
+        compressor = zlib.compressobj(LEVEL, zlib.DEFLATED, -15)
+    else:
+        compressor = zlib.compressobj(LEVEL, zlib.DEFLATED, -15, zdict=_dictionary(dictionary_id))
+    return HEADER.pack(MAGIC, dictionary_id) + compressor.compress(raw) + compressor.flush()
+
+
+def decompress(value):
+    """압축 값(bytes)을 문자열로 변환 (압축 형식이 아니면 UTF-8 문자열로 간주)"""
+    value = bytes(value)
+    if len(value) < HEADER.size or value[:2] != MAGIC:
+        return value.decode('utf-8')
+    _, dictionary_id = HEADER.unpack_from(value)
+    if dictionary_id == NO_DICTIONARY:
+        decompressor = zlib.decompressobj(-15)
+    else:
+        decompressor = zlib.decompressobj(-15, zdict=_dictionary(dictionary_id))
+    return (decompressor.decompress(value[HEADER.size:]) + decompressor.flush()).decode('utf-8')
+
+
+def encode(value):
+    """컬럼에 저장할 값 (압축이 꺼져 있거나, 작거나, 압축해도 줄지 않는 값은 문자열 그대로)"""
+    if value is None or not ENABLED or len(value) * 4 < MIN_BYTES:
+        return value
+    size = len(value.encode('utf-8'))
+    if size < MIN_BYTES:
+        return value
+    compressed = compress(value)
+    return compressed if len(compressed) < size else value
+
+
+class CompressedText(TypeDecorator):
+    """저장할 때 압축하고 읽을 때 푸는 텍스트 컬럼 (DDL은 TEXT 그대로, 기존 문자열 값도 읽음)"""
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return encode(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        return decompress(value)
+
+
+def compressed_columns():
+    """CompressedText 컬럼 목록 [(테이블, 컬럼)]"""
+    from models import db
+    return [(table, column) for table in db.metadata.sorted_tables
+            for column in table.columns if isinstance(column.type, CompressedText)]
+
+
+def train_dictionary(samples, size=None):
+    """표본 텍스트로 preset dictionary 학습
+
+    여러 문서에 반복해서 나오는 단어 1~3-gram을 (문서 빈도 - 1) × 바이트 길이 순으로 골라 이어 붙입니다.
+    zlib은 가까운 위치를 더 짧게 참조하므로 가장 유용한 조각을 사전의 끝에 둡니다.
+    """
+    size = size or DICTIONARY_SIZE
+    counts = Counter()
+    for sample in samples:
+        tokens = _TOKEN.findall(sample[:SAMPLE_MAX_CHARS])
+        fragments = set()
+        for n in range(1, MAX_NGRAM + 1):
+            for i in range(len(tokens) - n + 1):
+                fragments.add(''.join(tokens[i:i + n]))
+        counts.update(fragments)
+
+    scored = []
+    for fragment, count in counts.items():
+        length = len(fragment.encode('utf-8'))
+        if count >= 2 and length >= 4:
+            scored.append(((count - 1) * length, fragment))
+    scored.sort(reverse=True)
+
+    chosen, chosen_text, total = [], '', 0
+    for _, fragment in scored:
+        length = len(fragment.encode('utf-8'))
+        if total + length > size:
+            continue
+        if fragment in chosen_text:
+            continue
+        chosen.append(fragment)
+        chosen_text += fragment
+        total += length
+        if total >= size - 4:
+            break
+    return ''.join(reversed(chosen)).encode('utf-8')
+
+
+def collect_samples(rows_per_column=SAMPLE_ROWS_PER_COLUMN):
+    """사전 학습용 표본 (압축 컬럼별 최근 값, 작은 값 제외)"""
+    from models import db
+    samples = []
+    for table, column in compressed_columns():
+        pk = list(table.primary_key.columns)[0]
+        values = db.session.execute(
+            select(column).where(column.isnot(None)).order_by(pk.desc()).limit(rows_per_column)
+        ).scalars().all()
+        samples.extend(value for value in values if len(value.encode('utf-8')) >= MIN_BYTES)
+    return samples
+
+
+def train_and_store_dictionary(min_sample_bytes=None):
+    """저장된 텍스트로 사전을 학습하여 text_dictionaries에 추가하고 현재 사전으로 사용
+
+    Returns:
+        새 사전 ID (표본이 부족하면 None)
+    """
+    from models import db, TextDictionary
+    if min_sample_bytes is None:
+        min_sample_bytes = MIN_SAMPLE_BYTES
+    samples = collect_samples()
+    sample_bytes = sum(len(sample.encode('utf-8')) for sample in samples)
+    if sample_bytes < min_sample_bytes:
+        logger.info("압축 사전 학습을 건너뜁니다: 표본 %s바이트 (최소 %s바이트)", sample_bytes, min_sample_bytes)
+        return None
+
+    data = train_dictionary(samples)
+    record = TextDictionary(data=data, sample_count=len(samples))
+    db.session.add(record)
+    db.session.commit()
+    register_dictionary(record.id, data)
+    logger.info("압축 사전을 학습했습니다 (사전 ID: %s, 표본 %s개/%s바이트, 사전 %s바이트)",
+                record.id, len(samples), sample_bytes, len(data))
+    return record.id
+
+
+def migrate_compressed_columns(recompress=False, batch_size=500, train=True):
+    """기존 행의 압축 컬럼 값을 압축 형식으로 다시 저장
+
+    Args:
+        recompress: True이면 이미 압축된 값도 현재 사전으로 다시 압축 (사전을 새로 학습한 뒤 사용)
+        train: 사전이 없으면 먼저 학습
+
+    Returns:
+        다시 저장한 값 수
+    """
+    from models import db
+    if not ENABLED:
+        logger.info("TEXT_COMPRESSION=0이므로 압축 마이그레이션을 건너뜁니다.")
+        return 0
+    if train and _current_id == NO_DICTIONARY:
+        train_and_store_dictionary()
+
+    start = time.perf_counter()
+    rewritten = 0
+    for table, column in compressed_columns():
+        pk = list(table.primary_key.columns)[0]
+        condition = and_(func.typeof(column) == 'text', func.length(cast(column, LargeBinary)) >= MIN_BYTES)
+        if recompress:
+            condition = or_(condition, func.typeof(column) == 'blob')
+        statement = update(table).where(pk == bindparam('_pk')).values({column.name: bindparam('_value')})
+        last_pk = None
+        while True:
+            query = select(pk, column).where(condition).order_by(pk).limit(batch_size)
+            if last_pk is not None:
+                query = query.where(pk > last_pk)
+            rows = db.session.execute(query).all()
+            if not rows:
+                break
+            db.session.execute(statement, [{'_pk': row[0], '_value': row[1]} for row in rows])
+            db.session.commit()
+            rewritten += len(rows)
+            last_pk = rows[-1][0]
+
+    logger.info("압축 텍스트 마이그레이션 완료: %s개 값 (%.1f초)", rewritten, time.perf_counter() - start)
+    return rewritten
+
+
+def vacuum():
+    """압축으로 비워진 페이지를 반환하여 DB 파일 크기를 줄임"""
+    from models import db
+    with db.engine.connect() as connection:
+        connection.execution_options(isolation_level='AUTOCOMMIT').execute(text('VACUUM'))
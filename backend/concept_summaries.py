@@ -0,0 +1,190 @@
+"""
+개념 학습 계층 요약 모듈 (map-reduce)
+PDF 자료가 여러 개인 주차의 개념 학습 콘텐츠를 자료별 부분 요약(map)에서 통합(reduce)하여 만듭니다.
+
+- map: 자료마다 요약 노트를 한 번 생성하여 MaterialSummary에 저장합니다. 자료마다 개념 학습 자료 예산
+  (CONCEPT_MATERIAL_MAX_CHARS) 전체를 사용하므로, 주차 자료 전체를 예산 하나로 나눠 쓰던 방식보다 뒤쪽 자료가 덜 잘립니다.
+  요약이 없거나 오래된(fingerprint 불일치) 자료만 jobs.fan_out으로 동시에 요약합니다.
+- reduce: 주차의 자료별 요약을 이어 붙여 기존 Summary/Deep Dive 프롬프트의 강의 자료 자리에 넣습니다.
+  주차에 자료를 추가하면 새 자료 하나의 map과 reduce만, 자료를 삭제하면 reduce만 다시 실행됩니다.
+- map에 실패한 자료는 저장하지 않고 오류 목록으로 돌려주며, 다음 요청에서 다시 시도합니다.
+  이때 나머지 자료로 통합한 콘텐츠는 partial_fingerprint로 저장하여 캐시 히트가 되지 않게 합니다
+  (텍스트를 추출할 수 없는 자료처럼 다시 시도해도 같은 결과인 오류는 제외).
+
+환경 변수:
+    CONCEPT_HIERARCHICAL: '0'이면 계층 요약을 끄고 주차 자료 전체로 한 번에 생성 (기본값 '1')
+    CONCEPT_HIERARCHICAL_MIN_MATERIALS: 계층 요약을 사용할 최소 PDF 자료 수 (기본값 2)
+    MATERIAL_SUMMARY_MAX_OUTPUT_TOKENS: 자료별 요약의 최대 출력 토큰 수 (기본값 2048)
+"""
+
+import os
+import logging
+
+from sqlalchemy.exc import IntegrityError
+
+from models import db, MaterialSummary
+from jobs import fan_out
+from db_lifecycle import release_session
+from artifacts import material_summary_fingerprint, is_current
+from material_text import MaterialTextPending, get_material_text, material_abspath
+from text_cleaning import CLEANING_VERSION
+
+logger = logging.getLogger(__name__)
+
+# 자료별 요약 프롬프트 버전 (프롬프트를 바꾸면 올려서 기존 요약을 다시 생성)
+SUMMARY_VERSION = 1
+
+# 요약 노트가 너무 짧으면 실패로 간주 (개념 학습 응답 검증과 같은 기준)
+MIN_SUMMARY_CHARS = 50
+
+# map 실패로 일부 자료가 빠진 콘텐츠의 fingerprint 접두사 (현재 fingerprint와 달라 다음 요청에서 다시 생성)
+PARTIAL_PREFIX = 'partial:'
+
+REDUCE_HEADER = ("(아래 강의 자료는 이번 주차의 PDF 자료별로 정리한 요약 노트입니다. "
+                 "자료 전체를 아우르는 하나의 학습 노트로 통합하고, 자료 사이에 겹치는 내용은 한 번만 설명하세요.)\n")
+
+
+def is_enabled(material_count):
+    """PDF 자료 수가 material_count인 주차에 계층 요약을 사용할지 여부"""
+    if os.getenv('CONCEPT_HIERARCHICAL', '1') == '0':
+        return False
+    return material_count >= int(os.getenv('CONCEPT_HIERARCHICAL_MIN_MATERIALS', '2'))
+
+
+def partial_fingerprint(fingerprint):
+    """일부 자료의 요약에 실패한 채 통합한 콘텐츠에 저장할 fingerprint"""
+    return PARTIAL_PREFIX + fingerprint
+
+
+def build_material_prompt(file_name, week_number, text):
+    """자료 하나의 요약 노트 프롬프트"""
+    return f"""당신은 학습 자료를 정리하는 전문가입니다. 다음은 {week_number}주차 강의 자료 중 하나({file_name})입니다.
+이 자료의 내용을 나중에 다른 자료의 요약과 합쳐 주차 학습 노트를 만들 수 있도록 요약 노트로 정리해주세요.
+
+강의 자료:
+{text}
+
+**지시사항:**
+- 자료에 나오는 핵심 개념, 정의, 수식(LaTeX 형식), 예시, 강의 운영 정보를 빠짐없이 간결하게 정리하세요.
+- Markdown 헤딩(##, ###)과 하이픈(-) 리스트를 사용하고, 각 항목은 새 줄에 작성하세요.
+- 자료에 없는 내용은 추가하지 마세요.
+- 모든 내용은 한국어로 작성하세요 (영어 용어는 괄호 안에 병기 가능).
+
+출력은 Markdown 형식으로만 작성하세요."""
+
+
+def _summarize(provider, model_candidates, prompt):
+    """모델 후보를 차례로 시도하여 요약 노트 생성 (404/429/빈 응답이면 다음 모델)
+
+    Returns:
+        (요약 텍스트, 모델 이름, 오류 메시지) - 성공하면 오류 메시지는 None
+    """
+    generation_config = {
+        'temperature': 0.3,
+        'max_output_tokens': int(os.getenv('MATERIAL_SUMMARY_MAX_OUTPUT_TOKENS', '2048')),
+    }
+    error = '사용 가능한 모델이 없습니다.'
+    for model_name in model_candidates:
+        try:
+            response = provider.generate(model_name, prompt, purpose='material_summary',
+                                         generation_config=generation_config)
+        except Exception as e:
+            error = str(e)
+            if '404' in error or 'not found' in error.lower() or '429' in error or 'quota' in error.lower():
+                logger.warning("%s: 자료 요약 실패 - 다음 모델 시도... (%s)", model_name, error)
+                continue
+            return None, model_name, error
+        text = (response.text or '').strip() if response else ''
+        if text.startswith('```'):
+            text = '\n'.join(line for line in text.split('\n') if not line.strip().startswith('```')).strip()
+        if len(text) >= MIN_SUMMARY_CHARS:
+            return text, model_name, None
+        error = f'요약 노트가 너무 짧습니다 (길이: {len(text)} 문자)'
+        logger.warning("%s: %s - 다음 모델 시도...", model_name, error)
+    return None, None, error
+
+
+def material_summaries(week_number, materials, provider, model_candidates, max_chars):
+    """주차 PDF 자료들의 요약 노트 (없거나 오래된 요약만 새로 생성하여 저장)
+
+    자료 텍스트와 저장된 요약을 읽은 뒤 세션을 반환하고 요약을 생성하므로, 호출한 뒤에는 materials 객체 대신
+    반환된 파일명을 사용해야 합니다 (db_lifecycle 참고).
+    자료 텍스트가 아직 추출 중이면 material_text.MaterialTextPending이 발생합니다.
+
+    Returns:
+        ([(파일명, 요약 노트), ...] 자료 순서, [오류 메시지, ...], 요약 생성(map)에 실패한 자료 수)
+        요약 생성 실패는 일시적일 수 있으므로(429 등) 1 이상이면 통합 결과를 partial_fingerprint로 저장합니다.
+    """
+    fingerprints = {m.id: material_summary_fingerprint(m.id, CLEANING_VERSION, SUMMARY_VERSION) for m in materials}
+    summaries = {row.material_id: row.summary for row in MaterialSummary.query.filter(
+        MaterialSummary.material_id.in_(list(fingerprints))).all()
+        if is_current(row.source_fingerprint, fingerprints[row.material_id])} if fingerprints else {}
+
+    errors, pending = [], []
+    failed = 0
+    file_names = {}
+    for material in materials:
+        file_names[material.id] = material.file_name
+        if material.id in summaries:
+            continue
+        if material.text_status is None and not os.path.exists(material_abspath(material.file_path)):
+            errors.append(f"PDF 파일을 찾을 수 없습니다: {material.file_name}")
+            continue
+        try:
+            text = get_material_text(material, max_chars=max_chars)
+        except MaterialTextPending:
+            raise
+        except Exception as e:
+            errors.append(f"PDF 처리 중 오류 발생 ({material.file_name or '알 수 없음'}): {str(e)}")
+            continue
+        if not text or len(text.strip()) < MIN_SUMMARY_CHARS:
+            errors.append(f"PDF에서 텍스트를 추출할 수 없거나 내용이 너무 짧습니다: {material.file_name or '알 수 없음'}")
+            continue
+        if len(text) >= max_chars:
+            text = text.rstrip() + "\n\n[이하 생략...]"
+        pending.append((material.id, build_material_prompt(material.file_name, week_number, text)))
+    # 요약 생성과 이어지는 통합(reduce) 호출 동안 DB 커넥션을 잡지 않도록 세션 반환
+    release_session()
+
+    if pending:
+        logger.info("%s주차 자료 %s개 요약 생성 (재사용 %s개)", week_number, len(pending),
+                    len(materials) - len(pending) - len(errors))
+        results = fan_out(lambda item: _summarize(provider, model_candidates, item[1]), pending)
+
+        # 짧은 쓰기 트랜잭션: 요약 행을 다시 조회하여 저장
+        stored = {row.material_id: row for row in MaterialSummary.query.filter(
+            MaterialSummary.material_id.in_([material_id for material_id, _ in pending])).all()}
+        for (material_id, _), (summary, model, error) in zip(pending, results):
+            if error:
+                errors.append(f"자료 요약 실패 ({file_names[material_id] or '알 수 없음'}): {error}")
+                failed += 1
+                continue
+            row = stored.get(material_id)
+            if row is None:
+                row = MaterialSummary(material_id=material_id)
+                db.session.add(row)
+            row.summary = summary
+            row.model = model
+            row.source_fingerprint = fingerprints[material_id]
+            summaries[material_id] = summary
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # 요약하는 동안 자료가 삭제됨 - 이번 요청의 요약 노트는 저장하지 않고 그대로 사용
+            db.session.rollback()
+            logger.info("%s주차 자료 요약 저장 실패 (요약 중 자료 삭제)", week_number)
+
+    partials = [(file_name, summaries[material_id]) for material_id, file_name in file_names.items()
+                if material_id in summaries]
+    return partials, errors, failed
+
+
+def reduce_input(partials):
+    """자료별 요약 노트를 개념 학습 프롬프트의 강의 자료 자리에 넣을 텍스트로 합침"""
+    sections = []
+    for file_name, summary in partials:
+        if file_name and file_name.strip():
+            sections.append(f"\n\n## 📄 {file_name}\n\n{summary}\n\n")
+        else:
+            sections.append(f"\n\n{summary}\n\n")
+    return REDUCE_HEADER + '\n'.join(sections)
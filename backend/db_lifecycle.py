@@ -0,0 +1,23 @@
+"""
+요청 DB 세션 수명 관리 모듈
+수 초씩 걸리는 LLM 호출 동안 요청의 DB 세션이 풀 커넥션(SQLite에서는 열린 트랜잭션)을 잡고 있으면
+다른 요청의 쓰기가 잠금을 기다리고 커넥션 풀이 바닥납니다. LLM을 호출하는 요청은 다음 순서로 처리합니다.
+
+    1. 입력 읽기: 프롬프트와 저장에 필요한 값을 ORM 객체에서 지역 변수(ID, 문자열, 딕셔너리)로 꺼냄
+    2. release_session(): 세션을 닫아 커넥션을 풀에 반환
+    3. LLM 호출 (DB 사용 없음)
+    4. 짧은 쓰기 트랜잭션: 저장할 행을 ID로 다시 조회하여 수정하고 commit
+
+세션을 닫은 뒤에도 이미 읽은 ORM 객체의 컬럼 값은 읽을 수 있지만(분리된 객체), commit으로 만료되었거나
+읽지 않은 관계/지연 로딩 컬럼에 접근하면 DetachedInstanceError가 발생합니다. 쓰기는 항상 다시 조회한 객체에 합니다.
+LLM 호출 시점에 커넥션을 잡고 있었는지는 instrumentation이 계측합니다 (llm_calls_holding_db_connection_total).
+"""
+
+from models import db
+
+
+def release_session():
+    """세션을 닫아 DB 커넥션을 풀에 반환 (반영하지 않은 변경이 있으면 먼저 commit)"""
+    if db.session.new or db.session.dirty or db.session.deleted:
+        db.session.commit()
+    db.session.close()
@@ -0,0 +1,209 @@
+"""
+퀴즈 채점 모듈
+한 번의 제출에 포함된 모든 답안을 LLM 호출 없이 로컬에서 한 번에 채점합니다.
+
+문제 유형별 채점 방식:
+    multiple_choice: 정규화 후 완전 일치 (유니코드 정규화, 대소문자/공백 무시)
+    short_answer: 정규화 후 완전 일치 (문장 부호도 무시) → 숫자 정답이면 허용 오차 비교
+                  → 그 외에는 긴 정답(SHORT_ANSWER_TYPO_MIN_LENGTH자 이상)에만 오타 허용:
+                    편집 거리가 정답 길이 SHORT_ANSWER_CHARS_PER_TYPO자당 1자 이하이고 문자 단위 유사도가 기준 이상이면 정답
+    subjective: 문자 n-gram TF-IDF 코사인 유사도가 기준 이상이면 정답
+
+반대 의미 답안은 유사도가 높아도 오답입니다: 정답에 부정 접두사만 더하거나 뺀 단답(unsupervised/supervised, 비선형/선형)과
+부정 표현(not, 아니다, 않다, 없다 등)의 수가 정답과 다른 단답/주관식 답안.
+
+주관식 유사도는 제출 단위로 scikit-learn TfidfVectorizer(char_wb n-gram)를 한 번만 학습/변환하여 계산합니다.
+문자 n-gram은 형태소 분석 없이도 한국어 조사/어미 변화에 강합니다.
+scikit-learn을 불러올 수 없으면 difflib 문자열 유사도로 대신 계산합니다.
+
+환경 변수:
+    GRADING_SHORT_ANSWER_THRESHOLD: 단답형 오타 허용 시 정답 유사도 기준 (기본값 0.8)
+    GRADING_SUBJECTIVE_THRESHOLD: 주관식 정답 유사도 기준 (기본값 0.5)
+    GRADING_NUMERIC_TOLERANCE: 숫자 정답 허용 상대 오차 (기본값 0.01)
+"""
+
+import os
+import re
+import math
+import logging
+import unicodedata
+from difflib import SequenceMatcher
+from dataclasses import dataclass
+from fractions import Fraction
+
+logger = logging.getLogger(__name__)
+
+# 문자 n-gram 범위 (한글 음절 2~4자 조합이 단어/조사 단위와 비슷함)
+NGRAM_RANGE = (2, 4)
+# 단답형 오타를 허용하는 최소 정답 길이 (정규화 후 문자 수, 짧은 단어는 한두 글자 차이로 뜻이 바뀜)
+SHORT_ANSWER_TYPO_MIN_LENGTH = 8
+# 단답형에서 허용하는 편집 거리 (정답 길이 이 문자 수당 1자)
+SHORT_ANSWER_CHARS_PER_TYPO = 8
+# 정답 앞에 붙으면 뜻이 반대가 되는 접두사 (정규화된 단답 비교용)
+NEGATION_PREFIXES = ('un', 'non', 'in', 'im', 'il', 'ir', 'dis', 'anti', 'de', 'a',
+                     '비', '불', '부', '무', '미', '반', '탈', '몰')
+
+_SPACES = re.compile(r'\s+')
+_PUNCTUATION = re.compile(r'[^\w\s.+\-/%]|(?<!\d)\.|\.(?!\d)')
+_NUMBER_SEPARATORS = re.compile(r'(?<=\d),(?=\d{3}\b)')
+_NEGATIONS = re.compile(r"\b(?:not|no|never|none|cannot)\b|n't|아니|않|없|못하|불가능")
+
+
+@dataclass
+class GradeResult:
+    """답안 하나의 채점 결과
+
+    Attributes:
+        is_correct: 정답 여부
+        similarity: 정답과의 유사도 (0.0 ~ 1.0, 완전 일치/숫자 일치는 1.0)
+        method: 판정 방식 ('exact', 'numeric', 'similarity', 'negation', 'empty')
+    """
+    is_correct: bool
+    similarity: float
+    method: str
+
+
+def _threshold(name, default):
+    return float(os.getenv(name, default))
+
+
+def normalize_answer(answer, strip_punctuation=False):
+    """비교용 답안 정규화 (NFKC, 소문자, 공백 제거, 선택적으로 문장 부호 제거)"""
+    answer = unicodedata.normalize('NFKC', answer or '').casefold()
+    if strip_punctuation:
+        answer = _PUNCTUATION.sub('', answer)
+    return _SPACES.sub('', answer)
+
+
+def parse_number(answer):
+    """숫자 답안을 파싱 (천 단위 쉼표, 분수, 백분율 허용, 숫자가 아니면 None)"""
+    text = _NUMBER_SEPARATORS.sub('', unicodedata.normalize('NFKC', answer or '').strip())
+    scale = 1
+    if text.endswith('%'):
+        text, scale = text[:-1].strip(), Fraction(1, 100)
+    if not text:
+        return None
+    try:
+        value = float(Fraction(text) * scale)
+    except (ValueError, ZeroDivisionError):
+        try:
+            value = float(text) * float(scale)
+        except ValueError:
+            return None
+    return value if math.isfinite(value) else None
+
+
+def numbers_match(user_value, correct_value, tolerance=None):
+    """허용 상대 오차 안에서 숫자가 같은지 확인"""
+    if tolerance is None:
+        tolerance = _threshold('GRADING_NUMERIC_TOLERANCE', '0.01')
+    return math.isclose(user_value, correct_value, rel_tol=tolerance, abs_tol=1e-9)
+
+
+def _text_similarities(pairs):
+    """(답안, 정답) 쌍의 TF-IDF 코사인 유사도를 한 번에 계산"""
+    if not pairs:
+        return []
+    try:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+    except ImportError:
+        logger.warning("scikit-learn을 불러올 수 없어 difflib 유사도로 채점합니다.")
+        return [SequenceMatcher(None, user, correct).ratio() for user, correct in pairs]
+
+    documents = [text for pair in pairs for text in pair]
+    vectorizer = TfidfVectorizer(analyzer='char_wb', ngram_range=NGRAM_RANGE, sublinear_tf=True)
+    try:
+        matrix = vectorizer.fit_transform(documents)
+    except ValueError:
+        # 모든 답안이 n-gram을 만들 수 없을 만큼 짧은 경우
+        return [float(user == correct) for user, correct in pairs]
+    # TF-IDF 행은 L2 정규화되어 있으므로 행별 내적이 코사인 유사도
+    users, corrects = matrix[0::2], matrix[1::2]
+    return [min(1.0, float(value)) for value in users.multiply(corrects).sum(axis=1).A1]
+
+
+def edit_distance(a, b):
+    """두 문자열의 레벤슈타인 편집 거리"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ch_a in enumerate(a, start=1):
+        current = [i]
+        for j, ch_b in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ch_a != ch_b)))
+        previous = current
+    return previous[-1]
+
+
+def _negation_count(text):
+    return len(_NEGATIONS.findall(unicodedata.normalize('NFKC', text or '').casefold()))
+
+
+def _opposite_meaning(user_answer, correct_answer, user_key=None, correct_key=None):
+    """답안이 정답의 반대 의미인지 확인
+
+    부정 표현 수가 다르거나, 정규화한 단답 키가 한쪽에 부정 접두사만 더한 형태이면 반대 의미로 봅니다.
+    """
+    if _negation_count(user_answer) != _negation_count(correct_answer):
+        return True
+    if not user_key or not correct_key or user_key == correct_key:
+        return False
+    shorter, longer = sorted((user_key, correct_key), key=len)
+    return longer.endswith(shorter) and longer[:-len(shorter)] in NEGATION_PREFIXES
+
+
+def _grade_short_answer(user_answer, correct_answer):
+    """단답형 채점: 정규화 일치 → 숫자 허용 오차 → 긴 정답의 오타 허용 (반대 의미 답안은 오답)"""
+    user_key, correct_key = normalize_answer(user_answer, True), normalize_answer(correct_answer, True)
+    if user_key == correct_key:
+        return GradeResult(True, 1.0, 'exact')
+    correct_value = parse_number(correct_answer)
+    if correct_value is not None:
+        user_value = parse_number(user_answer)
+        matched = user_value is not None and numbers_match(user_value, correct_value)
+        return GradeResult(matched, float(matched), 'numeric')
+    similarity = round(SequenceMatcher(None, user_key, correct_key).ratio(), 4)
+    if _opposite_meaning(user_answer, correct_answer, user_key, correct_key):
+        return GradeResult(False, similarity, 'negation')
+    if len(correct_key) < SHORT_ANSWER_TYPO_MIN_LENGTH:
+        return GradeResult(False, similarity, 'similarity')
+    threshold = _threshold('GRADING_SHORT_ANSWER_THRESHOLD', '0.8')
+    max_typos = len(correct_key) // SHORT_ANSWER_CHARS_PER_TYPO
+    matched = similarity >= threshold and edit_distance(user_key, correct_key) <= max_typos
+    return GradeResult(matched, similarity, 'similarity')
+
+
+def grade_answers(items):
+    """제출된 답안 전체를 채점
+
+    Args:
+        items: (문제 유형, 사용자 답안, 정답) 목록
+
+    Returns:
+        입력 순서와 같은 GradeResult 목록
+    """
+    results = [None] * len(items)
+    subjective = []  # TF-IDF 유사도를 한 번에 계산할 주관식 답안의 인덱스
+
+    for index, (question_type, user_answer, correct_answer) in enumerate(items):
+        user_answer = (user_answer or '').strip()
+        if not user_answer:
+            results[index] = GradeResult(False, 0.0, 'empty')
+        elif question_type == 'subjective':
+            subjective.append(index)
+        elif question_type == 'short_answer':
+            results[index] = _grade_short_answer(user_answer, correct_answer or '')
+        else:
+            matched = normalize_answer(user_answer) == normalize_answer(correct_answer)
+            results[index] = GradeResult(matched, float(matched), 'exact')
+
+    if subjective:
+        threshold = _threshold('GRADING_SUBJECTIVE_THRESHOLD', '0.5')
+        pairs = [tuple(unicodedata.normalize('NFKC', (text or '').strip()).casefold() for text in items[index][1:])
+                 for index in subjective]
+        for index, similarity in zip(subjective, _text_similarities(pairs)):
+            if _opposite_meaning(items[index][1], items[index][2]):
+                results[index] = GradeResult(False, round(similarity, 4), 'negation')
+            else:
+                results[index] = GradeResult(similarity >= threshold, round(similarity, 4), 'similarity')
+    return results
@@ -0,0 +1,85 @@
+"""
+gunicorn 설정 (프로덕션 서버)
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+요청 처리 시간 대부분은 LLM(Gemini) 호출 응답을 기다리는 I/O입니다. sync 워커는 호출 하나가 워커 프로세스 전체를
+수십 초씩 막으므로, 기본값으로 스레드 워커(gthread)를 사용해 프로세스당 여러 요청이 LLM 응답을 동시에 기다리게 합니다.
+- workers: CPU 코어 수 (JSON 직렬화/PDF 추출 등 CPU 작업은 GIL 때문에 프로세스 수만큼만 병렬 처리)
+- threads: 워커당 동시 요청 수 (대부분 LLM 응답 대기이므로 코어 수보다 크게)
+- gevent: GUNICORN_WORKER_CLASS=gevent이면 앱을 불러오기 전에 이 파일에서 monkey patch를 적용합니다.
+- preload_app: 마스터에서 앱(google.generativeai, PDF 라이브러리 포함, wsgi.py)을 한 번 불러온 뒤 fork하여 워커들이
+  메모리를 copy-on-write로 공유합니다. 스키마 마이그레이션은 서버 시작 전에 python migrations.py로 실행하고,
+  DB_MIGRATE_ON_START=1이면 마스터에서 한 번만 실행합니다. fork 후 워커에서는 post_fork 훅이
+  마스터의 DB 연결을 버리고 로그 리스너 스레드를 다시 시작합니다.
+- 워커 재활용: max_requests(+jitter)마다 워커를 교체해 장시간 실행에 따른 메모리 증가를 막습니다.
+- 타임아웃: LLM 호출 제한 시간(LLM_REQUEST_TIMEOUT_SECONDS)에 여유를 더해, 정상적인 긴 LLM 호출 중에는
+  워커가 종료되지 않고 재시작/재활용 시에도 진행 중인 호출이 끝날 때까지 기다립니다.
+
+환경 변수:
+    GUNICORN_BIND: 바인드 주소 (기본값 '0.0.0.0:5000')
+    GUNICORN_WORKERS: 워커 프로세스 수 (기본값 CPU 코어 수)
+    GUNICORN_WORKER_CLASS: 'gthread' (기본값), 'gevent', 'sync'
+    GUNICORN_THREADS: gthread 워커당 스레드 수 (기본값 32, sync 워커는 1)
+    GUNICORN_WORKER_CONNECTIONS: gevent 워커당 동시 연결 수 (기본값 200)
+    GUNICORN_PRELOAD: '0'이면 워커마다 앱을 따로 불러옴 (기본값 '1')
+    GUNICORN_MAX_REQUESTS: 워커 재활용 주기 (요청 수, 기본값 1000, 0이면 재활용 안 함)
+    GUNICORN_MAX_REQUESTS_JITTER: 재활용 주기에 더하는 무작위 편차 (기본값 100)
+    GUNICORN_TIMEOUT: 워커 응답 없음 타임아웃 (초, 기본값 LLM_REQUEST_TIMEOUT_SECONDS + 30)
+    GUNICORN_GRACEFUL_TIMEOUT: 종료/재시작 시 진행 중인 요청을 기다리는 시간 (초, 기본값 LLM_REQUEST_TIMEOUT_SECONDS + 10)
+    GUNICORN_KEEPALIVE: Keep-Alive 연결 유지 시간 (초, 기본값 5)
+    LLM_REQUEST_TIMEOUT_SECONDS: LLM 호출 한 번의 제한 시간 (초, 기본값 120, llm_provider와 같은 값)
+"""
+
+import os
+import multiprocessing
+
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_class == 'gevent':
+    # preload_app이면 앱 모듈이 마스터에서 import되므로, 그 전에 소켓/스레드 모듈을 패치해야 함
+    from gevent import monkey
+    monkey.patch_all()
+
+llm_timeout = float(os.getenv('LLM_REQUEST_TIMEOUT_SECONDS', '120'))
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', str(multiprocessing.cpu_count())))
+# sync 워커에 threads > 1을 주면 gunicorn이 gthread로 바꾸므로 sync는 1
+threads = int(os.getenv('GUNICORN_THREADS', '1' if worker_class == 'sync' else '32'))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '200'))
+preload_app = os.getenv('GUNICORN_PRELOAD', '1') != '0'
+
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '100'))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', str(int(llm_timeout) + 30)))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', str(int(llm_timeout) + 10)))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# 요청 로그는 앱의 요청 계측 로그(instrumentation)가 담당
+accesslog = None
+errorlog = '-'
+loglevel = os.getenv('LOG_LEVEL', 'info').lower()
+
+
+def post_fork(server, worker):
+    """fork 직후 워커에서 마스터로부터 물려받은 자원 정리"""
+    import jobs
+    from logging_setup import restart_after_fork
+
+    restart_after_fork()
+    jobs.reset_after_fork()
+    if server.cfg.preload_app:
+        from wsgi import app
+        from models import db
+
+        # 마스터가 앱 생성(사전 로드, 마이그레이션)에 사용한 SQLite 연결을 워커끼리 공유하지 않도록 풀만 버림 (연결은 닫지 않음)
+        with app.app_context():
+            db.engine.dispose(close=False)
+
+
+def worker_exit(server, worker):
+    """워커 종료(재활용 포함) 시 진행 중인 백그라운드 작업(리포트 생성 등)이 끝날 때까지 대기"""
+    import jobs
+
+    jobs.shutdown(wait=True)
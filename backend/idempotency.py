@@ -0,0 +1,177 @@
+"""
+멱등성 키 모듈
+퀴즈 생성/제출처럼 LLM 호출이나 백그라운드 작업을 시작하는 요청을 클라이언트가 재시도(더블 클릭, 타임아웃 후 재요청)해도
+한 번만 처리합니다. 클라이언트는 같은 작업의 재시도에 같은 Idempotency-Key 헤더를 보냅니다.
+
+- 처음 온 키는 IdempotencyKey 행(status='pending')을 만들어 점유한 뒤 요청을 처리하고, 응답(2xx와 400/403/404)을 저장합니다.
+  (scope, key) 유니크 제약으로 점유하므로 워커 프로세스가 여러 개여도 한 요청만 처리합니다.
+- 처리 중인 키로 온 요청은 처리가 끝날 때까지 기다렸다가 저장된 응답을 그대로 반환합니다 (새로 LLM을 호출하지 않음).
+  같은 프로세스의 요청은 이벤트로 바로 깨우고, 다른 워커의 요청은 DB를 주기적으로 다시 읽습니다
+  (기다리는 동안에는 트랜잭션을 끝내 풀 커넥션을 잡지 않음).
+- 처리가 끝난 키로 온 요청은 저장된 응답을 반환합니다 (응답 헤더 Idempotent-Replayed: true).
+- 같은 키로 본문이 다른 요청을 보내면 422, 대기 시간 안에 처리가 끝나지 않으면 409를 반환합니다.
+- 그 밖의 응답(5xx, 429, 자료 텍스트 추출 중 409처럼 나중에 다시 시도하면 결과가 달라지는 응답)이나
+  예외로 끝난 요청은 키를 지워, 같은 키로 재시도하면 다시 처리합니다.
+- 처리 중 프로세스가 종료되어 남은 pending 키는 IDEMPOTENCY_PENDING_TIMEOUT_SECONDS가 지나면 다음 요청이 넘겨받습니다.
+- 저장된 응답은 IDEMPOTENCY_TTL_HOURS가 지나면 새 키를 점유할 때 함께 지웁니다.
+
+환경 변수:
+    IDEMPOTENCY_ENABLED: '0'이면 Idempotency-Key 헤더를 무시 (기본값 '1')
+    IDEMPOTENCY_TTL_HOURS: 저장된 응답 보관 시간 (기본값 24)
+    IDEMPOTENCY_WAIT_SECONDS: 처리 중인 키의 응답을 기다리는 최대 시간 (기본값 LLM_REQUEST_TIMEOUT_SECONDS + 30)
+    IDEMPOTENCY_PENDING_TIMEOUT_SECONDS: pending 키를 버려진 것으로 보는 시간 (기본값 IDEMPOTENCY_WAIT_SECONDS의 2배)
+"""
+
+import os
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import request, jsonify, current_app
+from sqlalchemy.exc import IntegrityError
+
+from models import db, IdempotencyKey
+from artifacts import fingerprint
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 128
+# 다른 워커가 처리 중인 키의 완료 여부를 다시 읽는 간격 (초)
+POLL_INTERVAL_SECONDS = 0.25
+# 저장하는 4xx 응답 (같은 요청을 다시 보내도 결과가 같은 응답만, 409/429 등은 재시도 허용)
+STORED_CLIENT_ERRORS = frozenset({400, 403, 404})
+
+_LLM_TIMEOUT = float(os.getenv('LLM_REQUEST_TIMEOUT_SECONDS', '120'))
+TTL = timedelta(hours=float(os.getenv('IDEMPOTENCY_TTL_HOURS', '24')))
+WAIT_SECONDS = float(os.getenv('IDEMPOTENCY_WAIT_SECONDS', str(_LLM_TIMEOUT + 30)))
+PENDING_TIMEOUT = timedelta(seconds=float(os.getenv('IDEMPOTENCY_PENDING_TIMEOUT_SECONDS', str(WAIT_SECONDS * 2))))
+
+# 이 프로세스에서 처리 중인 키 {(scope, key): Event} - 같은 프로세스의 대기 요청을 바로 깨움
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def is_enabled():
+    return os.getenv('IDEMPOTENCY_ENABLED', '1') != '0'
+
+
+def _replay(record):
+    response = current_app.response_class(record.response_body, status=record.status_code, mimetype='application/json')
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _claim(scope, key, request_fingerprint):
+    """키 점유 시도 (점유하면 None, 이미 있는 키면 그 행 반환)"""
+    now = datetime.utcnow()
+    IdempotencyKey.query.filter(IdempotencyKey.created_at < now - TTL).delete(synchronize_session=False)
+    IdempotencyKey.query.filter(
+        IdempotencyKey.scope == scope, IdempotencyKey.key == key,
+        IdempotencyKey.status == 'pending', IdempotencyKey.created_at < now - PENDING_TIMEOUT,
+    ).delete(synchronize_session=False)
+    db.session.add(IdempotencyKey(scope=scope, key=key, request_fingerprint=request_fingerprint,
+                                  status='pending', created_at=now))
+    try:
+        db.session.commit()
+        return None
+    except IntegrityError:
+        db.session.rollback()
+        return IdempotencyKey.query.filter_by(scope=scope, key=key).first()
+
+
+def _wait(scope, key):
+    """처리 중인 키가 완료될 때까지 대기 (완료된 행, 키가 지워졌으면 None, 시간 초과면 pending 행 반환)"""
+    with _in_flight_lock:
+        event = _in_flight.get((scope, key))
+    deadline = time.monotonic() + WAIT_SECONDS
+    # 대기 중에는 쓰기가 없으므로 트랜잭션을 끝내고 다른 요청이 commit한 최신 상태를 읽음
+    db.session.rollback()
+    while True:
+        record = IdempotencyKey.query.filter_by(scope=scope, key=key).first()
+        if record is None or record.status == 'done' or time.monotonic() >= deadline:
+            return record
+        # 기다리는 동안 풀 커넥션을 잡지 않도록 읽기 트랜잭션 종료
+        db.session.rollback()
+        if event is not None:
+            event.wait(POLL_INTERVAL_SECONDS)
+        else:
+            time.sleep(POLL_INTERVAL_SECONDS)
+
+
+def _is_stored(response):
+    """응답을 저장하여 같은 키의 재시도에 그대로 반환할지 여부"""
+    if response is None or response.is_streamed:
+        return False
+    return 200 <= response.status_code < 300 or response.status_code in STORED_CLIENT_ERRORS
+
+
+def _finish(scope, key, response):
+    """처리 결과 저장 (다시 시도하면 결과가 달라질 수 있는 응답이면 키를 지워 재시도 허용)"""
+    db.session.rollback()
+    record = IdempotencyKey.query.filter_by(scope=scope, key=key).first()
+    if record is not None:
+        if _is_stored(response):
+            record.status = 'done'
+            record.status_code = response.status_code
+            record.response_body = response.get_data(as_text=True)
+            record.completed_at = datetime.utcnow()
+        else:
+            db.session.delete(record)
+        db.session.commit()
+
+
+def idempotent(scope):
+    """Idempotency-Key 헤더가 있는 요청을 키마다 한 번만 처리하는 뷰 데코레이터
+
+    Args:
+        scope: 키가 적용되는 범위 이름. URL 변수를 넣으려면 format 문자열 사용 (예: 'quiz_submit:{quiz_id}')
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = request.headers.get(HEADER, '').strip()
+            if not key or not is_enabled():
+                return view(*args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                return jsonify({'error': f'{HEADER}는 {MAX_KEY_LENGTH}자 이하여야 합니다.'}), 400
+
+            view_scope = scope.format(**kwargs)
+            request_fingerprint = fingerprint(request.get_data(as_text=True))
+            record = _claim(view_scope, key, request_fingerprint)
+            if record is not None:
+                if record.request_fingerprint != request_fingerprint:
+                    return jsonify({'error': f'{HEADER}가 다른 요청에 이미 사용되었습니다.',
+                                    'error_code': 'IDEMPOTENCY_KEY_REUSED'}), 422
+                if record.status == 'pending':
+                    logger.info("처리 중인 요청 대기 (%s, %s)", view_scope, key)
+                    record = _wait(view_scope, key)
+                if record is None:
+                    # 먼저 온 요청이 실패하여 키가 지워짐 - 같은 키로 다시 점유하여 처리
+                    return wrapper(*args, **kwargs)
+                if record.status == 'pending':
+                    return jsonify({'error': '같은 요청을 아직 처리하고 있습니다. 잠시 후 다시 시도해주세요.',
+                                    'error_code': 'REQUEST_IN_PROGRESS'}), 409
+                logger.info("저장된 응답 반환 (%s, %s)", view_scope, key)
+                return _replay(record)
+
+            event = threading.Event()
+            with _in_flight_lock:
+                _in_flight[(view_scope, key)] = event
+            response = None
+            try:
+                response = current_app.make_response(view(*args, **kwargs))
+                return response
+            finally:
+                try:
+                    _finish(view_scope, key, response)
+                except Exception:
+                    db.session.rollback()
+                    logger.exception("멱등성 키 저장 실패 (%s, %s)", view_scope, key)
+                with _in_flight_lock:
+                    _in_flight.pop((view_scope, key), None)
+                event.set()
+        return wrapper
+    return decorator
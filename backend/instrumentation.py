@@ -0,0 +1,338 @@
+"""
+요청 단위 성능 계측 모듈
+요청마다 처리 시간, SQL 실행 횟수/시간, PDF 텍스트 추출 시간, LLM 호출 횟수/지연/토큰 수를 수집하여
+Server-Timing 응답 헤더, 구조화된(JSON) 로그 한 줄, /metrics(Prometheus 텍스트 형식) 집계로 노출합니다.
+
+DB 커넥션 풀의 checkout/checkin을 추적하여, 요청(또는 백그라운드 작업 스레드)이 풀 커넥션을 잡은 채로
+LLM을 호출하면 llm_db_held로 기록하고 경고 로그를 남깁니다 (db_lifecycle.release_session 참고).
+
+집계 값은 프로세스 단위입니다. 여러 워커로 실행하면 워커마다 별도로 집계됩니다.
+
+환경 변수:
+    REQUEST_METRICS_LOG: '0'이면 요청별 계측 로그 출력 비활성화 (기본값 '1')
+    METRICS_TOKEN: 설정하면 /metrics 요청에 'Authorization: Bearer <토큰>' 헤더 필요
+        (설정하지 않으면 같은 호스트(127.0.0.1, ::1)에서 온 요청만 허용)
+"""
+
+import os
+import hmac
+import time
+import logging
+import threading
+import contextvars
+
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+metrics_logger = logging.getLogger('metrics')
+
+# 요청 처리 시간 히스토그램 버킷 (초) - LLM 호출이 포함된 요청은 수십 초까지 걸릴 수 있음
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class RequestMetrics:
+    """한 요청 동안 누적되는 계측 값"""
+
+    __slots__ = ('start', 'sql_count', 'sql_time', 'pdf_count', 'pdf_time',
+                 'llm_count', 'llm_errors', 'llm_time', 'llm_prompt_tokens', 'llm_output_tokens', 'llm_db_held')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.pdf_count = 0
+        self.pdf_time = 0.0
+        self.llm_count = 0
+        self.llm_errors = 0
+        self.llm_time = 0.0
+        self.llm_prompt_tokens = 0
+        self.llm_output_tokens = 0
+        self.llm_db_held = 0
+
+
+class MetricsRegistry:
+    """엔드포인트별 누적 집계 (스레드 안전)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests = {}      # (endpoint, method, status) -> count
+        self._endpoints = {}     # endpoint -> 누적 값 딕셔너리
+
+    def _endpoint_stats(self, endpoint):
+        stats = self._endpoints.get(endpoint)
+        if stats is None:
+            stats = {
+                'duration_buckets': [0] * len(DURATION_BUCKETS),
+                'duration_count': 0,
+                'duration_sum': 0.0,
+                'sql_count': 0,
+                'sql_time': 0.0,
+                'pdf_count': 0,
+                'pdf_time': 0.0,
+                'llm_count': 0,
+                'llm_errors': 0,
+                'llm_time': 0.0,
+                'llm_prompt_tokens': 0,
+                'llm_output_tokens': 0,
+                'llm_db_held': 0,
+            }
+            self._endpoints[endpoint] = stats
+        return stats
+
+    def observe(self, endpoint, method, status, duration, metrics):
+        with self._lock:
+            key = (endpoint, method, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+            stats = self._endpoint_stats(endpoint)
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    stats['duration_buckets'][i] += 1
+            stats['duration_count'] += 1
+            stats['duration_sum'] += duration
+            stats['sql_count'] += metrics.sql_count
+            stats['sql_time'] += metrics.sql_time
+            stats['pdf_count'] += metrics.pdf_count
+            stats['pdf_time'] += metrics.pdf_time
+            stats['llm_count'] += metrics.llm_count
+            stats['llm_errors'] += metrics.llm_errors
+            stats['llm_time'] += metrics.llm_time
+            stats['llm_prompt_tokens'] += metrics.llm_prompt_tokens
+            stats['llm_output_tokens'] += metrics.llm_output_tokens
+            stats['llm_db_held'] += metrics.llm_db_held
+
+    def render_prometheus(self):
+        """Prometheus 텍스트 노출 형식(0.0.4)으로 직렬화"""
+        with self._lock:
+            requests = dict(self._requests)
+            endpoints = {name: dict(stats, duration_buckets=list(stats['duration_buckets']))
+                         for name, stats in self._endpoints.items()}
+
+        lines = [
+            '# HELP http_requests_total Total HTTP requests.',
+            '# TYPE http_requests_total counter',
+        ]
+        for (endpoint, method, status), count in sorted(requests.items()):
+            lines.append(f'http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}')
+
+        lines += [
+            '# HELP http_request_duration_seconds Request wall time.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for endpoint, stats in sorted(endpoints.items()):
+            for bound, count in zip(DURATION_BUCKETS, stats['duration_buckets']):
+                lines.append(f'http_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}')
+            lines.append(f'http_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {stats["duration_count"]}')
+            lines.append(f'http_request_duration_seconds_sum{{endpoint="{endpoint}"}} {stats["duration_sum"]:.6f}')
+            lines.append(f'http_request_duration_seconds_count{{endpoint="{endpoint}"}} {stats["duration_count"]}')
+
+        counters = [
+            ('db_queries_total', 'SQL statements executed.', 'sql_count', None),
+            ('db_query_seconds_total', 'Time spent executing SQL statements.', 'sql_time', None),
+            ('pdf_extractions_total', 'PDF text extractions.', 'pdf_count', None),
+            ('pdf_extraction_seconds_total', 'Time spent extracting PDF text.', 'pdf_time', None),
+            ('llm_calls_total', 'LLM generate calls.', 'llm_count', None),
+            ('llm_errors_total', 'Failed LLM generate calls.', 'llm_errors', None),
+            ('llm_call_seconds_total', 'Time spent waiting on LLM calls.', 'llm_time', None),
+            ('llm_tokens_total', 'LLM tokens consumed.', 'llm_prompt_tokens', 'prompt'),
+            ('llm_tokens_total', 'LLM tokens consumed.', 'llm_output_tokens', 'output'),
+            ('llm_calls_holding_db_connection_total', 'LLM calls started while holding a pooled DB connection.',
+             'llm_db_held', None),
+        ]
+        declared = set()
+        for metric, help_text, field, token_type in counters:
+            if metric not in declared:
+                lines.append(f'# HELP {metric} {help_text}')
+                lines.append(f'# TYPE {metric} counter')
+                declared.add(metric)
+            for endpoint, stats in sorted(endpoints.items()):
+                value = stats[field]
+                value = f'{value:.6f}' if isinstance(value, float) else value
+                labels = f'endpoint="{endpoint}"' + (f',type="{token_type}"' if token_type else '')
+                lines.append(f'{metric}{{{labels}}} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._requests.clear()
+            self._endpoints.clear()
+
+
+registry = MetricsRegistry()
+
+
+# 요청 하나를 여러 스레드로 나눠 처리할 때(퀴즈 분할 생성 등) 원래 요청의 계측 값에 기록하기 위한 컨텍스트 변수
+job_metrics = contextvars.ContextVar('job_metrics', default=None)
+_record_lock = threading.Lock()
+
+
+def current_metrics():
+    """현재 요청의 RequestMetrics (요청 컨텍스트 밖이면 job_metrics에 전달된 값 또는 None)"""
+    if not has_request_context():
+        return job_metrics.get()
+    return g.get('_request_metrics')
+
+
+def record_pdf_extraction(seconds):
+    """PDF 텍스트 추출 1회 기록"""
+    metrics = current_metrics()
+    if metrics is not None:
+        metrics.pdf_count += 1
+        metrics.pdf_time += seconds
+
+
+def record_llm_call(latency, prompt_tokens=0, output_tokens=0, error=False, db_held=False):
+    """LLM 호출 1회 기록 (db_held: 호출을 시작할 때 DB 커넥션을 잡고 있었는지)"""
+    metrics = current_metrics()
+    if metrics is not None:
+        # 분할 생성 스레드들이 같은 요청의 값에 동시에 더할 수 있음
+        with _record_lock:
+            metrics.llm_count += 1
+            metrics.llm_time += latency
+            metrics.llm_prompt_tokens += prompt_tokens
+            metrics.llm_output_tokens += output_tokens
+            if error:
+                metrics.llm_errors += 1
+            if db_held:
+                metrics.llm_db_held += 1
+
+
+# ---------- DB 커넥션 풀 이벤트 ----------
+
+# 풀에서 꺼낸 커넥션 {커넥션 레코드: 소유자} - 소유자는 요청의 RequestMetrics (요청 밖이면 스레드 ID)
+# fan_out 스레드는 원래 요청의 RequestMetrics를 이어받으므로 요청 스레드가 잡은 커넥션도 확인할 수 있음
+_checked_out = {}
+_checked_out_lock = threading.Lock()
+
+
+def _connection_owner():
+    metrics = current_metrics()
+    return metrics if metrics is not None else threading.get_ident()
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    owner = _connection_owner()
+    with _checked_out_lock:
+        _checked_out[connection_record] = owner
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    with _checked_out_lock:
+        _checked_out.pop(connection_record, None)
+
+
+def db_connection_held():
+    """현재 요청(요청 밖이면 현재 스레드)이 풀 커넥션을 잡고 있는지 여부"""
+    owner = _connection_owner()
+    with _checked_out_lock:
+        return any(held_by == owner for held_by in _checked_out.values())
+
+
+# ---------- SQLAlchemy 엔진 이벤트 ----------
+
+_sql_listeners_installed = False
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_query_start_times', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get('_query_start_times')
+    if not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+    metrics = current_metrics()
+    if metrics is not None:
+        metrics.sql_count += 1
+        metrics.sql_time += elapsed
+
+
+def _install_sql_listeners():
+    global _sql_listeners_installed
+    if _sql_listeners_installed:
+        return
+    # 모든 엔진에 적용 (create_app이 여러 번 호출되어도 한 번만 등록)
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(Pool, 'checkout', _on_checkout)
+    event.listen(Pool, 'checkin', _on_checkin)
+    _sql_listeners_installed = True
+
+
+# ---------- Flask 연동 ----------
+
+def _server_timing(metrics, duration):
+    parts = [f'app;dur={duration * 1000:.1f}']
+    parts.append(f'db;dur={metrics.sql_time * 1000:.1f};desc="{metrics.sql_count} queries"')
+    if metrics.pdf_count:
+        parts.append(f'pdf;dur={metrics.pdf_time * 1000:.1f};desc="{metrics.pdf_count} files"')
+    if metrics.llm_count:
+        parts.append(f'llm;dur={metrics.llm_time * 1000:.1f};desc="{metrics.llm_count} calls"')
+    if metrics.llm_db_held:
+        parts.append(f'llm-db-held;desc="{metrics.llm_db_held} calls"')
+    return ', '.join(parts)
+
+
+LOOPBACK_ADDRESSES = frozenset({'127.0.0.1', '::1'})
+
+
+def metrics_access_allowed():
+    """현재 요청이 /metrics를 읽을 수 있는지 (엔드포인트 목록, 요청 수, LLM 사용량이 외부에 노출되지 않도록)"""
+    token = os.getenv('METRICS_TOKEN')
+    if token:
+        scheme, _, provided = request.headers.get('Authorization', '').partition(' ')
+        return scheme.lower() == 'bearer' and hmac.compare_digest(provided.strip().encode(), token.encode())
+    return request.remote_addr in LOOPBACK_ADDRESSES
+
+
+def init_instrumentation(app):
+    """요청 계측 훅 등록 (/metrics 라우트는 app.py에서 등록)"""
+    _install_sql_listeners()
+
+    log_enabled = os.getenv('REQUEST_METRICS_LOG', '1') != '0'
+
+    @app.before_request
+    def start_request_metrics():
+        g._request_metrics = RequestMetrics()
+
+    @app.after_request
+    def finish_request_metrics(response):
+        metrics = g.pop('_request_metrics', None)
+        if metrics is None:
+            return response
+
+        duration = time.perf_counter() - metrics.start
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        registry.observe(endpoint, request.method, response.status_code, duration, metrics)
+
+        response.headers['Server-Timing'] = _server_timing(metrics, duration)
+        response.headers['Timing-Allow-Origin'] = '*'
+
+        if log_enabled:
+            # 필드는 extra로 전달되어 JSON 로그의 최상위 키가 됨
+            metrics_logger.info(
+                "%s %s %s %.1fms", request.method, request.path, response.status_code, duration * 1000,
+                extra={
+                    'event': 'request',
+                    'method': request.method,
+                    'path': request.path,
+                    'endpoint': endpoint,
+                    'status': response.status_code,
+                    'duration_ms': round(duration * 1000, 2),
+                    'sql_count': metrics.sql_count,
+                    'sql_ms': round(metrics.sql_time * 1000, 2),
+                    'pdf_count': metrics.pdf_count,
+                    'pdf_ms': round(metrics.pdf_time * 1000, 2),
+                    'llm_count': metrics.llm_count,
+                    'llm_errors': metrics.llm_errors,
+                    'llm_ms': round(metrics.llm_time * 1000, 2),
+                    'llm_prompt_tokens': metrics.llm_prompt_tokens,
+                    'llm_output_tokens': metrics.llm_output_tokens,
+                    'llm_db_held': metrics.llm_db_held,
+                }
+            )
+        return response
@@ -0,0 +1,115 @@
+"""
+백그라운드 작업 실행 모듈
+요청 처리와 분리해도 되는 느린 작업(LLM 리포트 생성 등)을 프로세스 내 스레드 풀에서 실행합니다.
+
+각 작업은 애플리케이션 컨텍스트 안에서 실행되며, 작업이 끝나면 스레드의 DB 세션을 정리합니다.
+작업 상태는 호출하는 쪽이 DB에 기록합니다 (예: QuizReport.status). 프로세스가 재시작되면
+실행 중이던 작업은 사라지므로, 상태 조회 쪽에서 오래된 pending 상태를 실패로 간주해야 합니다.
+
+요청 하나가 LLM 호출 여러 개를 동시에 기다려야 할 때(퀴즈 분할 생성, 자료별 요약)는 fan_out으로
+별도 스레드 풀에서 실행합니다. 백그라운드 작업과 풀을 나눠, 오래 걸리는 리포트 작업이 요청 응답을 막지 않게 합니다.
+
+환경 변수:
+    BACKGROUND_JOB_WORKERS: 작업 스레드 수 (기본값 4)
+    LLM_FANOUT_WORKERS: fan_out 스레드 수 (프로세스 전체, 기본값 8)
+"""
+
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from models import db
+from logging_setup import job_request_id, current_request_id
+from instrumentation import job_metrics, current_metrics
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_fanout_executor = None
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            max_workers = int(os.getenv('BACKGROUND_JOB_WORKERS', '4'))
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        return _executor
+
+
+def submit_job(app, name, func, *args, **kwargs):
+    """func(*args, **kwargs)를 앱 컨텍스트 안에서 백그라운드 실행하고 Future 반환
+
+    Args:
+        app: Flask 애플리케이션
+        name: 로그에 표시할 작업 이름
+        func: 실행할 함수 (예외는 로그로 남기고 삼킴 - 상태 기록은 func의 책임)
+    """
+    request_id = current_request_id()
+
+    def run():
+        job_request_id.set(request_id)
+        with app.app_context():
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                logger.exception("백그라운드 작업 실패: %s", name)
+            finally:
+                db.session.remove()
+
+    logger.debug("백그라운드 작업 등록: %s", name)
+    return _get_executor().submit(run)
+
+
+def _get_fanout_executor():
+    global _fanout_executor
+    with _executor_lock:
+        if _fanout_executor is None:
+            max_workers = int(os.getenv('LLM_FANOUT_WORKERS', '8'))
+            _fanout_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fanout')
+        return _fanout_executor
+
+
+def fan_out(func, items):
+    """요청 처리 중 func(item)을 항목마다 동시에 실행하고 결과를 항목 순서대로 반환
+
+    각 호출은 원래 요청의 요청 ID와 계측 값(LLM 호출 수/지연)을 이어받습니다. 앱 컨텍스트가 없으므로
+    func는 DB를 사용하지 않아야 합니다 (입력은 미리 읽어서 넘기고, 결과 저장은 호출한 쪽에서).
+    func에서 발생한 예외는 그대로 다시 발생합니다.
+    """
+    request_id, metrics = current_request_id(), current_metrics()
+
+    def run(item):
+        job_request_id.set(request_id)
+        token = job_metrics.set(metrics)
+        try:
+            return func(item)
+        finally:
+            job_metrics.reset(token)
+
+    items = list(items)
+    if len(items) <= 1:
+        return [func(item) for item in items]
+    return list(_get_fanout_executor().map(run, items))
+
+
+def shutdown(wait=True):
+    """작업 스레드 풀 종료 (gunicorn 워커 종료 훅, 테스트/벤치마크용)"""
+    global _executor, _fanout_executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
+        if _fanout_executor is not None:
+            _fanout_executor.shutdown(wait=wait)
+            _fanout_executor = None
+
+
+def reset_after_fork():
+    """fork된 자식 프로세스에서 부모의 스레드 풀을 버림 (스레드는 복제되지 않으므로 다음 작업 등록 때 새로 생성)"""
+    global _executor, _fanout_executor, _executor_lock
+    _executor_lock = threading.Lock()
+    _executor = None
+    _fanout_executor = None
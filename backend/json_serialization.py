@@ -0,0 +1,117 @@
+"""
+JSON 직렬화 모듈
+API 응답 JSON을 orjson으로 직렬화하는 Flask JSON 프로바이더와, 모델의 to_dict에서 사용하는
+모델별 직렬화 함수(compile_serializer)를 제공합니다.
+
+- OrjsonProvider: jsonify/request.get_json을 orjson으로 처리합니다. datetime/date는 orjson이 ISO 8601 문자열로
+  직렬화하므로(기존 to_dict의 isoformat()과 같은 형식) 직렬화 함수는 datetime 객체를 그대로 둡니다.
+  한글은 \\uXXXX로 이스케이프하지 않고 UTF-8 그대로 보내며, 키 정렬은 하지 않습니다.
+- orjson을 불러올 수 없으면 표준 json 기반 기본 프로바이더에 datetime/date를 ISO 8601로 바꾸는 처리만 추가하여 사용합니다.
+- compile_serializer: 필드 목록으로 모델별 직렬화 함수를 한 번 생성(exec)합니다. 생성된 함수는 속성 디스크립터를 거치지 않고
+  인스턴스 __dict__에서 컬럼 값을 바로 읽고, 로드되지 않은 속성(지연 로딩/만료)만 getattr로 읽습니다.
+"""
+
+import json
+import decimal
+import logging
+from datetime import date, datetime
+
+from flask.json.provider import JSONProvider, DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json 사용
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def _default(o):
+    """orjson이 기본으로 직렬화하지 않는 타입 처리 (Flask 기본 프로바이더와 같은 규칙)"""
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def json_loads(s):
+    """JSON 문자열 파싱 (orjson이 있으면 orjson 사용)"""
+    return orjson.loads(s) if orjson is not None else json.loads(s)
+
+
+class OrjsonProvider(JSONProvider):
+    """orjson 기반 Flask JSON 프로바이더"""
+
+    mimetype = 'application/json'
+    # 퀴즈 답안처럼 정수 키를 가진 딕셔너리도 표준 json과 같이 문자열 키로 직렬화
+    option = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default, option=self.option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self.option | orjson.OPT_APPEND_NEWLINE
+        if self._app.debug:
+            option |= orjson.OPT_INDENT_2
+        return self._app.response_class(orjson.dumps(obj, default=_default, option=option), mimetype=self.mimetype)
+
+
+class IsoDateJSONProvider(DefaultJSONProvider):
+    """orjson이 없을 때 사용하는 표준 json 프로바이더 (datetime/date를 orjson과 같은 ISO 8601로 직렬화)"""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, (datetime, date)):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+
+def init_json_provider(app):
+    """앱의 JSON 프로바이더 설정"""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+    else:
+        logger.warning("orjson을 불러올 수 없어 표준 json으로 응답을 직렬화합니다.")
+        app.json = IsoDateJSONProvider(app)
+
+
+def compile_serializer(name, fields, json_fields=None, or_defaults=None):
+    """모델 인스턴스를 딕셔너리로 바꾸는 직렬화 함수 생성
+
+    Args:
+        name: 생성할 함수 이름 (디버깅용)
+        fields: 출력할 컬럼 속성 이름 목록 (출력 순서)
+        json_fields: {속성 이름: 값이 비었을 때 출력할 값} JSON 문자열 컬럼을 파싱하여 출력 (값은 리터럴로 생성 코드에 들어감)
+        or_defaults: {속성 이름: 값이 비었을 때 출력할 값} (예: theme이 없으면 'light')
+
+    Returns:
+        serialize(instance) -> dict
+    """
+    json_fields = json_fields or {}
+    or_defaults = or_defaults or {}
+    namespace = {'_MISSING': _MISSING, '_loads': json_loads}
+    lines = [f'def {name}(obj):', '    d = obj.__dict__']
+    items = []
+    for index, field in enumerate(fields):
+        var = f'v{index}'
+        lines.append(f'    {var} = d.get({field!r}, _MISSING)')
+        lines.append(f'    if {var} is _MISSING:')
+        lines.append(f'        {var} = obj.{field}')
+        if field in json_fields:
+            items.append(f'{field!r}: _loads({var}) if {var} else {json_fields[field]!r}')
+        elif field in or_defaults:
+            items.append(f'{field!r}: {var} or {or_defaults[field]!r}')
+        else:
+            items.append(f'{field!r}: {var}')
+    lines.append('    return {' + ', '.join(items) + '}')
+    exec('\n'.join(lines), namespace)
+    return namespace[name]
@@ -0,0 +1,385 @@
+"""
+LLM 프로바이더 모듈
+Gemini API 호출을 프로바이더 인터페이스 뒤로 감싸고, 오프라인 부하 테스트용 결정적 Fake 프로바이더를 제공합니다.
+
+환경 변수:
+    LLM_PROVIDER: 'gemini' (기본값) 또는 'fake'
+    LLM_REQUEST_TIMEOUT_SECONDS: Gemini 호출 한 번의 제한 시간 (초, 기본값 120, gunicorn.conf.py의 워커 타임아웃 기준)
+    FAKE_LLM_LATENCY_MS: Fake 응답 지연 시간 (밀리초, 기본값 0)
+    FAKE_LLM_JITTER_MS: 지연 시간에 더해지는 무작위 편차 (밀리초, 기본값 0)
+    FAKE_LLM_TOKEN_LATENCY_MS: 출력 토큰당 추가 지연 시간 (밀리초, 기본값 0 - 실제 모델처럼 긴 응답일수록 느리게)
+    FAKE_LLM_ERROR_RATE: 일반 오류(500) 발생 확률 (0.0 ~ 1.0)
+    FAKE_LLM_429_RATE: 할당량 초과(429) 오류 발생 확률 (0.0 ~ 1.0)
+    FAKE_LLM_SEED: 난수 시드 (기본값 0)
+"""
+
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from instrumentation import record_llm_call, db_connection_held
+
+logger = logging.getLogger(__name__)
+
+# LLM 호출 한 번의 제한 시간 (gunicorn.conf.py가 같은 환경 변수로 워커 타임아웃을 정함)
+REQUEST_TIMEOUT_SECONDS = float(os.getenv('LLM_REQUEST_TIMEOUT_SECONDS', '120'))
+
+
+@dataclass
+class LLMResponse:
+    """LLM 응답
+
+    Attributes:
+        text: 생성된 텍스트
+        model: 응답을 생성한 모델명
+        prompt_tokens: 입력 토큰 수 (알 수 없으면 0)
+        output_tokens: 출력 토큰 수 (알 수 없으면 0)
+        latency: 호출 소요 시간 (초)
+    """
+    text: str
+    model: str
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    latency: float = 0.0
+
+
+class LLMProvider:
+    """LLM 프로바이더 인터페이스
+
+    app.py의 각 엔드포인트는 이 인터페이스만 사용하여 모델 목록을 조회하고 콘텐츠를 생성합니다.
+    purpose는 호출 목적('syllabus_analysis', 'concept', 'quiz', 'quiz_report', 'study_plan', 'study_plan_message', 'material_summary')을 나타냅니다.
+    """
+    name = 'base'
+
+    def list_models(self):
+        """generateContent를 지원하는 모델 이름 목록 반환 ('models/' 접두사 제외)"""
+        raise NotImplementedError
+
+    def generate(self, model_name, prompt, purpose='generic', generation_config=None):
+        """프롬프트로 콘텐츠를 생성하여 LLMResponse 반환
+
+        Args:
+            model_name: 사용할 모델 이름
+            prompt: 프롬프트 문자열
+            purpose: 호출 목적
+            generation_config: temperature, top_p, top_k, max_output_tokens 등을 담은 딕셔너리
+        """
+        # 호출 동안 DB 커넥션(SQLite에서는 열린 트랜잭션)을 잡고 있으면 다른 요청의 쓰기와 커넥션 풀이 막힘
+        db_held = db_connection_held()
+        if db_held:
+            logger.warning("DB 커넥션을 잡은 채 LLM을 호출합니다 (purpose: %s) - 호출 전에 세션을 반환하세요", purpose)
+        start_time = time.time()
+        try:
+            response = self._generate(model_name, prompt, purpose, generation_config)
+        except Exception:
+            record_llm_call(time.time() - start_time, error=True, db_held=db_held)
+            raise
+        record_llm_call(response.latency, response.prompt_tokens, response.output_tokens, db_held=db_held)
+        return response
+
+    def _generate(self, model_name, prompt, purpose, generation_config):
+        """프로바이더별 실제 생성 로직 (하위 클래스에서 구현)"""
+        raise NotImplementedError
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini API 프로바이더
+
+    google.generativeai는 import에 수백 ms가 걸리므로 모듈 최상단이 아니라 프로바이더를 처음 만들 때 불러옵니다
+    (Fake 프로바이더, 스크립트, 워커 시작 시간에서 제외).
+    """
+    name = 'gemini'
+
+    def __init__(self, api_key):
+        import google.generativeai as genai
+
+        self.api_key = api_key
+        self.genai = genai
+        genai.configure(api_key=api_key)
+
+    def list_models(self):
+        available_models = []
+        for m in self.genai.list_models():
+            if 'generateContent' in m.supported_generation_methods:
+                available_models.append(m.name.replace('models/', ''))  # 'models/gemini-pro' -> 'gemini-pro'
+        return available_models
+
+    def _generate(self, model_name, prompt, purpose, generation_config):
+        model = self.genai.GenerativeModel(model_name)
+        start_time = time.time()
+        if generation_config:
+            response = model.generate_content(
+                prompt,
+                generation_config=self.genai.types.GenerationConfig(**generation_config),
+                request_options={'timeout': REQUEST_TIMEOUT_SECONDS}
+            )
+        else:
+            response = model.generate_content(prompt, request_options={'timeout': REQUEST_TIMEOUT_SECONDS})
+        latency = time.time() - start_time
+
+        usage = getattr(response, 'usage_metadata', None)
+        return LLMResponse(
+            text=response.text if response else '',
+            model=model_name,
+            prompt_tokens=getattr(usage, 'prompt_token_count', 0) or 0,
+            output_tokens=getattr(usage, 'candidates_token_count', 0) or 0,
+            latency=latency
+        )
+
+
+class FakeLLMProvider(LLMProvider):
+    """결정적 로컬 Fake 프로바이더 (네트워크/API 키 불필요)
+
+    같은 프롬프트에는 항상 같은 응답을 반환하며, 각 purpose별로 실제 엔드포인트가 파싱할 수 있는
+    스키마(강의계획서 분석 JSON, 개념 학습 Markdown, 자료 요약 노트 Markdown, 퀴즈 JSON 배열, 리포트, 학습 계획 JSON)를 따릅니다.
+    지연 시간, 오류율, 429 주입은 생성자 인자 또는 FAKE_LLM_* 환경 변수로 설정합니다.
+    """
+    name = 'fake'
+    MODELS = ['gemini-2.5-flash', 'gemini-1.5-pro', 'gemini-1.5-flash']
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, rate_limit_rate=0.0, seed=0, token_latency_ms=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.token_latency_ms = token_latency_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            latency_ms=float(os.getenv('FAKE_LLM_LATENCY_MS', '0')),
+            jitter_ms=float(os.getenv('FAKE_LLM_JITTER_MS', '0')),
+            error_rate=float(os.getenv('FAKE_LLM_ERROR_RATE', '0')),
+            rate_limit_rate=float(os.getenv('FAKE_LLM_429_RATE', '0')),
+            seed=int(os.getenv('FAKE_LLM_SEED', '0')),
+            token_latency_ms=float(os.getenv('FAKE_LLM_TOKEN_LATENCY_MS', '0'))
+        )
+
+    def list_models(self):
+        return list(self.MODELS)
+
+    def _generate(self, model_name, prompt, purpose, generation_config):
+        with self._lock:
+            delay = self.latency_ms + (self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+            roll_429 = self._rng.random()
+            roll_error = self._rng.random()
+
+        start_time = time.time()
+        builder = {
+            'syllabus_analysis': self._syllabus_analysis,
+            'concept': self._concept,
+            'material_summary': self._material_summary,
+            'quiz': self._quiz,
+            'quiz_report': self._quiz_report,
+            'study_plan': self._study_plan,
+            'study_plan_message': self._study_plan_message,
+        }.get(purpose, self._concept)
+        text = builder(prompt, _seed_for(prompt))
+        if self.token_latency_ms:
+            delay += estimate_tokens(text) * self.token_latency_ms
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+        # 실제 Gemini 오류 메시지와 같은 문자열을 사용하여 기존 오류 분기 로직이 그대로 동작하도록 함
+        if roll_429 < self.rate_limit_rate:
+            raise Exception("429 Resource has been exhausted (e.g. check quota). [fake]")
+        if roll_error < self.error_rate:
+            raise Exception("500 An internal error has occurred. [fake]")
+
+        return LLMResponse(
+            text=text,
+            model=model_name,
+            prompt_tokens=estimate_tokens(prompt),
+            output_tokens=estimate_tokens(text),
+            latency=time.time() - start_time
+        )
+
+    # ---------- purpose별 응답 생성 ----------
+
+    def _syllabus_analysis(self, prompt, seed):
+        rng = random.Random(seed)
+        topics = ['오리엔테이션', '기초 개념', '선형 회귀', '분류', '정규화', '모델 평가', '결정 트리', '중간고사',
+                  '앙상블', '서포트 벡터 머신', '신경망 기초', '역전파', '합성곱 신경망', '순환 신경망', '종합 정리', '기말고사']
+        midterm = rng.choice([30, 35, 40])
+        result = {
+            "basic_info": {
+                "credits": 3,
+                "course_type": "전공핵심",
+                "course_level": "300단위",
+                "grading_policy": {
+                    "midterm": midterm,
+                    "final": 70 - midterm,
+                    "assignment": 20,
+                    "attendance": 10,
+                    "summary": f"중간고사 {midterm}%, 기말고사 {70 - midterm}%, 과제 20%, 출석 10%"
+                }
+            },
+            "weekly_schedule": [
+                {"week_no": i, "topic": topic, "description": f"{topic} 관련 핵심 내용 학습"}
+                for i, topic in enumerate(topics, 1)
+            ]
+        }
+        return json.dumps(result, ensure_ascii=False)
+
+    def _concept(self, prompt, seed):
+        rng = random.Random(seed)
+        sections = []
+        for i in range(1, rng.randint(3, 5) + 1):
+            sections.append(
+                f"# {i}. 핵심 개념 {i}\n\n"
+                f"## ({i}) 정의\n\n"
+                f"- **개념 {i}**는 강의 자료에서 다룬 주요 내용입니다.\n"
+                f"- 수식 예시: $y = w_{i} x + b$\n\n"
+                f"## ({i + 1}) 예시\n\n"
+                f"- 간단한 예시를 통해 개념 {i}를 이해합니다.\n"
+            )
+        return '\n'.join(sections) + "\n이상으로 이번 주차의 내용을 정리했습니다."
+
+    def _material_summary(self, prompt, seed):
+        rng = random.Random(seed)
+        match = re.search(r'(\d+)주차 강의 자료 중 하나\((.*?)\)입니다', prompt)
+        week_number, file_name = match.groups() if match else ('?', '강의 자료')
+        lines = [f"## {file_name} 요약 ({week_number}주차)\n"]
+        for i in range(1, rng.randint(2, 4) + 1):
+            lines.append(
+                f"### 개념 {seed % 97 + i}\n"
+                f"- 정의: 개념 {seed % 97 + i}는 이 자료에서 다룬 주요 내용입니다.\n"
+                f"- 수식: $y_{i} = w_{i} x + b$\n"
+            )
+        return '\n'.join(lines)
+
+    def _quiz(self, prompt, seed):
+        rng = random.Random(seed)
+        match = re.search(r'문제 개수:\s*(\d+)', prompt)
+        num_questions = int(match.group(1)) if match else 5
+
+        type_markers = [
+            ('multiple_choice', '객관식'),
+            ('short_answer', '단답형'),
+            ('subjective', '주관식'),
+        ]
+        type_line = re.search(r'문제 유형:\s*(.*)', prompt)
+        type_line = type_line.group(1) if type_line else ''
+        question_types = [qt for qt, marker in type_markers if marker in type_line] or ['multiple_choice']
+
+        questions = []
+        for i in range(num_questions):
+            question_type = question_types[i % len(question_types)]
+            concept = f"개념 {rng.randint(1, 12)}"
+            question = {
+                "question_type": question_type,
+                "question_text": f"[{seed % 10000}-{i + 1}] {concept}에 대한 설명으로 옳은 것은?",
+                "correct_answer": "",
+                "explanation": f"{concept}의 정의에 따라 정답이 결정됩니다.",
+                "key_concept": concept
+            }
+            if question_type == 'multiple_choice':
+                options = [f"{concept} 보기 {j}" for j in range(1, 5)]
+                question["options"] = options
+                question["correct_answer"] = options[rng.randint(0, 3)]
+            elif question_type == 'short_answer':
+                question["correct_answer"] = str(rng.randint(1, 100))
+            else:
+                question["correct_answer"] = f"{concept}는 입력과 출력의 관계를 학습하는 방법이다."
+            questions.append(question)
+
+        return json.dumps({"questions": questions}, ensure_ascii=False)
+
+    def _quiz_report(self, prompt, seed):
+        match = re.search(r'성적:\s*(\d+)/(\d+)', prompt)
+        score_line = f"이번 퀴즈에서 {match.group(1)}/{match.group(2)}점을 받았습니다." if match else "퀴즈를 완료했습니다."
+        return (
+            "# 1. 전반적인 평가\n"
+            f"{score_line} 전반적으로 핵심 개념을 잘 이해하고 있습니다.\n\n"
+            "# 2. 결과 분석 리포트\n\n"
+            "## (1) 잘한 부분 (강점)\n"
+            "기본 정의와 관련된 문제를 정확히 풀었습니다.\n\n"
+            "## (2) 부족한 부분 (약점)\n"
+            "응용 문제에서 일부 실수가 있었습니다.\n\n"
+            "## (3) 구체적인 학습 권장사항\n"
+            "틀린 문제의 핵심 개념을 다시 복습해보세요.\n\n"
+            "# 3. 마무리\n"
+            "꾸준히 학습하면 좋은 결과가 있을 것입니다!"
+        )
+
+    def _study_plan(self, prompt, seed):
+        match = re.search(r'오늘\((\d{4}-\d{2}-\d{2})\)부터 시험일\((\d{4}-\d{2}-\d{2})\)', prompt)
+        if match:
+            start = date.fromisoformat(match.group(1))
+            end = date.fromisoformat(match.group(2))
+        else:
+            start = date.today()
+            end = start + timedelta(days=7)
+        plan = {}
+        day = start
+        index = 1
+        while day <= end:
+            plan[day.isoformat()] = f"Day {index}: 시험 범위 복습 및 개념 확인 퀴즈 풀이."
+            day += timedelta(days=1)
+            index += 1
+        return json.dumps({"plan": plan}, ensure_ascii=False)
+
+    def _study_plan_message(self, prompt, seed):
+        match = re.search(r'(\d+)일 남음', prompt)
+        days = match.group(1) if match else '며칠'
+        return f"시험까지 {days}일, 계획대로 하루씩 차근차근 해나가면 충분합니다. 오늘 분량부터 시작해보세요!"
+
+
+def _seed_for(prompt):
+    """프롬프트로부터 결정적 시드 생성"""
+    return int(hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:8], 16)
+
+
+# 한글/영문 혼합 텍스트 기준 토큰당 문자 수 근사치
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """토큰 수 근사치 (약 CHARS_PER_TOKEN자당 1토큰)"""
+    return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+_provider_lock = threading.Lock()
+_provider_cache = {}
+
+
+def get_llm_provider():
+    """설정된 LLM 프로바이더 반환
+
+    LLM_PROVIDER=fake이면 FakeLLMProvider를, 그렇지 않으면 GeminiProvider를 반환합니다.
+    Gemini를 사용하는데 GEMINI_API_KEY가 없으면 None을 반환합니다.
+    """
+    provider_name = os.getenv('LLM_PROVIDER', 'gemini').lower()
+
+    if provider_name == 'fake':
+        cache_key = ('fake',)
+    else:
+        api_key = os.getenv('GEMINI_API_KEY')
+        if not api_key:
+            return None
+        cache_key = ('gemini', api_key)
+
+    with _provider_lock:
+        provider = _provider_cache.get(cache_key)
+        if provider is None:
+            if provider_name == 'fake':
+                provider = FakeLLMProvider.from_env()
+            else:
+                provider = GeminiProvider(api_key)
+            _provider_cache[cache_key] = provider
+        return provider
+
+
+def reset_llm_provider():
+    """캐시된 프로바이더 제거 (환경 변수 변경 후 재설정용)"""
+    with _provider_lock:
+        _provider_cache.clear()
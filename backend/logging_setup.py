@@ -0,0 +1,161 @@
+"""
+로깅 설정 모듈
+표준 logging 위에 요청 ID가 포함된 JSON 로그 출력과 비차단(QueueHandler) 출력 파이프라인을 구성합니다.
+
+요청 스레드는 로그 레코드를 큐에 넣기만 하고, 실제 stdout 쓰기는 별도 리스너 스레드가 담당합니다.
+로그 호출은 logger.debug("... %s", value) 형태의 지연 포맷팅을 사용하므로,
+레벨이 꺼져 있으면 메시지 문자열 자체가 만들어지지 않습니다.
+
+환경 변수:
+    LOG_LEVEL: 'DEBUG', 'INFO' (기본값), 'WARNING', 'ERROR'
+    LOG_FORMAT: 'json' (기본값) 또는 'text' (로컬 개발용 사람이 읽기 쉬운 형식)
+"""
+
+import os
+import sys
+import copy
+import json
+import uuid
+import queue
+import atexit
+import contextvars
+import logging
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, request, has_request_context
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+# 백그라운드 작업 스레드에서 원래 요청의 ID를 이어받기 위한 컨텍스트 변수
+job_request_id = contextvars.ContextVar('job_request_id', default='-')
+
+_configure_lock = threading.Lock()
+_listener = None
+
+# LogRecord 기본 속성 (extra로 전달된 필드만 JSON에 추가하기 위해 사용)
+_RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'request_id'}
+
+
+class RequestIdFilter(logging.Filter):
+    """레코드에 현재 요청 ID를 붙이는 필터 (요청 컨텍스트 밖이면 작업을 등록한 요청의 ID 또는 '-')"""
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = g.get('request_id', '-') if has_request_context() else job_request_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄짜리 JSON 로그 포맷터"""
+
+    def format(self, record):
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'request_id': getattr(record, 'request_id', '-'),
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload['exc_info'] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class _RequestQueueHandler(QueueHandler):
+    """요청 스레드에서 메시지/스택 트레이스를 확정한 뒤 큐에 넣는 핸들러
+
+    기본 QueueHandler.prepare()는 스택 트레이스를 메시지 문자열에 합쳐 버리므로,
+    JSON의 exc_info 필드로 분리하기 위해 직접 구현합니다.
+    """
+
+    def prepare(self, record):
+        message = record.getMessage()
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = logging.Formatter().formatException(record.exc_info)
+        record = copy.copy(record)
+        record.message = message
+        record.msg = message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = exc_text
+        return record
+
+
+def configure_logging():
+    """루트 로거를 큐 기반 JSON(또는 텍스트) 출력으로 설정 (여러 번 호출해도 한 번만 적용)"""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+
+        level = getattr(logging, os.getenv('LOG_LEVEL', 'INFO').upper(), logging.INFO)
+        if os.getenv('LOG_FORMAT', 'json').lower() == 'text':
+            formatter = logging.Formatter('%(asctime)s %(levelname)-7s [%(request_id)s] %(name)s: %(message)s')
+        else:
+            formatter = JsonFormatter()
+
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = _RequestQueueHandler(log_queue)
+        queue_handler.addFilter(RequestIdFilter())
+
+        root = logging.getLogger()
+        root.handlers = [queue_handler]
+        root.setLevel(level)
+
+        # 외부 라이브러리의 상세 로그는 경고 이상만 출력
+        logging.getLogger('werkzeug').setLevel(max(level, logging.INFO))
+        for noisy in ('urllib3', 'google', 'PyPDF2', 'pypdf'):
+            logging.getLogger(noisy).setLevel(max(level, logging.WARNING))
+
+        _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+
+def restart_after_fork():
+    """fork된 자식 프로세스(gunicorn preload 워커)에서 로그 리스너 스레드 재시작
+
+    스레드는 fork로 복제되지 않으므로, 마스터에서 configure_logging()을 호출한 뒤 fork한 워커는
+    큐에 쌓이기만 하고 출력되지 않습니다. 같은 큐와 출력 핸들러로 리스너를 새로 시작합니다.
+    """
+    global _listener
+    with _configure_lock:
+        if _listener is None or (_listener._thread is not None and _listener._thread.is_alive()):
+            return
+        atexit.unregister(_listener.stop)
+        _listener = QueueListener(_listener.queue, *_listener.handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+
+def current_request_id():
+    """현재 요청 ID (요청 컨텍스트 밖이면 작업에 전달된 ID 또는 '-')"""
+    if has_request_context():
+        return g.get('request_id', '-')
+    return job_request_id.get()
+
+
+def init_request_ids(app):
+    """요청마다 요청 ID를 발급하고 응답 헤더로 돌려줌 (클라이언트가 보낸 X-Request-ID가 있으면 재사용)"""
+
+    @app.before_request
+    def assign_request_id():
+        g.request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex[:16]
+
+    @app.after_request
+    def add_request_id_header(response):
+        request_id = g.get('request_id')
+        if request_id:
+            response.headers[REQUEST_ID_HEADER] = request_id
+        return response
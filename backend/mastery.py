@@ -0,0 +1,120 @@
+"""
+핵심 개념 숙련도 모듈
+퀴즈 제출 시 채점된 답안으로 (사용자, 과목, 핵심 개념)별 풀이 수/정답 수/최근 풀이 시간을 누적 갱신하고,
+적응형 퀴즈 프롬프트에는 정답률이 낮은 개념 몇 개만 짧은 목록으로 전달합니다.
+
+환경 변수:
+    ADAPTIVE_WEAK_CONCEPTS: 적응형 프롬프트에 포함할 취약 개념 수 (기본값 5)
+"""
+
+import os
+import logging
+from datetime import datetime
+
+from sqlalchemy import text, update, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import db, ConceptMastery, Question, UserResponse
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_concept(key_concept):
+    """숙련도 집계용 핵심 개념 키 (앞뒤 공백 제거, 200자 제한, 비어 있으면 None)"""
+    concept = (key_concept or '').strip()
+    return concept[:200] or None
+
+
+def apply_graded_responses(user_id, subject_id, graded, revert=False, seen_at=None):
+    """채점 결과를 숙련도에 반영 (commit은 호출하는 쪽에서)
+
+    Args:
+        graded: (핵심 개념, 정답 여부) 목록
+        revert: True이면 이전에 반영한 결과를 되돌림 (같은 퀴즈를 다시 제출하는 경우)
+    """
+    totals = {}
+    for key_concept, is_correct in graded:
+        concept = normalize_concept(key_concept)
+        if concept is None:
+            continue
+        attempts, correct, _ = totals.get(concept, (0, 0, None))
+        totals[concept] = (attempts + 1, correct + int(bool(is_correct)), bool(is_correct))
+    if not totals:
+        return
+
+    # 같은 사용자/과목의 제출이 동시에 들어와도 uq_concept_mastery 충돌이나 갱신 유실이 없도록
+    # 읽은 값에 더해 쓰지 않고 SQL에서 누적 (INSERT ... ON CONFLICT DO UPDATE, 되돌리기는 UPDATE)
+    seen_at = seen_at or datetime.utcnow()
+    for concept, (attempts, correct, last_correct) in totals.items():
+        if revert:
+            remaining = func.max(0, ConceptMastery.attempts - attempts)
+            db.session.execute(
+                update(ConceptMastery)
+                .where(ConceptMastery.user_id == user_id, ConceptMastery.subject_id == subject_id,
+                       ConceptMastery.key_concept == concept)
+                .values(attempts=remaining, correct=func.max(0, func.min(remaining, ConceptMastery.correct - correct)))
+                .execution_options(synchronize_session=False)
+            )
+            continue
+        statement = sqlite_insert(ConceptMastery).values(
+            user_id=user_id, subject_id=subject_id, key_concept=concept, attempts=attempts, correct=correct,
+            last_correct=last_correct, last_seen_at=seen_at)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=['user_id', 'subject_id', 'key_concept'],
+            set_={
+                'attempts': ConceptMastery.attempts + statement.excluded.attempts,
+                'correct': ConceptMastery.correct + statement.excluded.correct,
+                'last_correct': statement.excluded.last_correct,
+                'last_seen_at': statement.excluded.last_seen_at,
+            }
+        ))
+
+
+def quiz_graded_responses(quiz_id):
+    """퀴즈에 저장된 답안의 (핵심 개념, 정답 여부) 목록 (다시 제출하거나 삭제할 때 되돌리는 용도)"""
+    return db.session.query(Question.key_concept, UserResponse.is_correct).join(
+        Question, Question.id == UserResponse.question_id
+    ).filter(UserResponse.quiz_id == quiz_id).all()
+
+
+def weakest_concepts(user_id, subject_id, limit=None):
+    """정답률이 낮은 개념부터 반환 (한 번이라도 틀린 개념만, 같은 정답률이면 많이 풀고 최근에 푼 개념 우선)"""
+    if limit is None:
+        limit = int(os.getenv('ADAPTIVE_WEAK_CONCEPTS', '5'))
+    correct_rate = ConceptMastery.correct * 1.0 / ConceptMastery.attempts
+    return ConceptMastery.query.filter(
+        ConceptMastery.user_id == user_id,
+        ConceptMastery.subject_id == subject_id,
+        ConceptMastery.attempts > 0,
+        ConceptMastery.correct < ConceptMastery.attempts
+    ).order_by(
+        correct_rate.asc(), ConceptMastery.attempts.desc(), ConceptMastery.last_seen_at.desc()
+    ).limit(limit).all()
+
+
+def format_weak_concepts(masteries):
+    """취약 개념을 프롬프트용 짧은 목록으로 변환"""
+    lines = []
+    for mastery in masteries:
+        line = f"- {mastery.key_concept}: 정답률 {mastery.correct_rate:.0%} ({mastery.attempts}문제 중 {mastery.correct}개 정답)"
+        if mastery.last_correct is False:
+            line += ", 최근 오답"
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def backfill_concept_mastery():
+    """기존 답안으로 숙련도 테이블 채우기 (concept_mastery 테이블을 처음 만들 때 한 번 실행)"""
+    result = db.session.execute(text("""
+        INSERT INTO concept_mastery (user_id, subject_id, key_concept, attempts, correct, last_correct, last_seen_at)
+        SELECT z.user_id, z.subject_id, SUBSTR(TRIM(q.key_concept), 1, 200), COUNT(*), SUM(CASE WHEN r.is_correct THEN 1 ELSE 0 END),
+               NULL, MAX(r.submitted_at)
+        FROM user_responses r
+        JOIN questions q ON q.id = r.question_id
+        JOIN quizzes z ON z.id = r.quiz_id
+        WHERE q.key_concept IS NOT NULL AND TRIM(q.key_concept) != ''
+        GROUP BY z.user_id, z.subject_id, SUBSTR(TRIM(q.key_concept), 1, 200)
+    """))
+    db.session.commit()
+    logger.info("기존 답안으로 핵심 개념 숙련도 %s건을 만들었습니다.", result.rowcount)
+    return result.rowcount
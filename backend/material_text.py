@@ -0,0 +1,211 @@
+"""
+수업자료 텍스트 저장소 모듈
+PDF 자료의 텍스트를 업로드 시 한 번만 추출하여 MaterialText에 저장하고,
+개념 학습/퀴즈 생성 라우트는 저장된 텍스트만 읽도록 합니다.
+프롬프트에는 추출 시 함께 저장한 정리 텍스트(text_cleaning)를 사용합니다.
+
+Material.text_status 흐름:
+    업로드 → 'pending' → (백그라운드 추출) → 'ready' 또는 'failed'
+    이 기능 이전에 업로드된 자료(None)는 처음 읽을 때 추출하여 저장합니다.
+
+환경 변수:
+    MATERIAL_TEXT_WAIT_SECONDS: 이 프로세스에서 추출 중인 자료를 읽을 때 완료를 기다리는 최대 시간 (기본값 15초)
+        (기다리는 동안 DB 트랜잭션을 끝내 커넥션을 잡지 않음, 다른 워커에서 추출 중이면 기다리지 않고 MaterialTextPending)
+    MATERIAL_TEXT_STALE_SECONDS: 이 시간 이상 pending이면 작업이 유실된 것으로 보고 다시 추출 (기본값 600초)
+"""
+
+import os
+import json
+import logging
+import threading
+from datetime import datetime
+
+from models import db, Material, MaterialText, LearningPDF
+from jobs import submit_job
+from rag_utils import extract_pages_from_pdf, iter_text_budget
+from text_cleaning import clean_pages, CLEANING_VERSION
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+
+TEXT_PENDING = 'pending'
+TEXT_READY = 'ready'
+TEXT_FAILED = 'failed'
+
+# 이 프로세스에서 추출을 예약했거나 진행 중인 자료 (자료 ID → 추출 작업이 끝나면 set되는 Event)
+_extractions = {}
+_extractions_lock = threading.Lock()
+
+
+class MaterialTextPending(Exception):
+    """자료 텍스트 추출이 아직 끝나지 않음"""
+
+    def __init__(self, material):
+        super().__init__(f"자료 텍스트를 추출하는 중입니다: {material.file_name}")
+        self.material_id = material.id
+
+
+def material_abspath(file_path):
+    """DB에 저장된 자료 경로를 절대 경로로 변환 (작업 디렉터리와 무관)"""
+    if os.path.isabs(file_path):
+        return file_path
+    if file_path.startswith('uploads/') or file_path.startswith('uploads' + os.sep):
+        return os.path.join(BASE_DIR, file_path)
+    return os.path.join(BASE_DIR, 'uploads', 'materials', os.path.basename(file_path))
+
+
+def _store_clean_pages(record, pages):
+    """프롬프트용 정리 텍스트를 레코드에 저장하고 토큰 절감량을 로그로 남김 (commit은 호출하는 쪽에서)"""
+    cleaned, stats = clean_pages(pages)
+    record.clean_pages = json.dumps(cleaned, ensure_ascii=False)
+    record.clean_char_count = stats['clean_chars']
+    record.clean_version = CLEANING_VERSION
+
+    saved_tokens = stats['raw_tokens'] - stats['clean_tokens']
+    logger.info("자료 텍스트 정리 완료 (자료 ID: %s): 토큰 %s → %s (%s 절감)",
+                record.material_id, stats['raw_tokens'], stats['clean_tokens'], saved_tokens,
+                extra={'event': 'text_cleaning', 'material_id': record.material_id,
+                       'saved_tokens': saved_tokens, **stats})
+    return record
+
+
+def _store_pages(material, pages):
+    """추출 결과를 MaterialText에 저장하고 상태를 ready로 변경 (commit은 호출하는 쪽에서)"""
+    char_count = sum(len(page) for page in pages)
+    record = material.extracted_text
+    if record is None:
+        record = MaterialText(material_id=material.id)
+        db.session.add(record)
+    record.pages = json.dumps(pages, ensure_ascii=False)
+    record.char_count = char_count
+    record.extracted_at = datetime.utcnow()
+    _store_clean_pages(record, pages)
+
+    material.page_count = len(pages)
+    material.text_status = TEXT_READY
+    material.text_error = None
+    return record
+
+
+def _ensure_learning_pdf(material, has_text):
+    """텍스트가 있는 PDF는 학습용 PDF로도 등록 (벡터 인덱스는 생성하지 않음)"""
+    if not has_text or material.week is None:
+        return
+    subject_id = material.week.subject_id
+    exists = LearningPDF.query.filter_by(subject_id=subject_id, file_path=material.file_path).first()
+    if not exists:
+        db.session.add(LearningPDF(
+            subject_id=subject_id,
+            file_name=material.file_name,
+            file_path=material.file_path,
+            file_size=material.file_size
+        ))
+
+
+def extract_material(material):
+    """자료 PDF를 추출하여 저장 (성공/실패 상태까지 commit)"""
+    try:
+        pages = extract_pages_from_pdf(material_abspath(material.file_path))
+    except Exception as e:
+        logger.warning("자료 텍스트 추출 실패 (자료 ID: %s, %s): %s", material.id, material.file_name, e)
+        material.text_status = TEXT_FAILED
+        material.text_error = str(e)
+        db.session.commit()
+        return None
+
+    record = _store_pages(material, pages)
+    _ensure_learning_pdf(material, record.char_count > 0)
+    db.session.commit()
+    logger.info("자료 텍스트 추출 완료 (자료 ID: %s, %s페이지, %s자)", material.id, len(pages), record.char_count)
+    return record
+
+
+def schedule_material_text(app, material_id):
+    """업로드된 자료의 텍스트 추출을 백그라운드 작업으로 예약
+
+    같은 프로세스에서 이 자료를 읽는 요청은 DB를 폴링하지 않고 작업이 끝날 때 set되는 이벤트를 기다립니다.
+    """
+    with _extractions_lock:
+        _extractions.setdefault(material_id, threading.Event())
+    try:
+        submit_job(app, f'material_text:{material_id}', process_material_text, material_id)
+    except Exception:
+        _finish_extraction(material_id)
+        raise
+
+
+def _finish_extraction(material_id):
+    with _extractions_lock:
+        event = _extractions.pop(material_id, None)
+    if event is not None:
+        event.set()
+
+
+def process_material_text(material_id):
+    """백그라운드 작업: 업로드된 자료의 텍스트 추출 (끝나면 기다리는 요청에 알림)"""
+    try:
+        material = Material.query.get(material_id)
+        if material is None:
+            # 추출 전에 자료가 삭제된 경우
+            return
+        if material.text_status == TEXT_READY:
+            return
+        extract_material(material)
+    finally:
+        _finish_extraction(material_id)
+
+
+def _is_stale(material):
+    stale_seconds = int(os.getenv('MATERIAL_TEXT_STALE_SECONDS', '600'))
+    return (material.uploaded_at is not None and
+            (datetime.utcnow() - material.uploaded_at).total_seconds() > stale_seconds)
+
+
+def get_material_record(material):
+    """자료의 저장된 텍스트(MaterialText) 반환
+
+    - ready: 저장된 레코드 반환
+    - failed: None 반환
+    - pending: 이 프로세스에서 추출 중이면 끝날 때까지 잠시 기다리고, 다른 워커에서 추출 중이거나
+      기다려도 끝나지 않으면 MaterialTextPending 발생
+    - None(기존 자료) 또는 유실된 pending: 요청 스레드에서 바로 추출하여 저장
+    """
+    if material.text_status == TEXT_PENDING and not _is_stale(material):
+        with _extractions_lock:
+            event = _extractions.get(material.id)
+        if event is not None:
+            # 기다리는 동안 풀 커넥션(SQLite에서는 열린 읽기 트랜잭션)을 잡지 않도록 트랜잭션 종료
+            # (읽기 경로라 쓸 변경은 없음, 세션의 객체는 다음 접근 시 다시 읽음)
+            db.session.commit()
+            event.wait(float(os.getenv('MATERIAL_TEXT_WAIT_SECONDS', '15')))
+            db.session.refresh(material)
+        if material.text_status == TEXT_PENDING:
+            raise MaterialTextPending(material)
+
+    if material.text_status == TEXT_READY:
+        record = material.extracted_text
+        if record is not None:
+            return record
+        # 상태만 ready이고 본문이 없는 경우 아래에서 다시 추출
+
+    if material.text_status == TEXT_FAILED:
+        return None
+
+    logger.info("저장된 텍스트가 없는 자료를 추출합니다 (자료 ID: %s)", material.id)
+    return extract_material(material)
+
+
+def get_material_text(material, max_chars=None, max_tokens=None):
+    """자료의 프롬프트용 정리 텍스트 반환 (추출 실패 또는 텍스트 없음이면 빈 문자열)
+
+    max_chars/max_tokens를 지정하면 예산을 채울 때까지의 페이지만 이어 붙입니다.
+    정리 규칙이 바뀌었거나 정리 전에 저장된 레코드는 여기서 한 번 정리하여 저장합니다.
+    """
+    record = get_material_record(material)
+    if record is None:
+        return ''
+    if record.clean_version != CLEANING_VERSION:
+        _store_clean_pages(record, record.get_pages())
+        db.session.commit()
+    return '\n\n'.join(text for _, text in iter_text_budget(record.iter_clean_pages(), max_chars, max_tokens))
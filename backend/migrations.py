@@ -0,0 +1,380 @@
+"""
+데이터베이스 스키마 마이그레이션 모듈
+기존 테이블에 새 컬럼 추가(ALTER TABLE), 새 테이블 생성(create_all), 새 테이블에 기존 데이터 채우기(문제 은행 색인,
+핵심 개념 숙련도, 파생 데이터 fingerprint, 압축 텍스트 변환)와 압축 텍스트 공유 사전 학습을 실행합니다.
+
+스키마 확인(inspector)과 백필은 앱을 만들 때마다 실행할 필요가 없으므로, 앱 시작 시에는 DB_MIGRATE_ON_START=1일 때만
+실행합니다 (개발 서버 python app.py는 기본으로 실행). 배포 시에는 서버를 시작하기 전에 한 번 실행합니다.
+
+    python migrations.py
+
+환경 변수:
+    DB_MIGRATE_ON_START: 1이면 앱 생성(create_app) 시 마이그레이션 실행 (기본값 0, python app.py는 1)
+    RESET_DB: 1이면 마이그레이션 대신 데이터베이스를 재생성 (앱 시작 시에도 마이그레이션 실행)
+"""
+
+import os
+import logging
+
+from models import db
+from compressed_text import load_dictionaries, train_and_store_dictionary, migrate_compressed_columns, vacuum, NO_DICTIONARY
+from artifacts import stamp_missing_fingerprints
+from mastery import backfill_concept_mastery
+from question_bank import backfill_question_bank
+
+logger = logging.getLogger(__name__)
+
+
+def is_enabled():
+    """앱 생성 시 마이그레이션 실행 여부 (RESET_DB=1이면 항상 실행)"""
+    return os.getenv('DB_MIGRATE_ON_START', '0') == '1' or os.getenv('RESET_DB') == '1'
+
+
+def run_migrations():
+    """스키마 마이그레이션과 공유 사전 학습 (앱 컨텍스트 안에서 호출)"""
+    # 개발 환경: 기존 데이터베이스 스키마 문제 해결을 위해 재생성 옵션
+    # 환경 변수 RESET_DB=1로 설정하면 데이터베이스를 재생성합니다
+    if os.getenv('RESET_DB') == '1':
+        logger.warning("데이터베이스를 재생성합니다...")
+        db.drop_all()
+        db.create_all()
+        logger.info("데이터베이스가 재생성되었습니다.")
+    else:
+        # 기존 테이블에 새 컬럼 추가 (마이그레이션)
+        from sqlalchemy import inspect, text
+
+        inspector = inspect(db.engine)
+        existing_tables = inspector.get_table_names()
+
+        if 'users' in existing_tables:
+            # users 테이블에 새 컬럼 추가
+            existing_columns = [col['name'] for col in inspector.get_columns('users')]
+
+            # 새 컬럼들 추가
+            new_columns = {
+                'login_id': ('VARCHAR(80)', None),
+                'password': ('VARCHAR(255)', None),
+                'school': ('VARCHAR(100)', '""'),
+                'major': ('VARCHAR(100)', '""'),
+                'grade': ('INTEGER', '1'),
+                'social_type': ('VARCHAR(20)', None),
+                'social_id': ('VARCHAR(100)', None),
+                'onboarding_completed': ('BOOLEAN', '0'),
+                'theme': ('VARCHAR(20)', "'light'"),
+                'email_notifications': ('BOOLEAN', '1'),
+                'push_notifications': ('BOOLEAN', '1'),
+            }
+
+            # email 컬럼이 NOT NULL로 되어 있다면 nullable로 변경
+            if 'email' in existing_columns:
+                try:
+                    # SQLite는 ALTER TABLE로 NOT NULL 제약을 직접 변경할 수 없으므로
+                    # 새 테이블을 만들고 데이터를 복사하는 방식이 필요하지만,
+                    # 여기서는 간단히 기본값을 설정하는 방식으로 처리
+                    db.session.execute(text("UPDATE users SET email = NULL WHERE email = ''"))
+                    db.session.commit()
+                    logger.info("email 컬럼을 nullable로 처리했습니다.")
+                except Exception as e:
+                    db.session.rollback()
+                    logger.warning("email 컬럼 처리 중 오류: %s", e)
+
+            for col_name, (col_type, default_val) in new_columns.items():
+                if col_name not in existing_columns:
+                    try:
+                        if default_val is not None:
+                            db.session.execute(text(f'ALTER TABLE users ADD COLUMN {col_name} {col_type} DEFAULT {default_val}'))
+                        else:
+                            db.session.execute(text(f'ALTER TABLE users ADD COLUMN {col_name} {col_type}'))
+                        db.session.commit()
+                        logger.info("users 테이블에 %s 컬럼을 추가했습니다.", col_name)
+                    except Exception as e:
+                        db.session.rollback()
+                        logger.warning("%s 컬럼 추가 중 오류: %s", col_name, e)
+
+            # 기존 필수 필드들을 nullable로 변경 (기존 데이터 호환성)
+            if 'exam_style' in existing_columns:
+                try:
+                    # 기존 필수 필드들을 nullable로 변경
+                    db.session.execute(text("UPDATE users SET exam_style = NULL WHERE exam_style = ''"))
+                    db.session.execute(text("UPDATE users SET learning_depth = NULL WHERE learning_depth = ''"))
+                    db.session.execute(text("UPDATE users SET material_preference = NULL WHERE material_preference = ''"))
+                    db.session.execute(text("UPDATE users SET practice_style = NULL WHERE practice_style = ''"))
+                    db.session.execute(text("UPDATE users SET ai_persona = NULL WHERE ai_persona = ''"))
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    logger.warning("기존 필드 업데이트 중 오류: %s", e)
+
+        if 'subjects' in existing_tables:
+            # subjects 테이블에 새 컬럼 추가
+            existing_columns = [col['name'] for col in inspector.get_columns('subjects')]
+
+            # subject_type 컬럼 추가
+            if 'subject_type' not in existing_columns:
+                try:
+                    db.session.execute(text('ALTER TABLE subjects ADD COLUMN subject_type VARCHAR(50) DEFAULT "교양"'))
+                    db.session.execute(text("UPDATE subjects SET subject_type = '교양' WHERE subject_type IS NULL OR subject_type = ''"))
+                    db.session.commit()
+                    logger.info("subjects 테이블에 subject_type 컬럼을 추가했습니다.")
+                except Exception as e:
+                    db.session.rollback()
+                    logger.warning("subject_type 컬럼 추가 중 오류: %s", e)
+
+            # syllabus_analysis 컬럼 추가 (JSON 타입)
+            if 'syllabus_analysis' not in existing_columns:
+                try:
+                    db.session.execute(text('ALTER TABLE subjects ADD COLUMN syllabus_analysis TEXT'))
+                    db.session.commit()
+                    logger.info("subjects 테이블에 syllabus_analysis 컬럼을 추가했습니다.")
+                except Exception as e:
+                    db.session.rollback()
+                    logger.warning("syllabus_analysis 컬럼 추가 중 오류: %s", e)
+
+            # color 컬럼 추가
+            if 'color' not in existing_columns:
+                try:
+                    db.session.execute(text('ALTER TABLE subjects ADD COLUMN color VARCHAR(7)'))
+                    db.session.commit()
+                    logger.info("subjects 테이블에 color 컬럼을 추가했습니다.")
+                except Exception as e:
+                    db.session.rollback()
+                    logger.warning("color 컬럼 추가 중 오류: %s", e)
+
+            # order 컬럼 추가 (SQLite 예약어이므로 따옴표로 감싸야 함)
+            if 'order' not in existing_columns:
+                try:
+                    # SQLite에서 order는 예약어이므로 따옴표로 감싸야 함
+                    db.session.execute(text('ALTER TABLE subjects ADD COLUMN "order" INTEGER'))
+                    db.session.commit()
+                    # 기존 과목들의 order를 id 기반으로 설정
+                    db.session.execute(text('UPDATE subjects SET "order" = id WHERE "order" IS NULL'))
+                    db.session.commit()
+                    logger.info("subjects 테이블에 order 컬럼을 추가했습니다.")
+                except Exception as e:
+                    db.session.rollback()
+                    logger.exception("order 컬럼 추가 중 오류: %s", e)
+
+            # D-Day 관련 컬럼 추가
+            # exam_date 컬럼 추가
+            if 'exam_date' not in existing_columns:
+                try:
+                    db.session.execute(text('ALTER TABLE subjects ADD COLUMN exam_date DATETIME'))
+                    db.session.commit()
+                    logger.info("subjects 테이블에 exam_date 컬럼을 추가했습니다.")
+                except Exception as e:
+                    db.session.rollback()
+                    logger.warning("exam_date 컬럼 추가 중 오류: %s", e)
+
+            # is_notification_on 컬럼 추가
+            if 'is_notification_on' not in existing_columns:
+                try:
+                    db.session.execute(text('ALTER TABLE subjects ADD COLUMN is_notification_on BOOLEAN DEFAULT 1'))
+                    db.session.commit()
+                    # 기존 과목들의 알림을 기본값(True)으로 설정
+                    db.session.execute(text('UPDATE subjects SET is_notification_on = 1 WHERE is_notification_on IS NULL'))
+                    db.session.commit()
+                    logger.info("subjects 테이블에 is_notification_on 컬럼을 추가했습니다.")
+                except Exception as e:
+                    db.session.rollback()
+                    logger.warning("is_notification_on 컬럼 추가 중 오류: %s", e)
+
+            # study_plan 컬럼 추가
+            if 'study_plan' not in existing_columns:
+                try:
+                    db.session.execute(text('ALTER TABLE subjects ADD COLUMN study_plan TEXT'))
+                    db.session.commit()
+                    logger.info("subjects 테이블에 study_plan 컬럼을 추가했습니다.")
+                except Exception as e:
+                    db.session.rollback()
+                    logger.warning("study_plan 컬럼 추가 중 오류: %s", e)
+
+            # exam_type 컬럼 추가
+            if 'exam_type' not in existing_columns:
+                try:
+                    db.session.execute(text('ALTER TABLE subjects ADD COLUMN exam_type VARCHAR(20)'))
+                    db.session.commit()
+                    logger.info("subjects 테이블에 exam_type 컬럼을 추가했습니다.")
+                except Exception as e:
+                    db.session.rollback()
+                    logger.warning("exam_type 컬럼 추가 중 오류: %s", e)
+
+            # exam_week_start 컬럼 추가
+            if 'exam_week_start' not in existing_columns:
+                try:
+                    db.session.execute(text('ALTER TABLE subjects ADD COLUMN exam_week_start INTEGER'))
+                    db.session.commit()
+                    logger.info("subjects 테이블에 exam_week_start 컬럼을 추가했습니다.")
+                except Exception as e:
+                    db.session.rollback()
+                    logger.warning("exam_week_start 컬럼 추가 중 오류: %s", e)
+
+            # exam_week_end 컬럼 추가
+            if 'exam_week_end' not in existing_columns:
+                try:
+                    db.session.execute(text('ALTER TABLE subjects ADD COLUMN exam_week_end INTEGER'))
+                    db.session.commit()
+                    logger.info("subjects 테이블에 exam_week_end 컬럼을 추가했습니다.")
+                except Exception as e:
+                    db.session.rollback()
+                    logger.warning("exam_week_end 컬럼 추가 중 오류: %s", e)
+
+            # study_plan_fingerprint 컬럼 추가 (기존 계획은 입력이 바뀌는 요청 뒤에 다시 계산)
+            if 'study_plan_fingerprint' not in existing_columns:
+                try:
+                    db.session.execute(text('ALTER TABLE subjects ADD COLUMN study_plan_fingerprint VARCHAR(16)'))
+                    db.session.commit()
+                    logger.info("subjects 테이블에 study_plan_fingerprint 컬럼을 추가했습니다.")
+                except Exception as e:
+                    db.session.rollback()
+                    logger.warning("study_plan_fingerprint 컬럼 추가 중 오류: %s", e)
+
+        if 'materials' in existing_tables:
+            # materials 테이블에 텍스트 추출 상태 컬럼 추가 (기존 자료는 None → 처음 읽을 때 추출)
+            existing_columns = [col['name'] for col in inspector.get_columns('materials')]
+
+            for col_name, col_type in (('text_status', 'VARCHAR(20)'), ('page_count', 'INTEGER'), ('text_error', 'TEXT')):
+                if col_name not in existing_columns:
+                    try:
+                        db.session.execute(text(f'ALTER TABLE materials ADD COLUMN {col_name} {col_type}'))
+                        db.session.commit()
+                        logger.info("materials 테이블에 %s 컬럼을 추가했습니다.", col_name)
+                    except Exception as e:
+                        db.session.rollback()
+                        logger.warning("%s 컬럼 추가 중 오류: %s", col_name, e)
+
+        if 'material_texts' in existing_tables:
+            # material_texts 테이블에 프롬프트용 정리 텍스트 컬럼 추가 (기존 레코드는 처음 읽을 때 정리)
+            existing_columns = [col['name'] for col in inspector.get_columns('material_texts')]
+
+            for col_name, col_type in (('clean_pages', 'TEXT'), ('clean_char_count', 'INTEGER'), ('clean_version', 'INTEGER')):
+                if col_name not in existing_columns:
+                    try:
+                        db.session.execute(text(f'ALTER TABLE material_texts ADD COLUMN {col_name} {col_type}'))
+                        db.session.commit()
+                        logger.info("material_texts 테이블에 %s 컬럼을 추가했습니다.", col_name)
+                    except Exception as e:
+                        db.session.rollback()
+                        logger.warning("%s 컬럼 추가 중 오류: %s", col_name, e)
+
+        if 'questions' in existing_tables:
+            # questions 테이블에 문제 은행 원본 문제 ID 컬럼 추가 (기존 문제는 모두 LLM이 생성한 원본)
+            existing_columns = [col['name'] for col in inspector.get_columns('questions')]
+
+            if 'source_question_id' not in existing_columns:
+                try:
+                    db.session.execute(text('ALTER TABLE questions ADD COLUMN source_question_id INTEGER REFERENCES questions(id)'))
+                    db.session.commit()
+                    logger.info("questions 테이블에 source_question_id 컬럼을 추가했습니다.")
+                except Exception as e:
+                    db.session.rollback()
+                    logger.warning("source_question_id 컬럼 추가 중 오류: %s", e)
+
+        # 파생 데이터 입력 fingerprint 컬럼 추가 (기존 데이터에는 create_all 뒤에 현재 fingerprint를 기록)
+        stamp_fingerprints = 'question_bank' not in existing_tables and 'questions' in existing_tables
+        for table_name in ('concept_contents', 'question_bank'):
+            if table_name in existing_tables and 'source_fingerprint' not in [col['name'] for col in inspector.get_columns(table_name)]:
+                try:
+                    db.session.execute(text(f'ALTER TABLE {table_name} ADD COLUMN source_fingerprint VARCHAR(16)'))
+                    db.session.commit()
+                    stamp_fingerprints = True
+                    logger.info("%s 테이블에 source_fingerprint 컬럼을 추가했습니다.", table_name)
+                except Exception as e:
+                    db.session.rollback()
+                    logger.warning("%s.source_fingerprint 컬럼 추가 중 오류: %s", table_name, e)
+
+        if 'concept_contents' in existing_tables:
+            # concept_contents 테이블에 미리 압축한 응답 본문 컬럼 추가 (기존 콘텐츠는 처음 읽을 때 채움)
+            existing_columns = [col['name'] for col in inspector.get_columns('concept_contents')]
+
+            for col_name in ('gzip_body', 'br_body'):
+                if col_name not in existing_columns:
+                    try:
+                        db.session.execute(text(f'ALTER TABLE concept_contents ADD COLUMN {col_name} BLOB'))
+                        db.session.commit()
+                        logger.info("concept_contents 테이블에 %s 컬럼을 추가했습니다.", col_name)
+                    except Exception as e:
+                        db.session.rollback()
+                        logger.warning("%s 컬럼 추가 중 오류: %s", col_name, e)
+
+        if 'quiz_reports' in existing_tables:
+            # quiz_reports 테이블에 리포트 생성 상태 컬럼 추가 (기존 리포트는 모두 완료 상태)
+            existing_columns = [col['name'] for col in inspector.get_columns('quiz_reports')]
+
+            for col_name, col_def in (('status', "VARCHAR(20) NOT NULL DEFAULT 'ready'"), ('error_message', 'TEXT')):
+                if col_name not in existing_columns:
+                    try:
+                        db.session.execute(text(f'ALTER TABLE quiz_reports ADD COLUMN {col_name} {col_def}'))
+                        db.session.commit()
+                        logger.info("quiz_reports 테이블에 %s 컬럼을 추가했습니다.", col_name)
+                    except Exception as e:
+                        db.session.rollback()
+                        logger.warning("%s 컬럼 추가 중 오류: %s", col_name, e)
+
+        # 모든 테이블 생성/업데이트
+        db.create_all()  # 새 테이블이 있으면 생성
+
+        # 문제 은행 테이블을 새로 만든 경우 기존 문제를 색인
+        if 'question_bank' not in existing_tables and 'questions' in existing_tables:
+            try:
+                backfill_question_bank()
+            except Exception as e:
+                db.session.rollback()
+                logger.warning("문제 은행 색인 중 오류: %s", e)
+
+        # 핵심 개념 숙련도 테이블을 새로 만든 경우 기존 답안으로 채움
+        if 'concept_mastery' not in existing_tables and 'user_responses' in existing_tables:
+            try:
+                backfill_concept_mastery()
+            except Exception as e:
+                db.session.rollback()
+                logger.warning("핵심 개념 숙련도 생성 중 오류: %s", e)
+
+        # fingerprint가 없는 기존 개념 학습 콘텐츠/문제 은행 색인에 현재 입력 기록
+        if stamp_fingerprints:
+            try:
+                stamp_missing_fingerprints()
+            except Exception as e:
+                db.session.rollback()
+                logger.warning("파생 데이터 fingerprint 기록 중 오류: %s", e)
+
+        # 압축 텍스트 사전 테이블을 새로 만든 경우 기존 큰 텍스트를 압축 형식으로 다시 저장
+        if 'text_dictionaries' not in existing_tables and 'subjects' in existing_tables:
+            try:
+                migrate_compressed_columns()
+                vacuum()
+            except Exception as e:
+                db.session.rollback()
+                logger.warning("압축 텍스트 마이그레이션 중 오류: %s", e)
+
+        # 개발 환경에서 email NOT NULL 문제 해결을 위한 임시 조치
+        # 프로덕션에서는 마이그레이션 스크립트를 사용해야 함
+        try:
+            # email 컬럼이 존재하는지 확인하고, NOT NULL 제약이 있으면 경고
+            if 'users' in existing_tables:
+                email_col = next((col for col in inspector.get_columns('users') if col['name'] == 'email'), None)
+                if email_col and not email_col.get('nullable', True):
+                    logger.warning(
+                        "email 컬럼이 NOT NULL로 설정되어 있습니다. "
+                        "해결 방법: backend/instance/app.db 파일을 삭제한 후 서버를 재시작하거나, "
+                        "python backend/reset_db.py 를 실행하거나, RESET_DB=1 환경 변수를 설정하고 서버를 재시작하세요."
+                    )
+        except Exception as e:
+            logger.warning("스키마 확인 중 오류: %s", e)
+
+        logger.info("데이터베이스 테이블이 준비되었습니다.")
+
+    # 압축 텍스트 공유 사전이 없고 저장된 텍스트가 충분하면 학습
+    try:
+        if load_dictionaries() == NO_DICTIONARY:
+            train_and_store_dictionary()
+    except Exception as e:
+        db.session.rollback()
+        logger.warning("압축 텍스트 사전 학습 중 오류: %s", e)
+
+
+if __name__ == '__main__':
+    # 앱 생성 시 마이그레이션을 켜서 사전 로드보다 먼저 실행
+    os.environ['DB_MIGRATE_ON_START'] = '1'
+    from app import create_app
+
+    create_app()
@@ -3,8 +3,13 @@
 SQLAlchemy를 사용하여 User, Subject, QuizResult 테이블을 정의합니다.
 """
 
+import json
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import deferred
+
+from compressed_text import CompressedText
+from json_serialization import compile_serializer, json_loads
 
 db = SQLAlchemy()
 
@@ -63,27 +68,7 @@ class User(db.Model):
     
     def to_dict(self):
         """사용자 정보를 딕셔너리로 변환 (비밀번호 제외)"""
-        return {
-            'id': self.id,
-            'username': self.username,
-            'login_id': self.login_id,
-            'email': self.email,
-            'school': self.school,
-            'major': self.major,
-            'grade': self.grade,
-            'social_type': self.social_type,
-            'exam_style': self.exam_style,
-            'learning_depth': self.learning_depth,
-            'material_preference': self.material_preference,
-            'practice_style': self.practice_style,
-            'ai_persona': self.ai_persona,
-            'onboarding_completed': self.onboarding_completed,
-            'theme': self.theme or 'light',
-            'email_notifications': self.email_notifications,
-            'push_notifications': self.push_notifications,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        return _serialize_user(self)
 
 
 class Subject(db.Model):
@@ -96,7 +81,7 @@ class Subject(db.Model):
         subject_type: 과목 유형 (교양 vs 전공) (필수)
         syllabus_context: 강의계획서 요약/컨텍스트 (초기에는 빈 문자열)
         syllabus_file_path: 강의계획서 PDF 파일 경로
-        syllabus_text: PDF에서 추출한 텍스트 (Text 타입)
+        syllabus_text: PDF에서 추출한 텍스트 (큰 텍스트 컬럼은 압축 저장, compressed_text 모듈 참고)
         created_at: 생성 시간
         updated_at: 수정 시간
     """
@@ -108,8 +93,8 @@ class Subject(db.Model):
     subject_type = db.Column(db.String(50), nullable=False)  # 필수: 교양 또는 전공
     syllabus_context = db.Column(db.Text, default='', nullable=False)  # 강의계획서 요약 (초기에는 빈 문자열)
     syllabus_file_path = db.Column(db.String(500), nullable=True)  # PDF 파일 경로
-    syllabus_text = db.Column(db.Text, nullable=True)  # PDF에서 추출한 텍스트
-    syllabus_analysis = db.Column(db.Text, nullable=True)  # AI 분석 결과 (JSON 문자열)
+    syllabus_text = db.Column(CompressedText, nullable=True)  # PDF에서 추출한 텍스트
+    syllabus_analysis = db.Column(CompressedText, nullable=True)  # AI 분석 결과 (JSON 문자열)
     color = db.Column(db.String(7), nullable=True)  # HEX 색상 코드 (예: #FF5733)
     order = db.Column(db.Integer, nullable=True)  # 표시 순서
     exam_date = db.Column(db.DateTime, nullable=True)  # 시험 날짜 (D-Day)
@@ -117,41 +102,24 @@ class Subject(db.Model):
     exam_week_start = db.Column(db.Integer, nullable=True)  # 시험 범위 시작 주차
     exam_week_end = db.Column(db.Integer, nullable=True)  # 시험 범위 종료 주차
     is_notification_on = db.Column(db.Boolean, default=True, nullable=False)  # 학습 알림 설정
-    study_plan = db.Column(db.Text, nullable=True)  # AI 생성 학습 계획 (JSON 문자열)
+    study_plan = db.Column(CompressedText, nullable=True)  # AI 생성 학습 계획 (JSON 문자열)
+    study_plan_fingerprint = db.Column(db.String(16), nullable=True)  # 학습 계획 입력 fingerprint (artifacts 모듈 참고)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # 관계 설정
     weeks = db.relationship('Week', backref='subject', lazy=True, cascade='all, delete-orphan', order_by='Week.week_number')
     quiz_results = db.relationship('QuizResult', backref='subject', lazy=True, cascade='all, delete-orphan')
+    concept_masteries = db.relationship('ConceptMastery', backref='subject', lazy=True, cascade='all, delete-orphan')
     
     def to_dict(self, include_weeks=False):
         """과목 정보를 딕셔너리로 변환"""
-        import json
-        result = {
-            'id': self.id,
-            'user_id': self.user_id,
-            'name': self.name,
-            'subject_type': self.subject_type,
-            'syllabus_context': self.syllabus_context,
-            'syllabus_file_path': self.syllabus_file_path,
-            'syllabus_text': self.syllabus_text,
-            'color': self.color,
-            'order': self.order,
-            'exam_date': self.exam_date.isoformat() if self.exam_date else None,
-            'exam_type': self.exam_type,
-            'exam_week_start': self.exam_week_start,
-            'exam_week_end': self.exam_week_end,
-            'is_notification_on': self.is_notification_on,
-            'study_plan': json.loads(self.study_plan) if self.study_plan else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        result = _serialize_subject(self)
         # syllabus_analysis를 JSON으로 파싱
         if self.syllabus_analysis:
             try:
-                result['syllabus_analysis'] = json.loads(self.syllabus_analysis)
-            except:
+                result['syllabus_analysis'] = json_loads(self.syllabus_analysis)
+            except ValueError:
                 result['syllabus_analysis'] = None
         else:
             result['syllabus_analysis'] = None
@@ -188,16 +156,9 @@ class Week(db.Model):
     
     def to_dict(self):
         """주차 정보를 딕셔너리로 변환"""
-        return {
-            'id': self.id,
-            'subject_id': self.subject_id,
-            'week_number': self.week_number,
-            'title': self.title,
-            'description': self.description,
-            'materials': [material.to_dict() for material in self.materials],
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        result = _serialize_week(self)
+        result['materials'] = [_serialize_material(material) for material in self.materials]
+        return result
 
 
 class Material(db.Model):
@@ -210,6 +171,9 @@ class Material(db.Model):
         file_path: 파일 경로
         file_type: 파일 타입 (pdf, ppt, doc, etc.)
         file_size: 파일 크기 (bytes)
+        text_status: PDF 텍스트 추출 상태 ('pending', 'ready', 'failed', 기존 자료는 None)
+        page_count: PDF 페이지 수
+        text_error: 텍스트 추출 실패 사유
         uploaded_at: 업로드 시간
     """
     __tablename__ = 'materials'
@@ -220,19 +184,78 @@ class Material(db.Model):
     file_path = db.Column(db.String(500), nullable=False)  # 파일 경로
     file_type = db.Column(db.String(50), nullable=True)  # 파일 타입
     file_size = db.Column(db.Integer, nullable=True)  # 파일 크기 (bytes)
+    text_status = db.Column(db.String(20), nullable=True)  # 업로드 시 백그라운드 추출 상태
+    page_count = db.Column(db.Integer, nullable=True)
+    text_error = db.Column(db.Text, nullable=True)
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # 관계 설정 (본문 텍스트는 목록 조회 시 로드되지 않도록 별도 테이블에 저장)
+    extracted_text = db.relationship('MaterialText', backref='material', lazy=True, uselist=False, cascade='all, delete-orphan')
+    summary = db.relationship('MaterialSummary', backref='material', lazy=True, uselist=False, cascade='all, delete-orphan')
+    
     def to_dict(self):
         """자료 정보를 딕셔너리로 변환"""
-        return {
-            'id': self.id,
-            'week_id': self.week_id,
-            'file_name': self.file_name,
-            'file_path': self.file_path,
-            'file_type': self.file_type,
-            'file_size': self.file_size,
-            'uploaded_at': self.uploaded_at.isoformat() if self.uploaded_at else None
-        }
+        return _serialize_material(self)
+
+
+class MaterialText(db.Model):
+    """수업자료 추출 텍스트 테이블 (업로드 시 한 번 추출하여 저장)
+    
+    Attributes:
+        material_id: 자료 ID (Primary Key, Foreign Key)
+        pages: 페이지별 텍스트 (JSON 배열, 텍스트가 없는 페이지는 빈 문자열)
+        char_count: 전체 문자 수
+        extracted_at: 추출 시간
+        clean_pages: 프롬프트용으로 정리한 페이지별 텍스트 (JSON 배열, text_cleaning 참고)
+        clean_char_count: 정리 후 전체 문자 수
+        clean_version: 정리 규칙 버전 (text_cleaning.CLEANING_VERSION과 다르면 다시 정리)
+    """
+    __tablename__ = 'material_texts'
+    
+    material_id = db.Column(db.Integer, db.ForeignKey('materials.id'), primary_key=True)
+    pages = deferred(db.Column(CompressedText, nullable=False))  # JSON 배열 (다시 정리할 때만 읽으므로 지연 로딩)
+    char_count = db.Column(db.Integer, nullable=False, default=0)
+    extracted_at = db.Column(db.DateTime, default=datetime.utcnow)
+    clean_pages = db.Column(CompressedText, nullable=True)  # JSON 배열
+    clean_char_count = db.Column(db.Integer, nullable=True)
+    clean_version = db.Column(db.Integer, nullable=True)
+    
+    def get_pages(self):
+        """페이지별 텍스트 목록 반환"""
+        return json.loads(self.pages) if self.pages else []
+    
+    def iter_pages(self):
+        """(페이지 번호, 텍스트)를 페이지 순서대로 생성"""
+        return enumerate(self.get_pages(), 1)
+    
+    def iter_clean_pages(self):
+        """(페이지 번호, 정리된 텍스트)를 페이지 순서대로 생성"""
+        return enumerate(json.loads(self.clean_pages) if self.clean_pages else [], 1)
+    
+    def get_text(self):
+        """텍스트가 있는 페이지만 빈 줄로 이어 붙인 전체 텍스트 반환 (extract_text_from_pdf와 같은 형식)"""
+        return '\n\n'.join(page for page in self.get_pages() if page)
+
+
+class MaterialSummary(db.Model):
+    """자료별 부분 요약 테이블 (개념 학습 계층 요약의 map 단계 결과, concept_summaries 모듈 참고)
+    
+    Attributes:
+        material_id: 자료 ID (Primary Key, Foreign Key)
+        summary: 자료 하나의 요약 노트 (Markdown)
+        source_fingerprint: 요약에 사용한 자료 텍스트/요약 규칙 fingerprint (다르면 다시 요약)
+        model: 요약을 생성한 모델명
+        created_at: 생성 시간
+        updated_at: 수정 시간
+    """
+    __tablename__ = 'material_summaries'
+    
+    material_id = db.Column(db.Integer, db.ForeignKey('materials.id'), primary_key=True)
+    summary = db.Column(CompressedText, nullable=False)
+    source_fingerprint = db.Column(db.String(16), nullable=True)
+    model = db.Column(db.String(100), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
 class LearningPDF(db.Model):
@@ -255,7 +278,7 @@ class LearningPDF(db.Model):
     file_name = db.Column(db.String(200), nullable=False)
     file_path = db.Column(db.String(500), nullable=False)
     file_size = db.Column(db.Integer, nullable=True)
-    extracted_text = db.Column(db.Text, nullable=True)  # PDF에서 추출한 텍스트
+    extracted_text = deferred(db.Column(CompressedText, nullable=True))  # PDF에서 추출한 텍스트 (지연 로딩)
     vector_db_path = db.Column(db.String(500), nullable=True)  # 벡터 DB 인덱스 경로
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -264,14 +287,7 @@ class LearningPDF(db.Model):
     
     def to_dict(self):
         """PDF 정보를 딕셔너리로 변환"""
-        return {
-            'id': self.id,
-            'subject_id': self.subject_id,
-            'file_name': self.file_name,
-            'file_path': self.file_path,
-            'file_size': self.file_size,
-            'uploaded_at': self.uploaded_at.isoformat() if self.uploaded_at else None
-        }
+        return _serialize_learning_pdf(self)
 
 
 class ChatHistory(db.Model):
@@ -298,15 +314,7 @@ class ChatHistory(db.Model):
     
     def to_dict(self):
         """채팅 히스토리 정보를 딕셔너리로 변환"""
-        return {
-            'id': self.id,
-            'subject_id': self.subject_id,
-            'learning_pdf_id': self.learning_pdf_id,
-            'mode': self.mode,
-            'user_message': self.user_message,
-            'ai_response': self.ai_response,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        return _serialize_chat_history(self)
 
 
 class QuizResult(db.Model):
@@ -339,18 +347,7 @@ class QuizResult(db.Model):
     
     def to_dict(self):
         """퀴즈 결과 정보를 딕셔너리로 변환"""
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'subject_id': self.subject_id,
-            'learning_pdf_id': self.learning_pdf_id,
-            'quiz_content': self.quiz_content,
-            'user_answer': self.user_answer,
-            'correct_answer': self.correct_answer,
-            'is_correct': self.is_correct,
-            'weakness_tag': self.weakness_tag,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        return _serialize_quiz_result(self)
 
 
 class ConceptContent(db.Model):
@@ -361,6 +358,9 @@ class ConceptContent(db.Model):
         week_id: 주차 ID (Foreign Key)
         mode: 학습 모드 ('summary' 또는 'deep_dive')
         content: 생성된 콘텐츠 (Markdown 형식)
+        source_fingerprint: 생성에 사용한 주차 텍스트 fingerprint (다르면 다시 생성, artifacts 모듈 참고)
+        gzip_body: 미리 gzip으로 압축한 캐시 응답 본문 (response_compression 모듈 참고)
+        br_body: 미리 brotli로 압축한 캐시 응답 본문 (brotli 패키지가 있을 때만)
         created_at: 생성 시간
         updated_at: 수정 시간
     """
@@ -369,7 +369,10 @@ class ConceptContent(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     week_id = db.Column(db.Integer, db.ForeignKey('weeks.id'), nullable=False)
     mode = db.Column(db.String(50), nullable=False)  # 'summary' 또는 'deep_dive'
-    content = db.Column(db.Text, nullable=False)  # Markdown 형식의 콘텐츠
+    content = db.Column(CompressedText, nullable=False)  # Markdown 형식의 콘텐츠
+    source_fingerprint = db.Column(db.String(16), nullable=True)
+    gzip_body = deferred(db.Column(db.LargeBinary, nullable=True))  # 캐시 응답을 보낼 때만 읽음
+    br_body = deferred(db.Column(db.LargeBinary, nullable=True))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -378,14 +381,7 @@ class ConceptContent(db.Model):
     
     def to_dict(self):
         """콘텐츠 정보를 딕셔너리로 변환"""
-        return {
-            'id': self.id,
-            'week_id': self.week_id,
-            'mode': self.mode,
-            'content': self.content,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        return _serialize_concept_content(self)
 
 
 class Quiz(db.Model):
@@ -427,20 +423,7 @@ class Quiz(db.Model):
     
     def to_dict(self):
         """퀴즈 정보를 딕셔너리로 변환"""
-        import json
-        return {
-            'id': self.id,
-            'subject_id': self.subject_id,
-            'user_id': self.user_id,
-            'week_numbers': json.loads(self.week_numbers) if self.week_numbers else [],
-            'difficulty': self.difficulty,
-            'question_types': json.loads(self.question_types) if self.question_types else [],
-            'language': self.language,
-            'num_questions': self.num_questions,
-            'past_exam_context': self.past_exam_context,
-            'quiz_number': self.quiz_number,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        return _serialize_quiz(self)
 
 
 class Question(db.Model):
@@ -456,6 +439,7 @@ class Question(db.Model):
         explanation: 설명
         key_concept: 핵심 개념
         order: 문제 순서 (1, 2, 3, ...)
+        source_question_id: 문제 은행에서 복사한 문제인 경우 원본 문제 ID (LLM이 생성한 원본은 None)
     """
     __tablename__ = 'questions'
     
@@ -465,27 +449,48 @@ class Question(db.Model):
     question_text = db.Column(db.Text, nullable=False)
     options = db.Column(db.Text, nullable=True)  # JSON 배열 문자열 (객관식용)
     correct_answer = db.Column(db.Text, nullable=False)
-    explanation = db.Column(db.Text, nullable=False)
+    explanation = db.Column(CompressedText, nullable=False)
     key_concept = db.Column(db.String(200), nullable=True)  # 핵심 개념
     order = db.Column(db.Integer, nullable=False)  # 문제 순서
+    source_question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), nullable=True)
     
     # 관계 설정
     user_responses = db.relationship('UserResponse', backref='question', lazy=True, cascade='all, delete-orphan')
+    bank_entries = db.relationship('QuestionBankEntry', backref='question', lazy=True, cascade='all, delete-orphan')
     
     def to_dict(self):
         """문제 정보를 딕셔너리로 변환"""
-        import json
-        return {
-            'id': self.id,
-            'quiz_id': self.quiz_id,
-            'question_type': self.question_type,
-            'question_text': self.question_text,
-            'options': json.loads(self.options) if self.options else None,
-            'correct_answer': self.correct_answer,
-            'explanation': self.explanation,
-            'key_concept': self.key_concept,
-            'order': self.order
-        }
+        return _serialize_question(self)
+
+
+class QuestionBankEntry(db.Model):
+    """문제 은행 색인 테이블 (LLM이 생성한 원본 문제를 주차별로 한 행씩 색인, question_bank 모듈 참고)
+    
+    Attributes:
+        id: 색인 고유 ID (Primary Key)
+        question_id: 원본 문제 ID (Foreign Key)
+        subject_id: 과목 ID (Foreign Key)
+        week_number: 문제가 생성된 퀴즈의 주차 번호
+        difficulty: 난이도 ('easy', 'medium', 'hard')
+        question_type: 문제 유형
+        language: 언어 ('korean', 'english')
+        key_concept: 핵심 개념
+        source_fingerprint: 문제 생성에 사용한 주차 텍스트 fingerprint (자료가 바뀌면 출제에서 제외)
+    """
+    __tablename__ = 'question_bank'
+    __table_args__ = (
+        db.Index('ix_question_bank_lookup', 'subject_id', 'difficulty', 'language', 'week_number'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), nullable=False, index=True)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subjects.id'), nullable=False)
+    week_number = db.Column(db.Integer, nullable=False)
+    difficulty = db.Column(db.String(20), nullable=False)
+    question_type = db.Column(db.String(50), nullable=False)
+    language = db.Column(db.String(20), nullable=False)
+    key_concept = db.Column(db.String(200), nullable=True)
+    source_fingerprint = db.Column(db.String(16), nullable=True)
 
 
 class UserResponse(db.Model):
@@ -510,13 +515,50 @@ class UserResponse(db.Model):
     
     def to_dict(self):
         """답안 정보를 딕셔너리로 변환"""
+        return _serialize_user_response(self)
+
+
+class ConceptMastery(db.Model):
+    """핵심 개념별 숙련도 테이블 (퀴즈 제출 시 채점 결과로 누적 갱신, mastery 모듈 참고)
+    
+    Attributes:
+        id: 고유 ID (Primary Key)
+        user_id: 사용자 ID (Foreign Key)
+        subject_id: 과목 ID (Foreign Key)
+        key_concept: 핵심 개념 (Question.key_concept)
+        attempts: 푼 문제 수
+        correct: 맞힌 문제 수
+        last_correct: 가장 최근 답안의 정답 여부
+        last_seen_at: 가장 최근에 푼 시간
+    """
+    __tablename__ = 'concept_mastery'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'subject_id', 'key_concept', name='uq_concept_mastery'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subjects.id'), nullable=False)
+    key_concept = db.Column(db.String(200), nullable=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    correct = db.Column(db.Integer, nullable=False, default=0)
+    last_correct = db.Column(db.Boolean, nullable=True)
+    last_seen_at = db.Column(db.DateTime, nullable=True)
+    
+    @property
+    def correct_rate(self):
+        """정답률 (0.0 ~ 1.0, 푼 문제가 없으면 0)"""
+        return self.correct / self.attempts if self.attempts else 0.0
+    
+    def to_dict(self):
+        """숙련도 정보를 딕셔너리로 변환"""
         return {
-            'id': self.id,
-            'quiz_id': self.quiz_id,
-            'question_id': self.question_id,
-            'user_answer': self.user_answer,
-            'is_correct': self.is_correct,
-            'submitted_at': self.submitted_at.isoformat() if self.submitted_at else None
+            'key_concept': self.key_concept,
+            'attempts': self.attempts,
+            'correct': self.correct,
+            'correct_rate': round(self.correct_rate, 3),
+            'last_correct': self.last_correct,
+            'last_seen_at': self.last_seen_at.isoformat() if self.last_seen_at else None
         }
 
 
@@ -528,7 +570,9 @@ class QuizReport(db.Model):
         quiz_id: 퀴즈 ID (Foreign Key, unique)
         score: 점수
         total: 전체 문제 수
-        ai_report: AI 생성 리포트 내용 (텍스트)
+        ai_report: AI 생성 리포트 내용 (텍스트, 생성 전에는 빈 문자열)
+        status: 리포트 생성 상태 ('pending', 'ready', 'failed')
+        error_message: 리포트 생성 실패 사유
         created_at: 생성 시간
     """
     __tablename__ = 'quiz_reports'
@@ -537,17 +581,146 @@ class QuizReport(db.Model):
     quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id'), nullable=False, unique=True)
     score = db.Column(db.Integer, nullable=False)
     total = db.Column(db.Integer, nullable=False)
-    ai_report = db.Column(db.Text, nullable=False)  # AI 리포트 내용
+    ai_report = db.Column(CompressedText, nullable=False, default='')  # AI 리포트 내용
+    status = db.Column(db.String(20), nullable=False, default='ready')  # 제출 직후 'pending', 백그라운드 생성 후 'ready'/'failed'
+    error_message = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def to_dict(self):
         """리포트 정보를 딕셔너리로 변환"""
-        return {
-            'id': self.id,
-            'quiz_id': self.quiz_id,
-            'score': self.score,
-            'total': self.total,
-            'ai_report': self.ai_report,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        return _serialize_quiz_report(self)
+
+
+class TextDictionary(db.Model):
+    """압축 텍스트 공유 사전 테이블 (한 번 저장한 사전은 바꾸지 않음, compressed_text 모듈 참고)
+    
+    Attributes:
+        id: 사전 ID (Primary Key, 압축 값 헤더에 기록)
+        data: zlib preset dictionary 바이트
+        sample_count: 학습에 사용한 표본 수
+        created_at: 학습 시간
+    """
+    __tablename__ = 'text_dictionaries'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    data = db.Column(db.LargeBinary, nullable=False)
+    sample_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class IdempotencyKey(db.Model):
+    """멱등성 키 테이블 (같은 키로 다시 온 요청에 저장된 응답을 반환, idempotency 모듈 참고)
+
+    Attributes:
+        id: 고유 ID (Primary Key)
+        scope: 키가 적용되는 엔드포인트 (예: 'quiz_generate', 'quiz_submit:12')
+        key: 클라이언트가 보낸 Idempotency-Key 헤더 값
+        request_fingerprint: 요청 본문 fingerprint (같은 키로 다른 요청을 보내면 거부)
+        status: 'pending' (처리 중), 'done' (응답 저장됨)
+        status_code: 저장된 응답 상태 코드
+        response_body: 저장된 응답 본문 (JSON)
+        created_at: 처리 시작 시간
+        completed_at: 응답 저장 시간
+    """
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        db.UniqueConstraint('scope', 'key', name='uq_idempotency_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    scope = db.Column(db.String(100), nullable=False)
+    key = db.Column(db.String(128), nullable=False)
+    request_fingerprint = db.Column(db.String(16), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    status_code = db.Column(db.Integer, nullable=True)
+    response_body = db.Column(CompressedText, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+
+class GenerationClaim(db.Model):
+    """생성 작업 점유 테이블 (같은 결과를 만드는 동시 요청 중 한 요청만 생성, coalescing 모듈 참고)
+
+    Attributes:
+        key: 생성 작업 키 (Primary Key, 예: 'concept:12:summary:<fingerprint>')
+        created_at: 점유 시간
+    """
+    __tablename__ = 'generation_claims'
+
+    key = db.Column(db.String(200), primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class RateLimitBucket(db.Model):
+    """요청 제한 토큰 버킷 테이블 (사용자 × 엔드포인트, rate_limits 모듈 참고)
+
+    Attributes:
+        key: 버킷 키 (Primary Key, 예: 'quiz_generate:user:3')
+        tokens: 남은 토큰 수 (마지막 갱신 시점 기준)
+        updated: 마지막 갱신 시간 (Unix timestamp, 초)
+    """
+    __tablename__ = 'rate_limit_buckets'
+
+    key = db.Column(db.String(200), primary_key=True)
+    tokens = db.Column(db.Float, nullable=False)
+    updated = db.Column(db.Float, nullable=False)
+
+
+class LLMTokenUsage(db.Model):
+    """사용자별 일일 LLM 토큰 사용량 테이블 (일일 예산 확인용, rate_limits 모듈 참고)
+
+    Attributes:
+        user_id: 사용자 ID (Primary Key)
+        day: 날짜 (한국 시간 기준, Primary Key)
+        tokens: 입력 + 출력 토큰 수
+    """
+    __tablename__ = 'llm_token_usage'
+
+    user_id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    tokens = db.Column(db.Integer, nullable=False, default=0)
+
 
+# 모델별 직렬화 함수 (to_dict에서 사용, datetime은 JSON 프로바이더가 ISO 8601로 직렬화, json_serialization 모듈 참고)
+_serialize_user = compile_serializer('_serialize_user', [
+    'id', 'username', 'login_id', 'email', 'school', 'major', 'grade', 'social_type', 'exam_style', 'learning_depth',
+    'material_preference', 'practice_style', 'ai_persona', 'onboarding_completed', 'theme', 'email_notifications',
+    'push_notifications', 'created_at', 'updated_at',
+], or_defaults={'theme': 'light'})
+_serialize_subject = compile_serializer('_serialize_subject', [
+    'id', 'user_id', 'name', 'subject_type', 'syllabus_context', 'syllabus_file_path', 'syllabus_text', 'color', 'order',
+    'exam_date', 'exam_type', 'exam_week_start', 'exam_week_end', 'is_notification_on', 'study_plan',
+    'created_at', 'updated_at',
+], json_fields={'study_plan': None})
+_serialize_week = compile_serializer('_serialize_week', [
+    'id', 'subject_id', 'week_number', 'title', 'description', 'created_at', 'updated_at',
+])
+_serialize_material = compile_serializer('_serialize_material', [
+    'id', 'week_id', 'file_name', 'file_path', 'file_type', 'file_size', 'text_status', 'page_count', 'uploaded_at',
+])
+_serialize_learning_pdf = compile_serializer('_serialize_learning_pdf', [
+    'id', 'subject_id', 'file_name', 'file_path', 'file_size', 'uploaded_at',
+])
+_serialize_chat_history = compile_serializer('_serialize_chat_history', [
+    'id', 'subject_id', 'learning_pdf_id', 'mode', 'user_message', 'ai_response', 'created_at',
+])
+_serialize_quiz_result = compile_serializer('_serialize_quiz_result', [
+    'id', 'user_id', 'subject_id', 'learning_pdf_id', 'quiz_content', 'user_answer', 'correct_answer', 'is_correct',
+    'weakness_tag', 'created_at',
+])
+_serialize_concept_content = compile_serializer('_serialize_concept_content', [
+    'id', 'week_id', 'mode', 'content', 'created_at', 'updated_at',
+])
+_serialize_quiz = compile_serializer('_serialize_quiz', [
+    'id', 'subject_id', 'user_id', 'week_numbers', 'difficulty', 'question_types', 'language', 'num_questions',
+    'past_exam_context', 'quiz_number', 'created_at',
+], json_fields={'week_numbers': [], 'question_types': []})
+_serialize_question = compile_serializer('_serialize_question', [
+    'id', 'quiz_id', 'question_type', 'question_text', 'options', 'correct_answer', 'explanation', 'key_concept', 'order',
+], json_fields={'options': None})
+_serialize_user_response = compile_serializer('_serialize_user_response', [
+    'id', 'quiz_id', 'question_id', 'user_answer', 'is_correct', 'submitted_at',
+])
+_serialize_quiz_report = compile_serializer('_serialize_quiz_report', [
+    'id', 'quiz_id', 'score', 'total', 'ai_report', 'status', 'error_message', 'created_at',
+])
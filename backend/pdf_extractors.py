@@ -0,0 +1,86 @@
+"""
+PDF 텍스트 추출 백엔드 모듈
+PDF 라이브러리별 페이지 텍스트 추출을 공통 인터페이스 뒤로 감쌉니다.
+강의계획서(create_subject)와 수업자료(material_text) 추출 모두 get_pdf_extractor()를 통해 같은 백엔드를 사용합니다.
+
+백엔드별 속도/메모리/추출 품질 비교는 benchmarks/pdf_extractors.py로 측정합니다.
+uploads의 강의계획서/수업자료 기준으로 두 백엔드의 추출 내용은 같았고 PyPDF2가 더 빨라 기본값으로 사용합니다.
+pypdf는 단어 경계(줄 사이 공백)를 더 정확하게 유지합니다.
+
+환경 변수:
+    PDF_EXTRACTOR: 'pypdf2' (기본값) 또는 'pypdf'
+"""
+
+import os
+import threading
+
+DEFAULT_PDF_EXTRACTOR = 'pypdf2'
+
+
+class PDFExtractor:
+    """PDF 텍스트 추출 인터페이스"""
+    name = 'base'
+
+    def iter_pages(self, pdf_path):
+        """(페이지 번호, 텍스트)를 한 페이지씩 생성 (텍스트가 없는 페이지는 빈 문자열, 실패 시 예외 발생)
+
+        페이지 텍스트는 요청될 때 추출되므로, 소비하는 쪽이 중간에 멈추면 나머지 페이지는 추출하지 않습니다.
+        """
+        raise NotImplementedError
+
+    def extract_pages(self, pdf_path):
+        """페이지별 텍스트 목록 반환 (텍스트가 없는 페이지는 빈 문자열, 실패 시 예외 발생)"""
+        return [text for _, text in self.iter_pages(pdf_path)]
+
+
+class PypdfExtractor(PDFExtractor):
+    """pypdf 기반 추출 (PyPDF2의 후속 라이브러리)"""
+    name = 'pypdf'
+
+    def __init__(self):
+        from pypdf import PdfReader
+        self._reader_cls = PdfReader
+
+    def iter_pages(self, pdf_path):
+        reader = self._reader_cls(pdf_path)
+        for page_no, page in enumerate(reader.pages, 1):
+            yield page_no, page.extract_text() or ''
+
+
+class PyPDF2Extractor(PDFExtractor):
+    """PyPDF2 기반 추출 (기존 구현)"""
+    name = 'pypdf2'
+
+    def __init__(self):
+        from PyPDF2 import PdfReader
+        self._reader_cls = PdfReader
+
+    def iter_pages(self, pdf_path):
+        reader = self._reader_cls(pdf_path)
+        for page_no, page in enumerate(reader.pages, 1):
+            yield page_no, page.extract_text() or ''
+
+
+EXTRACTORS = {
+    PypdfExtractor.name: PypdfExtractor,
+    PyPDF2Extractor.name: PyPDF2Extractor,
+}
+
+_extractor_cache = {}
+_extractor_lock = threading.Lock()
+
+
+def get_pdf_extractor(name=None):
+    """설정된 PDF 추출 백엔드 반환 (name을 생략하면 PDF_EXTRACTOR 환경 변수 사용)
+
+    알 수 없는 이름이면 ValueError, 해당 라이브러리가 설치되어 있지 않으면 ImportError가 발생합니다.
+    """
+    name = (name or os.getenv('PDF_EXTRACTOR', DEFAULT_PDF_EXTRACTOR)).lower()
+    if name not in EXTRACTORS:
+        raise ValueError(f"알 수 없는 PDF_EXTRACTOR: {name} (사용 가능: {', '.join(EXTRACTORS)})")
+    with _extractor_lock:
+        extractor = _extractor_cache.get(name)
+        if extractor is None:
+            extractor = EXTRACTORS[name]()
+            _extractor_cache[name] = extractor
+        return extractor
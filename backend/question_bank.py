@@ -0,0 +1,227 @@
+"""
+문제 은행 모듈
+LLM으로 생성한 문제를 과목/주차/난이도/유형/언어/핵심 개념별로 색인(question_bank 테이블)하고,
+새 퀴즈를 만들 때 색인된 문제를 먼저 사용하여 LLM은 부족한 문제만 생성하도록 합니다.
+
+- 색인 대상은 LLM이 생성한 원본 문제입니다. 문제 은행에서 가져온 문제는 새 퀴즈에 복사하고
+  (UserResponse가 퀴즈별 문제를 참조하므로) source_question_id로 원본을 가리킵니다.
+- 문제에는 주차 정보가 없으므로, 문제가 생성된 퀴즈의 주차마다 색인합니다.
+- 사용자가 최근 퀴즈에서 본 문제(원본 기준)는 제외합니다.
+- 원본 문제가 있는 퀴즈를 삭제할 때 다른 퀴즈에 복사본이 있으면, 가장 먼저 만든 복사본을 새 원본으로 바꿔
+  색인과 다른 복사본의 source_question_id를 옮깁니다 (복사본이 가리키는 원본이 사라지지 않도록).
+- 색인할 때 주차 텍스트 fingerprint를 기록하고, 그 뒤 주차 자료가 바뀌었으면 출제에서 제외합니다 (artifacts 모듈 참고).
+
+환경 변수:
+    QUESTION_BANK_ENABLED: '0'이면 문제 은행을 사용하지 않고 항상 LLM으로 생성 (기본값 '1')
+    QUESTION_BANK_RECENT_QUIZZES: 출제에서 제외할 최근 퀴즈 수 (기본값 3)
+"""
+
+import os
+import random
+import logging
+from dataclasses import dataclass, field
+
+from sqlalchemy import text
+
+from models import db, Quiz, Question, QuestionBankEntry
+from artifacts import is_current
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BankSelection:
+    """문제 은행 선택 결과
+
+    Attributes:
+        questions: 선택된 원본 문제 목록 (출제 순서)
+        weeks: 선택된 문제가 색인된 주차 목록
+        uncovered_weeks: 조건에 맞는 후보 문제가 없는 주차 목록 (LLM으로 생성해야 함)
+    """
+    questions: list = field(default_factory=list)
+    weeks: list = field(default_factory=list)
+    uncovered_weeks: list = field(default_factory=list)
+
+
+def is_enabled():
+    return os.getenv('QUESTION_BANK_ENABLED', '1') != '0'
+
+
+def index_questions(quiz, questions, week_numbers, fingerprints=None):
+    """LLM으로 새로 생성한 문제를 문제 은행에 색인 (commit은 호출하는 쪽에서)
+
+    Args:
+        fingerprints: 주차 번호별 텍스트 fingerprint (문제 생성에 사용한 자료)
+    """
+    fingerprints = fingerprints or {}
+    for question in questions:
+        for week_no in week_numbers:
+            question.bank_entries.append(QuestionBankEntry(
+                subject_id=quiz.subject_id,
+                week_number=week_no,
+                difficulty=quiz.difficulty,
+                question_type=question.question_type,
+                language=quiz.language,
+                key_concept=question.key_concept,
+                source_fingerprint=fingerprints.get(week_no)
+            ))
+
+
+def copy_question(original, quiz_id, order):
+    """문제 은행의 문제를 새 퀴즈의 문제로 복사"""
+    return Question(
+        quiz_id=quiz_id,
+        question_type=original.question_type,
+        question_text=original.question_text,
+        options=original.options,
+        correct_answer=original.correct_answer,
+        explanation=original.explanation,
+        key_concept=original.key_concept,
+        order=order,
+        source_question_id=original.source_question_id or original.id
+    )
+
+
+def promote_copies(quiz_id):
+    """퀴즈를 삭제하기 전에 그 퀴즈의 원본 문제를 다른 퀴즈의 복사본으로 넘김 (commit은 호출하는 쪽에서)
+
+    원본마다 가장 먼저 만든 복사본을 새 원본(source_question_id=None)으로 바꾸고, 나머지 복사본과
+    문제 은행 색인이 새 원본을 가리키게 합니다. 복사본이 없는 원본은 퀴즈와 함께 삭제됩니다.
+
+    Returns:
+        새 원본이 된 문제 수
+    """
+    originals = db.session.query(Question.id).filter(
+        Question.quiz_id == quiz_id, Question.source_question_id.is_(None))
+    copies = Question.query.filter(
+        Question.source_question_id.in_(originals), Question.quiz_id != quiz_id
+    ).order_by(Question.id).all()
+
+    heirs = {}  # 원본 ID → 새 원본
+    for copy in copies:
+        heir = heirs.setdefault(copy.source_question_id, copy)
+        if heir is not copy:
+            copy.source_question_id = heir.id
+    for original_id, heir in heirs.items():
+        heir.source_question_id = None
+        QuestionBankEntry.query.filter_by(question_id=original_id).update(
+            {QuestionBankEntry.question_id: heir.id}, synchronize_session=False)
+    return len(heirs)
+
+
+def recent_question_ids(subject_id, user_id, recent_quizzes=None):
+    """사용자가 최근 퀴즈에서 본 문제의 원본 ID 집합"""
+    if recent_quizzes is None:
+        recent_quizzes = int(os.getenv('QUESTION_BANK_RECENT_QUIZZES', '3'))
+    if recent_quizzes <= 0:
+        return set()
+    quiz_ids = [quiz_id for (quiz_id,) in db.session.query(Quiz.id).filter_by(
+        subject_id=subject_id, user_id=user_id
+    ).order_by(Quiz.created_at.desc(), Quiz.id.desc()).limit(recent_quizzes).all()]
+    if not quiz_ids:
+        return set()
+    rows = db.session.query(db.func.coalesce(Question.source_question_id, Question.id)).filter(
+        Question.quiz_id.in_(quiz_ids)
+    ).all()
+    return {question_id for (question_id,) in rows}
+
+
+def select_bank_questions(subject_id, user_id, week_numbers, difficulty, question_types, language, num_questions,
+                          fingerprints=None, rng=None):
+    """문제 은행에서 퀴즈 문제 선택
+
+    주차를 돌아가며 한 문제씩 고르고, 이미 고른 핵심 개념은 뒤로 미뤄 범위가 고르게 섞이도록 합니다.
+    후보가 없는 주차가 있으면 그 비율만큼 LLM이 생성할 몫을 남깁니다.
+    fingerprints(주차 번호별 현재 텍스트 fingerprint)를 주면 그와 다른 자료로 만든 문제는 제외합니다.
+    """
+    week_numbers = list(dict.fromkeys(week_numbers))
+    selection = BankSelection(uncovered_weeks=week_numbers)
+    if num_questions <= 0 or not week_numbers or not question_types:
+        return selection
+
+    rows = db.session.query(
+        QuestionBankEntry.question_id, QuestionBankEntry.week_number, QuestionBankEntry.key_concept,
+        QuestionBankEntry.source_fingerprint
+    ).filter(
+        QuestionBankEntry.subject_id == subject_id,
+        QuestionBankEntry.difficulty == difficulty,
+        QuestionBankEntry.language == language,
+        QuestionBankEntry.question_type.in_(question_types),
+        QuestionBankEntry.week_number.in_(week_numbers)
+    ).all()
+    if not rows:
+        return selection
+
+    excluded = recent_question_ids(subject_id, user_id)
+    candidates = {}  # 주차 → {문제 ID: 핵심 개념}
+    stale = 0
+    for question_id, week_no, key_concept, source_fingerprint in rows:
+        if fingerprints is not None and not is_current(source_fingerprint, fingerprints.get(week_no)):
+            stale += 1
+            continue
+        if question_id not in excluded:
+            candidates.setdefault(week_no, {})[question_id] = (key_concept or '').strip().lower()
+
+    if stale:
+        logger.debug("주차 자료가 바뀐 문제 은행 색인 %s건 제외", stale)
+
+    covered = [week_no for week_no in week_numbers if week_no in candidates]
+    selection.uncovered_weeks = [week_no for week_no in week_numbers if week_no not in candidates]
+    quota = num_questions * len(covered) // len(week_numbers)
+    if quota <= 0:
+        return selection
+
+    rng = rng or random.Random()
+    pools = {}
+    for week_no in covered:
+        pools[week_no] = list(candidates[week_no])
+        rng.shuffle(pools[week_no])
+
+    chosen = {}  # 문제 ID → 주차 (선택 순서 유지)
+    used_concepts = set()
+    while len(chosen) < quota:
+        progressed = False
+        for week_no in covered:
+            if len(chosen) >= quota:
+                break
+            pool = [question_id for question_id in pools[week_no] if question_id not in chosen]
+            pools[week_no] = pool
+            if not pool:
+                continue
+            pick = next((question_id for question_id in pool
+                         if candidates[week_no][question_id] not in used_concepts), pool[0])
+            chosen[pick] = week_no
+            if candidates[week_no][pick]:
+                used_concepts.add(candidates[week_no][pick])
+            progressed = True
+        if not progressed:
+            break
+
+    questions = {question.id: question for question in Question.query.filter(Question.id.in_(list(chosen))).all()}
+    seen_texts = set()
+    for question_id, week_no in chosen.items():
+        question = questions.get(question_id)
+        if question is None or question.question_text in seen_texts:
+            continue
+        seen_texts.add(question.question_text)
+        selection.questions.append(question)
+        if week_no not in selection.weeks:
+            selection.weeks.append(week_no)
+    return selection
+
+
+def backfill_question_bank():
+    """기존에 생성된 원본 문제를 문제 은행에 색인 (question_bank 테이블을 처음 만들 때 한 번 실행)
+
+    퀴즈의 week_numbers(JSON 배열)를 SQLite json_each로 펼쳐서 주차별로 한 번에 삽입합니다.
+    """
+    result = db.session.execute(text("""
+        INSERT INTO question_bank (question_id, subject_id, week_number, difficulty, question_type, language, key_concept)
+        SELECT q.id, z.subject_id, CAST(w.value AS INTEGER), z.difficulty, q.question_type, z.language, q.key_concept
+        FROM questions q
+        JOIN quizzes z ON z.id = q.quiz_id, json_each(z.week_numbers) w
+        WHERE q.source_question_id IS NULL AND q.question_text != ''
+    """))
+    db.session.commit()
+    logger.info("기존 문제 %s건을 문제 은행에 색인했습니다.", result.rowcount)
+    return result.rowcount
@@ -0,0 +1,303 @@
+"""
+퀴즈 문제 생성 모듈
+LLM 응답(JSON) 파싱, 모델 후보를 차례로 시도하는 문제 생성, 여러 주차 퀴즈의 분할 병렬 생성을 담당합니다.
+
+분할 생성: 문제 수가 많거나 여러 주차를 선택한 퀴즈는 LLM 호출 하나로 모든 주차의 자료와 모든 문제를 처리하면
+입력(자료)과 출력(문제 수)이 함께 늘어나 응답 시간이 길어집니다. 요청을 주차 묶음별(주차가 하나면 문제 유형 묶음별)
+작은 호출 여러 개로 나누고, 각 호출에는 자기 주차의 자료만 넣어 동시에 실행합니다. 전체 응답 시간은 가장 큰 묶음의
+호출 시간에 가까워집니다.
+- 결과는 묶음 순서(주차 순서, 유형 묶음이면 번갈아가며)로 합치고, 같은 문제(공백/문장부호/대소문자를 무시한 문제 본문)는 하나만 남깁니다.
+- 실패한 묶음이나 중복 제거로 부족해진 문제는 가장 큰 묶음의 자료로 한 번 더 생성하여 채웁니다.
+- 생성된 문제에는 그 문제를 만든 묶음의 주차(QUESTION_WEEKS_KEY)가 붙어 문제 은행 색인에 사용됩니다.
+- 묶음 호출은 jobs.fan_out 스레드 풀에서 실행되며, LLM 호출 계측은 원래 요청(Server-Timing, /metrics)에 기록됩니다.
+
+환경 변수:
+    QUIZ_SHARDING: '0'이면 분할 생성 비활성화 (기본값 '1')
+    QUIZ_SHARD_MAX: 요청 하나를 나누는 최대 묶음 수 (기본값 4)
+    QUIZ_SHARD_MIN_QUESTIONS: 묶음 하나의 최소 문제 수 (기본값 2, 문제 수가 적으면 나누지 않음)
+    (묶음 호출 스레드 수는 jobs 모듈의 LLM_FANOUT_WORKERS)
+"""
+
+import os
+import re
+import json
+import logging
+from dataclasses import dataclass, field
+
+from jobs import fan_out
+
+logger = logging.getLogger(__name__)
+
+# 생성된 문제 딕셔너리에 붙이는 출제 주차 키 (save_generated_quiz가 문제 은행 색인에 사용)
+QUESTION_WEEKS_KEY = '_week_numbers'
+
+
+class QuizGenerationError(Exception):
+    """퀴즈 문제를 생성하지 못함 (message는 그대로 API 오류 응답에 사용)"""
+
+    def __init__(self, message, model=None):
+        super().__init__(message)
+        self.model = model
+
+
+@dataclass
+class QuizShard:
+    """분할 생성 단위
+
+    Attributes:
+        weeks: 이 묶음의 주차 번호 목록
+        texts: 프롬프트에 넣을 자료 텍스트 목록 (주차/파일 헤더 포함)
+        question_types: 생성할 문제 유형
+        count: 생성할 문제 수
+    """
+    weeks: list
+    texts: list
+    question_types: list
+    count: int
+    questions: list = field(default_factory=list)
+    model: str = None
+    error: str = None
+
+    @property
+    def text_size(self):
+        return sum(len(text) for text in self.texts)
+
+
+def is_enabled():
+    return os.getenv('QUIZ_SHARDING', '1') != '0'
+
+
+def _split_counts(total, weights):
+    """total을 weights 비율로 나눈 정수 목록 (최대 나머지 방식, 각 몫은 1 이상)"""
+    weight_sum = sum(weights)
+    raw = [total * w / weight_sum for w in weights]
+    counts = [max(1, int(r)) for r in raw]
+    order = sorted(range(len(weights)), key=lambda i: raw[i] - int(raw[i]), reverse=True)
+    i = 0
+    while sum(counts) < total:
+        counts[order[i % len(order)]] += 1
+        i += 1
+    while sum(counts) > total:
+        largest = max(range(len(counts)), key=lambda j: counts[j])
+        counts[largest] -= 1
+    return counts
+
+
+def _chunk(items, parts):
+    """items를 순서대로 parts개의 연속 묶음으로 나눔 (묶음 크기 차이는 최대 1)"""
+    size, extra = divmod(len(items), parts)
+    chunks, start = [], 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        chunks.append(items[start:end])
+        start = end
+    return chunks
+
+
+def plan_shards(week_texts, question_types, count, max_shards=None, min_questions=None):
+    """분할 생성 계획
+
+    Args:
+        week_texts: [(주차 번호, [자료 텍스트, ...]), ...] (주차 순서)
+        question_types: 요청한 문제 유형 목록
+        count: 생성할 전체 문제 수
+
+    Returns:
+        QuizShard 목록 (나누지 않는 경우 묶음 하나)
+    """
+    if max_shards is None:
+        max_shards = int(os.getenv('QUIZ_SHARD_MAX', '4'))
+    if min_questions is None:
+        min_questions = int(os.getenv('QUIZ_SHARD_MIN_QUESTIONS', '2'))
+    limit = max(1, min(max_shards, count // max(1, min_questions)))
+    all_weeks = [week_no for week_no, _ in week_texts]
+    all_texts = [text for _, texts in week_texts for text in texts]
+
+    if limit >= 2 and len(week_texts) >= 2:
+        # 주차 묶음별 분할 (문제 수는 묶음의 주차 수에 비례)
+        groups = _chunk(week_texts, min(limit, len(week_texts)))
+        counts = _split_counts(count, [len(group) for group in groups])
+        return [
+            QuizShard(weeks=[week_no for week_no, _ in group],
+                      texts=[text for _, texts in group for text in texts],
+                      question_types=list(question_types), count=group_count)
+            for group, group_count in zip(groups, counts)
+        ]
+
+    if limit >= 2 and len(question_types) >= 2:
+        # 주차가 하나면 문제 유형 묶음별 분할 (문제 수는 묶음의 유형 수에 비례, 자료는 모두 같음)
+        groups = _chunk(list(question_types), min(limit, len(question_types)))
+        counts = _split_counts(count, [len(group) for group in groups])
+        return [
+            QuizShard(weeks=all_weeks, texts=all_texts, question_types=group, count=group_count)
+            for group, group_count in zip(groups, counts)
+        ]
+
+    return [QuizShard(weeks=all_weeks, texts=all_texts, question_types=list(question_types), count=count)]
+
+
+def parse_questions(response_text):
+    """LLM 응답 텍스트에서 문제 목록 파싱 (```json 코드 블록 허용, 실패 시 QuizGenerationError)"""
+    response_text = response_text.strip()
+    if response_text.startswith('```'):
+        lines = response_text.split('\n')
+        response_text = '\n'.join(lines[1:-1]) if lines[-1].startswith('```') else '\n'.join(lines[1:])
+    try:
+        quiz_data = json.loads(response_text)
+    except json.JSONDecodeError as json_err:
+        logger.error("JSON 파싱 오류: %s", json_err)
+        logger.debug("응답 텍스트: %s...", response_text[:500])  # 처음 500자만 출력
+        raise QuizGenerationError(f'Failed to parse quiz data: {str(json_err)}')
+    return quiz_data.get('questions', [])
+
+
+def generate_questions(provider, model_candidates, prompt, count):
+    """모델 후보를 차례로 시도하여 문제 count개 생성
+
+    404(모델 없음)/429(할당량 초과)나 빈 응답이면 다음 모델을 시도하고, 그 밖의 오류는 마지막 모델에서 다시 발생시킵니다.
+    더 많이 생성되면 앞에서부터 count개만 사용하고, 적게 생성되면 QuizGenerationError가 발생합니다.
+
+    Returns:
+        (문제 딕셔너리 목록, 사용한 모델 이름)
+    """
+    response_text = ""
+    selected_model_name = None
+    for model_name in model_candidates:
+        try:
+            logger.debug("퀴즈 생성 모델 시도 중... (모델: %s)", model_name)
+            selected_model_name = model_name
+            response = provider.generate(model_name, prompt, purpose='quiz')
+
+            if response and response.text:
+                response_text = response.text.strip()
+                logger.info("퀴즈 생성 완료 (모델: %s)", selected_model_name)
+                break  # 성공하면 루프 종료
+            logger.warning("%s: 응답이 없음 - 다음 모델 시도...", model_name)
+
+        except Exception as error:
+            error_msg = str(error)
+            # 404 에러면 다음 모델 시도
+            if '404' in error_msg or 'not found' in error_msg.lower():
+                logger.warning("%s: 모델을 찾을 수 없음 - 다음 모델 시도...", model_name)
+            # 429 할당량 초과 에러면 다음 모델 시도
+            elif '429' in error_msg or 'quota' in error_msg.lower() or 'exceeded' in error_msg.lower():
+                logger.warning("%s: 할당량 초과 - 다음 모델 시도...", model_name)
+            # 다른 에러면 마지막 모델에서 재발생
+            else:
+                logger.warning("%s: %s", model_name, error_msg)
+                if model_name == model_candidates[-1]:
+                    raise
+
+    if not response_text:
+        raise QuizGenerationError('사용 가능한 Gemini 모델을 찾을 수 없거나 할당량이 초과되었습니다. 잠시 후 다시 시도해주세요.')
+
+    questions_data = parse_questions(response_text)
+
+    # 문제 수 검증 및 조정
+    if len(questions_data) != count:
+        logger.warning("요청한 문제 수(%s)와 생성된 문제 수(%s)가 다릅니다.", count, len(questions_data))
+
+        # 문제가 부족한 경우: 에러 (재시도 유도)
+        if len(questions_data) < count:
+            error_msg = f'생성된 문제 수({len(questions_data)}개)가 요청한 문제 수({count}개)보다 적습니다. 모델이 정확한 수의 문제를 생성하지 못했습니다.'
+            logger.error("%s", error_msg)
+            raise QuizGenerationError(error_msg, model=selected_model_name)
+
+        # 문제가 더 많은 경우: 처음 N개만 사용
+        logger.debug("생성된 문제가 더 많음. 처음 %s개만 사용합니다.", count)
+        questions_data = questions_data[:count]
+
+    return questions_data, selected_model_name
+
+
+_NORMALIZE_RE = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def question_signature(question):
+    """중복 판단용 문제 본문 (공백/문장부호/대소문자 무시)"""
+    return _NORMALIZE_RE.sub('', str(question.get('question_text', ''))).lower()
+
+
+def _run_shard(shard, provider, model_candidates, build_prompt):
+    """묶음 하나 생성 (실패는 shard.error에 기록)"""
+    try:
+        prompt = build_prompt(shard.texts, shard.weeks, shard.question_types, shard.count, [])
+        shard.questions, shard.model = generate_questions(provider, model_candidates, prompt, shard.count)
+    except Exception as e:
+        shard.error = str(e)
+        shard.model = getattr(e, 'model', None)
+        logger.warning("퀴즈 묶음 생성 실패 (주차 %s, 유형 %s): %s", shard.weeks, shard.question_types, e)
+    return shard
+
+
+def _merge(shards, interleave):
+    """묶음 결과를 순서대로 합치고 중복 문제 제거 (각 문제에 출제 주차를 붙임)"""
+    if interleave:
+        lists = [shard.questions for shard in shards]
+        ordered = []
+        for i in range(max((len(items) for items in lists), default=0)):
+            for shard, items in zip(shards, lists):
+                if i < len(items):
+                    ordered.append((shard, items[i]))
+    else:
+        ordered = [(shard, question) for shard in shards for question in shard.questions]
+
+    merged, seen, duplicates = [], set(), 0
+    for shard, question in ordered:
+        signature = question_signature(question)
+        if signature and signature in seen:
+            duplicates += 1
+            continue
+        seen.add(signature)
+        question[QUESTION_WEEKS_KEY] = list(shard.weeks)
+        merged.append(question)
+    return merged, seen, duplicates
+
+
+def generate_sharded(shards, provider, model_candidates, build_prompt, count):
+    """묶음들을 동시에 생성한 뒤 합치고, 부족한 문제는 가장 큰 묶음의 자료로 한 번 더 생성
+
+    Args:
+        build_prompt: (자료 텍스트 목록, 주차 목록, 문제 유형 목록, 문제 수, 피할 핵심 개념 목록) -> 프롬프트
+        count: 전체 문제 수
+
+    Returns:
+        (문제 딕셔너리 목록, 사용한 모델 이름 목록)
+    """
+    shards = fan_out(lambda shard: _run_shard(shard, provider, model_candidates, build_prompt), shards)
+
+    interleave = len({tuple(shard.weeks) for shard in shards}) == 1
+    merged, seen, duplicates = _merge(shards, interleave)
+    models = sorted({shard.model for shard in shards if shard.model and not shard.error})
+
+    missing = count - len(merged)
+    if missing > 0:
+        # 실패했거나 중복이 제거된 만큼 가장 큰 묶음의 자료로 추가 생성 (이미 출제된 개념은 피하도록 지시)
+        # 중복이 있었으면 추가 생성분에도 중복이 나올 수 있으므로 그만큼 여유 있게 요청
+        base = max(shards, key=lambda shard: shard.text_size)
+        avoid = sorted({q.get('key_concept') for q in merged if q.get('key_concept')})
+        extra_count = missing + min(duplicates, missing)
+        logger.info("퀴즈 묶음 결과가 %s개 부족하여 %s개를 추가 생성합니다 (주차 %s).", missing, extra_count, base.weeks)
+        prompt = build_prompt(base.texts, base.weeks, base.question_types, extra_count, avoid)
+        try:
+            extra, model = generate_questions(provider, model_candidates, prompt, extra_count)
+        except QuizGenerationError:
+            errors = [shard.error for shard in shards if shard.error]
+            if errors:
+                raise QuizGenerationError(errors[0], model=next((s.model for s in shards if s.error), None))
+            raise
+        for question in extra:
+            signature = question_signature(question)
+            if signature and signature in seen:
+                continue
+            seen.add(signature)
+            question[QUESTION_WEEKS_KEY] = list(base.weeks)
+            merged.append(question)
+        if model not in models:
+            models.append(model)
+
+    if len(merged) < count:
+        error_msg = f'생성된 문제 수({len(merged)}개)가 요청한 문제 수({count}개)보다 적습니다. 모델이 정확한 수의 문제를 생성하지 못했습니다.'
+        logger.error("%s", error_msg)
+        raise QuizGenerationError(error_msg, model=models[0] if models else None)
+    return merged[:count], models
@@ -4,23 +4,73 @@ RAG 기능은 제거되었으며, PDF 텍스트 추출만 제공합니다.
 """
 
 import os
-from PyPDF2 import PdfReader
+import time
+import logging
 from dotenv import load_dotenv
+from instrumentation import record_pdf_extraction
+from pdf_extractors import get_pdf_extractor
+from llm_provider import CHARS_PER_TOKEN
+
+logger = logging.getLogger(__name__)
 
 # 환경 변수 로드
 load_dotenv()
 
 
-def extract_text_from_pdf(pdf_path: str) -> str:
-    """PDF에서 텍스트 추출"""
+def budget_chars(max_chars=None, max_tokens=None):
+    """문자/토큰 예산을 문자 수 하나로 환산 (둘 다 없으면 None = 제한 없음)"""
+    limits = [limit for limit in (max_chars, max_tokens * CHARS_PER_TOKEN if max_tokens is not None else None)
+              if limit is not None]
+    return max(0, min(limits)) if limits else None
+
+
+def iter_text_budget(pages, max_chars=None, max_tokens=None):
+    """(페이지 번호, 텍스트) 이터러블에 문자/토큰 예산을 적용하여 텍스트가 있는 페이지만 생성
+
+    예산을 넘는 페이지는 남은 예산만큼 잘라서 내보낸 뒤 중단하며, 원본 이터레이터는 더 읽지 않습니다.
+    """
+    remaining = budget_chars(max_chars, max_tokens)
+    for page_no, text in pages:
+        if remaining is not None and remaining <= 0:
+            break
+        if not text:
+            continue
+        if remaining is not None:
+            text = text[:remaining]
+            remaining -= len(text)
+        yield page_no, text
+
+
+def iter_pdf_pages(pdf_path: str, max_chars=None, max_tokens=None):
+    """PDF에서 (페이지 번호, 텍스트)를 한 페이지씩 추출하여 생성 (실패 시 예외 발생)
+
+    문서 전체를 메모리에 올리지 않고, 예산(max_chars 또는 max_tokens)을 채우면 나머지 페이지는 추출하지 않습니다.
+    """
+    start_time = time.perf_counter()
+    pages = get_pdf_extractor().iter_pages(pdf_path)
+    try:
+        yield from iter_text_budget(pages, max_chars, max_tokens)
+    finally:
+        pages.close()
+        record_pdf_extraction(time.perf_counter() - start_time)
+
+
+def extract_pages_from_pdf(pdf_path: str) -> list:
+    """PDF에서 페이지별 텍스트 추출 (텍스트가 없는 페이지는 빈 문자열, 실패 시 예외 발생)
+
+    추출 백엔드는 PDF_EXTRACTOR 환경 변수로 선택합니다 (pdf_extractors 참고).
+    """
+    start_time = time.perf_counter()
+    try:
+        return get_pdf_extractor().extract_pages(pdf_path)
+    finally:
+        record_pdf_extraction(time.perf_counter() - start_time)
+
+
+def extract_text_from_pdf(pdf_path: str, max_chars=None, max_tokens=None) -> str:
+    """PDF에서 텍스트 추출 (텍스트가 있는 페이지를 빈 줄로 연결, 예산을 채우면 추출 중단)"""
     try:
-        pdf_reader = PdfReader(pdf_path)
-        text_parts = []
-        for page in pdf_reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text_parts.append(page_text)
-        return '\n\n'.join(text_parts)
+        return '\n\n'.join(text for _, text in iter_pdf_pages(pdf_path, max_chars, max_tokens))
     except Exception as e:
-        print(f"❌ PDF 텍스트 추출 실패: {e}")
+        logger.error("PDF 텍스트 추출 실패 (%s): %s", pdf_path, e)
         return ""
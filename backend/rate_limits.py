@@ -0,0 +1,217 @@
+"""
+요청 제한 모듈 (사용자별 토큰 버킷 + 일일 LLM 토큰 예산)
+LLM을 호출하는 엔드포인트를 사용자 한 명이 반복 호출하여(강제 재생성 반복, 퀴즈 생성 연타) 공유 Gemini 할당량을
+소진하지 않도록, 사용자 × 엔드포인트별 요청 수와 사용자별 하루 LLM 토큰 사용량을 제한합니다.
+
+- 토큰 버킷: 엔드포인트마다 '용량/기간(초)'으로 설정합니다 (예: '20/3600' - 최대 20회 연속, 3600초에 20개 충전).
+  버킷은 rate_limit_buckets 테이블에 저장하고 조건부 UPDATE 한 번으로 충전과 차감을 함께 하므로
+  gunicorn 워커가 여러 개여도 같은 버킷을 공유합니다.
+- 일일 예산: 요청 처리 중 사용한 LLM 토큰(instrumentation 계측 값)을 응답 직전에 사용자의 오늘(한국 시간) 사용량에 더하고,
+  예산을 넘은 사용자는 다음 날 0시까지 LLM 엔드포인트를 사용할 수 없습니다. 백그라운드 작업(퀴즈 리포트)은
+  작업에서 charge_llm_tokens를 직접 호출합니다.
+- 제한에 걸리면 429와 Retry-After 헤더(초), 어떤 제한인지(error_code, limit)와 재시도 가능 시간(retry_after)을 반환합니다.
+- 사용자를 알 수 없는 요청은 클라이언트 IP별 버킷을 사용합니다 (일일 예산은 적용하지 않음).
+
+환경 변수:
+    RATE_LIMIT_ENABLED: '0'이면 요청 제한 비활성화 (기본값 '1')
+    RATE_LIMIT_<엔드포인트>: 엔드포인트별 '용량/기간(초)', '0'이면 제한 없음 (기본값은 DEFAULT_LIMITS)
+        예: RATE_LIMIT_QUIZ_GENERATE=10/3600
+    LLM_DAILY_TOKEN_BUDGET: 사용자별 하루 LLM 토큰 예산 (입력 + 출력, 기본값 1000000, 0이면 제한 없음)
+"""
+
+import os
+import math
+import time
+import logging
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+
+from flask import request, g, jsonify
+from sqlalchemy import update, case
+from sqlalchemy.exc import IntegrityError
+
+from models import db, RateLimitBucket, LLMTokenUsage
+from instrumentation import current_metrics
+
+logger = logging.getLogger(__name__)
+
+KOREA_TZ = timezone(timedelta(hours=9))
+
+# 엔드포인트별 기본 제한 '용량/기간(초)'
+DEFAULT_LIMITS = {
+    'syllabus_analysis': '10/3600',
+    'concept_generate': '30/3600',
+    'quiz_generate': '20/3600',
+    'quiz_submit': '30/3600',
+    'quiz_report_retry': '10/3600',
+    'study_plan': '20/3600',
+}
+
+
+def is_enabled():
+    return os.getenv('RATE_LIMIT_ENABLED', '1') != '0'
+
+
+def _limit(name):
+    """엔드포인트의 (용량, 초당 충전량) - 제한이 없으면 None"""
+    spec = os.getenv(f'RATE_LIMIT_{name.upper()}', DEFAULT_LIMITS.get(name, '0'))
+    if spec.strip() in ('', '0'):
+        return None
+    capacity, _, period = spec.partition('/')
+    capacity = float(capacity)
+    return capacity, capacity / float(period or 60)
+
+
+def daily_budget():
+    return int(os.getenv('LLM_DAILY_TOKEN_BUDGET', '1000000'))
+
+
+def _korea_day():
+    return datetime.now(KOREA_TZ).date()
+
+
+def _seconds_until_tomorrow():
+    now = datetime.now(KOREA_TZ)
+    tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=KOREA_TZ)
+    return math.ceil((tomorrow - now).total_seconds())
+
+
+def _take(key, capacity, rate):
+    """버킷에서 토큰 1개 차감 (성공하면 0, 부족하면 다음 토큰까지 남은 초)"""
+    now = time.time()
+    refilled = RateLimitBucket.tokens + (now - RateLimitBucket.updated) * rate
+    current = case((refilled > capacity, capacity), else_=refilled)
+    for _ in range(2):
+        result = db.session.execute(
+            update(RateLimitBucket)
+            .where(RateLimitBucket.key == key, current >= 1)
+            .values(tokens=current - 1, updated=now)
+        )
+        if result.rowcount:
+            db.session.commit()
+            return 0
+        bucket = db.session.get(RateLimitBucket, key, populate_existing=True)
+        if bucket is not None:
+            db.session.rollback()
+            tokens = min(capacity, bucket.tokens + (now - bucket.updated) * rate)
+            return max(1, math.ceil((1 - tokens) / rate))
+        # 처음 사용하는 버킷 (다른 워커가 동시에 만들었으면 UPDATE를 다시 시도)
+        db.session.add(RateLimitBucket(key=key, tokens=capacity - 1, updated=now))
+        try:
+            db.session.commit()
+            return 0
+        except IntegrityError:
+            db.session.rollback()
+    return 1
+
+
+def used_tokens(user_id):
+    """사용자의 오늘 LLM 토큰 사용량"""
+    usage = db.session.get(LLMTokenUsage, (user_id, _korea_day()), populate_existing=True)
+    return usage.tokens if usage else 0
+
+
+def charge_llm_tokens(user_id, tokens):
+    """사용자의 오늘 LLM 토큰 사용량에 tokens를 더함"""
+    if not user_id or tokens <= 0:
+        return
+    day = _korea_day()
+    for _ in range(2):
+        result = db.session.execute(
+            update(LLMTokenUsage)
+            .where(LLMTokenUsage.user_id == user_id, LLMTokenUsage.day == day)
+            .values(tokens=LLMTokenUsage.tokens + tokens)
+        )
+        if not result.rowcount:
+            db.session.add(LLMTokenUsage(user_id=user_id, day=day, tokens=tokens))
+        try:
+            db.session.commit()
+            return
+        except IntegrityError:
+            db.session.rollback()
+
+
+def _too_many(message, error_code, name, retry_after):
+    response = jsonify({'error': message, 'error_code': error_code, 'limit': name, 'retry_after': retry_after})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+def check(name, user_id):
+    """엔드포인트 name의 요청 제한 확인 (통과하면 None, 제한에 걸리면 429 응답)
+
+    통과한 요청은 응답 직전에 사용한 LLM 토큰이 user_id의 일일 사용량에 더해집니다.
+    """
+    if not is_enabled():
+        return None
+    try:
+        user_id = int(user_id) if user_id is not None else None
+    except (TypeError, ValueError):
+        user_id = None
+
+    budget = daily_budget()
+    if user_id and budget and used_tokens(user_id) >= budget:
+        retry_after = _seconds_until_tomorrow()
+        logger.warning("일일 LLM 토큰 예산 초과 - user %s, %s", user_id, name)
+        return _too_many('오늘 사용할 수 있는 AI 생성량을 모두 사용했습니다. 내일 다시 시도해주세요.',
+                         'LLM_BUDGET_EXCEEDED', name, retry_after)
+
+    limit = _limit(name)
+    if limit is not None:
+        subject = f'user:{user_id}' if user_id else f'ip:{request.remote_addr}'
+        retry_after = _take(f'{name}:{subject}', *limit)
+        if retry_after:
+            logger.warning("요청 제한 - %s, %s (%s초 후 재시도)", subject, name, retry_after)
+            return _too_many(f'요청이 너무 많습니다. {retry_after}초 후에 다시 시도해주세요.',
+                             'RATE_LIMITED', name, retry_after)
+
+    if user_id:
+        g.llm_budget_user = user_id
+    return None
+
+
+def _request_user_id():
+    """요청 본문(JSON 또는 form)의 user_id"""
+    data = request.get_json(silent=True) if request.is_json else None
+    if isinstance(data, dict) and data.get('user_id') is not None:
+        return data.get('user_id')
+    return request.form.get('user_id')
+
+
+def rate_limited(name, user=None):
+    """요청 제한 뷰 데코레이터
+
+    Args:
+        name: 제한 이름 (RATE_LIMIT_<NAME> 환경 변수와 DEFAULT_LIMITS의 키)
+        user: URL 변수로 사용자 ID를 찾는 함수 (없으면 요청 본문의 user_id 사용)
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            user_id = user(**kwargs) if user is not None else _request_user_id()
+            limited = check(name, user_id)
+            if limited is not None:
+                return limited
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def init_rate_limits(app):
+    """요청이 사용한 LLM 토큰을 일일 사용량에 더하는 after_request 훅 등록
+
+    init_instrumentation 뒤에 호출해야 합니다 (after_request는 등록 역순으로 실행되므로 요청 계측 값이 남아 있을 때 실행).
+    """
+
+    @app.after_request
+    def charge_request_tokens(response):
+        user_id = g.pop('llm_budget_user', None)
+        metrics = current_metrics()
+        if user_id and metrics is not None:
+            try:
+                charge_llm_tokens(user_id, metrics.llm_prompt_tokens + metrics.llm_output_tokens)
+            except Exception:
+                db.session.rollback()
+                logger.exception("LLM 토큰 사용량 기록 실패 (user %s)", user_id)
+        return response
@@ -0,0 +1,144 @@
+"""
+HTTP 응답 압축 모듈
+Accept-Encoding 협상으로 JSON/Markdown 등 텍스트 응답을 brotli 또는 gzip으로 압축합니다.
+
+- 최소 크기(RESPONSE_COMPRESSION_MIN_BYTES)보다 작은 응답, 이미 Content-Encoding이 있는 응답,
+  파일 전송(direct_passthrough), 본문이 없는 상태 코드(204/206/304), Cache-Control: no-transform 응답은 그대로 보냅니다.
+- 스트리밍 응답은 청크마다 압축한 뒤 flush하여 클라이언트가 청크를 바로 받을 수 있게 합니다.
+- 자주 읽는 캐시 응답(개념 학습 콘텐츠)은 저장할 때 미리 압축한 본문(precompress_json)을 두고
+  precompressed_response로 압축 없이 바로 보냅니다.
+- brotli는 brotli 패키지가 설치되어 있을 때만 사용합니다 (없으면 gzip만 협상).
+
+환경 변수:
+    RESPONSE_COMPRESSION: '0'이면 응답 압축 비활성화 (기본값 '1')
+    RESPONSE_COMPRESSION_MIN_BYTES: 압축할 최소 응답 크기 (기본값 1024)
+    RESPONSE_COMPRESSION_GZIP_LEVEL: gzip 압축 레벨 (기본값 6)
+    RESPONSE_COMPRESSION_BROTLI_QUALITY: brotli 품질 (기본값 5, 미리 압축하는 본문은 11)
+"""
+
+import os
+import zlib
+import logging
+
+from flask import current_app, request, Response
+
+try:
+    import brotli
+except ImportError:  # brotli 패키지가 없으면 gzip만 사용
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'text/markdown', 'text/plain', 'text/html', 'text/css', 'text/csv',
+    'application/javascript', 'text/javascript',
+}
+SKIP_STATUS_CODES = {204, 206, 304}
+
+# 미리 압축하는 본문은 한 번만 압축하므로 가장 높은 압축 수준 사용
+PRECOMPRESS_GZIP_LEVEL = 9
+PRECOMPRESS_BROTLI_QUALITY = 11
+
+ENABLED = os.getenv('RESPONSE_COMPRESSION', '1') != '0'
+MIN_BYTES = int(os.getenv('RESPONSE_COMPRESSION_MIN_BYTES', '1024'))
+GZIP_LEVEL = int(os.getenv('RESPONSE_COMPRESSION_GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.getenv('RESPONSE_COMPRESSION_BROTLI_QUALITY', '5'))
+
+
+def supported_encodings():
+    """서버가 지원하는 인코딩 (선호 순서)"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate_encoding():
+    """요청의 Accept-Encoding(q 값 포함)과 서버 지원 인코딩으로 응답 인코딩 결정 (압축하지 않으면 None)"""
+    if not ENABLED:
+        return None
+    accepted = request.accept_encodings
+    best, best_quality = None, 0
+    for encoding in supported_encodings():
+        quality = accepted[encoding]  # 명시되지 않았으면 '*'의 q 값, 그것도 없으면 0
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_bytes(data, encoding, precompress=False):
+    """본문 전체를 압축"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=PRECOMPRESS_BROTLI_QUALITY if precompress else BROTLI_QUALITY)
+    compressor = zlib.compressobj(PRECOMPRESS_GZIP_LEVEL if precompress else GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _compress_stream(chunks, encoding):
+    """스트리밍 응답 청크를 압축 (청크마다 flush하여 지연 없이 전달)"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        for chunk in chunks:
+            data = compressor.process(chunk.encode('utf-8') if isinstance(chunk, str) else chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            data = compressor.compress(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+def precompress_json(payload):
+    """JSON 응답 본문을 지원하는 인코딩별로 미리 압축 {인코딩: bytes} (jsonify와 같은 본문)"""
+    body = current_app.json.response(payload).get_data()
+    return {encoding: compress_bytes(body, encoding, precompress=True) for encoding in supported_encodings()}
+
+
+def precompressed_response(body, encoding, mimetype='application/json'):
+    """미리 압축한 본문으로 응답 (after_request 압축은 Content-Encoding을 보고 건너뜀)"""
+    response = Response(body, mimetype=mimetype)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def _should_compress(response):
+    if request.method == 'HEAD' or response.status_code in SKIP_STATUS_CODES or response.status_code < 200:
+        return False
+    if response.direct_passthrough or 'Content-Encoding' in response.headers:
+        return False
+    if 'no-transform' in response.headers.get('Cache-Control', ''):
+        return False
+    return response.mimetype in COMPRESSIBLE_MIMETYPES
+
+
+def init_response_compression(app):
+    """응답 압축 after_request 훅 등록"""
+
+    @app.after_request
+    def compress_response(response):
+        if not ENABLED or not _should_compress(response):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = negotiate_encoding()
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = _compress_stream(response.response, encoding)
+            response.headers.pop('Content-Length', None)
+            response.headers['Content-Encoding'] = encoding
+            return response
+
+        data = response.get_data()
+        if len(data) < MIN_BYTES:
+            return response
+        compressed = compress_bytes(data, encoding)
+        if len(compressed) >= len(data):
+            return response
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        logger.debug("응답 압축 (%s): %s → %s바이트", encoding, len(data), len(compressed))
+        return response
@@ -0,0 +1,324 @@
+"""
+학습 계획 생성 모듈
+시험일까지의 일별 학습 계획을 LLM 호출 없이 로컬에서 계산합니다.
+
+계획 방식:
+    1. 남은 날을 학습 기간과 복습 기간으로 나눔 (exam_style에 따라 복습 비율이 다름)
+    2. 학습 기간에는 시험 범위 주차를 순서대로 배분. 주차마다 퀴즈 정답률이 낮을수록 많은 시간을,
+       주말에는 주중보다 많은 분량을 할당 (한 주차가 여러 날에 걸치거나 하루에 여러 주차를 묶을 수 있음)
+    3. 복습 기간에는 취약 주차부터 다시 보고, 마지막 날에는 시험 범위 전체 종합 퀴즈를 풂
+    4. 학습 방법/자료/퀴즈 활용 문구는 사용자 학습 스타일에 맞춰 선택
+
+결과는 기존과 같은 {"plan": {"YYYY-MM-DD": "학습 계획"}} 형식이며, LLM은 선택적으로
+짧은 응원 메시지("message")만 백그라운드에서 생성합니다.
+
+계획의 입력(시험 정보, 시험 범위 주차 주제, 주차별 정답률, 학습 스타일) fingerprint를
+Subject.study_plan_fingerprint에 저장하고, 입력이 바뀌는 요청 뒤에 refresh_study_plan을
+백그라운드로 실행하여 fingerprint가 달라진 계획만 다시 계산합니다 (지난 날짜의 계획은 유지).
+
+환경 변수:
+    STUDY_PLAN_LLM_MESSAGE: '0'이면 LLM 응원 메시지를 생성하지 않음 (기본값 '1')
+"""
+
+import os
+import json
+import logging
+from datetime import datetime, timezone, timedelta
+
+from models import db, Subject, User, Week, Quiz, QuizReport
+from artifacts import fingerprint
+
+logger = logging.getLogger(__name__)
+
+# 전체 기간 중 복습 기간 비율 (미리미리: 간격 복습 포함 여유 있게, 벼락치기: 학습 위주)
+REVIEW_RATIO = {'미리미리': 0.35, '벼락치기': 0.2}
+# 정답률이 0%인 주차는 100%인 주차보다 (1 + WEAKNESS_WEIGHT)배 시간을 할당
+WEAKNESS_WEIGHT = 1.0
+# 퀴즈를 풀지 않은 주차의 정답률 가정값
+UNKNOWN_ACCURACY = 0.5
+# 이 정답률 미만인 주차는 취약 주차로 표시
+WEAK_ACCURACY = 0.6
+# 주말 학습 분량 (주중 1.0 기준)
+WEEKEND_CAPACITY = 1.5
+# 미리미리형은 학습 기간 중 이 간격(일)마다 이전 범위를 짧게 복습
+SPACED_REVIEW_INTERVAL = 3
+# 한 주차에 할당할 최대 평균 학습 일수 (남는 날은 복습 기간으로)
+MAX_DAYS_PER_WEEK = 3
+
+
+# 날짜 계산 기준 시간대 (한국 시간, UTC+9)
+KOREA_TZ = timezone(timedelta(hours=9))
+
+
+def is_message_enabled():
+    return os.getenv('STUDY_PLAN_LLM_MESSAGE', '1') != '0'
+
+
+def korea_today():
+    return datetime.now(KOREA_TZ).date()
+
+
+def learning_style(user):
+    """계획에 반영하는 사용자 학습 스타일 (온보딩 전이면 기본값)"""
+    return {
+        'exam_style': user.exam_style or '미리미리',
+        'learning_depth': user.learning_depth or '원리파악',
+        'material_preference': user.material_preference or '텍스트',
+        'practice_style': user.practice_style or '이론중심'
+    }
+
+
+def exam_day(subject):
+    return subject.exam_date.date() if isinstance(subject.exam_date, datetime) else subject.exam_date
+
+
+def exam_range_weeks(subject):
+    """시험 범위 주차의 (주차 번호, 주제) 목록 (강의계획서 분석 결과 → 주차 목록 순으로 사용)"""
+    start, end = subject.exam_week_start, subject.exam_week_end
+
+    def in_range(week_no):
+        return not (start and end) or start <= week_no <= end
+
+    weeks = {}
+    if subject.syllabus_analysis:
+        try:
+            analysis = json.loads(subject.syllabus_analysis) if isinstance(subject.syllabus_analysis, str) else subject.syllabus_analysis
+            for index, week in enumerate(analysis.get('weekly_schedule', []) if isinstance(analysis, dict) else []):
+                week_no = week.get('week_no') or index + 1
+                if isinstance(week_no, str) and week_no.strip().isdigit():
+                    week_no = int(week_no)
+                if isinstance(week_no, int) and in_range(week_no):
+                    weeks.setdefault(week_no, (week.get('topic') or '').strip())
+        except (ValueError, TypeError, AttributeError):
+            logger.warning("과목 %s 강의계획서 분석 결과를 읽을 수 없어 주차 목록을 사용합니다.", subject.id)
+
+    if not weeks:
+        for week in Week.query.filter_by(subject_id=subject.id).order_by(Week.week_number).all():
+            if in_range(week.week_number):
+                weeks.setdefault(week.week_number, (week.title or '').strip())
+
+    if not weeks and start and end:
+        weeks = {week_no: '' for week_no in range(start, end + 1)}
+    return sorted(weeks.items())
+
+
+def week_accuracy(user_id, subject_id):
+    """주차별 퀴즈 정답률 {주차 번호: 정답률} (여러 주차를 묶은 퀴즈는 각 주차에 같은 점수를 반영)"""
+    rows = Quiz.query.join(QuizReport, QuizReport.quiz_id == Quiz.id).with_entities(
+        Quiz.week_numbers, QuizReport.score, QuizReport.total
+    ).filter(Quiz.user_id == user_id, Quiz.subject_id == subject_id).all()
+
+    totals = {}
+    for week_numbers, score, total in rows:
+        if not total:
+            continue
+        try:
+            week_nos = json.loads(week_numbers) if week_numbers else []
+        except ValueError:
+            continue
+        for week_no in week_nos:
+            correct, count = totals.get(week_no, (0, 0))
+            totals[week_no] = (correct + score, count + total)
+    return {week_no: correct / count for week_no, (correct, count) in totals.items()}
+
+
+def _week_label(week_nos):
+    """주차 목록을 'Week 1-3' 또는 'Week 1, 3' 형식으로 표시"""
+    week_nos = sorted(set(week_nos))
+    if len(week_nos) > 1 and week_nos[-1] - week_nos[0] == len(week_nos) - 1:
+        return f"Week {week_nos[0]}-{week_nos[-1]}"
+    return "Week " + ", ".join(map(str, week_nos))
+
+
+def _split_days(num_days, num_weeks, exam_style):
+    """남은 날 수를 (학습 일수, 복습 일수)로 나눔"""
+    if num_days <= 2:
+        return num_days, 0
+    review_days = max(1, round(num_days * REVIEW_RATIO.get(exam_style, REVIEW_RATIO['미리미리'])))
+    learn_days = min(num_days - review_days, num_weeks * MAX_DAYS_PER_WEEK)
+    return learn_days, num_days - learn_days
+
+
+def _allocate(weights, capacities):
+    """주차 가중치를 날짜별 학습 분량에 순서대로 배분
+
+    주차와 날짜를 각각 누적 구간으로 펼친 뒤 겹치는 구간을 할당합니다.
+    Returns:
+        날짜별 [(주차 인덱스, 몇 번째 날, 총 며칠)] 목록
+    """
+    total_weight, total_capacity = sum(weights), sum(capacities)
+    scale = total_capacity / total_weight
+    spans, cursor = [], 0.0
+    for weight in weights:
+        spans.append((cursor, cursor + weight * scale))
+        cursor += weight * scale
+
+    days, cursor = [], 0.0
+    for capacity in capacities:
+        days.append((cursor, cursor + capacity))
+        cursor += capacity
+
+    # 겹치는 분량이 아주 작은 경우(주차/하루 분량의 15% 미만)는 제외
+    assignments = [[] for _ in capacities]
+    for week_index, (week_start, week_end) in enumerate(spans):
+        touched = []
+        for day_index, (day_start, day_end) in enumerate(days):
+            overlap = min(week_end, day_end) - max(week_start, day_start)
+            if overlap > 0.15 * min(week_end - week_start, day_end - day_start):
+                touched.append(day_index)
+        if not touched:
+            midpoint = (week_start + week_end) / 2
+            touched = [next((i for i, (s, e) in enumerate(days) if s <= midpoint < e), len(days) - 1)]
+        for part, day_index in enumerate(touched, 1):
+            assignments[day_index].append((week_index, part, len(touched)))
+    return assignments
+
+
+def _study_method(style):
+    depth = "원리와 유도 과정까지 이해" if style.get('learning_depth') == '원리파악' else "예시 중심으로 핵심 개념을 직관적으로 이해"
+    material = "강의 영상과 수업자료" if style.get('material_preference') == '영상' else "강의노트와 수업자료 PDF"
+    practice = "예제 문제를 먼저 풀며 개념 확인" if style.get('practice_style') == '문제중심' else "이론을 정리한 뒤 예제로 확인"
+    return f"{material}로 {depth}하고, {practice}."
+
+
+def build_study_plan(today, exam_date, weeks, accuracy, style):
+    """일별 학습 계획 생성
+
+    Args:
+        today: 오늘 날짜 (date)
+        exam_date: 시험 날짜 (date, today 이후)
+        weeks: 시험 범위 (주차 번호, 주제) 목록
+        accuracy: 주차별 퀴즈 정답률 {주차 번호: 정답률}
+        style: 사용자 학습 스타일 (exam_style, learning_depth, material_preference, practice_style)
+
+    Returns:
+        {"plan": {"YYYY-MM-DD": "학습 계획"}}
+    """
+    num_days = (exam_date - today).days
+    dates = [today + timedelta(days=offset) for offset in range(num_days)]
+    exam_style = style.get('exam_style') or '미리미리'
+    method = _study_method(style)
+    plan = {}
+
+    if not weeks:
+        for day in dates:
+            plan[day.isoformat()] = f"시험 범위 수업자료 복습: {method} 개념 확인 퀴즈를 생성해 풀이하고 틀린 문제를 정리."
+        plan[exam_date.isoformat()] = "시험 당일: 오답노트와 핵심 개념 요약만 가볍게 훑어보고 컨디션을 관리하세요."
+        return {'plan': plan}
+
+    week_nos = [week_no for week_no, _ in weeks]
+    topics = dict(weeks)
+    week_acc = {week_no: accuracy.get(week_no) for week_no in week_nos}
+    weights = [1 + WEAKNESS_WEIGHT * (1 - (acc if acc is not None else UNKNOWN_ACCURACY)) for acc in week_acc.values()]
+
+    learn_days, review_days = _split_days(num_days, len(weeks), exam_style)
+    learn_dates, review_dates = dates[:learn_days], dates[learn_days:]
+    capacities = [WEEKEND_CAPACITY if day.weekday() >= 5 else 1.0 for day in learn_dates]
+
+    studied = []
+    for day_no, (day, assigned) in enumerate(zip(learn_dates, _allocate(weights, capacities)), 1):
+        scopes, quiz_weeks, weak_notes = [], [], []
+        for week_index, part, parts in assigned:
+            week_no = week_nos[week_index]
+            topic = topics[week_no]
+            label = f"Week {week_no}" + (f" ({part}/{parts})" if parts > 1 else "")
+            scopes.append(f"{label} {topic}".strip())
+            if part == parts:
+                quiz_weeks.append(week_no)
+                acc = week_acc[week_no]
+                if acc is not None and acc < WEAK_ACCURACY:
+                    weak_notes.append(f"Week {week_no}(정답률 {acc:.0%})")
+
+        text = ("주말 집중 학습 - " if day.weekday() >= 5 else "") + " / ".join(scopes) + f" 학습: {method}"
+        if quiz_weeks:
+            text += f" {_week_label(quiz_weeks)} 개념 확인 퀴즈를 생성해 풀이."
+        else:
+            text += " 오늘 학습한 부분의 핵심 개념을 요약 정리."
+        if weak_notes:
+            text += f" 지난 퀴즈에서 약했던 {', '.join(weak_notes)}은 틀린 문제를 먼저 다시 풀어보세요."
+        if exam_style == '미리미리' and studied and day_no % SPACED_REVIEW_INTERVAL == 0:
+            text += f" 마무리로 이전 범위({_week_label(studied)})를 10분간 짧게 복습."
+        plan[day.isoformat()] = text
+        studied.extend(week_no for week_no in quiz_weeks if week_no not in studied)
+
+    # 복습 기간: 취약 주차부터 나누어 복습하고 마지막 날에는 종합 퀴즈
+    weak_first = [week_no for _, week_no in sorted(zip(weights, week_nos), key=lambda item: (-item[0], item[1]))]
+    focus_days = review_dates[:-1]
+    for index, day in enumerate(focus_days):
+        if len(focus_days) >= len(weak_first):
+            group = [weak_first[index % len(weak_first)]]
+        else:
+            group = weak_first[index * len(weak_first) // len(focus_days):(index + 1) * len(weak_first) // len(focus_days)]
+        plan[day.isoformat()] = (
+            f"취약 주차 복습: {_week_label(group)} 핵심 개념을 다시 정리하고 오답노트의 틀린 문제를 재풀이. "
+            f"{_week_label(group)} 범위로 어려움 난이도 퀴즈를 생성해 실전 감각 익히기."
+        )
+    if review_dates:
+        plan[review_dates[-1].isoformat()] = (
+            f"시험 범위 종합 복습: {_week_label(week_nos)} 전체 종합 퀴즈를 시간을 재며 풀고, "
+            "틀린 문제와 헷갈린 개념을 오답노트에 최종 정리."
+        )
+    plan[exam_date.isoformat()] = "시험 당일: 오답노트와 핵심 개념 요약만 가볍게 훑어보고 컨디션을 관리하세요."
+    return {'plan': plan}
+
+
+def build_message_prompt(subject_name, exam_label, days_until_exam, weeks, accuracy, persona):
+    """응원 메시지 생성 프롬프트 (계획 자체는 포함하지 않고 요약 정보만 전달)"""
+    weak = [f"Week {week_no}" for week_no, _ in weeks
+            if accuracy.get(week_no) is not None and accuracy[week_no] < WEAK_ACCURACY]
+    tone = "따뜻하게 격려하는" if persona != '엄격형' else "단호하고 엄격한 코치 같은"
+    return f"""학생에게 보낼 짧은 학습 응원 메시지를 작성해주세요.
+
+- 과목: {subject_name}
+- 시험: {exam_label}, {days_until_exam}일 남음
+- 시험 범위: {_week_label([week_no for week_no, _ in weeks]) if weeks else '정보 없음'}
+- 취약 주차: {', '.join(weak) if weak else '없음'}
+
+{tone} 말투로 한국어 2문장 이내로 작성하고, 메시지 본문만 출력하세요."""
+
+
+def plan_inputs(subject, user):
+    """계획 입력 (시험 범위 주차, 주차별 정답률, 학습 스타일)과 그 fingerprint"""
+    weeks = exam_range_weeks(subject)
+    accuracy = week_accuracy(user.id, subject.id)
+    style = learning_style(user)
+    inputs_fingerprint = fingerprint(
+        'study_plan', exam_day(subject), subject.exam_type, weeks,
+        sorted((week_no, round(acc, 3)) for week_no, acc in accuracy.items()), style
+    )
+    return weeks, accuracy, style, inputs_fingerprint
+
+
+def refresh_study_plan(subject_id):
+    """백그라운드 작업: 입력 fingerprint가 바뀐 학습 계획만 다시 계산
+
+    오늘 이전 날짜의 계획과 응원 메시지는 그대로 유지하고, 시험일이 지났으면 계획을 그대로 둡니다.
+    """
+    subject = Subject.query.get(subject_id)
+    if not subject or not subject.study_plan or not subject.exam_date:
+        return False
+    user = User.query.get(subject.user_id)
+    today = korea_today()
+    if not user or exam_day(subject) <= today:
+        return False
+
+    weeks, accuracy, style, inputs_fingerprint = plan_inputs(subject, user)
+    if subject.study_plan_fingerprint == inputs_fingerprint:
+        return False
+
+    try:
+        previous = json.loads(subject.study_plan)
+    except ValueError:
+        previous = {}
+    plan_data = build_study_plan(today, exam_day(subject), weeks, accuracy, style)
+    past = {day: text for day, text in (previous.get('plan') or {}).items() if day < today.isoformat()}
+    plan_data['plan'] = {**past, **plan_data['plan']}
+    if previous.get('message'):
+        plan_data['message'] = previous['message']
+    plan_data['generated_at'] = datetime.utcnow().isoformat()
+
+    subject.study_plan = json.dumps(plan_data, ensure_ascii=False)
+    subject.study_plan_fingerprint = inputs_fingerprint
+    db.session.commit()
+    logger.info("학습 계획 입력이 바뀌어 다시 계산했습니다 - Subject: %s", subject_id)
+    return True
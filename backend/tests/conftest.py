@@ -0,0 +1,11 @@
+"""
+백엔드 테스트 공용 설정
+backend 폴더를 import 경로에 추가합니다 (backend 또는 저장소 루트에서 python -m pytest로 실행).
+"""
+
+import os
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
@@ -0,0 +1,61 @@
+"""coalescing.acquire/release 리더-팔로워 병합 테스트"""
+
+import threading
+
+import pytest
+from flask import Flask
+
+import coalescing
+from models import db, GenerationClaim
+
+KEY = 'concept:1:summary:fp'
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{tmp_path / "test.db"}'
+    db.init_app(app)
+    coalescing.init_coalescing(app)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def test_follower_returns_after_leader_releases(app):
+    leader_acquired = threading.Event()
+    follower_waiting = threading.Event()
+    results = {}
+
+    def leader():
+        with app.test_request_context():
+            results['leader'] = coalescing.acquire(KEY)
+            leader_acquired.set()
+            follower_waiting.wait(5)
+            # 팔로워가 기다리는 동안에는 아무도 풀 커넥션을 잡고 있지 않음
+            results['checked_out'] = db.engine.pool.checkedout()
+            coalescing.release(KEY)
+
+    def follower():
+        leader_acquired.wait(5)
+        with app.test_request_context():
+            threading.Timer(0.6, follower_waiting.set).start()
+            results['follower'] = coalescing.acquire(KEY)
+
+    threads = [threading.Thread(target=leader), threading.Thread(target=follower)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert results == {'leader': True, 'follower': False, 'checked_out': 0}
+    with app.app_context():
+        assert db.session.get(GenerationClaim, KEY) is None
+
+
+def test_claim_released_when_request_ends(app):
+    with app.test_request_context():
+        assert coalescing.acquire(KEY) is True
+        app.do_teardown_request()
+    with app.test_request_context():
+        assert coalescing.acquire(KEY) is True
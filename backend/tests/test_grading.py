@@ -0,0 +1,48 @@
+"""grading.grade_answers 채점 테스트"""
+
+import pytest
+
+from grading import grade_answers
+
+
+def grade(question_type, user_answer, correct_answer):
+    return grade_answers([(question_type, user_answer, correct_answer)])[0]
+
+
+@pytest.mark.parametrize('user_answer, correct_answer', [
+    ('unsupervised', 'supervised'),
+    ('supervised', 'unsupervised'),
+    ('비선형', '선형'),
+    ('선형', '비선형'),
+    ('unsupervised learning', 'supervised learning'),
+    ('non-parametric model', 'parametric model'),
+    ('정규화가 필요하지 않다', '정규화가 필요하다'),
+])
+def test_short_answer_rejects_opposite_meaning(user_answer, correct_answer):
+    assert not grade('short_answer', user_answer, correct_answer).is_correct
+
+
+def test_subjective_rejects_negated_answer():
+    correct = '경사 하강법은 손실 함수를 최소화하는 방법이다.'
+    result = grade('subjective', '경사 하강법은 손실 함수를 최소화하는 방법이 아니다.', correct)
+    assert not result.is_correct
+    assert result.method == 'negation'
+    assert grade('subjective', '경사 하강법은 손실 함수를 최소화하는 방법입니다.', correct).is_correct
+
+
+@pytest.mark.parametrize('user_answer, correct_answer, expected', [
+    ('Supervised', 'supervised', True),
+    ('지도 학습', '지도학습', True),
+    ('gradient desent', 'gradient descent', True),  # 긴 정답의 한 글자 오타
+    ('regresion', 'regression', True),
+    ('logit', 'logic', False),  # 짧은 정답은 오타 허용 없음
+    ('선행', '선형', False),
+    ('classification', 'regression', False),
+])
+def test_short_answer_typo_allowance(user_answer, correct_answer, expected):
+    assert grade('short_answer', user_answer, correct_answer).is_correct is expected
+
+
+def test_short_answer_numeric_tolerance():
+    assert grade('short_answer', '0.5', '1/2').is_correct
+    assert not grade('short_answer', '0.6', '1/2').is_correct
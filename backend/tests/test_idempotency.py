@@ -0,0 +1,83 @@
+"""idempotency.idempotent 저장된 응답 반환/키 재사용/재시도 허용 테스트"""
+
+import sqlite3
+from datetime import datetime
+
+import pytest
+from flask import Flask, jsonify
+
+import idempotency
+from models import db, IdempotencyKey
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{tmp_path / "test.db"}'
+    db.init_app(app)
+    app.calls = 0
+    app.responses = []
+
+    @app.route('/generate', methods=['POST'])
+    @idempotency.idempotent('quiz_generate')
+    def generate():
+        app.calls += 1
+        status = app.responses.pop(0) if app.responses else 201
+        return jsonify({'call': app.calls}), status
+
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+def post(app, body, key='key-1'):
+    return app.test_client().post('/generate', json=body, headers={idempotency.HEADER: key})
+
+
+def test_replays_stored_response(app):
+    first = post(app, {'week': 1})
+    second = post(app, {'week': 1})
+    assert first.status_code == second.status_code == 201
+    assert second.get_json() == {'call': 1}
+    assert second.headers['Idempotent-Replayed'] == 'true'
+    assert app.calls == 1
+
+
+def test_key_reused_with_different_body(app):
+    post(app, {'week': 1})
+    response = post(app, {'week': 2})
+    assert response.status_code == 422
+    assert response.get_json()['error_code'] == 'IDEMPOTENCY_KEY_REUSED'
+    assert app.calls == 1
+
+
+@pytest.mark.parametrize('status', [500, 429, 409])
+def test_retryable_response_deletes_key(app, status):
+    app.responses = [status]
+    assert post(app, {'week': 1}).status_code == status
+    assert IdempotencyKey.query.count() == 0
+
+    retried = post(app, {'week': 1})
+    assert retried.status_code == 201
+    assert 'Idempotent-Replayed' not in retried.headers
+    assert app.calls == 2
+
+
+def test_wait_does_not_hold_connection(app, tmp_path, monkeypatch):
+    db.session.add(IdempotencyKey(scope='quiz_generate', key='key-1', request_fingerprint='fp',
+                                  status='pending', created_at=datetime.utcnow()))
+    db.session.commit()
+    held = []
+
+    def sleep(seconds):
+        # 다른 워커가 처리를 끝내고 응답을 저장한 상황
+        held.append(db.engine.pool.checkedout())
+        connection = sqlite3.connect(tmp_path / 'test.db')
+        connection.execute("UPDATE idempotency_keys SET status = 'done', status_code = 201, response_body = '{}'")
+        connection.commit()
+        connection.close()
+
+    monkeypatch.setattr(idempotency.time, 'sleep', sleep)
+    record = idempotency._wait('quiz_generate', 'key-1')
+    assert record.status == 'done'
+    assert held == [0]
@@ -0,0 +1,35 @@
+"""instrumentation.metrics_access_allowed /metrics 접근 제한 테스트"""
+
+import pytest
+from flask import Flask
+
+from instrumentation import metrics_access_allowed
+
+REMOTE = {'REMOTE_ADDR': '203.0.113.7'}
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+
+    @app.route('/metrics')
+    def metrics():
+        return ('ok', 200) if metrics_access_allowed() else ('', 403)
+
+    return app.test_client()
+
+
+def test_without_token_only_loopback(client, monkeypatch):
+    monkeypatch.delenv('METRICS_TOKEN', raising=False)
+    assert client.get('/metrics').status_code == 200
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '::1'}).status_code == 200
+    assert client.get('/metrics', environ_base=REMOTE).status_code == 403
+
+
+def test_token_required_when_set(client, monkeypatch):
+    monkeypatch.setenv('METRICS_TOKEN', 'scrape-secret')
+    assert client.get('/metrics').status_code == 403
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 403
+    assert client.get('/metrics', headers={'Authorization': 'Basic scrape-secret'}).status_code == 403
+    assert client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'},
+                      environ_base=REMOTE).status_code == 200
@@ -0,0 +1,17 @@
+"""llm_provider.FakeLLMProvider purpose별 응답 형식 테스트"""
+
+from llm_provider import FakeLLMProvider
+from concept_summaries import build_material_prompt, MIN_SUMMARY_CHARS
+
+
+def test_material_summary_is_summary_note():
+    provider = FakeLLMProvider()
+    prompt = build_material_prompt('lecture03.pdf', 3, '선형 회귀 강의 자료 본문')
+    response = provider.generate('gemini-2.5-flash', prompt, purpose='material_summary')
+
+    assert response.text.startswith('## lecture03.pdf 요약 (3주차)')
+    assert '### ' in response.text
+    assert len(response.text) >= MIN_SUMMARY_CHARS
+    # 같은 프롬프트에는 같은 응답, 개념 학습 콘텐츠와는 다른 형식
+    assert provider.generate('gemini-2.5-flash', prompt, purpose='material_summary').text == response.text
+    assert provider.generate('gemini-2.5-flash', prompt, purpose='concept').text != response.text
@@ -0,0 +1,63 @@
+"""mastery.apply_graded_responses 누적 갱신/되돌리기 테스트"""
+
+import pytest
+from flask import Flask
+
+from models import db, ConceptMastery, Question, UserResponse
+from mastery import apply_graded_responses, quiz_graded_responses
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+def mastery(concept):
+    row = db.session.query(ConceptMastery.attempts, ConceptMastery.correct).filter_by(
+        user_id=1, subject_id=1, key_concept=concept).one()
+    return tuple(row)
+
+
+def test_accumulates_and_reverts(app):
+    apply_graded_responses(1, 1, [('회귀', True), ('회귀', False), ('분류', True)])
+    db.session.commit()
+    apply_graded_responses(1, 1, [('회귀', True)])
+    db.session.commit()
+    assert mastery('회귀') == (3, 2)
+    assert mastery('분류') == (1, 1)
+
+    apply_graded_responses(1, 1, [('회귀', True), ('회귀', False), ('분류', True)], revert=True)
+    db.session.commit()
+    assert mastery('회귀') == (1, 1)
+    assert mastery('분류') == (0, 0)
+
+
+def test_row_created_by_concurrent_submit_is_updated(app):
+    # 다른 제출이 읽기 이후에 같은 개념 행을 먼저 만든 경우 (uq_concept_mastery 충돌 없이 누적)
+    db.session.add(ConceptMastery(user_id=1, subject_id=1, key_concept='회귀', attempts=2, correct=1))
+    db.session.commit()
+    apply_graded_responses(1, 1, [('회귀', False)])
+    db.session.commit()
+    assert mastery('회귀') == (3, 1)
+
+
+def test_revert_quiz_responses(app):
+    # 퀴즈를 삭제하면 그 퀴즈 답안이 숙련도에서 빠짐 (다른 퀴즈 결과는 유지)
+    for order, (concept, is_correct) in enumerate([('회귀', False), ('회귀', True), ('분류', False)], start=1):
+        question = Question(quiz_id=7, question_type='short_answer', question_text=f'문제 {order}',
+                            correct_answer='답', explanation='해설', key_concept=concept, order=order)
+        db.session.add(question)
+        db.session.flush()
+        db.session.add(UserResponse(quiz_id=7, question_id=question.id, user_answer='답', is_correct=is_correct))
+    apply_graded_responses(1, 1, [('회귀', False), ('회귀', True), ('분류', False), ('분류', True)])
+    db.session.commit()
+
+    apply_graded_responses(1, 1, quiz_graded_responses(7), revert=True)
+    db.session.commit()
+    assert mastery('회귀') == (0, 0)
+    assert mastery('분류') == (1, 1)
@@ -0,0 +1,88 @@
+"""question_bank 문제 선택/원본 승격 테스트"""
+
+import json
+import random
+
+import pytest
+from flask import Flask
+
+from models import db, Quiz, Question, QuestionBankEntry
+from question_bank import select_bank_questions, copy_question, index_questions, promote_copies
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+def make_quiz(number, weeks=(1,)):
+    quiz = Quiz(subject_id=1, user_id=1, week_numbers=json.dumps(list(weeks)), difficulty='medium',
+                question_types=json.dumps(['short_answer']), language='korean', num_questions=5, quiz_number=number)
+    db.session.add(quiz)
+    db.session.flush()
+    return quiz
+
+
+def make_question(quiz, order, concept):
+    question = Question(quiz_id=quiz.id, question_type='short_answer', question_text=f'{concept} 문제 {order}',
+                        correct_answer='답', explanation='해설', key_concept=concept, order=order)
+    db.session.add(question)
+    return question
+
+
+def select(num_questions, weeks=(1,)):
+    return select_bank_questions(1, 1, list(weeks), 'medium', ['short_answer'], 'korean', num_questions,
+                                 rng=random.Random(0))
+
+
+def test_selection_excludes_recently_seen(app, monkeypatch):
+    monkeypatch.setenv('QUESTION_BANK_RECENT_QUIZZES', '1')
+    source = make_quiz(1)
+    originals = [make_question(source, order, f'개념 {order}') for order in range(1, 5)]
+    index_questions(source, originals, [1])
+    db.session.commit()
+
+    # 가장 최근 퀴즈가 앞의 두 문제를 복사해서 출제함
+    recent = make_quiz(2)
+    db.session.add_all([copy_question(originals[0], recent.id, 1), copy_question(originals[1], recent.id, 2)])
+    db.session.commit()
+
+    selection = select(4)
+    assert {question.id for question in selection.questions} == {originals[2].id, originals[3].id}
+    assert selection.weeks == [1]
+    assert selection.uncovered_weeks == []
+
+
+def test_selection_leaves_uncovered_weeks_to_llm(app, monkeypatch):
+    monkeypatch.setenv('QUESTION_BANK_RECENT_QUIZZES', '0')
+    quiz = make_quiz(1)
+    index_questions(quiz, [make_question(quiz, 1, '회귀'), make_question(quiz, 2, '분류')], [1])
+    db.session.commit()
+
+    # 후보가 있는 주차 비율만큼만 문제 은행에서 고르고 나머지는 LLM 몫으로 남김
+    selection = select(4, weeks=(1, 2))
+    assert len(selection.questions) == 2
+    assert selection.uncovered_weeks == [2]
+
+
+def test_promote_copies_before_deleting_quiz(app):
+    source = make_quiz(1)
+    original, unused = make_question(source, 1, '회귀'), make_question(source, 2, '분류')
+    index_questions(source, [original, unused], [1])
+    db.session.commit()
+    first, second = make_quiz(2), make_quiz(3)
+    first_copy = copy_question(original, first.id, 1)
+    second_copy = copy_question(original, second.id, 1)
+    db.session.add_all([first_copy, second_copy])
+    db.session.commit()
+
+    assert promote_copies(source.id) == 1
+    db.session.commit()
+    assert first_copy.source_question_id is None
+    assert second_copy.source_question_id == first_copy.id
+    assert {entry.question_id for entry in QuestionBankEntry.query.all()} == {first_copy.id, unused.id}
@@ -0,0 +1,78 @@
+"""rate_limits 토큰 버킷/일일 예산 테스트"""
+
+import pytest
+from flask import Flask, jsonify
+
+import rate_limits
+from models import db
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limits.time, 'time', clock.time)
+    return clock
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setenv('RATE_LIMIT_QUIZ_GENERATE', '3/30')
+    monkeypatch.setenv('LLM_DAILY_TOKEN_BUDGET', '1000')
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    rate_limits.init_rate_limits(app)
+
+    @app.route('/generate', methods=['POST'])
+    @rate_limits.rate_limited('quiz_generate')
+    def generate():
+        return jsonify({'ok': True}), 200
+
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+def post(app, user_id=1):
+    return app.test_client().post('/generate', json={'user_id': user_id})
+
+
+def test_bucket_drains_and_refills(app, clock):
+    assert [post(app).status_code for _ in range(3)] == [200, 200, 200]
+
+    limited = post(app)
+    assert limited.status_code == 429
+    # 30초에 3개 충전 → 다음 토큰까지 10초
+    assert limited.headers['Retry-After'] == '10'
+    assert limited.get_json()['error_code'] == 'RATE_LIMITED'
+    assert post(app, user_id=2).status_code == 200
+
+    clock.now += 9
+    assert post(app).status_code == 429
+    clock.now += 1
+    assert post(app).status_code == 200
+    assert post(app).status_code == 429
+
+    # 오래 쉬어도 용량 이상으로 쌓이지 않음
+    clock.now += 3600
+    assert [post(app).status_code for _ in range(4)] == [200, 200, 200, 429]
+
+
+def test_daily_token_budget(app, clock):
+    rate_limits.charge_llm_tokens(1, 600)
+    assert post(app).status_code == 200
+    rate_limits.charge_llm_tokens(1, 400)
+
+    limited = post(app)
+    assert limited.status_code == 429
+    assert limited.get_json()['error_code'] == 'LLM_BUDGET_EXCEEDED'
+    assert int(limited.headers['Retry-After']) > 0
+    assert post(app, user_id=2).status_code == 200
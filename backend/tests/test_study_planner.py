@@ -0,0 +1,39 @@
+"""study_planner.build_study_plan 일별 배분 테스트"""
+
+import re
+from datetime import date, timedelta
+
+import pytest
+
+from study_planner import build_study_plan
+
+WEEKS = [(1, '선형 회귀'), (2, '로지스틱 회귀'), (3, '결정 트리'), (4, '신경망')]
+STYLE = {'exam_style': '미리미리', 'learning_depth': '원리파악', 'material_preference': '텍스트', 'practice_style': '이론중심'}
+
+
+def studied_days(plan, week_no):
+    pattern = re.compile(rf'Week {week_no}(?: \(\d+/\d+\))? ')
+    return [day for day, text in plan.items() if pattern.search(text.split(' 학습:')[0])]
+
+
+@pytest.mark.parametrize('num_days', [2, 5, 14, 30])
+def test_every_day_and_exam_week_is_planned(num_days):
+    today = date(2026, 3, 2)
+    exam_date = today + timedelta(days=num_days)
+    plan = build_study_plan(today, exam_date, WEEKS, {}, STYLE)['plan']
+
+    assert sorted(plan) == [(today + timedelta(days=offset)).isoformat() for offset in range(num_days + 1)]
+    assert plan[exam_date.isoformat()].startswith('시험 당일')
+    for week_no, _ in WEEKS:
+        assert studied_days(plan, week_no), f'Week {week_no}가 학습 계획에 없음'
+
+
+def test_weak_week_gets_more_days():
+    today = date(2026, 3, 2)
+    plan = build_study_plan(today, today + timedelta(days=20), WEEKS, {1: 1.0, 2: 1.0, 3: 0.2, 4: 1.0},
+                            dict(STYLE, exam_style='벼락치기'))['plan']
+    assert len(studied_days(plan, 3)) > len(studied_days(plan, 1))
+    # 복습 기간은 취약 주차부터, 마지막 날은 시험 범위 종합 퀴즈
+    review = [text for text in plan.values() if text.startswith('취약 주차 복습')]
+    assert review and review[0].startswith('취약 주차 복습: Week 3')
+    assert plan[(today + timedelta(days=19)).isoformat()].startswith('시험 범위 종합 복습: Week 1-4')
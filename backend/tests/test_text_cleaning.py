@@ -0,0 +1,42 @@
+"""text_cleaning.clean_pages 반복 줄 제거 테스트"""
+
+from text_cleaning import clean_pages
+
+
+def make_deck(body_lines):
+    """페이지마다 같은 머리말, 번호가 바뀌는 꼬리말, body_lines(페이지 번호 → 줄 목록)를 넣은 8페이지 자료"""
+    return [
+        '\n'.join(['Machine Learning 3주차'] + body_lines(page_no) + [f'Lecture 3 - {page_no}'])
+        for page_no in range(1, 9)
+    ]
+
+
+def test_numeric_table_rows_are_kept():
+    pages = make_deck(lambda n: ['0.53', '21', f'{n * 7}', '$y = 3x + 1$', f'$y = {n}x + 1$', f'데이터 {n}번째 예제'])
+    cleaned, stats = clean_pages(pages)
+
+    assert stats['dropped_pages'] == 0
+    for page_no, text in enumerate(cleaned, start=1):
+        lines = text.split('\n')
+        assert lines == ['0.53', '21', f'{page_no * 7}', '$y = 3x + 1$', f'$y = {page_no}x + 1$', f'데이터 {page_no}번째 예제']
+
+
+def test_repeated_header_and_numbered_footer_are_removed():
+    pages = make_deck(lambda n: [f'본문 내용 {n}: 선형 회귀의 비용 함수와 경사 하강법'])
+    cleaned, stats = clean_pages(pages)
+
+    assert all('Machine Learning' not in text and 'Lecture 3' not in text for text in cleaned)
+    assert cleaned[0] == '본문 내용 1: 선형 회귀의 비용 함수와 경사 하강법'
+    assert stats['removed_lines'] == 16
+
+
+def test_page_number_lines_are_removed():
+    bodies = [
+        '선형 회귀의 비용 함수는 예측값과 실제값의 평균 제곱 오차로 정의합니다',
+        '경사 하강법에서는 손실이 줄어드는 방향으로 학습률만큼 가중치를 갱신합니다',
+        '정규화는 가중치 크기에 벌점을 주어 모델의 과적합을 방지합니다',
+    ]
+    cleaned, stats = clean_pages([f'{body}\n{page_no}' for page_no, body in enumerate(bodies, start=1)])
+
+    assert cleaned == bodies
+    assert stats['removed_lines'] == 3
@@ -0,0 +1,133 @@
+"""
+프롬프트용 텍스트 정리 모듈
+PDF에서 추출한 페이지 텍스트를 LLM 프롬프트에 넣기 전에 정리하여 토큰 사용량을 줄입니다.
+
+정리 단계 (문서당 한 번 실행, 결과는 MaterialText.clean_pages에 캐시):
+    1. 유니코드 정규화(NFKC)와 줄 단위 공백 정리 (연속 공백 → 공백 하나, 연속 빈 줄 → 빈 줄 하나)
+    2. 줄 끝 하이픈으로 나뉜 영어 단어 연결 (regres-\\nsion → regression)
+    3. 여러 페이지에 반복되는 머리말/꼬리말(줄 처음/끝의 번호만 다른 줄 포함)과 페이지 번호만 있는 줄 제거
+       (숫자 위주의 표 값과 수식 줄은 반복되어도 유지)
+    4. 정리 후 내용이 거의 없는 페이지 제거 (페이지 번호 유지를 위해 빈 문자열로 남김)
+
+정리 규칙을 바꾸면 CLEANING_VERSION을 올려서 캐시된 결과를 다시 만들도록 합니다.
+"""
+
+import re
+import math
+import unicodedata
+from collections import Counter
+
+from llm_provider import estimate_tokens
+
+CLEANING_VERSION = 2
+
+# 이 문자 수(공백 제외)보다 내용이 적은 페이지는 제거
+MIN_PAGE_CHARS = 20
+# 반복 줄로 판단할 최대 길이 (긴 줄은 본문으로 간주)
+MAX_BOILERPLATE_LINE_LENGTH = 80
+# 전체 페이지 중 이 비율 이상(최소 3페이지)에 나오는 짧은 줄은 머리말/꼬리말로 간주
+BOILERPLATE_PAGE_RATIO = 0.5
+# 머리말/꼬리말 후보가 되기 위한 최소 글자 수 (숫자만 있는 표 값, 수식 줄은 제외)
+MIN_BOILERPLATE_LETTERS = 3
+
+_SPACES = re.compile(r'[ \t\u00a0\u2000-\u200b\u3000]+')
+_EDGE_DIGITS = re.compile(r'^\d+|\d+$')
+_FORMULA_CHARS = frozenset('=$\\^_{}')
+_HYPHENATED = re.compile(r'([A-Za-z])-\n([a-z])')
+_PAGE_NUMBER_LINE = re.compile(r'^(?:page\s*)?[-–—(\[]?\s*(\d{1,4})\s*(?:/\s*\d{1,4})?\s*[-–—)\]]?$', re.IGNORECASE)
+
+
+def _normalize_lines(text):
+    """줄 단위 공백 정리 후 줄 목록 반환 (빈 줄 포함)"""
+    text = unicodedata.normalize('NFKC', text).replace('\r\n', '\n').replace('\r', '\n')
+    return [_SPACES.sub(' ', line).strip() for line in text.split('\n')]
+
+
+def _is_boilerplate_candidate(line):
+    """머리말/꼬리말로 볼 수 있는 줄인지 확인
+
+    짧고 글자가 숫자보다 많은 줄만 후보로 봅니다. 숫자 위주의 줄(표 값)과 수식 줄은
+    여러 페이지에 반복되어도 본문으로 유지합니다.
+    """
+    if not line or len(line) > MAX_BOILERPLATE_LINE_LENGTH or _FORMULA_CHARS.intersection(line):
+        return False
+    letters = sum(1 for ch in line if ch.isalpha())
+    digits = sum(1 for ch in line if ch.isdigit())
+    return letters >= MIN_BOILERPLATE_LETTERS and letters > digits
+
+
+def _boilerplate_key(line):
+    """페이지마다 번호만 바뀌는 머리말/꼬리말을 같은 줄로 보기 위한 키
+
+    페이지 번호 자리(줄 처음/끝)의 숫자만 무시하므로, 중간의 숫자가 다른 줄("데이터 3번째 예제")은 서로 다른 줄입니다.
+    """
+    return _EDGE_DIGITS.sub('#', line.lower())
+
+
+def _is_page_number(line, page_no):
+    """해당 페이지의 번호만 있는 줄인지 확인 (표 안의 숫자 줄은 유지)"""
+    match = _PAGE_NUMBER_LINE.match(line)
+    return match is not None and int(match.group(1)) == page_no
+
+
+def _join_lines(lines):
+    """줄을 이어 붙이면서 연속된 빈 줄은 하나로 합침"""
+    result = []
+    for line in lines:
+        if not line and (not result or not result[-1]):
+            continue
+        result.append(line)
+    while result and not result[-1]:
+        result.pop()
+    return '\n'.join(result)
+
+
+def clean_pages(pages, page_numbers=None):
+    """페이지별 텍스트를 정리하여 (정리된 페이지 목록, 통계) 반환
+
+    page_numbers를 생략하면 pages가 1페이지부터 순서대로 있다고 봅니다.
+    반환하는 페이지 목록의 길이는 입력과 같으며, 제거된 페이지는 빈 문자열입니다.
+    통계: raw_chars, clean_chars, raw_tokens, clean_tokens, removed_lines, dropped_pages
+    """
+    page_lines = [_normalize_lines(page or '') for page in pages]
+    if page_numbers is None:
+        page_numbers = range(1, len(pages) + 1)
+
+    # 여러 페이지에 반복되는 짧은 줄 찾기 (한 페이지 안의 중복은 한 번만 셈)
+    non_empty_pages = sum(1 for lines in page_lines if any(lines))
+    repeated = set()
+    if non_empty_pages >= 3:
+        threshold = max(3, math.ceil(non_empty_pages * BOILERPLATE_PAGE_RATIO))
+        counts = Counter()
+        for lines in page_lines:
+            counts.update({_boilerplate_key(line) for line in lines if _is_boilerplate_candidate(line)})
+        repeated = {key for key, count in counts.items() if count >= threshold}
+
+    cleaned = []
+    removed_lines = dropped_pages = 0
+    for raw, lines, page_no in zip(pages, page_lines, page_numbers):
+        kept = []
+        for line in lines:
+            if line and (_is_page_number(line, page_no)
+                         or (_is_boilerplate_candidate(line) and _boilerplate_key(line) in repeated)):
+                removed_lines += 1
+                continue
+            kept.append(line)
+        text = _HYPHENATED.sub(r'\1\2', _join_lines(kept))
+        if len(''.join(text.split())) < MIN_PAGE_CHARS:
+            if raw and raw.strip():
+                dropped_pages += 1
+            text = ''
+        cleaned.append(text)
+
+    raw_text = '\n\n'.join(page for page in pages if page)
+    clean_text = '\n\n'.join(page for page in cleaned if page)
+    stats = {
+        'raw_chars': len(raw_text),
+        'clean_chars': len(clean_text),
+        'raw_tokens': estimate_tokens(raw_text),
+        'clean_tokens': estimate_tokens(clean_text),
+        'removed_lines': removed_lines,
+        'dropped_pages': dropped_pages,
+    }
+    return cleaned, stats
@@ -0,0 +1,41 @@
+"""
+프로덕션 WSGI 진입점
+gunicorn은 이 모듈의 app을 불러옵니다 (설정은 gunicorn.conf.py).
+
+    python migrations.py
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+앱 생성(create_app)은 스키마 마이그레이션을 실행하지 않으므로 배포 시 서버를 시작하기 전에 python migrations.py를
+한 번 실행합니다 (또는 DB_MIGRATE_ON_START=1이면 preload_app일 때 마스터에서 한 번 실행).
+preload_app(기본값)이면 마스터 프로세스가 이 모듈을 한 번 import하여 앱을 만든 뒤 워커를 fork합니다.
+요청 처리 중에 처음 import되는 무거운 모듈(PDF 추출 라이브러리, google.generativeai)도 여기서 미리 불러와
+워커들이 copy-on-write로 같은 메모리 페이지를 공유하게 합니다.
+
+환경 변수:
+    WSGI_PRELOAD_MODULES: 0이면 무거운 모듈을 미리 불러오지 않고 처음 사용할 때 import
+        (기본값 1, preload_app을 끄고 워커마다 앱을 불러올 때 워커 시작을 빠르게)
+"""
+
+import os
+import logging
+
+from app import app
+from pdf_extractors import get_pdf_extractor
+from llm_provider import get_llm_provider
+
+logger = logging.getLogger(__name__)
+
+if os.getenv('WSGI_PRELOAD_MODULES', '1') != '0':
+    try:
+        # 추출 백엔드 생성 시 PDF 라이브러리(PyPDF2/pypdf)를 import
+        get_pdf_extractor()
+    except (ImportError, ValueError) as e:
+        logger.warning("PDF 추출 백엔드를 미리 불러오지 못했습니다: %s", e)
+
+    try:
+        # Gemini 프로바이더 생성 시 google.generativeai를 import (LLM_PROVIDER=fake이면 import하지 않음)
+        get_llm_provider()
+    except ImportError as e:
+        logger.warning("LLM 프로바이더를 미리 불러오지 못했습니다: %s", e)
+
+__all__ = ['app']
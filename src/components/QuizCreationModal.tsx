@@ -3,7 +3,7 @@
  * 주차 선택, 난이도, 문제 유형 등을 설정하여 퀴즈를 생성합니다.
  */
 
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { Dialog, DialogContent, DialogDescription, DialogHeader, DialogTitle } from './ui/dialog';
 import { Button } from './ui/button';
 import { Label } from './ui/label';
@@ -12,7 +12,7 @@ import { Textarea } from './ui/textarea';
 import { Input } from './ui/input';
 import { Loader2, CheckCircle2, Plus, Minus } from 'lucide-react';
 import { Progress } from './ui/progress';
-import { generateQuiz, type SubjectDetail, type Week } from '../services/api';
+import { generateQuiz, newIdempotencyKey, type SubjectDetail, type Week } from '../services/api';
 
 interface QuizCreationModalProps {
   open: boolean;
@@ -39,6 +39,8 @@ export default function QuizCreationModal({
   const [isGenerating, setIsGenerating] = useState(false);
   const [generationProgress, setGenerationProgress] = useState<number>(0);
   const [error, setError] = useState<string | null>(null);
+  // 같은 설정으로 다시 생성하면(실패 후 재시도 등) 같은 멱등성 키를 보내 퀴즈가 중복 생성되지 않게 함
+  const idempotencyRef = useRef<{ payload: string; key: string } | null>(null);
 
   // PDF가 있는 주차만 필터링
   const weeksWithPDFs = subject.weeks?.filter((week) => {
@@ -58,6 +60,7 @@ export default function QuizCreationModal({
       setPastExamContext('');
       setError(null);
       setGenerationProgress(0);
+      idempotencyRef.current = null;
     }
   }, [open]);
 
@@ -106,14 +109,19 @@ export default function QuizCreationModal({
     }, 300);
 
     try {
-      const result = await generateQuiz(subject.id, userId, {
+      const options = {
         week_numbers: selectedWeeks,
         difficulty,
         question_types: questionTypes,
         language,
         num_questions: numQuestions,
         past_exam_context: pastExamContext || undefined,
-      });
+      };
+      const payload = JSON.stringify(options);
+      const idempotencyKey = idempotencyRef.current?.payload === payload ? idempotencyRef.current.key : newIdempotencyKey();
+      idempotencyRef.current = { payload, key: idempotencyKey };
+      const result = await generateQuiz(subject.id, userId, options, idempotencyKey);
+      idempotencyRef.current = null;
 
       clearInterval(progressInterval);
       setGenerationProgress(100);
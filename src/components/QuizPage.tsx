@@ -3,7 +3,7 @@
  * 퀴즈 풀이 및 결과 확인을 담당합니다.
  */
 
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { Card, CardContent, CardHeader, CardTitle } from './ui/card';
 import { Button } from './ui/button';
 import { RadioGroup, RadioGroupItem } from './ui/radio-group';
@@ -12,7 +12,10 @@ import { Textarea } from './ui/textarea';
 import { Input } from './ui/input';
 import { Loader2, ArrowLeft, CheckCircle2, XCircle, ChevronDown, ChevronUp, RotateCcw } from 'lucide-react';
 import { Progress } from './ui/progress';
-import { getQuiz, submitQuiz, getSubjectDetail, type QuizDetail, type Question, type QuizResult, type QuizReport } from '../services/api';
+import { getQuiz, submitQuiz, newIdempotencyKey, getQuizReport, retryQuizReport, getSubjectDetail, type QuizDetail, type Question, type QuizResult, type QuizReport } from '../services/api';
+
+// AI 리포트 생성 상태 폴링 간격 (밀리초)
+const REPORT_POLL_INTERVAL_MS = 2000;
 
 interface QuizPageProps {
   quizId: number;
@@ -35,11 +38,27 @@ export default function QuizPage({ quizId, userId, onBack, subjectId: propSubjec
   const [subjectName, setSubjectName] = useState<string>('');
   const [subjectId, setSubjectId] = useState<number | null>(null);
   const [isRetaking, setIsRetaking] = useState(false);
+  // 같은 답안을 다시 제출하면(실패 후 재시도 등) 같은 멱등성 키를 보내 채점/리포트 생성이 중복되지 않게 함
+  const idempotencyRef = useRef<{ payload: string; key: string } | null>(null);
 
   useEffect(() => {
     loadQuiz();
   }, [quizId]);
 
+  // AI 리포트는 제출 후 백그라운드에서 생성되므로 완료(ready/failed)될 때까지 폴링
+  useEffect(() => {
+    if (!report || report.status !== 'pending') return;
+    const timer = setTimeout(async () => {
+      try {
+        setReport(await getQuizReport(quizId, userId));
+      } catch (err) {
+        console.error('Failed to poll quiz report:', err);
+        setReport((prev) => (prev ? { ...prev } : prev)); // 다음 폴링 예약
+      }
+    }, REPORT_POLL_INTERVAL_MS);
+    return () => clearTimeout(timer);
+  }, [report, quizId, userId]);
+
   const loadQuiz = async () => {
     try {
       setIsLoading(true);
@@ -144,7 +163,11 @@ export default function QuizPage({ quizId, userId, onBack, subjectId: propSubjec
         answer: answer || '',
       }));
 
-      const result = await submitQuiz(quizId, userId, answersArray);
+      const payload = JSON.stringify(answersArray);
+      const idempotencyKey = idempotencyRef.current?.payload === payload ? idempotencyRef.current.key : newIdempotencyKey();
+      idempotencyRef.current = { payload, key: idempotencyKey };
+      const result = await submitQuiz(quizId, userId, answersArray, idempotencyKey);
+      idempotencyRef.current = null;
       
       clearInterval(progressInterval);
       setSubmissionProgress(100);
@@ -166,6 +189,14 @@ export default function QuizPage({ quizId, userId, onBack, subjectId: propSubjec
     }
   };
 
+  const handleRetryReport = async () => {
+    try {
+      setReport(await retryQuizReport(quizId, userId));
+    } catch (err) {
+      alert(err instanceof Error ? err.message : '리포트 재생성에 실패했습니다.');
+    }
+  };
+
   const formatWeekScope = (weekNumbers: number[]): string => {
     if (weekNumbers.length === 1) {
       return `Week ${weekNumbers[0]}`;
@@ -373,16 +404,31 @@ export default function QuizPage({ quizId, userId, onBack, subjectId: propSubjec
         ) : (
           report && (
             <div className="mt-8">
-              <Button
-                onClick={() => setShowReport(!showReport)}
-                variant="outline"
-                className="w-full gap-2"
-              >
-                {showReport ? <ChevronUp className="h-4 w-4" /> : <ChevronDown className="h-4 w-4" />}
-                {showReport ? '분석 리포트 숨기기' : '분석 리포트 보기'}
-              </Button>
-
-              {showReport && report && (
+              {report.status === 'pending' ? (
+                <Button variant="outline" className="w-full gap-2" disabled>
+                  <Loader2 className="h-4 w-4 animate-spin" />
+                  AI 분석 리포트 생성 중...
+                </Button>
+              ) : report.status === 'failed' ? (
+                <div className="space-y-2 text-center">
+                  <p className="text-sm text-destructive">{report.error_message || '리포트 생성에 실패했습니다.'}</p>
+                  <Button onClick={handleRetryReport} variant="outline" className="w-full gap-2">
+                    <RotateCcw className="h-4 w-4" />
+                    리포트 다시 생성하기
+                  </Button>
+                </div>
+              ) : (
+                <Button
+                  onClick={() => setShowReport(!showReport)}
+                  variant="outline"
+                  className="w-full gap-2"
+                >
+                  {showReport ? <ChevronUp className="h-4 w-4" /> : <ChevronDown className="h-4 w-4" />}
+                  {showReport ? '분석 리포트 숨기기' : '분석 리포트 보기'}
+                </Button>
+              )}
+
+              {showReport && report && report.status === 'ready' && (
                 <Card className="mt-4 border-2 shadow-xl bg-white">
                   <CardHeader className="bg-gradient-to-r from-blue-600 via-indigo-600 to-purple-600 text-white">
                     <div className="flex items-start justify-between pb-2 border-b-2 border-white/20">
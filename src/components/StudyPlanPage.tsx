@@ -409,6 +409,15 @@ export default function StudyPlanPage({ subjectId, onBack }: StudyPlanPageProps)
           </Card>
         )}
 
+        {/* 응원 메시지 */}
+        {subject.study_plan?.message && (
+          <Card className="mb-6 border-purple-200 bg-purple-50">
+            <CardContent className="pt-6">
+              <p className="text-sm text-purple-800">{subject.study_plan.message}</p>
+            </CardContent>
+          </Card>
+        )}
+
         {/* 캘린더 뷰 */}
         {subject.study_plan ? (
           <div className="space-y-6">
@@ -13,6 +13,14 @@ const api = axios.create({
   },
 });
 
+/**
+ * 멱등성 키 생성 (같은 작업의 재시도에 같은 키를 보내면 서버가 한 번만 처리)
+ */
+export const newIdempotencyKey = (): string =>
+  typeof crypto !== 'undefined' && 'randomUUID' in crypto
+    ? crypto.randomUUID()
+    : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+
 // API 응답 타입 정의
 export interface UserProfile {
   id?: number;
@@ -168,7 +176,7 @@ export interface Subject {
   exam_week_start?: number | null;  // 시험 범위 시작 주차
   exam_week_end?: number | null;  // 시험 범위 종료 주차
   is_notification_on?: boolean;  // 학습 알림 설정
-  study_plan?: { plan: { [date: string]: string } } | null;  // 학습 계획
+  study_plan?: { plan: { [date: string]: string }; message?: string; generated_at?: string } | null;  // 학습 계획 (message: 응원 메시지)
   created_at?: string;
   updated_at?: string;
 }
@@ -202,6 +210,8 @@ export interface Material {
   file_size: number | null;
   uploaded_at?: string;
   learning_pdf_id?: number; // PDF인 경우 학습용 PDF ID
+  text_status?: 'pending' | 'ready' | 'failed' | null; // PDF 텍스트 추출 상태 (업로드 후 백그라운드 처리)
+  page_count?: number | null;
 }
 
 export interface SubjectDetail extends Subject {
@@ -994,6 +1004,8 @@ export interface QuizReport {
   score: number;
   total: number;
   ai_report: string;
+  status: 'pending' | 'ready' | 'failed'; // 제출 직후 'pending', AI 리포트 생성 후 'ready'
+  error_message: string | null;
   created_at: string;
 }
 
@@ -1026,16 +1038,20 @@ export const generateQuiz = async (
     language: 'korean' | 'english';
     num_questions: number;
     past_exam_context?: string;
-  }
-): Promise<{ message: string; quiz: Quiz; questions: Question[] }> => {
+  },
+  idempotencyKey?: string
+): Promise<{ message: string; quiz: Quiz; questions: Question[]; bank_question_count?: number }> => {
   try {
-    const response = await api.post<{ message: string; quiz: Quiz; questions: Question[] }>(
+    // bank_question_count: 문제 은행에서 가져온 문제 수 (나머지는 새로 생성)
+    // idempotencyKey: 재시도 시 같은 키를 보내면 서버가 퀴즈를 다시 만들지 않고 처음 결과를 반환
+    const response = await api.post<{ message: string; quiz: Quiz; questions: Question[]; bank_question_count?: number }>(
       '/api/quiz/generate',
       {
         subject_id: subjectId,
         user_id: userId,
         ...options
-      }
+      },
+      idempotencyKey ? { headers: { 'Idempotency-Key': idempotencyKey } } : undefined
     );
     return response.data;
   } catch (error) {
@@ -1071,7 +1087,8 @@ export const getQuiz = async (quizId: number): Promise<QuizDetail> => {
 export const submitQuiz = async (
   quizId: number,
   userId: number,
-  answers: Array<{ question_id: number; answer: string }>
+  answers: Array<{ question_id: number; answer: string }>,
+  idempotencyKey?: string
 ): Promise<{
   message: string;
   score: number;
@@ -1089,7 +1106,7 @@ export const submitQuiz = async (
     }>(`/api/quiz/${quizId}/submit`, {
       user_id: userId,
       answers
-    });
+    }, idempotencyKey ? { headers: { 'Idempotency-Key': idempotencyKey } } : undefined);
     return response.data;
   } catch (error) {
     if (axios.isAxiosError(error)) {
@@ -1101,6 +1118,44 @@ export const submitQuiz = async (
   }
 };
 
+/**
+ * 퀴즈 리포트 조회 API (제출 후 AI 리포트 생성 상태 폴링용)
+ */
+export const getQuizReport = async (quizId: number, userId: number): Promise<QuizReport> => {
+  try {
+    const response = await api.get<{ report: QuizReport }>(`/api/quiz/${quizId}/report`, {
+      params: { user_id: userId }
+    });
+    return response.data.report;
+  } catch (error) {
+    if (axios.isAxiosError(error)) {
+      throw new Error(
+        error.response?.data?.error || '리포트 조회에 실패했습니다.'
+      );
+    }
+    throw error;
+  }
+};
+
+/**
+ * 퀴즈 리포트 재생성 API (생성 실패 시)
+ */
+export const retryQuizReport = async (quizId: number, userId: number): Promise<QuizReport> => {
+  try {
+    const response = await api.post<{ report: QuizReport }>(`/api/quiz/${quizId}/report/retry`, {
+      user_id: userId
+    });
+    return response.data.report;
+  } catch (error) {
+    if (axios.isAxiosError(error)) {
+      throw new Error(
+        error.response?.data?.error || '리포트 재생성에 실패했습니다.'
+      );
+    }
+    throw error;
+  }
+};
+
 /**
  * 퀴즈 히스토리 조회 API
  */
@@ -1232,9 +1287,9 @@ export const toggleNotification = async (
 export const generateStudyPlan = async (
   subjectId: number,
   userId: number
-): Promise<{ message: string; study_plan: { plan: { [date: string]: string } } }> => {
+): Promise<{ message: string; study_plan: { plan: { [date: string]: string }; message?: string; generated_at?: string } }> => {
   try {
-    const response = await api.post<{ message: string; study_plan: { plan: { [date: string]: string } } }>(
+    const response = await api.post<{ message: string; study_plan: { plan: { [date: string]: string }; message?: string; generated_at?: string } }>(
       `/api/subjects/${subjectId}/study-plan`,
       {},
       {